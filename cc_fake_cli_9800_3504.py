@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# flake8: noqa
+
+"""
+NAME: cc_fake_cli_9800_3504.py
+
+CLASSIFICATION: test stand-in
+
+PURPOSE:
+local stand-in for the IOS-XE CLI of a cisco 9800 controller, for trying
+cc_session_9800_3504.py without a controller. It reads commands from stdin and
+answers like the controller:
+    - Username: / Password: login to the WLC1> prompt, 'enable' to WLC1#
+    - 'terminal length 0', canned 'show ap summary' and 'show wlan summary' output
+    - 'configure terminal' to WLC1(config)#, 'wlan <name> ...' and 'ap profile <name>'
+      to the WLC1(config-wlan)# and WLC1(config-ap-profile)# sub-modes, 'exit' and 'end'
+    - '% Invalid input' for unknown exec commands
+Every command accepted in config mode is appended to --log as "<mode>: <command>",
+so a test can see which configuration the controller received. --drop_after closes
+the connection instead of reading the command after that many commands.
+
+SETUP:
+None
+
+EXAMPLE:
+    ./cc_fake_cli_9800_3504.py --prompt WLC1 --user admin --passwd Cisco123 --log /tmp/fake_cli.log
+
+    session = controller_cli_session(prompt='WLC1', user='admin', passwd='Cisco123',
+                                     spawn=lambda: pexpect.spawn('./cc_fake_cli_9800_3504.py', encoding='utf-8'))
+
+COPYRIGHT:
+    Copyright 2023 Candela Technologies Inc
+    License: Free to distribute and modify. LANforge systems must be licensed.
+
+INCLUDE_IN_README
+"""
+
+import sys
+if sys.version_info[0] != 3:
+    print("This script requires Python 3")
+    exit()
+
+import argparse
+
+SHOW_OUTPUT = {
+    "show ap summary": """Number of APs: 1
+
+AP Name                          Slots    AP Model  Ethernet MAC    Radio MAC       Location                          Country     IP Address                                 State
+-------------------------------------------------------------------------------------------------------------------------------------------------------------------------------------
+APA453.0E7B.CF9C                 3        C9136I-B  a453.0e7b.cf9c  10b3.d507.9d00  default location                  US          192.168.100.109                            Registered""",
+    "show wlan summary": """Number of WLANs: 1
+
+ID   Profile Name                     SSID                             Status Security
+-------------------------------------------------------------------------------------------------------------------------------------------------------
+1    open-wlan                        open-wlan                        UP     [open],MAC Filtering""",
+}
+# config commands that enter a sub-mode, and the sub-mode
+SUB_MODES = (("wlan ", "config-wlan"), ("ap profile ", "config-ap-profile"))
+
+
+class fake_cli:
+    def __init__(self, prompt=None, user=None, passwd=None, log=None, drop_after=None):
+        self.prompt = prompt
+        self.user = user
+        self.passwd = passwd
+        self.log = log
+        self.drop_after = drop_after
+        self.commands = 0
+        # user, enable, config, config-wlan, ...
+        self.mode = 'user'
+
+    def write(self, text):
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
+    def show_prompt(self):
+        if self.mode == 'user':
+            self.write("\n{prompt}>".format(prompt=self.prompt))
+        elif self.mode == 'enable':
+            self.write("\n{prompt}#".format(prompt=self.prompt))
+        else:
+            self.write("\n{prompt}({mode})#".format(prompt=self.prompt, mode=self.mode))
+
+    def read_line(self):
+        line = sys.stdin.readline()
+        if not line:
+            raise EOFError
+        return line.strip()
+
+    def login(self):
+        self.write("Username: ")
+        if self.read_line() != self.user:
+            return False
+        self.write("Password: ")
+        return self.read_line() == self.passwd
+
+    def config(self, command):
+        if command == "end":
+            self.mode = 'enable'
+            return
+        if command == "exit":
+            self.mode = 'enable' if self.mode == 'config' else 'config'
+            return
+        if self.log:
+            with open(self.log, "a") as log:
+                log.write("{mode}: {command}\n".format(mode=self.mode, command=command))
+        for prefix, mode in SUB_MODES:
+            if command.startswith(prefix):
+                self.mode = mode
+
+    def command(self, command):
+        if not command:
+            return True
+        if self.mode == 'user':
+            if command == "enable":
+                self.write("Password: ")
+                if self.read_line() == self.passwd:
+                    self.mode = 'enable'
+                else:
+                    self.write("% Bad passwords\n")
+            elif command in ("logout", "exit"):
+                return False
+            else:
+                self.write("% Invalid input detected at '^' marker.\n")
+        elif self.mode == 'enable':
+            if command in ("logout", "exit"):
+                return False
+            if command == "configure terminal":
+                self.write("Enter configuration commands, one per line.  End with CNTL/Z.\n")
+                self.mode = 'config'
+            elif command in SHOW_OUTPUT:
+                self.write(SHOW_OUTPUT[command] + "\n")
+            elif command != "terminal length 0":
+                self.write("% Invalid input detected at '^' marker.\n")
+        else:
+            self.config(command)
+        return True
+
+    def run(self):
+        try:
+            if not self.login():
+                self.write("% Authentication failed\n")
+                return
+            while True:
+                self.show_prompt()
+                if self.drop_after is not None and self.commands >= self.drop_after:
+                    # the connection drops between two commands
+                    return
+                command = self.read_line()
+                self.commands += 1
+                if not self.command(command):
+                    return
+        except EOFError:
+            return
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='cc_fake_cli_9800_3504.py',
+        formatter_class=argparse.RawTextHelpFormatter,
+        description='''\
+NAME: cc_fake_cli_9800_3504.py
+
+PURPOSE:
+answer on stdin / stdout like the CLI of a cisco 9800 controller, for testing cc_session_9800_3504.py
+
+EXAMPLE:
+./cc_fake_cli_9800_3504.py --prompt WLC1 --user admin --passwd Cisco123 --log /tmp/fake_cli.log
+''')
+    parser.add_argument("--prompt", type=str, help="controller prompt", default="WLC1")
+    parser.add_argument("--user", type=str, help="credential login/username", default="admin")
+    parser.add_argument("--passwd", type=str, help="credential password", default="Cisco123")
+    parser.add_argument("--log", type=str, help="file the config mode commands are appended to")
+    parser.add_argument("--drop_after", type=int, help="close the connection after this many commands")
+    args = parser.parse_args()
+
+    fake_cli(prompt=args.prompt, user=args.user, passwd=args.passwd, log=args.log, drop_after=args.drop_after).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,9 @@ EXAMPLE:
 
     ./cc_module_9800_3504.py --scheme ssh --dest localhost --port 8887 --user admin --passwd Cisco123 --ap APCC9C.3EF1.1140 --series 9800 --prompt "WLC1" --timeout 10 --band '5g'
 
+    keep one controller login open for all the actions (9800 over ssh or telnet), see cc_session_9800_3504.py
+    ./cc_module_9800_3504.py --scheme ssh --dest localhost --port 8887 --user admin --passwd Cisco123 --ap APA453.0E7B.CF9C --series 9800 --prompt "WLC1" --timeout 10 --band '5g' --persistent_session
+
 SUPPORT HISTORY:
 
 2/25/2022 - adding 6E support
@@ -72,7 +75,8 @@ class create_controller_series_object:
                  ap_dual_band_slot_6g=None,
                  port=None,
                  timeout=None,
-                 pwd=None
+                 pwd=None,
+                 persistent_session=False
                  ):
         if scheme is None:
             raise ValueError('Controller scheme must be set: serial, ssh or telnet')
@@ -182,6 +186,23 @@ class create_controller_series_object:
         self.testbed_location = 'NA'
         self.ap_config_radio_role = 'NA'
 
+        # with persistent_session the 9800 actions are sent over one login kept open
+        # by cc_session_9800_3504, instead of running wifi_ctl_9800_3504.py for each action
+        self.session = None
+        if persistent_session:
+            if self.series == "9800" and self.scheme in ["ssh", "telnet"]:
+                cc_session = importlib.import_module("cc_session_9800_3504")
+                self.session = cc_session.controller_cli_session(
+                    scheme=self.scheme,
+                    dest=self.dest,
+                    port=self.port,
+                    user=self.user,
+                    passwd=self.passwd,
+                    prompt=self.prompt,
+                    timeout=self.timeout)
+            else:
+                logger.warning("persistent_session supported for series 9800 over ssh or telnet, running wifi_ctl_9800_3504.py per action")
+
 
     # TODO update the wifi_ctl_9800_3504 to use 24g, 5g, 6g
 
@@ -220,12 +241,116 @@ class create_controller_series_object:
 #
     # TODO consolidate the command formats
 
+    # dot11 band name used in the 9800 commands
+    def dot11_band(self):
+        if self.band in ['dual_band_5g', 'dual_band_6g']:
+            return 'dual-band'
+        elif self.band == '6g':
+            return '6ghz'
+        elif self.band == '5g':
+            return '5ghz'
+        return '24ghz'
+
+    # the 9800 commands wifi_ctl_9800_3504.py sends for an action
+    # returns (mode, commands) with mode 'exec' or 'config', None if the action is left to wifi_ctl_9800_3504.py
+    def session_command(self):
+        band = self.dot11_band()
+        ap_band = "ap name {ap} dot11 {band} slot {slot}".format(ap=self.ap, band=band, slot=self.ap_band_slot)
+        exec_commands = {
+            'cmd': self.value,
+            'summary': "show ap summary",
+            'show_ap_status': "show ap status",
+            'show_ap_name_config_role': "show ap name {ap} config slot {slot} | inc Role".format(ap=self.ap, slot=self.ap_band_slot),
+            'show_ap_tx_power_config': "show ap name {ap} config dot11 {band} | sec Tx".format(ap=self.ap, band=band),
+            'advanced': "show ap dot11 {band} summary".format(band=band),
+            'show_ap_bssid_24g': "show ap name {ap} wlan dot11 24ghz".format(ap=self.ap),
+            'show_ap_bssid_5g': "show ap name {ap} wlan dot11 5ghz".format(ap=self.ap),
+            'show_ap_bssid_6g': "show ap name {ap} wlan dot11 6ghz".format(ap=self.ap),
+            'show_ap_bssid_dual_band_5g': "show ap name {ap} wlan dot11 dual-band".format(ap=self.ap),
+            'show_ap_bssid_dual_band_6g': "show ap name {ap} wlan dot11 dual-band".format(ap=self.ap),
+            'show_ap_wlan_summary': "show ap wlan summary",
+            'show_wlan_summary': "show wlan summary",
+            'show_wireless_client_sumry': "show wireless client summary",
+            'show_client_macadd_detail': "show wireless client mac-address {mac} detail".format(mac=self.value),
+            'debug_wieless_mac': "debug wireless mac {mac}".format(mac=self.value),
+            'no_debug_wieless_mac': "no debug wireless mac {mac}".format(mac=self.value),
+            'get_ra_trace_files': "dir bootflash: | i ra_trace",
+            'get_data_ra_trace_files': "more bootflash:{file}".format(file=self.value),
+            'del_ra_trace_file': "delete /force bootflash:{file}".format(file=self.value),
+            '11r_logs': "sh wi stats client detail | inc 11r",
+            'txPower': "{ap_band} txpower {value}".format(ap_band=ap_band, value=self.value),
+            'channel': "{ap_band} channel {value}".format(ap_band=ap_band, value=self.value),
+            'bandwidth': "{ap_band} channel width {value}".format(ap_band=ap_band, value=self.value),
+            'auto': "{ap_band} radio role auto".format(ap_band=ap_band),
+            'enable_operation_status': "ap name {ap} no dot11 {band} slot {slot} shutdown".format(ap=self.ap, band=band, slot=self.ap_band_slot),
+            'disable_operation_status': "{ap_band} shutdown".format(ap_band=ap_band),
+            'disable_network_dual_band_5ghz': "ap name {ap} dot11 dual-band slot {slot} shutdown".format(ap=self.ap, slot=self.ap_band_slot),
+            'disable_network_dual_band_6ghz': "ap name {ap} dot11 dual-band slot {slot} shutdown".format(ap=self.ap, slot=self.ap_band_slot),
+            'enable_network_dual_band_5ghz': "ap name {ap} no dot11 dual-band slot {slot} shutdown".format(ap=self.ap, slot=self.ap_band_slot),
+            'enable_network_dual_band_6ghz': "ap name {ap} no dot11 dual-band slot {slot} shutdown".format(ap=self.ap, slot=self.ap_band_slot),
+            'dual_band_mode_shutdown': "ap name {ap} dot11 dual-band shutdown".format(ap=self.ap),
+            'dual_band_no_mode_shutdown': "ap name {ap} no dot11 dual-band shutdown".format(ap=self.ap),
+        }
+        if band == 'dual-band':
+            exec_commands['manual'] = "{ap_band} role manual client-serving".format(ap_band=ap_band)
+            exec_commands['config_dual_band_mode'] = "ap name {ap} dot11 dual-band slot {slot} band {band}".format(
+                ap=self.ap, slot=self.ap_band_slot, band='6ghz' if self.band == 'dual_band_6g' else '5ghz')
+        else:
+            exec_commands['manual'] = "{ap_band} radio role manual client-serving".format(ap_band=ap_band)
+
+        # the dot11ax mcs commands use the band of a dual band radio
+        mcs_band = {'dual_band_6g': '6ghz', 'dual_band_5g': '5ghz'}.get(self.band, band)
+        mcs_index = "ap dot11 {band} dot11ax mcs tx index {index} spatial-stream {stream}".format(
+            band=mcs_band, index=self.mcs_tx_index, stream=self.spatial_stream)
+        config_commands = {
+            'disable_network_24ghz': ["ap dot11 24ghz shutdown"],
+            'disable_network_5ghz': ["ap dot11 5ghz shutdown"],
+            'disable_network_6ghz': ["ap dot11 6ghz shutdown"],
+            'enable_network_24ghz': ["no ap dot11 24ghz shutdown"],
+            'enable_network_5ghz': ["no ap dot11 5ghz shutdown"],
+            'enable_network_6ghz': ["no ap dot11 6ghz shutdown"],
+            'no_logging_console': ["no logging console"],
+            'line_console_0': ["line console 0"],
+            'ap_dot11_dot11ax_mcs_tx_index_spatial_stream': [mcs_index],
+            'no_ap_dot11_dot11ax_mcs_tx_index_spatial_stream': ["no " + mcs_index],
+            'enable_wlan': ["wlan {wlan}".format(wlan=self.wlan), "no shutdown"],
+            'disable_wlan': ["wlan {wlan}".format(wlan=self.wlan), "shutdown"],
+        }
+        if self.action in exec_commands:
+            return 'exec', [exec_commands[self.action]]
+        if self.action in config_commands:
+            return 'config', config_commands[self.action]
+        return None
+
+    def send_session_command(self, mode, commands):
+        logger.info("action {action} session {mode}: {commands}".format(action=self.action, mode=mode, commands=commands))
+        if mode == 'config':
+            summary_output = self.session.config_commands(commands)
+        else:
+            summary_output = ''.join(self.session.exec_command(command) for command in commands)
+        logger.info(summary_output)
+        return summary_output
+
+    def close_session(self):
+        if self.session is not None:
+            logger.info("controller session: {logins} logins {commands} commands {reconnects} reconnects".format(
+                logins=self.session.logins, commands=self.session.commands_sent, reconnects=self.session.reconnects))
+            self.session.close()
+
     def send_command(self):
         # self.convert_band()
         self.set_ap_band_slot()
 
         logger.info("action {action}".format(action=self.action))
 
+        if self.session is not None:
+            session_command = self.session_command()
+            if session_command is not None:
+                try:
+                    return self.send_session_command(*session_command)
+                except ConnectionError as x:
+                    logger.error("action {action} controller session failed: {x}, running wifi_ctl_9800_3504.py".format(action=self.action, x=x))
+
         # set the ap_band_slot 24g = ap_band_slot 0 , 5g ap_band_slot = 1 / 2, 6g - ap_band_slot 2 / 3 so needs to be passed in
 
         # Command base
@@ -1382,6 +1507,7 @@ INCLUDE_IN_README
     parser.add_argument("--lf_logger_config_json", help="[debug configuration] --lf_logger_config_json <json file> , json configuration of logger")
     parser.add_argument("--debug", help='--debug flag present debug on  enable debugging', action='store_true')
     parser.add_argument('--log_level', default=None, help='--log_level <level>', choices=['debug', 'info', 'warning', 'error', 'critical'])
+    parser.add_argument("--persistent_session", help='--persistent_session keep one controller login open for all the commands, 9800 only', action='store_true')
 
     args = parser.parse_args()
 
@@ -1411,7 +1537,8 @@ INCLUDE_IN_README
         ap=args.ap,
         port=args.port,
         band=args.band,
-        timeout=args.timeout)
+        timeout=args.timeout,
+        persistent_session=args.persistent_session)
     # TODO add ability to select tests
     # cs.show_ap_summary()
     # summary = cs.show_ap_bssid_5ghz()
@@ -1420,6 +1547,7 @@ INCLUDE_IN_README
     # sample to dump status
     # sample_test_dump_status(cs=cs)
     cs.show_wireless_client_sum_cc()
+    cs.close_session()
 
 
 if __name__ == "__main__":
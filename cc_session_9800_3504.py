@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+# flake8: noqa
+
+"""
+NAME: cc_session_9800_3504.py
+
+CLASSIFICATION: module
+
+PURPOSE:
+long lived CLI session to a cisco 9800 controller.
+wifi_ctl_9800_3504.py logs in, disables paging, sends one action and logs out every
+time it is run. controller_cli_session logs in once and keeps the pexpect connection
+open across commands:
+    - the prompt is tracked, WLC1> (user), WLC1# (enable), WLC1(config...)# (config)
+    - exec_command() sends a command from the enable prompt and returns its output
+    - config_commands() sends a list of commands in config mode, consecutive calls
+      share one 'configure terminal'
+    - a connection that drops or stops answering is logged into again and the
+      command is sent again; a config_commands() batch resumes after the last
+      command the controller answered, in the sub-mode it was in
+
+The session is used by cc_module_9800_3504.py when persistent_session is set.
+
+SETUP:
+pexpect, the ssh or telnet client
+
+EXAMPLE:
+    session = controller_cli_session(scheme='ssh', dest='localhost', port=8887, user='admin',
+                                     passwd='Cisco123', prompt='WLC1', timeout=10)
+    summary = session.exec_command('show ap summary')
+    session.config_commands(['ap dot11 5ghz shutdown'])
+    session.close()
+
+    ./cc_session_9800_3504.py --scheme ssh --dest localhost --port 8887 --user admin --passwd Cisco123 --prompt "WLC1" --command "show ap summary"
+
+    The spawn parameter replaces the ssh / telnet client, for instance with
+    cc_fake_cli_9800_3504.py, a local program that answers like the controller CLI;
+    cc_session_test.py runs the session against it:
+    session = controller_cli_session(prompt='WLC1', user='admin', passwd='Cisco123',
+                                     spawn=lambda: pexpect.spawn('./cc_fake_cli_9800_3504.py', encoding='utf-8'))
+
+COPYRIGHT:
+    Copyright 2023 Candela Technologies Inc
+    License: Free to distribute and modify. LANforge systems must be licensed.
+
+INCLUDE_IN_README
+"""
+
+import sys
+if sys.version_info[0] != 3:
+    print("This script requires Python 3")
+    exit()
+
+import argparse
+import logging
+import importlib
+import os
+import re
+import pexpect
+
+sys.path.append(os.path.join(os.path.abspath(__file__ + "../../")))
+
+logger = logging.getLogger(__name__)
+lf_logger_config = importlib.import_module("py-scripts.lf_logger_config")
+
+# answers the controller expects during login and commands
+FINGERPRINT = r"\(yes/no(/\[fingerprint\])?\)\?"
+USERNAME = r"(Username|User):"
+PASSWORD = r"[Pp]assword:"
+MORE = r"--More--"
+# 'Are you sure you want to continue? (y/n)[y]:' , answered y as wifi_ctl_9800_3504.py does
+CONFIRM = r"\(y/n\)(\[[yn]\])?:?"
+CLI_ERRORS = ("% Invalid", "% Incomplete", "% Ambiguous", "% Unknown")
+
+
+class controller_cli_session:
+    Default_Timeout = 10
+    Default_Retries = 1
+    Max_Login_Steps = 12
+
+    def __init__(self,
+                 scheme='ssh',
+                 dest=None,
+                 port=None,
+                 user=None,
+                 passwd=None,
+                 prompt=None,
+                 timeout=Default_Timeout,
+                 retries=Default_Retries,
+                 spawn=None):
+        """
+        :param scheme: ssh or telnet
+        :param dest: controller address
+        :param port: ssh or telnet port
+        :param user: login user
+        :param passwd: login and enable password
+        :param prompt: host name shown in the prompt, WLC1
+        :param timeout: seconds to wait for a prompt
+        :param retries: times a command is sent again after the connection dropped
+        :param spawn: function returning a pexpect spawn with encoding set, replaces the ssh / telnet client
+        """
+        if prompt is None:
+            raise ValueError('controller_cli_session prompt must be set: WLC1')
+        if spawn is None:
+            if scheme not in ('ssh', 'telnet'):
+                raise ValueError('controller_cli_session scheme must be ssh or telnet')
+            if dest is None:
+                raise ValueError('controller_cli_session dest must be set: and IP or localhost')
+        self.scheme = scheme
+        self.dest = dest
+        self.port = port
+        self.user = user
+        self.passwd = passwd
+        self.prompt = prompt
+        self.timeout = int(timeout)
+        self.retries = int(retries)
+        self.spawn = spawn
+        # WLC1> WLC1# WLC1(config)# WLC1(config-wlan)#
+        self.prompt_pattern = re.escape(prompt) + r"(\([\w\-]+\))?([>#])"
+        self.egg = None
+        # user, enable or config
+        self.mode = None
+        # config, config-wlan, ... when in config mode
+        self.config_mode = None
+        self.logins = 0
+        self.commands_sent = 0
+        self.reconnects = 0
+
+    def _spawn(self):
+        if self.spawn is not None:
+            return self.spawn()
+        if self.scheme == 'ssh':
+            port = int(self.port) if self.port else 22
+            cmd = "ssh -p%d -o PubkeyAuthentication=no %s@%s" % (port, self.user, self.dest)
+        else:
+            port = int(self.port) if self.port else 23
+            cmd = "telnet %s %d" % (self.dest, port)
+        logger.info("Spawn: {cmd}".format(cmd=cmd))
+        return pexpect.spawn(cmd, encoding='utf-8', codec_errors='ignore')
+
+    def _set_mode(self, match):
+        if match.group(2) == '>':
+            self.mode = 'user'
+            self.config_mode = None
+        elif match.group(1):
+            self.mode = 'config'
+            self.config_mode = match.group(1)[1:-1]
+        else:
+            self.mode = 'enable'
+            self.config_mode = None
+
+    def connected(self):
+        return self.egg is not None and self.egg.isalive() and self.mode is not None
+
+    def login(self):
+        """
+        Log in and go to the enable prompt with paging disabled
+        """
+        self.close()
+        self.egg = self._spawn()
+        user_sent = False
+        password_sent = False
+        enable_sent = False
+        for step in range(self.Max_Login_Steps):
+            i = self.egg.expect([self.prompt_pattern, FINGERPRINT, USERNAME, PASSWORD, pexpect.EOF, pexpect.TIMEOUT],
+                                timeout=self.timeout)
+            if i == 0:
+                self._set_mode(self.egg.match)
+                if self.mode == 'enable':
+                    break
+                if self.mode == 'config':
+                    # a session left in config mode
+                    self.egg.sendline("end")
+                elif not enable_sent:
+                    self.egg.sendline("enable")
+                    enable_sent = True
+                else:
+                    raise ConnectionError("controller {prompt}: enable failed".format(prompt=self.prompt))
+            elif i == 1:
+                self.egg.sendline("yes")
+            elif i == 2:
+                if user_sent:
+                    raise ConnectionError("controller {prompt}: login failed".format(prompt=self.prompt))
+                self.egg.sendline(self.user)
+                user_sent = True
+            elif i == 3:
+                if password_sent and not enable_sent:
+                    raise ConnectionError("controller {prompt}: login failed".format(prompt=self.prompt))
+                self.egg.sendline(self.passwd)
+                password_sent = True
+            elif i == 4:
+                raise ConnectionError("controller {prompt}: connection closed during login".format(prompt=self.prompt))
+            else:
+                # telnet needs a return to show the first prompt
+                logger.info("controller {prompt}: timed out during login, sending return".format(prompt=self.prompt))
+                self.egg.sendline("")
+        if self.mode != 'enable':
+            raise ConnectionError("controller {prompt}: did not reach the {prompt}# prompt".format(prompt=self.prompt))
+        self.logins += 1
+        logger.info("controller {prompt}: logged in, login {logins}".format(prompt=self.prompt, logins=self.logins))
+        self._send("terminal length 0")
+
+    def _read_until_prompt(self):
+        """
+        :return: output up to the next prompt; --More-- and (y/n) are answered
+        """
+        output = ''
+        while True:
+            i = self.egg.expect([self.prompt_pattern, MORE, CONFIRM, pexpect.EOF, pexpect.TIMEOUT],
+                                timeout=self.timeout)
+            output += self.egg.before
+            if i == 0:
+                self._set_mode(self.egg.match)
+                return output
+            if i == 1:
+                self.egg.send(' ')
+            elif i == 2:
+                output += self.egg.after
+                self.egg.sendline('y')
+            elif i == 3:
+                self.mode = None
+                raise ConnectionError("controller {prompt}: connection closed".format(prompt=self.prompt))
+            else:
+                self.mode = None
+                raise ConnectionError("controller {prompt}: timed out waiting for the prompt".format(prompt=self.prompt))
+
+    def _send(self, command):
+        """
+        :return: output of one command, without the echoed command line
+        """
+        self.egg.sendline(command)
+        self.commands_sent += 1
+        output = self._read_until_prompt()
+        lines = output.replace('\r', '').split('\n')
+        if lines and lines[0].strip() == command.strip():
+            lines = lines[1:]
+        output = '\n'.join(lines)
+        for line in lines:
+            if line.strip().startswith(CLI_ERRORS):
+                logger.warning("controller {prompt}: {command}: {error}".format(
+                    prompt=self.prompt, command=command, error=line.strip()))
+        return output
+
+    def _retry(self, send):
+        for attempt in range(self.retries + 1):
+            try:
+                if not self.connected():
+                    if self.logins:
+                        self.reconnects += 1
+                    self.login()
+                return send()
+            except ConnectionError as x:
+                logger.warning("controller {prompt}: {x}".format(prompt=self.prompt, x=x))
+                self.close()
+                if attempt == self.retries:
+                    raise
+
+    def end_config(self):
+        """ leave config mode for the enable prompt """
+        if self.connected() and self.mode == 'config':
+            self._send("end")
+
+    def exec_command(self, command=None):
+        """
+        Send a command from the enable prompt
+        :param command: show ap summary, ap name <ap> dot11 5ghz slot 1 channel 36, ...
+        :return: command output
+        """
+        def send():
+            self.end_config()
+            return self._send(command)
+        logger.info("controller {prompt}# {command}".format(prompt=self.prompt, command=command))
+        return self._retry(send)
+
+    def config_commands(self, commands=None):
+        """
+        Send commands in config mode. The session stays in config mode, so consecutive
+        calls share one 'configure terminal'; exec_command() and close() leave it.
+        If the connection drops part way, the commands the controller answered are not
+        sent again: after logging in again the sub-mode commands that led to the current
+        sub-mode are entered again and the batch resumes with the first unanswered command.
+        :param commands: list of commands, a sub-mode command like 'wlan <name>' applies to the commands after it
+        :return: output of the commands
+        """
+        # output of the commands the controller answered
+        answered = []
+        # (sub-mode, command that entered it) from the top level config prompt to the current sub-mode
+        sub_modes = []
+
+        def send():
+            if self.mode != 'config':
+                self._send("configure terminal")
+            # start from the top level config prompt
+            while self.mode == 'config' and self.config_mode != 'config':
+                self._send("exit")
+            if self.mode != 'config':
+                raise ConnectionError("controller {prompt}: did not reach the (config)# prompt".format(
+                    prompt=self.prompt))
+            if answered:
+                logger.info("controller {prompt}: resuming after {count} of {total} config commands".format(
+                    prompt=self.prompt, count=len(answered), total=len(commands)))
+            for _, command in sub_modes:
+                self._send(command)
+            for command in commands[len(answered):]:
+                config_mode = self.config_mode
+                answered.append(self._send(command))
+                if self.mode != 'config' or self.config_mode == 'config':
+                    del sub_modes[:]
+                elif self.config_mode != config_mode:
+                    modes = [mode for mode, _ in sub_modes]
+                    if self.config_mode in modes:
+                        # 'exit' back to an outer sub-mode
+                        del sub_modes[modes.index(self.config_mode) + 1:]
+                    else:
+                        sub_modes.append((self.config_mode, command))
+            return ''.join(answered)
+        logger.info("controller {prompt}(config)# {commands}".format(prompt=self.prompt, commands=commands))
+        return self._retry(send)
+
+    def close(self):
+        """ log out and close the connection """
+        if self.egg is None:
+            return
+        try:
+            if self.egg.isalive():
+                if self.mode == 'config':
+                    self.egg.sendline("end")
+                self.egg.sendline("logout")
+                if self.scheme == 'telnet' and self.spawn is None:
+                    self.egg.sendline("\x1b\r")
+        except (OSError, pexpect.ExceptionPexpect) as x:
+            logger.info("controller {prompt}: logout failed: {x}".format(prompt=self.prompt, x=x))
+        self.egg.close(force=True)
+        self.egg = None
+        self.mode = None
+        self.config_mode = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='cc_session_9800_3504.py',
+        formatter_class=argparse.RawTextHelpFormatter,
+        description='''\
+NAME: cc_session_9800_3504.py
+
+PURPOSE:
+send commands to a cisco 9800 controller over one login
+
+EXAMPLE:
+./cc_session_9800_3504.py --scheme ssh --dest localhost --port 8887 --user admin --passwd Cisco123 --prompt "WLC1" --command "show ap summary" --command "show wlan summary"
+./cc_session_9800_3504.py --scheme ssh --dest localhost --port 8887 --user admin --passwd Cisco123 --prompt "WLC1" --config "ap dot11 5ghz shutdown"
+''')
+    parser.add_argument("--dest", type=str, help="address of the cisco controller", required=True)
+    parser.add_argument("--port", type=str, help="control port on the controller")
+    parser.add_argument("--user", type=str, help="credential login/username", required=True)
+    parser.add_argument("--passwd", type=str, help="credential password", required=True)
+    parser.add_argument("--prompt", type=str, help="controller prompt", required=True)
+    parser.add_argument("--scheme", type=str, choices=["ssh", "telnet"], help="Connect via ssh or telnet", default="ssh")
+    parser.add_argument("--timeout", type=str, help="timeout value", default=10)
+    parser.add_argument("--command", action='append', help="command sent from the enable prompt, may be repeated", default=[])
+    parser.add_argument("--config", action='append', help="command sent in config mode, may be repeated", default=[])
+    parser.add_argument("--lf_logger_config_json", help="[debug configuration] --lf_logger_config_json <json file> , json configuration of logger")
+    parser.add_argument('--log_level', default=None, help='--log_level <level>', choices=['debug', 'info', 'warning', 'error', 'critical'])
+
+    args = parser.parse_args()
+
+    logger_config = lf_logger_config.lf_logger_config()
+    if args.log_level:
+        logger_config.set_level(args.log_level)
+    if args.lf_logger_config_json:
+        logger_config.lf_logger_config_json = args.lf_logger_config_json
+        logger_config.load_lf_logger_config()
+
+    with controller_cli_session(scheme=args.scheme, dest=args.dest, port=args.port, user=args.user,
+                                passwd=args.passwd, prompt=args.prompt, timeout=args.timeout) as session:
+        for command in args.command:
+            print(session.exec_command(command))
+        if args.config:
+            print(session.config_commands(args.config))
+
+
+if __name__ == "__main__":
+    main()
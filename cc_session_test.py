@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# flake8: noqa
+
+"""
+NAME: cc_session_test.py
+
+CLASSIFICATION:
+module unit test
+
+PURPOSE:
+to test cc_session_9800_3504.py against cc_fake_cli_9800_3504.py, a local stand-in for
+the 9800 controller CLI, through the spawn hook of controller_cli_session:
+login, prompt tracking, config mode batching and reconnecting part way through a batch
+
+SETUP:
+pexpect
+
+EXAMPLE:
+    ./cc_session_test.py
+    ./cc_session_test.py --log_level debug
+
+COPYRIGHT:
+    Copyright 2023 Candela Technologies Inc
+    License: Free to distribute and modify. LANforge systems must be licensed.
+
+INCLUDE_IN_README
+"""
+
+import sys
+if sys.version_info[0] != 3:
+    print("This script requires Python 3")
+    exit()
+
+import argparse
+import logging
+import importlib
+import os
+import tempfile
+import pexpect
+
+sys.path.append(os.path.join(os.path.abspath(__file__ + "../../")))
+
+logger = logging.getLogger(__name__)
+lf_logger_config = importlib.import_module("py-scripts.lf_logger_config")
+cc_session = importlib.import_module("cc_session_9800_3504")
+
+FAKE_CLI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cc_fake_cli_9800_3504.py")
+WLAN_COMMANDS = ["wlan open-wlan 1 open-wlan", "shutdown", "no security wpa", "no shutdown"]
+
+
+class create_session_test_object:
+    def __init__(self, prompt='WLC1', user='admin', passwd='Cisco123', timeout=5):
+        self.prompt = prompt
+        self.user = user
+        self.passwd = passwd
+        self.timeout = timeout
+        self.log = None
+        self.failures = []
+
+    def session(self, drop_after=None):
+        """
+        :param drop_after: the first connection drops after this many commands, later ones stay up
+        :return: controller_cli_session spawning cc_fake_cli_9800_3504.py
+        """
+        spawns = []
+
+        def spawn():
+            args = [FAKE_CLI, '--prompt', self.prompt, '--user', self.user, '--passwd', self.passwd, '--log', self.log]
+            if drop_after is not None and not spawns:
+                args += ['--drop_after', str(drop_after)]
+            spawns.append(args)
+            return pexpect.spawn(sys.executable, args, encoding='utf-8', timeout=self.timeout)
+        return cc_session.controller_cli_session(prompt=self.prompt, user=self.user, passwd=self.passwd,
+                                                 timeout=self.timeout, spawn=spawn)
+
+    def logged_config(self):
+        with open(self.log) as log:
+            return [line.rstrip('\n') for line in log]
+
+    def check(self, name, result, expected):
+        if result == expected:
+            logger.info("PASS {name}".format(name=name))
+        else:
+            logger.error("FAIL {name}: {result} expected {expected}".format(name=name, result=result, expected=expected))
+            self.failures.append(name)
+
+    def test_login_and_prompt(self):
+        with self.session() as session:
+            output = session.exec_command("show ap summary")
+            self.check("login reaches the enable prompt", (session.logins, session.mode), (1, 'enable'))
+            self.check("show ap summary output", "APA453.0E7B.CF9C" in output, True)
+            session.config_commands(WLAN_COMMANDS[:1])
+            self.check("prompt tracks the sub-mode", (session.mode, session.config_mode), ('config', 'config-wlan'))
+            session.exec_command("show wlan summary")
+            self.check("exec_command leaves config mode", session.mode, 'enable')
+
+    def test_config_batching(self):
+        with self.session() as session:
+            session.config_commands(WLAN_COMMANDS[:2])
+            sent = session.commands_sent
+            # each batch starts from the top level config prompt
+            session.config_commands(WLAN_COMMANDS[:1] + WLAN_COMMANDS[2:])
+            # 'exit' back to the top level config prompt and the three commands, no 'configure terminal'
+            self.check("consecutive batches share configure terminal", session.commands_sent - sent, 4)
+        self.check("batch configuration", self.logged_config(),
+                   ["config: wlan open-wlan 1 open-wlan", "config-wlan: shutdown",
+                    "config: wlan open-wlan 1 open-wlan", "config-wlan: no security wpa", "config-wlan: no shutdown"])
+
+    def test_reconnect_resumes_batch(self):
+        # enable, terminal length 0, configure terminal, wlan and shutdown are answered, then the connection drops
+        with self.session(drop_after=5) as session:
+            session.config_commands(WLAN_COMMANDS)
+            self.check("reconnected once", (session.logins, session.reconnects), (2, 1))
+        self.check("answered commands are not sent again", self.logged_config(),
+                   ["config: wlan open-wlan 1 open-wlan", "config-wlan: shutdown",
+                    "config: wlan open-wlan 1 open-wlan", "config-wlan: no security wpa", "config-wlan: no shutdown"])
+
+    def run(self):
+        for test in (self.test_login_and_prompt, self.test_config_batching, self.test_reconnect_resumes_batch):
+            with tempfile.NamedTemporaryFile(prefix="cc_fake_cli_", suffix=".log", delete=False) as log:
+                self.log = log.name
+            try:
+                test()
+            except (ConnectionError, pexpect.ExceptionPexpect) as x:
+                logger.error("FAIL {name}: {x}".format(name=test.__name__, x=x))
+                self.failures.append(test.__name__)
+            finally:
+                os.remove(self.log)
+        return not self.failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='cc_session_test.py',
+        formatter_class=argparse.RawTextHelpFormatter,
+        description='''\
+NAME: cc_session_test.py
+
+PURPOSE:
+test cc_session_9800_3504.py against the local controller CLI stand-in cc_fake_cli_9800_3504.py
+
+EXAMPLE:
+./cc_session_test.py --log_level debug
+''')
+    parser.add_argument("--prompt", type=str, help="controller prompt", default="WLC1")
+    parser.add_argument("--timeout", type=int, help="seconds to wait for a prompt", default=5)
+    parser.add_argument('--log_level', default=None, help='--log_level <level>', choices=['debug', 'info', 'warning', 'error', 'critical'])
+    args = parser.parse_args()
+
+    logger_config = lf_logger_config.lf_logger_config()
+    if args.log_level:
+        logger_config.set_level(args.log_level)
+
+    test = create_session_test_object(prompt=args.prompt, timeout=args.timeout)
+    if not test.run():
+        logger.error("failed: {failures}".format(failures=test.failures))
+        exit(1)
+    logger.info("all tests passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -98,6 +98,10 @@ import base64
 import string
 import re
 import random
+import io
+import threading
+import select
+from collections import deque
 
 # - - - - deployed import references - - - - -
 from .strutil import nott, iss
@@ -213,6 +217,210 @@ def print_diagnostics(url_: str = None,
         exit(1)
 
 
+
+class PooledResponse:
+    """----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----
+        Stands in for http.client.HTTPResponse when a request was served by an
+        LFConnectionPool. The body is read completely before the connection is
+        returned to the pool, so read() returns the buffered body.
+    ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----"""
+
+    def __init__(self, response: http.client.HTTPResponse = None, body: bytes = b'', url: str = None):
+        self.status: int = response.status
+        self.code: int = response.status
+        self.reason: str = response.reason
+        self.headers = response.headers
+        self.msg = response.headers
+        self.version: int = response.version
+        self.url: str = url
+        self._body = io.BytesIO(body)
+
+    def read(self, amt: int = None) -> bytes:
+        return self._body.read(amt)
+
+    def getheader(self, name: str, default=None):
+        return self.headers.get(name, default)
+
+    def getheaders(self) -> list:
+        return list(self.headers.items())
+
+    def geturl(self) -> str:
+        return self.url
+
+    def getcode(self) -> int:
+        return self.status
+
+    def close(self):
+        self._body.close()
+
+
+class LFConnectionPool:
+    """----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----
+        A bounded pool of persistent HTTP/1.1 keep-alive connections to the LANforge GUI.
+        Connections are shared between threads: at most pool_size connections are
+        checked out at any moment, and idle connections older than idle_timeout_sec
+        are closed instead of reused. Requests are urllib.request.Request objects, and
+        HTTP error statuses raise urllib.error.HTTPError just as urlopen() would.
+    ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----"""
+    Default_Pool_Size: int = 4
+    Default_Idle_Timeout_Sec: float = 30.0
+    # methods that may be sent again after the connection failed while awaiting the response
+    Idempotent_Methods: tuple = ("GET", "HEAD")
+
+    def __init__(self,
+                 lfclient_url: str = 'http://localhost:8080',
+                 pool_size: int = Default_Pool_Size,
+                 idle_timeout_sec: float = Default_Idle_Timeout_Sec,
+                 connection_timeout_sec: float = None):
+        """
+        :param lfclient_url: base URL of the LANforge GUI, like http://localhost:8080
+        :param pool_size: maximum number of connections open at once
+        :param idle_timeout_sec: close idle connections that have not been used for this long
+        :param connection_timeout_sec: socket timeout for requests that do not specify one
+        """
+        if not pool_size or pool_size < 1:
+            raise ValueError("LFConnectionPool: pool_size must be at least 1")
+        parsed: ParseResult = urlparse(lfclient_url)
+        self.is_https: bool = parsed.scheme == "https"
+        self.host: str = parsed.hostname
+        self.port: int = parsed.port
+        self.pool_size: int = pool_size
+        self.idle_timeout_sec: float = idle_timeout_sec
+        self.connection_timeout_sec: float = connection_timeout_sec
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        # idle connections are kept as (connection, last_used_sec) pairs, most recently used last
+        self._idle: deque = deque()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.expired: int = 0
+        self.retries: int = 0
+        self.requests: int = 0
+
+    def _new_connection(self, timeout_sec: float = None) -> http.client.HTTPConnection:
+        if self.is_https:
+            return http.client.HTTPSConnection(self.host, self.port, timeout=timeout_sec)
+        return http.client.HTTPConnection(self.host, self.port, timeout=timeout_sec)
+
+    def _checkout(self, timeout_sec: float = None) -> tuple:
+        """
+        :return: (connection, was_reused) pair
+        """
+        now = time.monotonic()
+        with self._lock:
+            while self._idle:
+                conn, last_used = self._idle.pop()
+                if ((now - last_used) > self.idle_timeout_sec) or self._dropped(conn):
+                    self.expired += 1
+                    conn.close()
+                    continue
+                self.hits += 1
+                return conn, True
+            self.misses += 1
+        return self._new_connection(timeout_sec), False
+
+    @staticmethod
+    def _dropped(conn: http.client.HTTPConnection = None) -> bool:
+        """
+        :return: True if the GUI has closed this idle connection; an idle socket only
+        becomes readable when the other end closes it
+        """
+        if conn.sock is None:
+            return True
+        try:
+            readable, _, _ = select.select([conn.sock], [], [], 0)
+        except (OSError, ValueError):
+            return True
+        return bool(readable)
+
+    def _checkin(self, conn: http.client.HTTPConnection = None):
+        with self._lock:
+            self._idle.append((conn, time.monotonic()))
+
+    def urlopen(self, request_: urllib.request.Request = None):
+        """
+        Perform request_ over a pooled connection.
+        :param request_: urllib.request.Request to send
+        :return: PooledResponse with the body already read
+        """
+        timeout_sec = getattr(request_, "timeout", None) or self.connection_timeout_sec
+        parsed: ParseResult = urlparse(request_.full_url)
+        selector = parsed.path or "/"
+        if parsed.query:
+            selector += "?" + parsed.query
+        headers = dict(request_.header_items())
+        method = request_.get_method()
+
+        self._slots.acquire()
+        try:
+            conn, reused = self._checkout(timeout_sec)
+            while True:
+                sent = False
+                try:
+                    if conn.sock is not None:
+                        conn.sock.settimeout(timeout_sec)
+                    else:
+                        conn.timeout = timeout_sec
+                    conn.request(method, selector, body=request_.data, headers=headers)
+                    sent = True
+                    response = conn.getresponse()
+                    body = response.read()
+                    break
+                except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as cerror:
+                    conn.close()
+                    # the GUI may close an idle keep-alive connection at any time, so one
+                    # failure on a reused connection earns a retry on a new connection. Once
+                    # a POST has been sent the GUI may have run it, so it is not sent again.
+                    if (not reused) or (sent and (method not in self.Idempotent_Methods)):
+                        raise urllib.error.URLError(cerror)
+                    with self._lock:
+                        self.retries += 1
+                    conn, reused = self._new_connection(timeout_sec), False
+                except (OSError, http.client.HTTPException) as error:
+                    conn.close()
+                    raise urllib.error.URLError(error)
+            with self._lock:
+                self.requests += 1
+            if response.will_close:
+                conn.close()
+            else:
+                self._checkin(conn)
+        finally:
+            self._slots.release()
+
+        if response.status >= 400:
+            raise urllib.error.HTTPError(request_.full_url,
+                                         response.status,
+                                         response.reason,
+                                         response.headers,
+                                         io.BytesIO(body))
+        return PooledResponse(response=response, body=body, url=request_.full_url)
+
+    def get_stats(self) -> dict:
+        """
+        :return: dict of pool counters: hits are requests served by an already open
+        connection, misses are requests that had to open a new connection
+        """
+        with self._lock:
+            return {
+                "pool_size": self.pool_size,
+                "idle": len(self._idle),
+                "requests": self.requests,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "retries": self.retries,
+            }
+
+    def close(self):
+        """ close all idle connections """
+        with self._lock:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                conn.close()
+
+
 class BaseLFJsonRequest:
     """----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----
         Perform HTTP get/post/put/delete with extensions specific to LANforge JSON
@@ -304,6 +512,19 @@ class BaseLFJsonRequest:
             self.logger.debug(f"{__class__!s}: url [{url}] now [{corrected_url}]")
         return corrected_url
 
+    def urlopen(self, request_: urllib.request.Request = None):
+        """
+        Send request_ through the session connection pool when the session has keep-alive
+        connections enabled, otherwise through urllib.request.urlopen()
+        :param request_: urllib.request.Request to send
+        :return: http.client.HTTPResponse or PooledResponse
+        """
+        if self.session_instance:
+            pool = self.session_instance.get_connection_pool()
+            if pool:
+                return pool.urlopen(request_)
+        return urllib.request.urlopen(request_)
+
     def add_error(self, message: str = None):
         if not message:
             return
@@ -398,7 +619,7 @@ class BaseLFJsonRequest:
         myrequest.headers['Content-type'] = 'application/x-www-form-urlencoded'
 
         try:
-            resp = urllib.request.urlopen(myrequest)
+            resp = self.urlopen(myrequest)
             responses.append(resp)
             return responses[0]
 
@@ -574,7 +795,7 @@ class BaseLFJsonRequest:
         attempt = 1
         while (time.time() * 1000) < finish_time_ms:
             try:
-                response = urllib.request.urlopen(myrequest)
+                response = self.urlopen(myrequest)
                 resp_data = response.read().decode('utf-8')
                 if self.receives_async_feedback and (response_json_list is None and resp_data):
                     self.logger.warning("json_post: POST to URL has data: " + url)
@@ -799,7 +1020,7 @@ class BaseLFJsonRequest:
 
         myresponses: list = []  # list[HTTPResponse]
         try:
-            myresponses.append(request.urlopen(myrequest))
+            myresponses.append(self.urlopen(myrequest))
             return myresponses[0]
 
         except urllib.error.HTTPError as herror:
@@ -1179,7 +1400,10 @@ class BaseSession:
                  retry_sec: float = Default_Retry_Sec,
                  stream_errors: bool = True,
                  stream_warnings: bool = False,
-                 exit_on_error: bool = False):
+                 exit_on_error: bool = False,
+                 keep_alive: bool = False,
+                 pool_size: int = LFConnectionPool.Default_Pool_Size,
+                 pool_idle_timeout_sec: float = LFConnectionPool.Default_Idle_Timeout_Sec):
         self.debug_on = debug
         # self.logger = Logg(name='json_api_session')
         self.logger = logging.getLogger(__name__)
@@ -1212,6 +1436,8 @@ class BaseSession:
         self.session_connection_check: bool
         self.session_connection_check = False
         self.session_started_at: int = 0
+        self.connection_pool: LFConnectionPool
+        self.connection_pool = None
 
         # please see this discussion on ProxyHandlers:
         # https://docs.python.org/3/library/urllib.request.html#urllib.request.ProxyHandler
@@ -1292,6 +1518,15 @@ class BaseSession:
                                            ("8080", port)[has_port])
         # print("RESULTING URL: "+self.lfclient_url)
 
+        if keep_alive:
+            if self.proxies_installed:
+                self.logger.warning("keep_alive connections are not used when proxies are configured")
+            else:
+                self.connection_pool = LFConnectionPool(lfclient_url=self.lfclient_url,
+                                                        pool_size=pool_size,
+                                                        idle_timeout_sec=pool_idle_timeout_sec,
+                                                        connection_timeout_sec=self.connection_timeout_sec)
+
         # test connection with GUI to get a session id, then set our session ids in those instances
         # self.session_connection_check = self.command_instance.start_session(debug=debug)
         self.command_instance = None
@@ -1306,6 +1541,8 @@ class BaseSession:
         BaseSession.end_session(command_obj=self.command_instance,
                                 session_id_=BaseSession.session_id,
                                 debug=False)
+        if self.connection_pool:
+            self.connection_pool.close()
 
     def get_command(self) -> 'JsonCommand':
         """
@@ -1372,6 +1609,21 @@ class BaseSession:
     def get_timeout_sec(self) -> float:
         return self.connection_timeout_sec
 
+    def get_connection_pool(self) -> 'LFConnectionPool':
+        """
+        :return: the LFConnectionPool queries and commands are sent through, or None
+        when keep_alive was not requested
+        """
+        return self.connection_pool
+
+    def get_connection_pool_stats(self) -> dict:
+        """
+        :return: dict of connection pool hit/miss counters, empty when keep_alive is off
+        """
+        if not self.connection_pool:
+            return {}
+        return self.connection_pool.get_stats()
+
     @classmethod
     def end_session(cls,
                     command_obj: JsonCommand = None,
@@ -25152,7 +25404,10 @@ class LFSession(BaseSession):
                  stream_errors: bool = True,
                  stream_warnings: bool = False,
                  require_session: bool = False,
-                 exit_on_error: bool = False):
+                 exit_on_error: bool = False,
+                 keep_alive: bool = False,
+                 pool_size: int = LFConnectionPool.Default_Pool_Size,
+                 pool_idle_timeout_sec: float = LFConnectionPool.Default_Idle_Timeout_Sec):
         """
         :param debug: turn on diagnostic information
         :param proxy_map: a dict with addresses of proxies to route requests through.
@@ -25165,6 +25420,10 @@ class LFSession(BaseSession):
         :param require_session: exit(1) if unable to establish a session_id
         :param exit_on_error: on requests failing HTTP requests on besides error 404,
         exit(1). This does not include failing to establish a session_id
+        :param keep_alive: send all queries and commands through a pool of persistent
+        HTTP/1.1 connections instead of opening a new connection per request
+        :param pool_size: maximum number of keep-alive connections open at once
+        :param pool_idle_timeout_sec: close keep-alive connections idle longer than this
         """
         super().__init__(lfclient_url=lfclient_url,
                          debug=debug,
@@ -25172,7 +25431,10 @@ class LFSession(BaseSession):
                          connection_timeout_sec=connection_timeout_sec,
                          stream_errors=stream_errors,
                          stream_warnings=stream_warnings,
-                         exit_on_error=exit_on_error)
+                         exit_on_error=exit_on_error,
+                         keep_alive=keep_alive,
+                         pool_size=pool_size,
+                         pool_idle_timeout_sec=pool_idle_timeout_sec)
         self.command_instance = LFJsonCommand(session_obj=self, debug=debug, exit_on_error=exit_on_error)
         self.session_connection_check = \
             self.command_instance.start_session(debug=debug,
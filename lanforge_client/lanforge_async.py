@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----
+
+    LANforge JSON API, asyncio flavor
+
+    AsyncLFSession wraps an LFSession so that every generated post_*() command and
+    get_*() query becomes a coroutine. Calls run on a bounded worker pool over the
+    session's keep-alive connection pool, so many station, port and endpoint
+    commands can be in flight at once while the concurrency limit keeps the GUI
+    from being flooded.
+
+    EXAMPLE PYTHON USAGE:
+    ----- ----- ----- 8< ----- ----- ----- 8< ----- ----- -----
+    async def create_stations(names: list):
+        async with AsyncLFSession(lfclient_url="http://localhost:8080",
+                                  concurrency=32) as session:
+            lf_command = session.get_command()
+            await asyncio.gather(*[lf_command.post_add_sta(shelf=1,
+                                                           resource=1,
+                                                           radio="wiphy0",
+                                                           sta_name=name,
+                                                           ssid="lanforge")
+                                   for name in names])
+            lf_query = session.get_query()
+            ports = await lf_query.get_port(eid_list=["1.1.list"],
+                                            requested_col_names=["alias", "ip"])
+
+    asyncio.run(create_stations(["sta%04d" % i for i in range(1000)]))
+    ----- ----- ----- 8< ----- ----- ----- 8< ----- ----- -----
+
+----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----"""
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from .lanforge_api import LFSession, BaseLFJsonRequest
+
+LOGGER = logging.getLogger(__name__)
+
+
+class AsyncLFRequest:
+    """----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----
+        Presents the methods of an LFJsonCommand or LFJsonQuery as coroutines.
+        Generated methods (post_*, get_* and friends) and the json_* transport
+        methods are awaited; any other attribute is passed through unchanged.
+    ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----"""
+    Transport_Methods = ("json_post", "json_post_raw", "json_put", "json_delete", "json_get", "get_as_json")
+
+    def __init__(self,
+                 request_obj: BaseLFJsonRequest = None,
+                 async_session: 'AsyncLFSession' = None):
+        if not request_obj:
+            raise ValueError("AsyncLFRequest requires request_obj")
+        self.request_obj = request_obj
+        self.async_session = async_session
+        # names of the methods that become coroutines: those generated on the subclass
+        self.async_names = set(name for name, value in vars(type(request_obj)).items()
+                               if callable(value) and not name.startswith("_"))
+        self.async_names.update(self.Transport_Methods)
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.request_obj, name)
+        if (name not in self.async_names) or not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def coroutine(*args, **kwargs):
+            return await self.async_session.run(attr, *args, **kwargs)
+
+        # cache the wrapper so later lookups skip __getattr__
+        setattr(self, name, coroutine)
+        return coroutine
+
+
+class AsyncLFSession:
+    """----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----
+        asyncio session to a LANforge GUI. Commands and queries share one LFSession,
+        one pool of keep-alive connections and a worker pool of `concurrency` threads,
+        which is the most requests this session will have outstanding at once.
+    ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- ----- -----"""
+    Default_Concurrency: int = 16
+
+    def __init__(self, lfclient_url: str = 'http://localhost:8080',
+                 concurrency: int = Default_Concurrency,
+                 debug: bool = False,
+                 proxy_map: dict = None,
+                 connection_timeout_sec: float = None,
+                 stream_errors: bool = True,
+                 stream_warnings: bool = False,
+                 require_session: bool = False,
+                 exit_on_error: bool = False,
+                 keep_alive: bool = True,
+                 pool_size: int = None,
+                 pool_idle_timeout_sec: float = 30.0):
+        """
+        :param lfclient_url: URL of the LANforge GUI
+        :param concurrency: maximum number of requests in flight at once
+        :param keep_alive: share a pool of persistent HTTP/1.1 connections between requests
+        :param pool_size: number of keep-alive connections, defaults to concurrency
+        Remaining parameters are passed to LFSession.
+        """
+        if not concurrency or concurrency < 1:
+            raise ValueError("AsyncLFSession: concurrency must be at least 1")
+        self.concurrency: int = concurrency
+        self.logger = logging.getLogger(__name__)
+        self.session: LFSession = LFSession(lfclient_url=lfclient_url,
+                                            debug=debug,
+                                            proxy_map=proxy_map,
+                                            connection_timeout_sec=connection_timeout_sec,
+                                            stream_errors=stream_errors,
+                                            stream_warnings=stream_warnings,
+                                            require_session=require_session,
+                                            exit_on_error=exit_on_error,
+                                            keep_alive=keep_alive,
+                                            pool_size=pool_size or concurrency,
+                                            pool_idle_timeout_sec=pool_idle_timeout_sec)
+        self.executor = ThreadPoolExecutor(max_workers=concurrency,
+                                           thread_name_prefix="lf_async")
+        self.command_instance = AsyncLFRequest(request_obj=self.session.get_command(),
+                                               async_session=self)
+        self.query_instance = AsyncLFRequest(request_obj=self.session.get_query(),
+                                             async_session=self)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, exc_traceback):
+        await self.aclose()
+
+    def get_session(self) -> LFSession:
+        """
+        :return: the blocking LFSession this session wraps
+        """
+        return self.session
+
+    def get_command(self) -> AsyncLFRequest:
+        """
+        :return: LFJsonCommand whose post_* methods are coroutines
+        """
+        return self.command_instance
+
+    def get_query(self) -> AsyncLFRequest:
+        """
+        :return: LFJsonQuery whose get_* methods are coroutines
+        """
+        return self.query_instance
+
+    def get_connection_pool_stats(self) -> dict:
+        return self.session.get_connection_pool_stats()
+
+    async def run(self, method=None, *args, **kwargs):
+        """
+        Await a blocking LFJsonCommand/LFJsonQuery call on the worker pool.
+        :param method: bound method to call
+        :return: whatever method returns
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor,
+                                          functools.partial(method, *args, **kwargs))
+
+    async def aclose(self):
+        """ close() without blocking the event loop while outstanding requests finish """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.close)
+
+    def close(self):
+        """ wait for outstanding requests and release worker threads and connections; blocks """
+        self.executor.shutdown(wait=True)
+        pool = self.session.get_connection_pool()
+        if pool:
+            pool.close()
@@ -331,6 +331,183 @@ class PortEID:
 
 # end class PortEID
 
+
+class PortStateWatcher:
+    """
+    Watches a set of ports until each one reaches a target state. All of the ports on
+    a resource are fetched with a single multi-port query per poll, polls back off
+    while nothing changes, and with use_events the GUI event log is checked between
+    polls so a poll happens as soon as a watched port logs an event.
+    """
+
+    def __init__(self, base_url="http://localhost:8080", port_list=(), fields=("alias", "down", "phantom"),
+                 resource_id=0, names_per_query=100, debug=False):
+        """
+        :param base_url: URL of the LANforge GUI
+        :param port_list: port EIDs like 1.1.sta0000, or bare names when resource_id is given
+        :param fields: port fields to request, alias is always included
+        :param resource_id: resource for port names that do not carry one, 0 uses the EID resource
+        :param names_per_query: most port names put into one query URL
+        :param debug: turn on debugging output
+        """
+        self.base_url = base_url
+        self.debug = debug
+        if "alias" not in fields:
+            fields = ("alias",) + tuple(fields)
+        self.fields = ",".join(fields)
+        if type(port_list) is str:
+            port_list = [port_list]
+        self.eids = []
+        names_by_resource = {}
+        for port in port_list:
+            eid = name_to_eid(port)
+            if resource_id and ((port.count('.') < 1) or not port.split('.')[0].isnumeric()):
+                eid[1] = resource_id
+            eid_str = "%s.%s.%s" % (eid[0], eid[1], eid[2])
+            if eid_str in self.eids:
+                continue
+            self.eids.append(eid_str)
+            names_by_resource.setdefault((eid[0], eid[1]), []).append(eid[2])
+        self.queries = []
+        for ((shelf, resource), names) in names_by_resource.items():
+            for idx in range(0, len(names), names_per_query):
+                self.queries.append((shelf, resource, "/port/%s/%s/%s?fields=%s"
+                                     % (shelf, resource, ",".join(names[idx:idx + names_per_query]), self.fields)))
+        self.started = None
+        self.reached = {}
+        self.last_event_id = None
+
+    def poll(self):
+        """
+        Query all watched ports
+        :return: dict of port EID to port record, None for ports that were not found
+        """
+        states = dict.fromkeys(self.eids)
+        for (shelf, resource, uri) in self.queries:
+            json_response = LFRequest.LFRequest(self.base_url, uri, debug_=self.debug).get_as_json()
+            if json_response is None:
+                continue
+            records = []
+            if "interface" in json_response:
+                records.append(json_response["interface"])
+            elif "interfaces" in json_response:
+                for entry in json_response["interfaces"]:
+                    records.extend(entry.values())
+            for record in records:
+                if not record or ("alias" not in record):
+                    continue
+                eid_str = "%s.%s.%s" % (shelf, resource, record["alias"])
+                if eid_str in states:
+                    states[eid_str] = record
+        return states
+
+    def _event_records(self, json_response):
+        if not json_response:
+            return []
+        noun = "events" if "events" in json_response else "event"
+        if noun not in json_response:
+            return []
+        entries = json_response[noun]
+        if isinstance(entries, dict):
+            return [entries]
+        records = []
+        for entry in entries:
+            records.extend(entry.values())
+        return records
+
+    def _bookmark_events(self):
+        json_response = LFRequest.LFRequest(self.base_url, "/events/last/1", debug_=self.debug).get_as_json()
+        for record in self._event_records(json_response):
+            if "id" in record:
+                self.last_event_id = record["id"]
+
+    def _events_for_pending(self, pending):
+        """ :return: True when a new event mentions one of the pending port names """
+        if self.last_event_id is None:
+            self._bookmark_events()
+            return False
+        json_response = LFRequest.LFRequest(self.base_url, "/events/since/%s" % self.last_event_id,
+                                            debug_=self.debug).get_as_json()
+        names = set(eid.split('.', 2)[2] for eid in pending)
+        woke = False
+        for record in self._event_records(json_response):
+            if "id" in record:
+                self.last_event_id = record["id"]
+            for value in record.values():
+                if isinstance(value, str) and any(name in value for name in names):
+                    woke = True
+        return woke
+
+    def wait(self, ready=None, timeout_sec=300, min_interval_sec=0.5, max_interval_sec=4.0,
+             backoff=1.5, use_events=False, on_poll=None):
+        """
+        Poll until ready(record) is True for every port, or timeout_sec passes.
+        :param ready: callable given a port record, or None for a missing port, returning True when done
+        :param timeout_sec: give up after this many seconds
+        :param min_interval_sec: poll interval after a poll in which some port reached its state
+        :param max_interval_sec: longest interval reached by backing off
+        :param backoff: interval multiplier applied after a poll with no progress
+        :param use_events: check /events/since between polls to wake early
+        :param on_poll: optional callable given (states, pending_eids) after each poll
+        :return: True when all ports are ready, see get_timings() for when each port got there
+        """
+        if ready is None:
+            raise ValueError("PortStateWatcher.wait needs a ready() callable")
+        self.started = time.time()
+        self.reached = dict.fromkeys(self.eids)
+        deadline = self.started + timeout_sec
+        interval = min_interval_sec
+        pending = list(self.eids)
+        if use_events:
+            self._bookmark_events()
+        while True:
+            states = self.poll()
+            now = time.time()
+            progress = False
+            for eid in pending:
+                if ready(states[eid]):
+                    self.reached[eid] = now - self.started
+                    progress = True
+            pending = [eid for eid in pending if self.reached[eid] is None]
+            if on_poll is not None:
+                on_poll(states, pending)
+            if not pending:
+                return True
+            if self.debug:
+                logger.debug("PortStateWatcher: %d of %d ports pending" % (len(pending), len(self.eids)))
+            if now >= deadline:
+                return False
+            interval = min_interval_sec if progress else min(interval * backoff, max_interval_sec)
+            wake_at = min(now + interval, deadline)
+            if not use_events:
+                sleep(max(0.0, wake_at - time.time()))
+                continue
+            # sleep in short steps, polling ports again as soon as a pending port logs an event
+            while time.time() < wake_at:
+                sleep(min(min_interval_sec, max(0.0, wake_at - time.time())))
+                if self._events_for_pending(pending):
+                    break
+
+    def get_timings(self):
+        """
+        :return: dict of port EID to seconds from the start of wait() until the port reached
+        its state, or None if it never did
+        """
+        return dict(self.reached)
+
+
+def port_is_admin_up(record):
+    return (record is not None) and (record.get("down") not in (True, "true"))
+
+
+def port_is_admin_down_or_gone(record):
+    return (record is None) or (record.get("down") in (True, "true"))
+
+
+def port_is_present(record):
+    return (record is not None) and (record.get("phantom") not in (True, "true"))
+
+
 def staNewDownStaRequest(sta_name, resource_id=1, radio="wiphy0", ssid="", passphrase="", debug_on=False):
     return sta_new_down_sta_request(sta_name, resource_id, radio, ssid, passphrase, debug_on)
 
@@ -687,92 +864,126 @@ def find_port_eids(resource_id=1, base_url="http://localhost:8080", port_names=(
     return port_eids
 
 
-def waitUntilPortsAdminDown(resource_id=1, base_url="http://localhost:8080", port_list=()):
-    return wait_until_ports_admin_down(resource_id=resource_id, base_url=base_url, port_list=port_list)
+IP_WAITING_STATES = ("0.0.0.0", "NA", "", "DELETED", "AUTO")
 
 
-def wait_until_ports_admin_down(resource_id=1, base_url="http://localhost:8080", debug_=False, port_list=(), timeout_sec=360):
-    print("Waiting until ports appear admin-down...")
-    port_url = "/port/1"
-    for _ in range(0, timeout_sec):
-        up_stations = []
-        for port_name in port_list:
-            uri = "%s/%s/%s?fields=device,down" % (port_url, resource_id, port_name)
-            lf_r = LFRequest.LFRequest(base_url, uri, debug_=debug_)
-            json_response = lf_r.get_as_json()
-            if json_response is None:
-                if debug_:
-                    print("port %s disappeared" % port_name)
-                continue
-            if "interface" in json_response:
-                json_response = json_response['interface']
-            if json_response['down'] == "false":
-                up_stations.append(port_name)
-        if len(up_stations) == 0:
-            return True
-        sleep(1)
+def port_has_ipv4(record):
+    return (record is not None) and (record.get("ip") not in IP_WAITING_STATES)
 
-    return False
 
+def port_has_ipv6(record):
+    if record is None:
+        return False
+    ip6a = record.get("ipv6 address", record.get("ipv6_address", ""))
+    return (ip6a not in IP_WAITING_STATES) and not ip6a.startswith("fe80")
 
-def waitUntilPortsAdminUp(resource_id=0, base_url="http://localhost:8080", port_list=()):
-    return wait_until_ports_admin_up(resource_id=resource_id, base_url=base_url, port_list=port_list)
 
+def time_distribution(samples=None):
+    """
+    Summarize a list of durations in seconds, ignoring None entries.
+    :return: dict with count, min, median, p95, max and mean; values are None when there are no samples
+    """
+    values = sorted(value for value in (samples or []) if value is not None)
+    if not values:
+        return {"count": 0, "min": None, "median": None, "p95": None, "max": None, "mean": None}
+    mid = len(values) // 2
+    median = values[mid] if len(values) % 2 else (values[mid - 1] + values[mid]) / 2
+    # nearest-rank percentile
+    p95 = values[max(0, math.ceil(0.95 * len(values)) - 1)]
+    return {"count": len(values),
+            "min": values[0],
+            "median": median,
+            "p95": p95,
+            "max": values[-1],
+            "mean": sum(values) / len(values)}
+
+
+def wait_until_ports_have_ip(base_url="http://localhost:8080", port_list=(), ipv4=True, ipv6=False,
+                             timeout_sec=360, interval_sec=1.0, timings=None, debug=False):
+    """
+    Wait until ports have IPv4 and/or IPv6 addresses, querying all ports on a resource
+    in one request per interval.
+    :param port_list: port EIDs like 1.1.sta0000
+    :param ipv4: wait for an IPv4 address
+    :param ipv6: wait for a global IPv6 address
+    :param timeout_sec: give up after this many seconds
+    :param interval_sec: seconds between queries
+    :param timings: optional dict filled with {"ipv4": {eid: sec}, "ipv6": {eid: sec}}, the seconds
+    from the start of the wait until each port had an address, None for ports that never did
+    :param debug: turn on debugging output
+    :return: True if every port got the requested addresses before timeout_sec
+    """
+    if not (ipv4 or ipv6):
+        raise ValueError("wait_until_ports_have_ip: ipv4 and/or ipv6 must be set!")
+    watcher = PortStateWatcher(base_url=base_url, port_list=port_list,
+                               fields=("alias", "ip", "port type", "ipv6 address"), debug=debug)
+    ip_reached = {"ipv4": dict.fromkeys(watcher.eids), "ipv6": dict.fromkeys(watcher.eids)}
+
+    def record_ip_times(states, pending):
+        elapsed = time.time() - watcher.started
+        for eid, record in states.items():
+            if ipv4 and ip_reached["ipv4"][eid] is None and port_has_ipv4(record):
+                ip_reached["ipv4"][eid] = elapsed
+            if ipv6 and ip_reached["ipv6"][eid] is None and port_has_ipv6(record):
+                ip_reached["ipv6"][eid] = elapsed
+
+    def has_requested_ips(record):
+        return (not ipv4 or port_has_ipv4(record)) and (not ipv6 or port_has_ipv6(record))
+
+    rv = watcher.wait(ready=has_requested_ips, timeout_sec=timeout_sec, min_interval_sec=interval_sec,
+                      max_interval_sec=interval_sec, on_poll=record_ip_times)
+    if timings is not None:
+        if ipv4:
+            timings["ipv4"] = ip_reached["ipv4"]
+        if ipv6:
+            timings["ipv6"] = ip_reached["ipv6"]
+    return rv
 
-def wait_until_ports_admin_up(resource_id=0, base_url="http://localhost:8080", port_list=(), debug_=False, timeout=300):
-    if debug_:
-        print("Waiting until %s ports appear admin-up..." % (len(port_list)))
-    down_stations = port_list.copy()
-    port_url = "/port"
-    loops = 0
-
-    # url = /%s/%s?fields=device,down" % (resource_id, port_name)
-    for _ in range(0, timeout):
-        down_stations = []
-        for port_name in port_list:
-            eid = name_to_eid(port_name)
-            rid = resource_id
-            if rid == 0:  # TODO: this allows user to pass in resource_id, but probably should remove resource_id entirely.
-                rid = eid[1]  # use resource-id from the eid instead.
-            uri = "%s/%s/%s/%s?fields=device,down" % (port_url, eid[0], rid, eid[2])
-            lf_r = LFRequest.LFRequest(base_url, uri, debug_=debug_)
-            json_response = lf_r.get_as_json()
 
-            if debug_:
-                print("uri: %s response:\n%s" % (uri, json_response))
+def waitUntilPortsAdminDown(resource_id=1, base_url="http://localhost:8080", port_list=()):
+    return wait_until_ports_admin_down(resource_id=resource_id, base_url=base_url, port_list=port_list)
 
-            if json_response is None:
-                if debug_:
-                    print("port response is None for port name: %s" % port_name)
-                down_stations.append(port_name)
-                continue
 
-            if "interface" in json_response:
-                json_response = json_response['interface']
-            else:
-                if debug_:
-                    print("interface not found in json response:")
-                    pprint(json_response)
-                down_stations.append(port_name)
-                continue
+def wait_until_ports_admin_down(resource_id=1, base_url="http://localhost:8080", debug_=False, port_list=(), timeout_sec=360,
+                                timings=None, use_events=False):
+    """
+    Wait until ports are admin-down or have disappeared.
+    :param timings: optional dict filled with the seconds each port took to go down
+    :param use_events: wake early on port events between polls
+    :return: True if all ports went down before timeout_sec
+    """
+    print("Waiting until ports appear admin-down...")
+    watcher = PortStateWatcher(base_url=base_url, port_list=port_list, fields=("alias", "device", "down"),
+                               resource_id=resource_id, debug=debug_)
+    rv = watcher.wait(ready=port_is_admin_down_or_gone, timeout_sec=timeout_sec, use_events=use_events)
+    if timings is not None:
+        timings.update(watcher.get_timings())
+    return rv
 
-            if json_response['down']:  # This is a boolean object, not a string
-                if debug_:
-                    logger.info("waiting for port: %s to go admin up." % port_name)
-                down_stations.append(port_name)
-            else:
-                if debug_:
-                    logger.debug("port %s is admin up" % port_name)
 
-        if len(down_stations) > 0:
-            sleep(1)
-        else:
-            return True
+def waitUntilPortsAdminUp(resource_id=0, base_url="http://localhost:8080", port_list=()):
+    return wait_until_ports_admin_up(resource_id=resource_id, base_url=base_url, port_list=port_list)
 
-        loops += 1
 
-    logger.warning("Not all ports went admin up within %s+ seconds" % timeout)
-    return False
+def wait_until_ports_admin_up(resource_id=0, base_url="http://localhost:8080", port_list=(), debug_=False, timeout=300,
+                              timings=None, use_events=False):
+    """
+    Wait until ports are admin-up.
+    :param resource_id: resource for port names without one, 0 uses the resource in each EID
+    :param timings: optional dict filled with the seconds each port took to come up
+    :param use_events: wake early on port events between polls
+    :return: True if all ports came up before timeout
+    """
+    if debug_:
+        print("Waiting until %s ports appear admin-up..." % (len(port_list)))
+    watcher = PortStateWatcher(base_url=base_url, port_list=port_list, fields=("alias", "device", "down"),
+                               resource_id=resource_id, debug=debug_)
+    rv = watcher.wait(ready=port_is_admin_up, timeout_sec=timeout, use_events=use_events)
+    if timings is not None:
+        timings.update(watcher.get_timings())
+    if not rv:
+        logger.warning("Not all ports went admin up within %s+ seconds" % timeout)
+    return rv
 
 def speed_to_int(speed):
     # Parse speed into a number.  Initial implementation is for ping output, but
@@ -943,7 +1154,8 @@ def name_to_eid(eid_input, non_port=False):
     return rv
 
 
-def wait_until_ports_appear(base_url="http://localhost:8080", port_list=(), debug=False, timeout=300):
+def wait_until_ports_appear(base_url="http://localhost:8080", port_list=(), debug=False, timeout=300,
+                            timings=None, use_events=False):
     """
     Wait until ports are found and non phantom, or if timeout expires.
     Returns True if all are found and non phantom, returns False if timeout expires first.
@@ -951,62 +1163,51 @@ def wait_until_ports_appear(base_url="http://localhost:8080", port_list=(), debu
     :param base_url:
     :param port_list: list or str. Pass a list of multiple port EIDs, or a single EID string.
     :param debug:
+    :param timings: optional dict filled with the seconds each port took to appear
+    :param use_events: wake early on port events between polls
     :return:
     """
-    if debug:
-        logger.debug("Waiting until ports appear...")
-        existing_stations = LFRequest.LFRequest(base_url, '/ports', debug_=debug)
-        # logger.debug('existing ports')
-        # logger.debug(pprint.pformat(existing_stations)) # useless
-    port_url = "/port/1"
     show_url = "/cli-json/show_ports"
-    found_stations = set()
     if base_url.endswith('/'):
-        port_url = port_url[1:]
         show_url = show_url[1:]
     if type(port_list) is not list:
         port_list = [port_list]
     if debug:
+        logger.debug("Waiting until ports appear...")
         current_ports = LFRequest.LFRequest(base_url, '/ports', debug_=debug).get_as_json()
         logger.debug("LFUtils:wait_until_ports_appear, full port listing: %s" % pprint.pformat(current_ports))
         for port in current_ports['interfaces']:
             if list(port.values())[0]['phantom']:
                 logger.debug("LFUtils:waittimeout_until_ports_appear: %s is phantom" % list(port.values())[0]['alias'])
-    for attempt in range(0, int(timeout / 2)):
-        found_stations = set()
-        for port_eid in port_list:
+
+    watcher = PortStateWatcher(base_url=base_url, port_list=port_list, fields=("alias", "phantom"), debug=debug)
+    last_probe = [0.0]
+
+    def probe_missing(states, pending):
+        # ask the GUI to probe ports it does not know about yet, at most every two seconds
+        if time.time() - last_probe[0] < 2:
+            return
+        last_probe[0] = time.time()
+        for port_eid in pending:
+            if states[port_eid] is not None:
+                continue
             eid = name_to_eid(port_eid)
-            shelf = eid[0]
-            resource_id = eid[1]
-            port_name = eid[2]
-            # TODO:  If port_name happens to be a number, especialy '1', then the request below
-            # gets a list instead of a single item...and see a few lines down.
-            uri = "%s/%s/%s" % (port_url, resource_id, port_name)
-            #print("port-eid: %s uri: %s" % (port_eid, uri))
-            lf_r = LFRequest.LFRequest(base_url, uri, debug_=debug)
-            json_response = lf_r.get_as_json()
-            if json_response is not None:
-                #pprint.pprint(json_response)
-                # TODO:  If a list was (accidentally) requested, this code below will blow up.
-                # This can currently happen if someone manages to name a port 1.1.vap0, ie using
-                # an EID as a name.
-                # TODO:  Fix name_to_eid to somehow detect this and deal with it.
-                if not json_response['interface']['phantom']:
-                    found_stations.add("%s.%s.%s" % (shelf, resource_id, port_name))
-            else:
-                lf_r = LFRequest.LFRequest(base_url, show_url, debug_=debug)
-                lf_r.addPostData({"shelf": shelf, "resource": resource_id, "port": port_name, "probe_flags": 5})
-                lf_r.jsonPost()
-        if len(found_stations) < len(port_list):
-            sleep(2)
-            logger.info('Found %s out of %s ports in %s out of %s tries in wait_until_ports_appear' % (len(found_stations), len(port_list), attempt, timeout/2))
-        else:
-            logger.info('All %s ports appeared' % len(found_stations))
-            return True
+            lf_r = LFRequest.LFRequest(base_url, show_url, debug_=debug)
+            lf_r.addPostData({"shelf": eid[0], "resource": eid[1], "port": eid[2], "probe_flags": 5})
+            lf_r.jsonPost()
+        logger.info('Found %s out of %s ports in wait_until_ports_appear'
+                    % (len(port_list) - len(pending), len(port_list)))
+
+    rv = watcher.wait(ready=port_is_present, timeout_sec=timeout, use_events=use_events, on_poll=probe_missing)
+    if timings is not None:
+        timings.update(watcher.get_timings())
+    if rv:
+        logger.info('All %s ports appeared' % len(watcher.eids))
+        return True
     if debug:
-        logger.debug("These ports appeared: " + ", ".join(found_stations))
-        logger.debug("These ports did not appear: " + ",".join(set(port_list) - set(found_stations)))
-        logger.debug(pprint.pformat(LFRequest.LFRequest("%s/ports" % base_url)))
+        reached = watcher.get_timings()
+        logger.debug("These ports appeared: " + ", ".join(eid for eid in reached if reached[eid] is not None))
+        logger.debug("These ports did not appear: " + ",".join(eid for eid in reached if reached[eid] is None))
     return False
 
 
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Plan and run the removal of LANforge test objects in dependency order.
+
+The cleanup functions of lf_cleanup.py used to re-read the whole /port or /endp
+table for every object type, post one rm_vlan / rm_endp / rm_cx at a time and
+sleep a fixed time afterwards. CleanupSnapshot reads the cx, endp, layer4 and
+port tables once, and CleanupPlan sorts everything selected for removal into
+stages:
+
+    cx       Layer-3 and Layer 4-7 cross-connects
+    endp     Layer-3 and Layer 4-7 endpoints
+    station  WiFi stations, monitors and malformed station names
+    port     other virtual ports (vAP, MAC-VLAN, ...)
+    bridge   bridges
+
+CleanupRunner posts the commands of a stage concurrently through realm.batch(),
+then re-reads only the table the stage removes from until its objects are gone,
+before moving on to the next stage. With dry_run it only logs the commands.
+
+Example:
+    snapshot = CleanupSnapshot(json_get=realm.json_get)
+    snapshot.refresh()
+    plan = CleanupPlan(snapshot, resources="all", cxs=True, l3_endp=True, sta=True)
+    runner = CleanupRunner(local_realm=realm, max_workers=16)
+    remaining = runner.run(plan, snapshot)
+    runner.log_report()
+"""
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("cx", "endp", "station", "port", "bridge")
+# table each stage removes objects from
+STAGE_TABLES = {"cx": "cx", "endp": "endp", "station": "port", "port": "port", "bridge": "port"}
+
+PORT_FIELDS = ("alias", "port type")
+PHYSICAL_PORT_TYPES = ("Ethernet", "WIFI-Radio", "NA")
+STATION_PORT_TYPES = ("WIFI-STA",)
+# aliases removed as stations whatever their type
+STATION_ALIASES = ("sta", "wlan", "moni", "Unknown")
+
+
+def _records(entries):
+    """ flatten a list of {name: record} into one dict """
+    records = {}
+    if isinstance(entries, dict):
+        entries = [entries]
+    for entry in entries or []:
+        records.update(entry)
+    return records
+
+
+def _list_records(entries):
+    """
+    :return: dict of name to record from an 'endpoint' list, or from a single record
+             that is not wrapped in a list
+    """
+    if isinstance(entries, dict):
+        if "name" in entries:
+            return {entries["name"]: entries}
+        return entries
+    return _records(entries)
+
+
+class CleanupSnapshot:
+    """
+    The cx, endp, layer4 and port tables of the GUI, read with one query each.
+    """
+
+    def __init__(self, json_get=None):
+        """
+        :param json_get: function that queries the LANforge GUI, like LFCliBase.json_get
+        """
+        if json_get is None:
+            raise ValueError("CleanupSnapshot requires json_get")
+        self.json_get = json_get
+        self.cxs = {}
+        self.endps = {}
+        self.layer4 = {}
+        self.ports = {}
+        self.queries = 0
+
+    def _get(self, url):
+        self.queries += 1
+        return self.json_get(url)
+
+    def refresh(self, tables=("cx", "endp", "layer4", "port")):
+        """
+        Read tables from the GUI
+        :param tables: tables to read, of 'cx', 'endp', 'layer4' and 'port'
+        """
+        if "cx" in tables:
+            response = self._get("/cx")
+            self.cxs = {}
+            if response is not None and "empty" not in response:
+                self.cxs = {name: record for name, record in response.items()
+                            if name not in ("handler", "uri", "warnings") and isinstance(record, dict)}
+        if "endp" in tables:
+            response = self._get("/endp")
+            self.endps = {}
+            if response is not None and "endpoint" in response:
+                self.endps = {name: record for name, record in _list_records(response["endpoint"]).items()
+                              if record.get("name", name) != ""}
+        if "layer4" in tables:
+            response = self._get("/layer4")
+            self.layer4 = {}
+            if response is not None and "empty" not in response and "endpoint" in response:
+                for record in _list_records(response["endpoint"]).values():
+                    if record.get("name"):
+                        self.layer4[record["name"]] = record
+        if "port" in tables:
+            response = self._get("/port/?fields=" + ",".join(PORT_FIELDS).replace(" ", "+"))
+            self.ports = _records(response.get("interfaces")) if response else {}
+
+    def present(self, stage=None):
+        """
+        :return: names of the objects a stage could remove that are in the last refresh()
+        """
+        table = STAGE_TABLES[stage]
+        if table == "cx":
+            return set(self.cxs.keys())
+        if table == "endp":
+            return set(self.endps.keys()) | set(self.layer4.keys())
+        return set(self.ports.keys())
+
+
+class CleanupPlan:
+    def __init__(self,
+                 snapshot=None,
+                 resources="all",
+                 cxs=False,
+                 l3_endp=False,
+                 layer4=False,
+                 sta=False,
+                 port_mgr=False,
+                 br=False,
+                 misc=False):
+        """
+        Select the objects to remove from a refreshed snapshot
+        :param snapshot: CleanupSnapshot, refreshed before the plan is built
+        :param resources: resource number, comma separated numbers, or 'all'
+        :param cxs: Layer-3 cross-connects
+        :param l3_endp: Layer-3 endpoints
+        :param layer4: Layer 4-7 cross-connects and endpoints
+        :param sta: WiFi stations
+        :param port_mgr: every virtual port
+        :param br: bridges
+        :param misc: stations with malformed names
+        """
+        if snapshot is None:
+            raise ValueError("CleanupPlan requires snapshot")
+        resources = str(resources)
+        self.resources = None if "all" in resources else set(r.strip() for r in resources.split(","))
+        # stage: {object name: [(url, data), ...]}
+        self.stages = {stage: {} for stage in STAGES}
+        if cxs:
+            self._add_cxs(snapshot)
+        if l3_endp:
+            for name in snapshot.endps.keys():
+                self._add("endp", name, "cli-json/rm_endp", {"endp_name": name})
+        if layer4:
+            for name in snapshot.layer4.keys():
+                self._add("cx", "CX_" + name, "cli-json/rm_cx", {"test_mgr": "default_tm", "cx_name": "CX_" + name})
+                self._add("endp", name, "cli-json/rm_endp", {"endp_name": name})
+        if sta or port_mgr or br or misc:
+            self._add_ports(snapshot, sta=sta, port_mgr=port_mgr, br=br, misc=misc)
+
+    def _selected(self, resource):
+        return self.resources is None or str(resource) in self.resources
+
+    def _add(self, stage, name, url, data):
+        self.stages[stage].setdefault(name, []).append((url, data))
+
+    def _add_cxs(self, snapshot):
+        for cx_name, record in snapshot.cxs.items():
+            cx_eid = record.get("entity id", "")
+            eid = cx_eid.split(".")
+            if len(eid) > 1 and self._selected(eid[1]):
+                self._add("cx", cx_name, "cli-json/rm_cx", {"test_mgr": "default_tm", "cx_name": cx_name})
+
+    def _add_ports(self, snapshot, sta=False, port_mgr=False, br=False, misc=False):
+        for port_eid, record in snapshot.ports.items():
+            port_type = record.get("port type", "")
+            if "1.1.1.1.eth" in port_eid:
+                # malformed name, the eid has to be read from its end
+                eid = port_eid.split(".")[2:5]
+                if (misc or (port_mgr and port_type not in PHYSICAL_PORT_TYPES)) and self._selected(eid[1]):
+                    self._add_port("station", port_eid, eid)
+                continue
+            eid = port_eid.split(".")
+            if len(eid) < 3 or not self._selected(eid[1]):
+                continue
+            eid = [eid[0], eid[1], ".".join(eid[2:])]
+            is_station = port_type in STATION_PORT_TYPES or any(alias in port_eid for alias in STATION_ALIASES)
+            is_misc = "phy" in port_eid and "wiphy" not in port_eid
+            is_bridge = "Bridge" in port_type
+            is_virtual = port_type not in PHYSICAL_PORT_TYPES
+            if (sta and is_station) or (misc and is_misc):
+                self._add_port("station", port_eid, eid)
+            elif br and is_bridge:
+                self._add_port("bridge", port_eid, eid)
+            elif port_mgr and is_virtual:
+                if is_station:
+                    self._add_port("station", port_eid, eid)
+                elif is_bridge:
+                    self._add_port("bridge", port_eid, eid)
+                else:
+                    self._add_port("port", port_eid, eid)
+
+    def _add_port(self, stage, port_eid, eid):
+        self._add(stage, port_eid, "cli-json/rm_vlan", {"shelf": eid[0], "resource": eid[1], "port": eid[2]})
+
+    def __len__(self):
+        return sum(len(objects) for objects in self.stages.values())
+
+    def log(self):
+        """ log the commands of every stage """
+        for stage in STAGES:
+            for name, commands in self.stages[stage].items():
+                for url, data in commands:
+                    logger.info("{stage}: {name}: {url} {data}".format(stage=stage, name=name, url=url, data=data))
+
+
+class CleanupRunner:
+    Default_Max_Workers = 16
+    Default_Timeout_Sec = 30.0
+    Default_Poll_Interval_Sec = 1.0
+    Default_Retries = 2
+
+    def __init__(self,
+                 local_realm=None,
+                 max_workers=Default_Max_Workers,
+                 timeout_sec=Default_Timeout_Sec,
+                 poll_interval_sec=Default_Poll_Interval_Sec,
+                 retries=Default_Retries,
+                 dry_run=False):
+        """
+        :param local_realm: Realm the removals are posted through
+        :param max_workers: removals posted at the same time
+        :param timeout_sec: longest wait for the objects of a stage to disappear
+        :param poll_interval_sec: time between reads of the stage's table while waiting
+        :param retries: times to post the removals of objects still present after timeout_sec
+        :param dry_run: only log the plan, remove nothing
+        """
+        if local_realm is None:
+            raise ValueError("CleanupRunner requires local_realm")
+        self.local_realm = local_realm
+        self.max_workers = max_workers
+        self.timeout_sec = timeout_sec
+        self.poll_interval_sec = poll_interval_sec
+        self.retries = retries
+        self.dry_run = dry_run
+        self.plan = None
+        self.snapshot = None
+        # stage: {objects, posted, failed, post_sec, converge_sec, remaining}
+        self.report = {}
+
+    def _post(self, stage, objects):
+        """ post the removals of objects, return the number that failed """
+        with self.local_realm.batch(max_workers=self.max_workers) as batch:
+            for name in objects:
+                for url, data in self.plan.stages[stage][name]:
+                    batch.add(url, data)
+        return len(batch.get_errors())
+
+    def _wait(self, stage, objects):
+        """ :return: objects still present after timeout_sec """
+        snapshot = self.snapshot
+        deadline = time.monotonic() + self.timeout_sec
+        while True:
+            snapshot.refresh(tables=("endp", "layer4") if stage == "endp" else (STAGE_TABLES[stage],))
+            remaining = objects & snapshot.present(stage)
+            if not remaining or time.monotonic() >= deadline:
+                return remaining
+            time.sleep(self.poll_interval_sec)
+
+    def run(self, plan=None, snapshot=None):
+        """
+        Remove the objects of a plan, stage by stage
+        :param plan: CleanupPlan
+        :param snapshot: CleanupSnapshot used to wait for the removals
+        :return: set of object names that are still present
+        """
+        self.plan = plan
+        self.snapshot = snapshot
+        self.report = {}
+        left = set()
+        if self.dry_run:
+            logger.info("dry run, {count} objects would be removed:".format(count=len(plan)))
+            plan.log()
+            return left
+        for stage in STAGES:
+            objects = set(plan.stages[stage].keys())
+            if not objects:
+                continue
+            entry = self.report[stage] = {"objects": len(objects), "posted": 0, "failed": 0,
+                                          "post_sec": 0.0, "converge_sec": 0.0, "remaining": 0}
+            remaining = objects
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    logger.info("{stage}: removing {count} objects again".format(stage=stage, count=len(remaining)))
+                started = time.monotonic()
+                entry["failed"] += self._post(stage, remaining)
+                entry["posted"] += len(remaining)
+                entry["post_sec"] += time.monotonic() - started
+                started = time.monotonic()
+                remaining = self._wait(stage, remaining)
+                entry["converge_sec"] += time.monotonic() - started
+                if not remaining:
+                    break
+            entry["remaining"] = len(remaining)
+            if remaining:
+                logger.warning("{stage}: {count} objects not removed: {names}".format(
+                    stage=stage, count=len(remaining), names=sorted(remaining)))
+            left |= remaining
+        return left
+
+    def log_report(self):
+        """ log the objects and seconds of each stage """
+        for stage, entry in self.report.items():
+            logger.info("{stage}: {objects} objects, {posted} removals posted in {post_sec:.1f}s, {failed} failed, "
+                        "converged in {converge_sec:.1f}s, {remaining} remaining".format(stage=stage, **entry))
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+CommandBatch queues LANforge CLI-JSON commands and submits them concurrently.
+
+Commands that share a key (for example every command for one station, or for one
+cross-connect and its endpoints) are posted in the order they were queued; commands
+with different keys are posted in parallel by a pool of worker threads. Each command
+gets its own result record so a failure can be traced to the exact command.
+
+Example:
+    with realm.batch(max_workers=16) as batch:
+        for name in station_names:
+            batch.add("/cli-json/add_sta", {...}, key=name)
+            batch.add("/cli-json/set_port", {...}, key=name)
+    for result in batch.get_errors():
+        logger.error(result)
+"""
+import copy
+import importlib
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../")))
+
+LFRequest = importlib.import_module("py-json.LANforge.LFRequest")
+
+logger = logging.getLogger(__name__)
+
+
+class CommandBatch:
+    Default_Max_Workers = 8
+
+    def __init__(self,
+                 local_realm=None,
+                 max_workers=Default_Max_Workers,
+                 debug=False):
+        """
+        :param local_realm: Realm the commands are posted through
+        :param max_workers: number of commands posted at the same time
+        :param debug: turn on debugging output
+        """
+        if local_realm is None:
+            raise ValueError("CommandBatch requires local_realm")
+        if not max_workers or int(max_workers) < 1:
+            raise ValueError("CommandBatch max_workers must be at least 1")
+        self.local_realm = local_realm
+        self.max_workers = int(max_workers)
+        self.debug = debug
+        self.queue = []
+        self.results = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        if exc_type is None:
+            self.flush()
+        else:
+            logger.warning("CommandBatch: discarding %d queued commands after exception" % len(self.queue))
+            self.queue = []
+        return False
+
+    def add(self, url, data, key=None, suppress_related_commands_=None, raw=False):
+        """
+        Queue a command to post at the next flush()
+        :param url: CLI-JSON url, like /cli-json/add_sta
+        :param data: post data, copied when queued so the caller may reuse the dict
+        :param key: commands with the same key are posted in queued order; None posts independently
+        :param suppress_related_commands_: passed to Realm.json_post()
+        :param raw: post data exactly as given, without Realm.json_post() adjusting suppress_ flags
+        :return: index of the command in the batch
+        """
+        self.queue.append({
+            "index": len(self.queue),
+            "url": url,
+            "data": copy.deepcopy(data),
+            "key": key,
+            "suppress_related_commands": suppress_related_commands_,
+            "raw": raw,
+        })
+        return self.queue[-1]["index"]
+
+    def __len__(self):
+        return len(self.queue)
+
+    def _post(self, command):
+        response_json_list = []
+        started = time.time()
+        try:
+            if command["raw"]:
+                lf_r = LFRequest.LFRequest(url=self.local_realm.lfclient_url,
+                                           uri=command["url"],
+                                           proxies_=self.local_realm.proxy,
+                                           debug_=self.debug)
+                lf_r.addPostData(command["data"])
+                response = lf_r.json_post(debug=self.debug,
+                                          response_json_list_=response_json_list)
+            else:
+                response = self.local_realm.json_post(command["url"],
+                                                      command["data"],
+                                                      debug_=self.debug,
+                                                      suppress_related_commands_=command["suppress_related_commands"],
+                                                      response_json_list_=response_json_list)
+            errors = []
+            if response is None:
+                errors.append("no response")
+            for json_response in response_json_list:
+                if isinstance(json_response, dict) and json_response.get("errors"):
+                    errors.extend(json_response["errors"])
+        except Exception as x:
+            response_json_list = []
+            errors = ["%s: %s" % (type(x).__name__, x)]
+        return {
+            "index": command["index"],
+            "url": command["url"],
+            "key": command["key"],
+            "data": command["data"],
+            "ok": not errors,
+            "skipped": False,
+            "errors": errors,
+            "response": response_json_list,
+            "elapsed_sec": time.time() - started,
+        }
+
+    def _post_chain(self, chain):
+        """ post commands sharing a key in order, skipping the remainder after a failure """
+        results = []
+        failed = None
+        for command in chain:
+            if failed is not None:
+                results.append({
+                    "index": command["index"],
+                    "url": command["url"],
+                    "key": command["key"],
+                    "data": command["data"],
+                    "ok": False,
+                    "skipped": True,
+                    "errors": ["skipped after command %d failed" % failed],
+                    "response": [],
+                    "elapsed_sec": 0.0,
+                })
+                continue
+            result = self._post(command)
+            results.append(result)
+            if not result["ok"]:
+                failed = command["index"]
+        return results
+
+    def flush(self):
+        """
+        Post every queued command and empty the queue
+        :return: list of per-command result dicts, in queued order
+        """
+        if not self.queue:
+            return []
+        chains = {}
+        for command in self.queue:
+            key = command["key"]
+            if key is None:
+                key = ("__unkeyed__", command["index"])
+            chains.setdefault(key, []).append(command)
+        queued = len(self.queue)
+        self.queue = []
+
+        started = time.time()
+        results = [None] * queued
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(chains))) as executor:
+            for chain_results in executor.map(self._post_chain, chains.values()):
+                for result in chain_results:
+                    results[result["index"]] = result
+        failures = [result for result in results if not result["ok"]]
+        logger.info("CommandBatch: posted %d commands in %d chains in %.2f sec, %d failed"
+                    % (queued, len(chains), time.time() - started, len(failures)))
+        for result in failures:
+            logger.error("CommandBatch: %s key[%s]: %s" % (result["url"], result["key"], result["errors"]))
+        self.results.extend(results)
+        return results
+
+    def get_results(self):
+        """
+        :return: results of every command posted by this batch
+        """
+        return self.results
+
+    def get_errors(self):
+        """
+        :return: results of commands that failed or were skipped
+        """
+        return [result for result in self.results if not result["ok"]]
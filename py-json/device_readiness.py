@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Readiness-driven Wi-Fi configuration of real devices (phones and laptops).
+
+Configuring a device is a series of phases: post a command to the LANforge GUI,
+then wait until the device reaches the state the next phase needs. Rather than
+sleeping a fixed time after each command for the slowest device, ReadinessPipeline
+runs every device through its phases on its own and moves it on as soon as the
+GUI reports it ready. All waiting devices share one bulk poll of the port,
+resource and adb tables every poll_interval_sec. At most max_concurrency devices
+post commands at the same time; waiting for a device to become ready is not limited.
+
+The time each device spent in each phase is kept in phase_timings and logged by
+log_phase_timings().
+
+Example:
+    pipeline = ReadinessPipeline(json_get=self.json_get)
+    results = asyncio.run(pipeline.run(
+        [pipeline.configure_android(self.androids_obj, android, serial, ssid) for ...] +
+        [pipeline.configure_laptop(self.laptops_obj, laptop, ssid) for ...]))
+    pipeline.log_phase_timings()
+"""
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+PORT_FIELDS = ("port", "alias", "down", "phantom", "ip", "ssid", "gateway ip", "mac")
+RESOURCE_FIELDS = ("eid", "hostname", "phantom")
+# addresses the GUI reports for a port without one
+NO_ADDRESS = (None, "", "0.0.0.0", "NA")
+
+
+def _flag(value):
+    """ :return: True for a JSON flag that is set, which the GUI may send as a bool or a string """
+    return str(value).lower() in ("true", "1")
+
+
+def _eid_records(entries):
+    """ flatten a list of {eid: record} (or a single {eid: record}) into one dict """
+    records = {}
+    if isinstance(entries, dict):
+        entries = [entries]
+    for entry in entries or []:
+        records.update(entry)
+    return records
+
+
+class DeviceStateSnapshot:
+    """
+    The port, resource and adb tables of the GUI, read with one query each.
+    """
+
+    def __init__(self, json_get=None):
+        """
+        :param json_get: function that queries the LANforge GUI, like LFCliBase.json_get
+        """
+        if json_get is None:
+            raise ValueError("DeviceStateSnapshot requires json_get")
+        self.json_get = json_get
+        self.ports = {}
+        self.resources = {}
+        self.adb_resource_ids = {}
+        self.refreshed = None
+        self.refresh_count = 0
+
+    def refresh(self):
+        """ read the port, resource and adb tables """
+        response = self.json_get("/port/all?fields=" + ",".join(PORT_FIELDS).replace(" ", "+"))
+        self.ports = _eid_records(response.get("interfaces")) if response else {}
+        response = self.json_get("/resource/all?fields=" + ",".join(RESOURCE_FIELDS))
+        if response:
+            self.resources = _eid_records(response.get("resources", response.get("resource")))
+        else:
+            self.resources = {}
+        response = self.json_get("/adb/")
+        self.adb_resource_ids = {}
+        if response:
+            for record in _eid_records(response.get("devices")).values():
+                # _links is /adb/<serial>
+                serial = record.get("_links", "").split("/")[-1]
+                self.adb_resource_ids[serial] = record.get("resource-id", "")
+        self.refreshed = time.monotonic()
+        self.refresh_count += 1
+
+    def get_port(self, port_eid=None):
+        return self.ports.get(port_eid)
+
+    def get_resource(self, resource_eid=None):
+        return self.resources.get(resource_eid)
+
+    def get_adb_resource_id(self, serial=None):
+        """
+        :return: shelf.resource of the phone, '' until the phone has registered
+        """
+        return self.adb_resource_ids.get(serial, "")
+
+    def is_connected(self, port_eid=None, ssid=None, need_gateway=False):
+        """
+        :param port_eid: shelf.resource.port of the Wi-Fi port
+        :param ssid: SSID the port should be associated with
+        :param need_gateway: also wait for a gateway address, Windows reports the IP before DHCP completes
+        :return: True once the port is up with an address on the SSID
+        """
+        port = self.ports.get(port_eid)
+        if not port or _flag(port.get("down")) or _flag(port.get("phantom")):
+            return False
+        if ssid is not None and port.get("ssid") != ssid:
+            return False
+        if port.get("ip") in NO_ADDRESS:
+            return False
+        if need_gateway and port.get("gateway ip") in NO_ADDRESS:
+            return False
+        return True
+
+
+class ReadinessPipeline:
+    Default_Poll_Interval_Sec = 2.0
+    Default_Max_Concurrency = 8
+    Default_Settle_Sec = 2.0
+    Default_Station_Timeout_Sec = 30.0
+
+    def __init__(self,
+                 json_get=None,
+                 poll_interval_sec=Default_Poll_Interval_Sec,
+                 max_concurrency=Default_Max_Concurrency,
+                 settle_sec=Default_Settle_Sec):
+        """
+        :param json_get: function that queries the LANforge GUI, like LFCliBase.json_get
+        :param poll_interval_sec: time between bulk polls of the GUI while devices are waiting
+        :param max_concurrency: devices posting commands at the same time
+        :param settle_sec: pause after commands whose effect the GUI does not report
+        """
+        if not max_concurrency or int(max_concurrency) < 1:
+            raise ValueError("ReadinessPipeline max_concurrency must be at least 1")
+        self.snapshot = DeviceStateSnapshot(json_get=json_get)
+        self.poll_interval_sec = poll_interval_sec
+        self.max_concurrency = int(max_concurrency)
+        self.settle_sec = settle_sec
+        # device: {phase: seconds}, phases in the order they ran
+        self.phase_timings = {}
+        # device: True if it reached its final state
+        self.results = {}
+        self.semaphore = None
+        self.poll_lock = None
+
+    async def poll(self):
+        """ refresh the snapshot unless another waiter refreshed it within poll_interval_sec """
+        async with self.poll_lock:
+            if (self.snapshot.refreshed is not None) and \
+                    (time.monotonic() - self.snapshot.refreshed < self.poll_interval_sec):
+                return
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(None, self.snapshot.refresh)
+            except Exception as x:
+                # the GUI may be busy applying the configuration, try again next poll
+                logger.warning("ReadinessPipeline: poll failed: {x}".format(x=x))
+                self.snapshot.refreshed = time.monotonic()
+
+    async def wait_for(self, ready=None, timeout_sec=None):
+        """
+        :param ready: function of the DeviceStateSnapshot, True once the device is ready
+        :param timeout_sec: give up after this long
+        :return: True if ready, False on timeout
+        """
+        deadline = time.monotonic() + timeout_sec
+        while True:
+            await self.poll()
+            if ready(self.snapshot):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(min(self.poll_interval_sec, max(0.0, deadline - time.monotonic())))
+
+    async def phase(self, device=None, name=None, action=None, ready=None, timeout_sec=None, settle_sec=None):
+        """
+        Run one phase of a device and record how long it took
+        :param device: device name used in the timings
+        :param name: phase name
+        :param action: awaitable that posts the phase's commands, may be None
+        :param ready: function of the DeviceStateSnapshot, True once the phase is done
+        :param timeout_sec: longest wait for ready
+        :param settle_sec: fixed pause after the action when there is no ready check
+        :return: True when the phase completed, False when ready timed out
+        """
+        started = time.monotonic()
+        if action is not None:
+            # only the commands are limited, the wait for ready below is not
+            async with self.semaphore:
+                await action
+        done = True
+        if ready is not None:
+            done = await self.wait_for(ready=ready, timeout_sec=timeout_sec)
+        elif settle_sec:
+            await asyncio.sleep(settle_sec)
+        timings = self.phase_timings.setdefault(device, {})
+        # a phase run again on retry adds to its time
+        timings[name] = timings.get(name, 0.0) + (time.monotonic() - started)
+        if not done:
+            logger.info("{device}: {phase} not ready after {sec:.0f} sec".format(
+                device=device, phase=name, sec=timeout_sec))
+        return done
+
+    async def _configure(self, device, steps):
+        started = time.monotonic()
+        try:
+            self.results[device] = await steps
+        except Exception as x:
+            logger.error("{device}: configuration failed: {x}".format(device=device, x=x))
+            self.results[device] = False
+        self.phase_timings.setdefault(device, {})["total"] = time.monotonic() - started
+
+    async def run(self, configurations=None):
+        """
+        Configure devices concurrently, at most max_concurrency posting commands at a time
+        :param configurations: list of (device, coroutine) from configure_android() / configure_laptop()
+        :return: dict of device to True if it connected
+        """
+        # created here so they belong to the running event loop
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.poll_lock = asyncio.Lock()
+        await asyncio.gather(*[self._configure(device, steps) for device, steps in configurations])
+        return self.results
+
+    def configure_android(self, android_obj=None, port_data=None, serial=None, ssid=None,
+                          connect_timeout_sec=120):
+        """
+        :param android_obj: object with stop_app() and configure_wifi() taking port_list
+        :param port_data: the phone's entry in port_list
+        :param serial: adb serial of the phone
+        :param ssid: SSID it should connect to
+        :param connect_timeout_sec: longest wait for the phone to connect
+        :return: (device, coroutine) for run()
+        """
+        def connected(snapshot):
+            resource_id = snapshot.get_adb_resource_id(serial)
+            if not resource_id:
+                return False
+            resource = snapshot.get_resource(resource_id)
+            if resource and _flag(resource.get("phantom")):
+                return False
+            return snapshot.is_connected(resource_id + ".wlan0", ssid=ssid)
+
+        async def steps():
+            port_list = [port_data]
+            await self.phase(serial, "stop_app", android_obj.stop_app(port_list=port_list))
+            return await self.phase(serial, "connect", android_obj.configure_wifi(port_list=port_list),
+                                    ready=connected, timeout_sec=connect_timeout_sec)
+
+        return serial, steps()
+
+    def configure_laptop(self, laptop_obj=None, laptop=None, ssid=None, wifi_extra=False,
+                         connect_timeout_sec=100, retries=0, retry_timeout_sec=60):
+        """
+        :param laptop_obj: object with rm_station(), set_port_1(), add_station(), set_wifi_extra()
+                           and set_port() taking port_list
+        :param laptop: the laptop's entry in port_list, with shelf, resource, sta_name and os
+        :param ssid: SSID it should connect to
+        :param wifi_extra: post the enterprise settings before bringing the port up
+        :param connect_timeout_sec: longest wait for the laptop to connect
+        :param retries: times to add the station again if it does not connect
+        :param retry_timeout_sec: longest wait for the laptop to connect after a retry
+        :return: (device, coroutine) for run()
+        """
+        port_eid = "{}.{}.{}".format(laptop['shelf'], laptop['resource'], laptop['sta_name'])
+
+        def station_present(snapshot):
+            return snapshot.get_port(port_eid) is not None
+
+        def connected(snapshot):
+            return snapshot.is_connected(port_eid, ssid=ssid, need_gateway=(laptop['os'] == 'Win'))
+
+        async def add_and_connect(timeout_sec):
+            port_list = [laptop]
+            await self.phase(port_eid, "set_port_1", laptop_obj.set_port_1(port_list=port_list),
+                             settle_sec=self.settle_sec)
+            await self.phase(port_eid, "add_station", laptop_obj.add_station(port_list=port_list),
+                             ready=station_present, timeout_sec=self.Default_Station_Timeout_Sec)
+            if wifi_extra:
+                await self.phase(port_eid, "set_wifi_extra", laptop_obj.set_wifi_extra(port_list=port_list),
+                                 settle_sec=self.settle_sec)
+            return await self.phase(port_eid, "connect", laptop_obj.set_port(port_list=port_list),
+                                    ready=connected, timeout_sec=timeout_sec)
+
+        async def steps():
+            await self.phase(port_eid, "rm_station", laptop_obj.rm_station(port_list=[laptop]))
+            done = await add_and_connect(connect_timeout_sec)
+            attempt = 0
+            while not done and attempt < retries:
+                attempt += 1
+                logger.info("RETRY-{attempt} FOR: {port_eid}".format(attempt=attempt, port_eid=port_eid))
+                done = await add_and_connect(retry_timeout_sec)
+            return done
+
+        return port_eid, steps()
+
+    def log_phase_timings(self):
+        """ log the seconds each device spent in each phase """
+        for device, timings in self.phase_timings.items():
+            logger.info("{device}: {state} {phases}".format(
+                device=device,
+                state="connected" if self.results.get(device) else "NOT connected",
+                phases=", ".join("{phase} {sec:.1f}s".format(phase=phase, sec=sec)
+                                 for phase, sec in timings.items())))
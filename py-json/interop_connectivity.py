@@ -5,7 +5,6 @@ import logging
 import sys
 import asyncio
 import requests
-import time
 from datetime import datetime
 if (sys.version_info[0] != 3):
     logging.critical('This script requires Python3')
@@ -711,7 +710,7 @@ class Laptop():
 
         # Use asyncio.gather to await the completion of all tasks
         results = await asyncio.gather(*tasks)
-        time.sleep(2)
+        await asyncio.sleep(2)
 
     # add station
     async def add_station(self, port_list=[]):
@@ -821,7 +820,7 @@ class Laptop():
 
         # Use asyncio.gather to await the completion of all tasks
         results = await asyncio.gather(*tasks)
-        time.sleep(2)
+        await asyncio.sleep(2)
 
     async def set_wifi_extra(self, port_list=[]):
         logger.info("SET WIFI EXTRA LAPTOP")
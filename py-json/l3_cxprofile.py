@@ -17,6 +17,9 @@ LFCliBase = lfcli_base.LFCliBase
 pandas_extensions = importlib.import_module("py-json.LANforge.pandas_extensions")
 port_probe = importlib.import_module("py-json.port_probe")
 ProbePort = port_probe.ProbePort
+ProbeCollector = port_probe.ProbeCollector
+metrics_recorder = importlib.import_module("py-json.metrics_recorder")
+MetricsRecorder = metrics_recorder.MetricsRecorder
 
 logger = logging.getLogger(__name__)
 
@@ -144,6 +147,10 @@ class L3CXProfile(LFCliBase):
                 compared_report=None,
                 resource=1,
                 adjust_cx_json=False,  # used for lf_test_max_association.py (removes created_cx from json get to alleviate url > 2048 bytes error)
+                columnar_format=None,  # also stream samples to an 'arrow' or 'parquet' file next to report_file
+                flush_rows=MetricsRecorder.Default_Flush_Rows,
+                probe_ttl_sec=ProbeCollector.Default_TTL_Sec,
+                probe_workers=ProbeCollector.Default_Max_Workers,
                 debug=False):
         if duration_sec:
             duration_sec = self.parse_time(duration_sec).seconds
@@ -224,165 +231,177 @@ class L3CXProfile(LFCliBase):
         old_cx_rx_values = self.__get_rx_values()
 
 
+        # samples are appended to report_file as they arrive instead of held until the end
+        recorder = MetricsRecorder(csv_path=report_file,
+                                   columnar_format=columnar_format,
+                                   flush_rows=flush_rows,
+                                   drop_columns=['alias'],
+                                   debug=debug)
+
+        # probes every station in parallel once per interval instead of one at a time
+        probe_collector = ProbeCollector(lfhost=self.lfclient_host,
+                                         lfport=self.lfclient_port,
+                                         ttl_sec=probe_ttl_sec,
+                                         max_workers=probe_workers,
+                                         debug=self.debug)
+
         # for x in range(0,int(round(iterations,0))):
         initial_starttime = datetime.datetime.now()
-        timestamp_data = list()
-        while datetime.datetime.now() < end_time:
-            t = datetime.datetime.now()
-            timestamp = t.strftime("%m/%d/%Y %I:%M:%S")
-            t_to_millisec_epoch = int(self.get_milliseconds(t))
-            t_to_sec_epoch = int(self.get_seconds(t))
-            time_elapsed = int(self.get_seconds(t)) - int(self.get_seconds(initial_starttime))
-            stations = [station.split('.')[-1] for station in sta_list]
-            stations = ','.join(stations)
-
-            if port_mgr_cols:
-                port_mgr_response = self.json_get("/port/1/%s/%s?fields=%s" % (resource, stations, port_mgr_fields))
-
-            # if True, removes created_cx from json get to alleviate url > 2048 bytes error
-            if adjust_cx_json:
-                layer_3_response = self.json_get("/endp/?fields=%s" % (layer3_fields))
-            else:
-                layer_3_response = self.json_get("/endp/%s?fields=%s" % (created_cx, layer3_fields))
-            # logger.info(layer_3_response)
-
-            new_cx_rx_values = self.__get_rx_values()
-            if debug:
-                logger.debug(old_cx_rx_values, new_cx_rx_values)
-                logger.debug("\n-----------------------------------")
-                logger.debug(t)
-                logger.debug("-----------------------------------\n")
-            expected_passes += 1
-            if self.__compare_vals(old_cx_rx_values, new_cx_rx_values):
-                passes += 1
-            else:
-                # TODO track where this goes?
-                self.fail("FAIL: Not all stations increased traffic")
-
-            result = dict()  # create dataframe from layer 3 results
-            if type(layer_3_response) is dict:
-                for dictionary in layer_3_response['endpoint']:
-                    logger.debug('layer_3_data: {dictionary}'.format(dictionary=dictionary))
-                    result.update(dictionary)
-            else:
-                pass
-            layer3 = pd.DataFrame(result.values())
-            layer3.columns = ['l3-' + x for x in layer3.columns]
-
-            if port_mgr_cols:  # create dataframe from port mgr results
-                result = dict()
-                if type(port_mgr_response) is dict:
-                    logger.info("port_mgr_response {pmr}".format(pmr=port_mgr_response))
-                    if 'interfaces' in port_mgr_response:
-                        for dictionary in port_mgr_response['interfaces']:
+        with recorder, probe_collector:
+            while datetime.datetime.now() < end_time:
+                t = datetime.datetime.now()
+                timestamp = t.strftime("%m/%d/%Y %I:%M:%S")
+                t_to_millisec_epoch = int(self.get_milliseconds(t))
+                t_to_sec_epoch = int(self.get_seconds(t))
+                time_elapsed = int(self.get_seconds(t)) - int(self.get_seconds(initial_starttime))
+                stations = [station.split('.')[-1] for station in sta_list]
+                stations = ','.join(stations)
+
+                if port_mgr_cols:
+                    port_mgr_response = self.json_get("/port/1/%s/%s?fields=%s" % (resource, stations, port_mgr_fields))
+
+                # if True, removes created_cx from json get to alleviate url > 2048 bytes error
+                if adjust_cx_json:
+                    layer_3_response = self.json_get("/endp/?fields=%s" % (layer3_fields))
+                else:
+                    layer_3_response = self.json_get("/endp/%s?fields=%s" % (created_cx, layer3_fields))
+                # logger.info(layer_3_response)
+
+                new_cx_rx_values = self.__get_rx_values()
+                if debug:
+                    logger.debug(old_cx_rx_values, new_cx_rx_values)
+                    logger.debug("\n-----------------------------------")
+                    logger.debug(t)
+                    logger.debug("-----------------------------------\n")
+                expected_passes += 1
+                if self.__compare_vals(old_cx_rx_values, new_cx_rx_values):
+                    passes += 1
+                else:
+                    # TODO track where this goes?
+                    self.fail("FAIL: Not all stations increased traffic")
+
+                result = dict()  # create dataframe from layer 3 results
+                if type(layer_3_response) is dict:
+                    for dictionary in layer_3_response['endpoint']:
+                        logger.debug('layer_3_data: {dictionary}'.format(dictionary=dictionary))
+                        result.update(dictionary)
+                else:
+                    pass
+                layer3 = pd.DataFrame(result.values())
+                layer3.columns = ['l3-' + x for x in layer3.columns]
+
+                if port_mgr_cols:  # create dataframe from port mgr results
+                    result = dict()
+                    if type(port_mgr_response) is dict:
+                        logger.info("port_mgr_response {pmr}".format(pmr=port_mgr_response))
+                        if 'interfaces' in port_mgr_response:
+                            for dictionary in port_mgr_response['interfaces']:
+                                if debug:
+                                    logger.debug('port mgr data: {dictionary}'.format(dictionary=dictionary))
+                                result.update(dictionary)
+
+                        elif 'interface' in port_mgr_response:
+                            dict_update = {port_mgr_response['interface']['alias']: port_mgr_response['interface']}
                             if debug:
-                                logger.debug('port mgr data: {dictionary}'.format(dictionary=dictionary))
-                            result.update(dictionary)
-
-                    elif 'interface' in port_mgr_response:
-                        dict_update = {port_mgr_response['interface']['alias']: port_mgr_response['interface']}
-                        if debug:
-                            logger.debug(dict_update)
-                        result.update(dict_update)
-                        if debug:
-                            logger.debug(result)
-                    else:
-                        logger.critical('interfaces and interface not in port_mgr_response')
-                        raise ValueError('interfaces and interface not in port_mgr_response')
-                    portdata_df = pd.DataFrame(result.values())
-                    logger.info("portdata_df {pd}".format(pd=portdata_df))
-                    portdata_df.columns = ['port-' + x for x in portdata_df.columns]
-                    portdata_df['alias'] = portdata_df['port-alias']
-
-                    layer3_alias = list()  # Add alias to layer 3 dataframe
-                    for cross_connect in layer3['l3-name']:
-                        for port in portdata_df['port-alias']:
-                            if port in cross_connect:
-                                layer3_alias.append(port)
-                    if len(layer3_alias) == layer3.shape[0]:
-                        layer3['alias'] = layer3_alias
-                    else:
-                        logger.critical(("The Stations or Connection on LANforge did not match expected,",
-                                         " Check if LANForge initial state correct or delete/cleanup corrects"))
-                        raise ValueError(("The Stations or Connection on LANforge did not match expected,",
-                                          " Check if LANForge initial state correct or delete/cleanup corrects"))
-
-                    timestamp_df = pd.merge(layer3, portdata_df, on='alias')
-            else:
-                timestamp_df = layer3
-            probe_port_df_list = list()
-            for station in sta_list:
-                probe_port = ProbePort(lfhost=self.lfclient_host,
-                                       lfport=self.lfclient_port,
-                                       eid_str=station,
-                                       debug=self.debug)
-                probe_results = dict()
-                if (probe_port.refreshProbe()):
-                    probe_results['Signal Avg Combined'] = probe_port.getSignalAvgCombined()
-                    probe_results['Signal Avg per Chain'] = probe_port.getSignalAvgPerChain()
-                    probe_results['Signal Combined'] = probe_port.getSignalCombined()
-                    probe_results['Signal per Chain'] = probe_port.getSignalPerChain()
-                    if 'Beacon Av Signal' in probe_results.keys():
-                        probe_results['Beacon Avg Signal'] = probe_port.getBeaconSignalAvg()
-                    else:
-                        probe_results['Beacon Avg Signal'] = "0"
-                    # probe_results['HE status'] = probe_port.he
-                    probe_results['TX Bitrate'] = probe_port.tx_bitrate
-                    probe_results['TX Mbps'] = probe_port.tx_mbit
-                    probe_results['TX MCS ACTUAL'] = probe_port.tx_mcs
-                    if probe_port.tx_mcs:
-                        probe_results['TX MCS'] = int(probe_port.tx_mcs) % 8
-                    else:
-                        probe_results['TX MCS'] = probe_port.tx_mcs
-                    probe_results['TX NSS'] = probe_port.tx_nss
-                    probe_results['TX MHz'] = probe_port.tx_mhz
-                    if probe_port.tx_gi:
-                        probe_results['TX GI ns'] = (probe_port.tx_gi * 10**9)
-                    else:
-                        probe_results['TX GI ns'] = probe_port.tx_gi
-                    probe_results['TX Mbps Calc'] = probe_port.tx_mbit_calc
-                    probe_results['TX GI'] = probe_port.tx_gi
-                    probe_results['TX Mbps short GI'] = probe_port.tx_data_rate_gi_short_Mbps
-                    probe_results['TX Mbps long GI'] = probe_port.tx_data_rate_gi_long_Mbps
-                    probe_results['RX Bitrate'] = probe_port.rx_bitrate
-                    probe_results['RX Mbps'] = probe_port.rx_mbit
-                    probe_results['RX MCS ACTUAL'] = probe_port.rx_mcs
-                    if probe_port.rx_mcs:
-                        probe_results['RX MCS'] = int(probe_port.rx_mcs) % 8
-                    else:
-                        probe_results['RX MCS'] = probe_port.rx_mcs
-                    probe_results['RX NSS'] = probe_port.rx_nss
-                    probe_results['RX MHz'] = probe_port.rx_mhz
-                    if probe_port.rx_gi:
-                        probe_results['RX GI ns'] = (probe_port.rx_gi * 10**9)
-                    else:
-                        probe_results['RX GI ns'] = probe_port.rx_gi
-                    probe_results['RX Mbps Calc'] = probe_port.rx_mbit_calc
-                    probe_results['RX GI'] = probe_port.rx_gi
-                    probe_results['RX Mbps short GI'] = probe_port.rx_data_rate_gi_short_Mbps
-                    probe_results['RX Mbps long GI'] = probe_port.rx_data_rate_gi_long_Mbps
-
-                    probe_df_initial = pd.DataFrame(probe_results.values()).transpose()
-                    probe_df_initial.columns = probe_results.keys()
-                    probe_df_initial.columns = ['probe ' + x for x in probe_df_initial.columns]
-                    probe_df_initial['alias'] = station.split('.')[-1]
-                    probe_port_df_list.append(probe_df_initial)
-            if len(probe_port_df_list) > 0:
-                probe_port_df = pd.concat(probe_port_df_list)
-                timestamp_df = pd.merge(timestamp_df, probe_port_df, on='alias')
-                timestamp_df['Timestamp'] = timestamp
-                timestamp_df['Timestamp milliseconds epoch'] = t_to_millisec_epoch
-                timestamp_df['Timestamp seconds epoch'] = t_to_sec_epoch
-                timestamp_df['Duration elapsed'] = time_elapsed
-                timestamp_data.append(timestamp_df)
-                time.sleep(monitor_interval_ms)
-                logger.info("Monitor: {}".format(datetime.datetime.now()))
-            else:
-                logger.info("port probe dataframe list is empty.")
-        if len(timestamp_data) > 0:
-            df = pd.concat(timestamp_data)
-            df = df.drop('alias', axis=1)
-            df.to_csv(str(report_file), index=False)
+                                logger.debug(dict_update)
+                            result.update(dict_update)
+                            if debug:
+                                logger.debug(result)
+                        else:
+                            logger.critical('interfaces and interface not in port_mgr_response')
+                            raise ValueError('interfaces and interface not in port_mgr_response')
+                        portdata_df = pd.DataFrame(result.values())
+                        logger.info("portdata_df {pd}".format(pd=portdata_df))
+                        portdata_df.columns = ['port-' + x for x in portdata_df.columns]
+                        portdata_df['alias'] = portdata_df['port-alias']
+
+                        layer3_alias = list()  # Add alias to layer 3 dataframe
+                        for cross_connect in layer3['l3-name']:
+                            for port in portdata_df['port-alias']:
+                                if port in cross_connect:
+                                    layer3_alias.append(port)
+                        if len(layer3_alias) == layer3.shape[0]:
+                            layer3['alias'] = layer3_alias
+                        else:
+                            logger.critical(("The Stations or Connection on LANforge did not match expected,",
+                                             " Check if LANForge initial state correct or delete/cleanup corrects"))
+                            raise ValueError(("The Stations or Connection on LANforge did not match expected,",
+                                              " Check if LANForge initial state correct or delete/cleanup corrects"))
+
+                        timestamp_df = pd.merge(layer3, portdata_df, on='alias')
+                else:
+                    timestamp_df = layer3
+                probe_port_df_list = list()
+                probe_ports = probe_collector.refresh(sta_list)
+                for station in sta_list:
+                    probe_port = probe_ports[station]
+                    probe_results = dict()
+                    if probe_port is not None:
+                        probe_results['Signal Avg Combined'] = probe_port.getSignalAvgCombined()
+                        probe_results['Signal Avg per Chain'] = probe_port.getSignalAvgPerChain()
+                        probe_results['Signal Combined'] = probe_port.getSignalCombined()
+                        probe_results['Signal per Chain'] = probe_port.getSignalPerChain()
+                        if 'Beacon Av Signal' in probe_results.keys():
+                            probe_results['Beacon Avg Signal'] = probe_port.getBeaconSignalAvg()
+                        else:
+                            probe_results['Beacon Avg Signal'] = "0"
+                        # probe_results['HE status'] = probe_port.he
+                        probe_results['TX Bitrate'] = probe_port.tx_bitrate
+                        probe_results['TX Mbps'] = probe_port.tx_mbit
+                        probe_results['TX MCS ACTUAL'] = probe_port.tx_mcs
+                        if probe_port.tx_mcs:
+                            probe_results['TX MCS'] = int(probe_port.tx_mcs) % 8
+                        else:
+                            probe_results['TX MCS'] = probe_port.tx_mcs
+                        probe_results['TX NSS'] = probe_port.tx_nss
+                        probe_results['TX MHz'] = probe_port.tx_mhz
+                        if probe_port.tx_gi:
+                            probe_results['TX GI ns'] = (probe_port.tx_gi * 10**9)
+                        else:
+                            probe_results['TX GI ns'] = probe_port.tx_gi
+                        probe_results['TX Mbps Calc'] = probe_port.tx_mbit_calc
+                        probe_results['TX GI'] = probe_port.tx_gi
+                        probe_results['TX Mbps short GI'] = probe_port.tx_data_rate_gi_short_Mbps
+                        probe_results['TX Mbps long GI'] = probe_port.tx_data_rate_gi_long_Mbps
+                        probe_results['RX Bitrate'] = probe_port.rx_bitrate
+                        probe_results['RX Mbps'] = probe_port.rx_mbit
+                        probe_results['RX MCS ACTUAL'] = probe_port.rx_mcs
+                        if probe_port.rx_mcs:
+                            probe_results['RX MCS'] = int(probe_port.rx_mcs) % 8
+                        else:
+                            probe_results['RX MCS'] = probe_port.rx_mcs
+                        probe_results['RX NSS'] = probe_port.rx_nss
+                        probe_results['RX MHz'] = probe_port.rx_mhz
+                        if probe_port.rx_gi:
+                            probe_results['RX GI ns'] = (probe_port.rx_gi * 10**9)
+                        else:
+                            probe_results['RX GI ns'] = probe_port.rx_gi
+                        probe_results['RX Mbps Calc'] = probe_port.rx_mbit_calc
+                        probe_results['RX GI'] = probe_port.rx_gi
+                        probe_results['RX Mbps short GI'] = probe_port.rx_data_rate_gi_short_Mbps
+                        probe_results['RX Mbps long GI'] = probe_port.rx_data_rate_gi_long_Mbps
+                        # seconds since this station was probed, it may have come from the cache
+                        probe_results['Age sec'] = probe_collector.get_age(station)
+
+                        probe_df_initial = pd.DataFrame(probe_results.values()).transpose()
+                        probe_df_initial.columns = probe_results.keys()
+                        probe_df_initial.columns = ['probe ' + x for x in probe_df_initial.columns]
+                        probe_df_initial['alias'] = station.split('.')[-1]
+                        probe_port_df_list.append(probe_df_initial)
+                if len(probe_port_df_list) > 0:
+                    probe_port_df = pd.concat(probe_port_df_list)
+                    timestamp_df = pd.merge(timestamp_df, probe_port_df, on='alias')
+                    timestamp_df['Timestamp'] = timestamp
+                    timestamp_df['Timestamp milliseconds epoch'] = t_to_millisec_epoch
+                    timestamp_df['Timestamp seconds epoch'] = t_to_sec_epoch
+                    timestamp_df['Duration elapsed'] = time_elapsed
+                    recorder.append(timestamp_df)
+                    time.sleep(monitor_interval_ms)
+                    logger.info("Monitor: {}".format(datetime.datetime.now()))
+                else:
+                    logger.info("port probe dataframe list is empty.")
+        if recorder.rows_written == 0:
+            logger.warning("Monitor recorded no samples to {report_file}".format(report_file=report_file))
 
         # comparison to last report / report inputted
         if compared_report:
@@ -470,14 +489,28 @@ class L3CXProfile(LFCliBase):
                ip_port_increment_a=0,
                ip_port_increment_b=0,
                cx_name=None,
-               add_tos_to_name=False):
+               add_tos_to_name=False,
+               batch_workers=0):
         # Returns a 2-member array, list of cx, list of endp on success.
         # If endpoints creation fails, returns False, False
         # if Endpoints creation is OK, but CX creation fails, returns False, list of endp
+        # batch_workers above zero queues the endpoint and cx commands and posts them
+        # concurrently, keeping the commands for each cx in order
         if self.debug:
             debug_ = True
             logger.info('Start L3CXProfile.create')
 
+        batch = None
+        if batch_workers:
+            batch = self.local_realm.batch(max_workers=batch_workers, debug_=debug_)
+
+        def post_cmd(batch_key, _req_url, _data, debug_=False, suppress_related_commands_=None):
+            if batch is not None:
+                batch.add(_req_url, _data, key=batch_key, suppress_related_commands_=suppress_related_commands_)
+                return None
+            return self.local_realm.json_post(_req_url, _data, debug_=debug_,
+                                              suppress_related_commands_=suppress_related_commands_)
+
         cx_post_data = []
         timer_post_data = []
         these_endp = []
@@ -614,20 +647,20 @@ class L3CXProfile(LFCliBase):
                 }
 
                 url = "/cli-json/add_endp"
-                self.local_realm.json_post(_req_url=url,
-                                           _data=endp_side_a,
-                                           debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
-                self.local_realm.json_post(_req_url=url,
-                                           _data=endp_side_b,
-                                           debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
-                self.local_realm.json_post(_req_url="/cli-json/set_endp_report_timer",
-                                           _data={"endp_name":endp_a_name, "milliseconds":250 },
-                                           suppress_related_commands_=suppress_related_commands)
-                self.local_realm.json_post(_req_url="/cli-json/set_endp_report_timer",
-                                           _data={ "endp_name":endp_b_name, "milliseconds":250, },
-                                           suppress_related_commands_=suppress_related_commands)
+                post_cmd(cx_name, _req_url=url,
+                         _data=endp_side_a,
+                         debug_=debug_,
+                         suppress_related_commands_=suppress_related_commands)
+                post_cmd(cx_name, _req_url=url,
+                         _data=endp_side_b,
+                         debug_=debug_,
+                         suppress_related_commands_=suppress_related_commands)
+                post_cmd(cx_name, _req_url="/cli-json/set_endp_report_timer",
+                         _data={"endp_name":endp_a_name, "milliseconds":250 },
+                         suppress_related_commands_=suppress_related_commands)
+                post_cmd(cx_name, _req_url="/cli-json/set_endp_report_timer",
+                         _data={ "endp_name":endp_b_name, "milliseconds":250, },
+                         suppress_related_commands_=suppress_related_commands)
                 # time.sleep(sleep_time)
 
                 url = "cli-json/set_endp_flag"
@@ -636,28 +669,28 @@ class L3CXProfile(LFCliBase):
                     "flag": "AutoHelper",
                     "val": 1
                 }
-                self.local_realm.json_post(url, data, debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
+                post_cmd(cx_name, url, data, debug_=debug_,
+                         suppress_related_commands_=suppress_related_commands)
                 data["name"] = endp_b_name
-                self.local_realm.json_post(url, data, debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
+                post_cmd(cx_name, url, data, debug_=debug_,
+                         suppress_related_commands_=suppress_related_commands)
 
                 if (endp_type == "lf_udp") or (endp_type == "udp") or (endp_type == "lf_udp6") or (endp_type == "udp6"):
                     data["name"] = endp_a_name
                     data["flag"] = "UseAutoNAT"
-                    self.local_realm.json_post(url, data, debug_=debug_,
-                                               suppress_related_commands_=suppress_related_commands)
+                    post_cmd(cx_name, url, data, debug_=debug_,
+                             suppress_related_commands_=suppress_related_commands)
                     data["name"] = endp_b_name
-                    self.local_realm.json_post(url, data, debug_=debug_,
-                                               suppress_related_commands_=suppress_related_commands)
+                    post_cmd(cx_name, url, data, debug_=debug_,
+                             suppress_related_commands_=suppress_related_commands)
 
                 if tos:
-                    self.local_realm.set_endp_tos(endp_a_name, tos)
-                    self.local_realm.set_endp_tos(endp_b_name, tos)
+                    self.local_realm.set_endp_tos(endp_a_name, tos, batch=batch, batch_key=cx_name)
+                    self.local_realm.set_endp_tos(endp_b_name, tos, batch=batch, batch_key=cx_name)
 
                 if pkts_to_send:
-                    self.local_realm.set_endp_details(endp_a_name, pkts_to_send)
-                    self.local_realm.set_endp_details(endp_b_name, pkts_to_send)
+                    self.local_realm.set_endp_details(endp_a_name, pkts_to_send, batch=batch, batch_key=cx_name)
+                    self.local_realm.set_endp_details(endp_b_name, pkts_to_send, batch=batch, batch_key=cx_name)
 
                 data = {
                     "alias": cx_name,
@@ -787,11 +820,12 @@ class L3CXProfile(LFCliBase):
                 }
 
                 url = "/cli-json/add_endp"
-                self.local_realm.json_post(url, endp_side_a, debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
-                self.local_realm.json_post(url, endp_side_b, debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
-                time.sleep(sleep_time)
+                post_cmd(cx_name, url, endp_side_a, debug_=debug_,
+                         suppress_related_commands_=suppress_related_commands)
+                post_cmd(cx_name, url, endp_side_b, debug_=debug_,
+                         suppress_related_commands_=suppress_related_commands)
+                if batch is None:
+                    time.sleep(sleep_time)
 
                 url = "cli-json/set_endp_flag"
                 data = {
@@ -799,8 +833,8 @@ class L3CXProfile(LFCliBase):
                     "flag": "autohelper",
                     "val": 1
                 }
-                self.local_realm.json_post(url, data, debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
+                post_cmd(cx_name, url, data, debug_=debug_,
+                         suppress_related_commands_=suppress_related_commands)
 
                 url = "cli-json/set_endp_flag"
                 data = {
@@ -808,16 +842,16 @@ class L3CXProfile(LFCliBase):
                     "flag": "autohelper",
                     "val": 1
                 }
-                self.local_realm.json_post(url, data, debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
+                post_cmd(cx_name, url, data, debug_=debug_,
+                         suppress_related_commands_=suppress_related_commands)
 
                 if tos:
-                    self.local_realm.set_endp_tos(endp_a_name, tos)
-                    self.local_realm.set_endp_tos(endp_b_name, tos)
+                    self.local_realm.set_endp_tos(endp_a_name, tos, batch=batch, batch_key=cx_name)
+                    self.local_realm.set_endp_tos(endp_b_name, tos, batch=batch, batch_key=cx_name)
 
                 if pkts_to_send:
-                    self.local_realm.set_endp_details(endp_a_name, pkts_to_send)
-                    self.local_realm.set_endp_details(endp_b_name, pkts_to_send)
+                    self.local_realm.set_endp_details(endp_a_name, pkts_to_send, batch=batch, batch_key=cx_name)
+                    self.local_realm.set_endp_details(endp_b_name, pkts_to_send, batch=batch, batch_key=cx_name)
 
                 data = {
                     "alias": cx_name,
@@ -913,20 +947,20 @@ class L3CXProfile(LFCliBase):
 
                 # pprint.pprint(["endp_side_a", endp_side_a, "endp_side_b", endp_side_b])
                 url = "/cli-json/add_endp"
-                self.local_realm.json_post(_req_url=url,
-                                           _data=endp_side_a,
-                                           debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
-                self.local_realm.json_post(_req_url=url,
-                                           _data=endp_side_b,
-                                           debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
-                self.local_realm.json_post(_req_url="/cli-json/set_endp_report_timer",
-                                           _data={"endp_name":endp_a_name, "milliseconds":250 },
-                                           suppress_related_commands_=suppress_related_commands)
-                self.local_realm.json_post(_req_url="/cli-json/set_endp_report_timer",
-                                           _data={ "endp_name":endp_b_name, "milliseconds":250, },
-                                           suppress_related_commands_=suppress_related_commands)
+                post_cmd(cx_name, _req_url=url,
+                         _data=endp_side_a,
+                         debug_=debug_,
+                         suppress_related_commands_=suppress_related_commands)
+                post_cmd(cx_name, _req_url=url,
+                         _data=endp_side_b,
+                         debug_=debug_,
+                         suppress_related_commands_=suppress_related_commands)
+                post_cmd(cx_name, _req_url="/cli-json/set_endp_report_timer",
+                         _data={"endp_name":endp_a_name, "milliseconds":250 },
+                         suppress_related_commands_=suppress_related_commands)
+                post_cmd(cx_name, _req_url="/cli-json/set_endp_report_timer",
+                         _data={ "endp_name":endp_b_name, "milliseconds":250, },
+                         suppress_related_commands_=suppress_related_commands)
                 # time.sleep(sleep_time)
 
                 url = "cli-json/set_endp_flag"
@@ -935,28 +969,28 @@ class L3CXProfile(LFCliBase):
                     "flag": "AutoHelper",
                     "val": 1
                 }
-                self.local_realm.json_post(url, data, debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
+                post_cmd(cx_name, url, data, debug_=debug_,
+                         suppress_related_commands_=suppress_related_commands)
                 data["name"] = endp_b_name
-                self.local_realm.json_post(url, data, debug_=debug_,
-                                           suppress_related_commands_=suppress_related_commands)
+                post_cmd(cx_name, url, data, debug_=debug_,
+                         suppress_related_commands_=suppress_related_commands)
 
                 if (endp_type == "lf_udp") or (endp_type == "udp") or (endp_type == "lf_udp6") or (endp_type == "udp6"):
                     data["name"] = endp_a_name
                     data["flag"] = "UseAutoNAT"
-                    self.local_realm.json_post(url, data, debug_=debug_,
-                                               suppress_related_commands_=suppress_related_commands)
+                    post_cmd(cx_name, url, data, debug_=debug_,
+                             suppress_related_commands_=suppress_related_commands)
                     data["name"] = endp_b_name
-                    self.local_realm.json_post(url, data, debug_=debug_,
-                                               suppress_related_commands_=suppress_related_commands)
+                    post_cmd(cx_name, url, data, debug_=debug_,
+                             suppress_related_commands_=suppress_related_commands)
 
                 if tos:
-                    self.local_realm.set_endp_tos(endp_a_name, tos)
-                    self.local_realm.set_endp_tos(endp_b_name, tos)
+                    self.local_realm.set_endp_tos(endp_a_name, tos, batch=batch, batch_key=cx_name)
+                    self.local_realm.set_endp_tos(endp_b_name, tos, batch=batch, batch_key=cx_name)
 
                 if pkts_to_send:
-                    self.local_realm.set_endp_details(endp_a_name, pkts_to_send)
-                    self.local_realm.set_endp_details(endp_b_name, pkts_to_send)
+                    self.local_realm.set_endp_details(endp_a_name, pkts_to_send, batch=batch, batch_key=cx_name)
+                    self.local_realm.set_endp_details(endp_b_name, pkts_to_send, batch=batch, batch_key=cx_name)
 
                 data = {
                     "alias": cx_name,
@@ -986,6 +1020,8 @@ class L3CXProfile(LFCliBase):
         if debug_:
             logger.debug("wait_until_endps_appear these_endp: {these_endp} debug_ {debug_}".format(
                 these_endp=these_endp, debug_=debug_))
+        if batch is not None:
+            batch.flush()
         rv = self.local_realm.wait_until_endps_appear(these_endp, debug=debug_, timeout=timeout)
         if not rv:
             logger.error("L3CXProfile::create, Could not create/find endpoints")
@@ -993,15 +1029,20 @@ class L3CXProfile(LFCliBase):
 
         for data in cx_post_data:
             url = "/cli-json/add_cx"
-            self.local_realm.json_post(url,
-                                       data,
-                                       debug_=debug_,
-                                       suppress_related_commands_=suppress_related_commands)
-            self.local_realm.json_post("/cli-json/set_cx_report_timer",
-                                       {"test_mgr": "all", "cx_name": data["alias"], "milliseconds": 8000},
-                                       debug_=debug_,
-                                       suppress_related_commands_=suppress_related_commands)
-            time.sleep(0.01)
+            post_cmd(data["alias"],
+                     url,
+                     data,
+                     debug_=debug_,
+                     suppress_related_commands_=suppress_related_commands)
+            post_cmd(data["alias"],
+                     "/cli-json/set_cx_report_timer",
+                     {"test_mgr": "all", "cx_name": data["alias"], "milliseconds": 8000},
+                     debug_=debug_,
+                     suppress_related_commands_=suppress_related_commands)
+            if batch is None:
+                time.sleep(0.01)
+        if batch is not None:
+            batch.flush()
 
         rv = self.local_realm.wait_until_cxs_appear(these_cx, debug=debug_, timeout=timeout)
         if not rv:
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Helpers for reporting a running test to the LANforge webGUI.
+
+LiveCsvAppender appends one row per polling interval to the live csv the webGUI
+plots, instead of rewriting the file from the whole history every interval.
+
+RunningStatusWatcher answers "has the user stopped the test?" from the
+Running_instances/<host>_<test>_running.json file. It reads the small file every
+time but only parses the json again when its content changes; modification time
+and size can miss a Running -> Stopped rewrite of the same length.
+
+Example:
+    live_csv = LiveCsvAppender(path=result_dir + "/overall_multicast_throughput.csv")
+    watcher = RunningStatusWatcher(path=running_json_path)
+    while running:
+        live_csv.append({"timestamp": now, "status": "Running", ...})
+        if not watcher.is_running():
+            break
+"""
+import csv
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class LiveCsvAppender:
+    def __init__(self, path=None, fieldnames=None, truncate=True):
+        """
+        :param path: csv file to write
+        :param fieldnames: column order, default the keys of the first row
+        :param truncate: start a new file, otherwise append to an existing one
+        """
+        if path is None:
+            raise ValueError("LiveCsvAppender requires path")
+        self.path = path
+        self.fieldnames = list(fieldnames) if fieldnames else None
+        self.rows_written = 0
+        self.warned_keys = set()
+        if truncate:
+            self.reset()
+        elif os.path.exists(self.path) and os.path.getsize(self.path) > 0:
+            with open(self.path, "r", newline="") as file:
+                header = next(csv.reader(file), None)
+            if header:
+                self.fieldnames = header
+                self.rows_written = 1
+
+    def reset(self):
+        """ empty the file; the next row writes the header again """
+        open(self.path, "w").close()
+        self.rows_written = 0
+
+    def append(self, row=None):
+        """
+        Append one row, writing the header first if the file is empty
+        :param row: dict of column name to value
+        """
+        if self.fieldnames is None:
+            self.fieldnames = list(row.keys())
+        extra = [key for key in row.keys() if key not in self.fieldnames and key not in self.warned_keys]
+        if extra:
+            logger.warning("LiveCsvAppender: {path} has no columns for {extra}, not written".format(
+                path=self.path, extra=extra))
+            self.warned_keys.update(extra)
+        with open(self.path, "a", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=self.fieldnames, extrasaction="ignore")
+            if self.rows_written == 0:
+                writer.writeheader()
+            writer.writerow(row)
+        self.rows_written += 1
+
+
+class RunningStatusWatcher:
+    def __init__(self, path=None, running_status="Running"):
+        """
+        :param path: Running_instances/<host>_<test>_running.json written by the webGUI
+        :param running_status: value of "status" while the test should keep running
+        """
+        if path is None:
+            raise ValueError("RunningStatusWatcher requires path")
+        self.path = path
+        self.running_status = running_status
+        self.content = None
+        self.data = None
+        self.reads = 0
+
+    def get_status(self):
+        """
+        :return: the json's "status", parsed again only when the file changed; None if it cannot be read
+        """
+        try:
+            with open(self.path, "rb") as file:
+                content = file.read()
+        except OSError as x:
+            logger.warning("RunningStatusWatcher: cannot read {path}: {x}".format(path=self.path, x=x))
+            return None
+        if content != self.content:
+            try:
+                self.data = json.loads(content)
+            except ValueError as x:
+                # the webGUI may be part way through rewriting it, look again next time
+                logger.debug("RunningStatusWatcher: cannot parse {path}: {x}".format(path=self.path, x=x))
+                return None if self.data is None else self.data.get("status")
+            self.content = content
+            self.reads += 1
+        return self.data.get("status")
+
+    def is_running(self):
+        """
+        :return: False once the webGUI has set a status other than running_status
+        """
+        status = self.get_status()
+        return (status is None) or (status == self.running_status)
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+MetricsRecorder streams monitor samples to disk as they are collected.
+
+Long running monitors (L3CXProfile.monitor() on a 24 hour longevity test, for
+example) produce one small DataFrame per interval. Rather than keeping every
+interval in memory until the end of the run, MetricsRecorder buffers at most
+flush_rows rows (or flush_interval_sec seconds of samples) and then appends them
+to a CSV file, and optionally to a columnar file:
+
+    arrow   -- Arrow IPC stream; each flush is a record batch, so a file cut short
+               by a crash still reloads up to the last complete batch
+    parquet -- Parquet; each flush is a row group. Parquet writes its footer on
+               close(), so a partial run can only be reloaded from the CSV file
+
+The column set is fixed by the first flush. Later rows are aligned to it; columns
+that show up later are logged once and dropped.
+
+Example:
+    with MetricsRecorder(csv_path="l3_monitor.csv", columnar_format="arrow") as recorder:
+        while running:
+            recorder.append(interval_df)
+    df = read_metrics("l3_monitor.arrow")
+"""
+import csv
+import logging
+import os
+import time
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class MetricsRecorder:
+    Default_Flush_Rows = 1000
+    Default_Flush_Interval_Sec = 5.0
+    Columnar_Formats = ("arrow", "parquet")
+
+    def __init__(self,
+                 csv_path=None,
+                 columnar_format=None,
+                 columnar_path=None,
+                 flush_rows=Default_Flush_Rows,
+                 flush_interval_sec=Default_Flush_Interval_Sec,
+                 drop_columns=None,
+                 debug=False):
+        """
+        :param csv_path: CSV file to write, replaced if it exists
+        :param columnar_format: None, 'arrow' or 'parquet'; requires pyarrow
+        :param columnar_path: columnar file to write, defaults to csv_path with the format as extension
+        :param flush_rows: write buffered rows once this many are queued
+        :param flush_interval_sec: write buffered rows once the oldest has waited this long
+        :param drop_columns: columns removed from every frame before it is recorded
+        :param debug: turn on debugging output
+        """
+        if csv_path is None:
+            raise ValueError("MetricsRecorder requires csv_path")
+        if columnar_format:
+            columnar_format = columnar_format.lower()
+            if columnar_format not in self.Columnar_Formats:
+                raise ValueError("MetricsRecorder columnar_format must be one of %s, not %s"
+                                 % (", ".join(self.Columnar_Formats), columnar_format))
+            if pyarrow is None:
+                raise ValueError("MetricsRecorder columnar_format %s requires pyarrow, try: pip install pyarrow"
+                                 % columnar_format)
+            if columnar_path is None:
+                columnar_path = os.path.splitext(csv_path)[0] + "." + columnar_format
+        if not flush_rows or int(flush_rows) < 1:
+            raise ValueError("MetricsRecorder flush_rows must be at least 1")
+        self.csv_path = csv_path
+        self.columnar_format = columnar_format
+        self.columnar_path = columnar_path
+        self.flush_rows = int(flush_rows)
+        self.flush_interval_sec = flush_interval_sec
+        self.drop_columns = list(drop_columns) if drop_columns else []
+        self.debug = debug
+
+        self.columns = None
+        self.numeric_columns = None
+        self.schema = None
+        self.ignored_columns = set()
+        self.buffer = []
+        self.buffered_rows = 0
+        self.buffer_started = None
+        self.rows_written = 0
+        self.flush_count = 0
+        self.closed = False
+
+        self.csv_file = None
+        self.csv_writer = None
+        self.columnar_writer = None
+        self.columnar_sink = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        # write what we have even when the monitor failed, that is the point
+        self.close()
+        return False
+
+    def append(self, dataframe=None):
+        """
+        Queue one interval of samples
+        :param dataframe: pandas DataFrame of samples
+        :return: number of rows queued
+        """
+        if self.closed:
+            raise ValueError("MetricsRecorder: append() after close()")
+        if dataframe is None or dataframe.empty:
+            return 0
+        if self.drop_columns:
+            dataframe = dataframe.drop(columns=self.drop_columns, errors='ignore')
+        if self.buffer_started is None:
+            self.buffer_started = time.time()
+        self.buffer.append(dataframe)
+        self.buffered_rows += dataframe.shape[0]
+        if (self.buffered_rows >= self.flush_rows) \
+                or (self.flush_interval_sec is not None
+                    and (time.time() - self.buffer_started) >= self.flush_interval_sec):
+            self.flush()
+        return dataframe.shape[0]
+
+    def _align(self, dataframe):
+        if self.columns is None:
+            self.columns = list(dataframe.columns)
+            self.numeric_columns = set(column for column in self.columns
+                                       if pd.api.types.is_numeric_dtype(dataframe[column])
+                                       and not pd.api.types.is_bool_dtype(dataframe[column]))
+            return dataframe
+        extra = [column for column in dataframe.columns
+                 if column not in self.columns and column not in self.ignored_columns]
+        if extra:
+            logger.warning("MetricsRecorder: dropping columns not present in the first interval: %s" % extra)
+            self.ignored_columns.update(extra)
+        return dataframe.reindex(columns=self.columns)
+
+    def _columnar_table(self, dataframe):
+        # numeric columns are float64 so a missing sample does not change the type,
+        # everything else is recorded as text; every batch then shares one schema
+        data = {}
+        for column in self.columns:
+            if column in self.numeric_columns:
+                data[column] = pd.to_numeric(dataframe[column], errors='coerce').astype('float64')
+            else:
+                data[column] = dataframe[column].map(lambda value: None if value is None or value != value
+                                                     else str(value))
+        if self.schema is None:
+            self.schema = pyarrow.schema([(str(column),
+                                           pyarrow.float64() if column in self.numeric_columns
+                                           else pyarrow.string())
+                                          for column in self.columns])
+        return pyarrow.Table.from_pandas(pd.DataFrame(data, columns=self.columns),
+                                         schema=self.schema,
+                                         preserve_index=False)
+
+    def _open(self):
+        self.csv_file = open(self.csv_path, 'w', newline='')
+        self.csv_writer = csv.writer(self.csv_file)
+        self.csv_writer.writerow(self.columns)
+        if self.columnar_format == "arrow":
+            self.columnar_sink = pyarrow.OSFile(self.columnar_path, 'wb')
+            self.columnar_writer = pyarrow.ipc.new_stream(self.columnar_sink, self.schema)
+        elif self.columnar_format == "parquet":
+            self.columnar_writer = pyarrow.parquet.ParquetWriter(self.columnar_path, self.schema)
+
+    def flush(self):
+        """
+        Write buffered rows to disk
+        :return: number of rows written
+        """
+        if not self.buffer:
+            return 0
+        dataframe = pd.concat([self._align(frame) for frame in self.buffer], ignore_index=True)
+        self.buffer = []
+        self.buffered_rows = 0
+        self.buffer_started = None
+        table = None
+        if self.columnar_format:
+            table = self._columnar_table(dataframe)
+        if self.csv_writer is None:
+            self._open()
+        dataframe.to_csv(self.csv_file, header=False, index=False)
+        self.csv_file.flush()
+        if table is not None:
+            self.columnar_writer.write_table(table)
+            if self.columnar_sink is not None:
+                self.columnar_sink.flush()
+        self.rows_written += dataframe.shape[0]
+        self.flush_count += 1
+        if self.debug:
+            logger.debug("MetricsRecorder: wrote %d rows, %d total" % (dataframe.shape[0], self.rows_written))
+        return dataframe.shape[0]
+
+    def close(self):
+        """ write remaining rows and close the output files """
+        if self.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self.closed = True
+            if self.columnar_writer is not None:
+                self.columnar_writer.close()
+            if self.columnar_sink is not None:
+                self.columnar_sink.close()
+            if self.csv_file is not None:
+                self.csv_file.close()
+        logger.info("MetricsRecorder: %d rows in %d writes to %s"
+                    % (self.rows_written, self.flush_count, self.csv_path))
+
+    def get_stats(self):
+        """
+        :return: dict of rows written, writes and rows still buffered
+        """
+        return {
+            "rows_written": self.rows_written,
+            "flushes": self.flush_count,
+            "rows_buffered": self.buffered_rows,
+        }
+
+
+def _metrics_format(path, file_format):
+    if file_format:
+        return file_format.lower()
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension in ('arrow', 'arrows', 'ipc'):
+        return "arrow"
+    if extension in ('parquet', 'pq'):
+        return "parquet"
+    return "csv"
+
+
+def iter_metrics(path=None, chunk_rows=MetricsRecorder.Default_Flush_Rows, columns=None, file_format=None):
+    """
+    Read a file written by MetricsRecorder a chunk at a time, including a run that
+    was cut short: a CSV row or Arrow batch that was only partly written is skipped.
+    :param path: CSV, Arrow or Parquet file
+    :param chunk_rows: rows per CSV chunk; Arrow and Parquet chunks follow the writes
+    :param columns: list of columns to read, default all
+    :param file_format: 'csv', 'arrow' or 'parquet', default from the file extension
+    :return: generator of DataFrames
+    """
+    if path is None:
+        raise ValueError("iter_metrics requires path")
+    file_format = _metrics_format(path, file_format)
+    if file_format == "csv":
+        with open(path, 'rb') as file:
+            file.seek(0, os.SEEK_END)
+            if file.tell() == 0:
+                return
+            file.seek(-1, os.SEEK_END)
+            complete = file.read(1) == b'\n'
+        pending = None
+        for chunk in pd.read_csv(path, usecols=columns, chunksize=chunk_rows):
+            if pending is not None:
+                yield pending
+            pending = chunk
+        if pending is not None:
+            if not complete:
+                pending = pending.iloc[:-1]
+            yield pending
+        return
+    if pyarrow is None:
+        raise ValueError("iter_metrics: reading %s requires pyarrow, try: pip install pyarrow" % file_format)
+    if file_format == "arrow":
+        with pyarrow.OSFile(path, 'rb') as source:
+            try:
+                reader = pyarrow.ipc.open_stream(source)
+            except (pyarrow.ArrowInvalid, OSError) as x:
+                logger.warning("iter_metrics: %s has no complete schema: %s" % (path, x))
+                return
+            while True:
+                try:
+                    batch = reader.read_next_batch()
+                except StopIteration:
+                    return
+                except (pyarrow.ArrowInvalid, OSError) as x:
+                    logger.warning("iter_metrics: %s ends with a partial batch, ignoring it: %s" % (path, x))
+                    return
+                dataframe = batch.to_pandas()
+                yield dataframe[columns] if columns else dataframe
+    elif file_format == "parquet":
+        parquet_file = pyarrow.parquet.ParquetFile(path)
+        for group in range(parquet_file.num_row_groups):
+            yield parquet_file.read_row_group(group, columns=columns).to_pandas()
+    else:
+        raise ValueError("iter_metrics: unknown file_format %s" % file_format)
+
+
+def read_metrics(path=None, columns=None, file_format=None):
+    """
+    Load a file written by MetricsRecorder, complete or partial
+    :param path: CSV, Arrow or Parquet file
+    :param columns: list of columns to read, default all
+    :param file_format: 'csv', 'arrow' or 'parquet', default from the file extension
+    :return: DataFrame
+    """
+    chunks = list(iter_metrics(path=path, columns=columns, file_format=file_format))
+    if not chunks:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(chunks, ignore_index=True)
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Single pass 802.11 capture analysis.
+
+PcapAnalyzer memory-maps a pcap or pcapng capture, decodes the radiotap and
+802.11 management headers itself and runs every registered check on each frame,
+so a set of checks costs one read of the file instead of one tshark decode per
+check. Each check keeps the first frame it matches; the scan stops as soon as
+every check has matched.
+
+Supported link types are 802.11 (105) and 802.11 with radiotap (127).
+
+Example:
+    analyzer = PcapAnalyzer(checks=DEFAULT_CHECKS)
+    results = analyzer.analyze("mu-mimo.pcap")
+    print(results["he_guard_interval"])
+"""
+import logging
+import mmap
+import struct
+
+logger = logging.getLogger(__name__)
+
+NOT_FOUND = "Packet Not Found"
+
+LINKTYPE_IEEE802_11 = 105
+LINKTYPE_IEEE802_11_RADIOTAP = 127
+
+# magic: (byte order, timestamp fractions per second)
+PCAP_MAGIC = {
+    b"\xd4\xc3\xb2\xa1": ("<", 1e6),
+    b"\xa1\xb2\xc3\xd4": (">", 1e6),
+    # nanosecond resolution
+    b"\x4d\x3c\xb2\xa1": ("<", 1e9),
+    b"\xa1\xb2\x3c\x4d": (">", 1e9),
+}
+PCAPNG_SHB = 0x0A0D0D0A
+PCAPNG_IDB = 1
+PCAPNG_SPB = 3
+PCAPNG_EPB = 6
+
+# radiotap fields before HE (bit 23): (alignment, size)
+RADIOTAP_FIELDS = (
+    (8, 8), (1, 1), (1, 1), (2, 4), (1, 2), (1, 1), (1, 1), (2, 2),
+    (2, 2), (2, 2), (1, 1), (1, 1), (1, 1), (1, 1), (2, 2), (2, 2),
+    (1, 1), (1, 1), (4, 8), (1, 3), (4, 8), (2, 12), (8, 12),
+)
+RADIOTAP_FLAGS = 1
+RADIOTAP_FLAGS_FCS = 0x10
+RADIOTAP_HE = 23
+HE_DATA2_GI_KNOWN = 0x0002
+HE_DATA5_GI_MASK = 0x0030
+HE_GI_US = {0: "0.8", 1: "1.6", 2: "3.2"}
+
+# management frame subtypes, as wlan.fc.type_subtype
+ASSOC_REQUEST = 0
+ASSOC_RESPONSE = 1
+REASSOC_REQUEST = 2
+REASSOC_RESPONSE = 3
+PROBE_REQUEST = 4
+PROBE_RESPONSE = 5
+BEACON = 8
+ACTION = 13
+# bytes of fixed parameters before the tagged parameters
+FIXED_PARAMS = {
+    ASSOC_REQUEST: 4, ASSOC_RESPONSE: 6, REASSOC_REQUEST: 10, REASSOC_RESPONSE: 6,
+    PROBE_REQUEST: 0, PROBE_RESPONSE: 12, BEACON: 12,
+}
+
+TAG_VHT_CAPABILITIES = 191
+TAG_EXTENSION = 255
+EXT_TAG_HE_CAPABILITIES = 35
+VHT_CAP_MU_BEAMFORMER = 1 << 19
+VHT_CAP_MU_BEAMFORMEE = 1 << 20
+# bits of the HE PHY capabilities information
+HE_PHY_SU_PPDU_1X_LTF_08US_GI = 14
+HE_PHY_SU_PPDU_4X_LTF_08US_GI = 58
+HE_MAC_CAP_LEN = 6
+HE_PHY_CAP_LEN = 11
+
+ACTION_CATEGORY_VHT = 21
+VHT_ACTION_GROUP_ID_MANAGEMENT = 1
+GROUP_ID_MANAGEMENT_LEN = 8 + 16
+
+
+class Frame:
+    """
+    One captured 802.11 frame. Tagged parameters and radiotap HE data are only
+    decoded when a check asks for them.
+    """
+    __slots__ = ("number", "timestamp", "data", "start", "end", "he_data",
+                 "type_subtype", "_tags")
+
+    def __init__(self, number, timestamp, data, start, end, he_data):
+        self.number = number
+        self.timestamp = timestamp
+        self.data = data
+        self.start = start
+        self.end = end
+        self.he_data = he_data
+        self._tags = None
+        self.type_subtype = None
+        if end - start >= 2:
+            fc = data[start]
+            frame_type = (fc >> 2) & 0x3
+            self.type_subtype = (frame_type << 4) | ((fc >> 4) & 0xf)
+
+    def body_offset(self):
+        """ offset of the management frame body, after the header and HT control """
+        offset = self.start + 24
+        if self.data[self.start + 1] & 0x80:
+            offset += 4
+        return offset
+
+    def tags(self):
+        """
+        :return: dict of tag number, or (255, extension id), to the first element body
+        """
+        if self._tags is not None:
+            return self._tags
+        self._tags = {}
+        fixed = FIXED_PARAMS.get(self.type_subtype)
+        if fixed is None:
+            return self._tags
+        offset = self.body_offset() + fixed
+        data = self.data
+        while offset + 2 <= self.end:
+            tag = data[offset]
+            length = data[offset + 1]
+            body = offset + 2
+            if body + length > self.end:
+                break
+            if tag == TAG_EXTENSION and length >= 1:
+                key = (tag, data[body])
+                if key not in self._tags:
+                    self._tags[key] = bytes(data[body + 1:body + length])
+            elif tag not in self._tags:
+                self._tags[tag] = bytes(data[body:body + length])
+            offset = body + length
+        return self._tags
+
+
+class PcapCheck:
+    """
+    A check looks at each frame and keeps the first value it matches.
+    Subclasses implement match(frame), returning None when the frame does not match.
+    """
+
+    def __init__(self, name=None):
+        self.name = name
+
+    def match(self, frame):
+        raise NotImplementedError
+
+
+class VhtCapabilityCheck(PcapCheck):
+    def __init__(self, name=None, subtype=None, bit=None, label=None):
+        super().__init__(name)
+        self.subtype = subtype
+        self.bit = bit
+        self.label = label
+
+    def match(self, frame):
+        if frame.type_subtype != self.subtype:
+            return None
+        body = frame.tags().get(TAG_VHT_CAPABILITIES)
+        if body is None or len(body) < 4:
+            return None
+        if struct.unpack_from("<I", body)[0] & self.bit:
+            return "%s: Supported" % self.label
+        return None
+
+
+class HePhyCapabilityCheck(PcapCheck):
+    """ frames with 4x HE-LTF & 0.8us GI support; reports the bit named by report_bit """
+
+    def __init__(self, name=None, subtype=None, report_bit=HE_PHY_SU_PPDU_4X_LTF_08US_GI):
+        super().__init__(name)
+        self.subtype = subtype
+        self.report_bit = report_bit
+
+    def match(self, frame):
+        if frame.type_subtype != self.subtype:
+            return None
+        body = frame.tags().get((TAG_EXTENSION, EXT_TAG_HE_CAPABILITIES))
+        if body is None or len(body) < HE_MAC_CAP_LEN + HE_PHY_CAP_LEN:
+            return None
+        phy = int.from_bytes(body[HE_MAC_CAP_LEN:HE_MAC_CAP_LEN + HE_PHY_CAP_LEN], "little")
+        if not (phy >> HE_PHY_SU_PPDU_4X_LTF_08US_GI) & 1:
+            return None
+        if (phy >> self.report_bit) & 1:
+            return "HE SU PPDU & HE MU PPDU w 4x HE-LTF & 0.8us GI: Supported"
+        return "HE SU PPDU & HE MU PPDU w 4x HE-LTF & 0.8us GI: Not Supported"
+
+
+class GroupIdManagementCheck(PcapCheck):
+    def match(self, frame):
+        if frame.type_subtype != ACTION:
+            return None
+        offset = frame.body_offset()
+        if offset + 2 + GROUP_ID_MANAGEMENT_LEN > frame.end:
+            return None
+        data = frame.data
+        if data[offset] != ACTION_CATEGORY_VHT or data[offset + 1] != VHT_ACTION_GROUP_ID_MANAGEMENT:
+            return None
+        value = ":".join("%02x" % byte for byte in data[offset + 2:offset + 2 + GROUP_ID_MANAGEMENT_LEN])
+        return "Group ID Management: %s" % value
+
+
+class HeGuardIntervalCheck(PcapCheck):
+    def match(self, frame):
+        if frame.he_data is None:
+            return None
+        data2, data5 = frame.he_data[1], frame.he_data[4]
+        if not data2 & HE_DATA2_GI_KNOWN:
+            return None
+        gi = (data5 & HE_DATA5_GI_MASK) >> 4
+        return "GI: %sus" % HE_GI_US.get(gi, gi)
+
+
+DEFAULT_CHECKS = (
+    GroupIdManagementCheck("group_id_mgmt"),
+    VhtCapabilityCheck("beamformee_association_request", ASSOC_REQUEST, VHT_CAP_MU_BEAMFORMEE, "MU Beamformee Capable"),
+    VhtCapabilityCheck("beamformer_association_response", ASSOC_RESPONSE, VHT_CAP_MU_BEAMFORMER, "MU Beamformer Capable"),
+    VhtCapabilityCheck("beamformer_beacon_frame", BEACON, VHT_CAP_MU_BEAMFORMER, "MU Beamformer Capable"),
+    VhtCapabilityCheck("beamformer_probe_response", PROBE_RESPONSE, VHT_CAP_MU_BEAMFORMER, "MU Beamformer Capable"),
+    HePhyCapabilityCheck("he_capability_beacon_frame", BEACON, HE_PHY_SU_PPDU_1X_LTF_08US_GI),
+    HePhyCapabilityCheck("he_capability_probe_request", PROBE_REQUEST),
+    HePhyCapabilityCheck("he_capability_probe_response", PROBE_RESPONSE, HE_PHY_SU_PPDU_1X_LTF_08US_GI),
+    HePhyCapabilityCheck("he_capability_association_request", ASSOC_REQUEST),
+    HePhyCapabilityCheck("he_capability_association_response", ASSOC_RESPONSE),
+    HeGuardIntervalCheck("he_guard_interval"),
+)
+
+
+def _radiotap(data, start, end):
+    """
+    :return: (offset of the 802.11 frame, end of the 802.11 frame, HE data words or None)
+    """
+    if end - start < 8:
+        return None
+    length = struct.unpack_from("<H", data, start + 2)[0]
+    present = struct.unpack_from("<I", data, start + 4)[0]
+    # skip extended presence bitmaps; the fields they add follow the ones decoded here
+    offset = start + 8
+    word = present
+    while word & 0x80000000 and offset + 4 <= start + length:
+        word = struct.unpack_from("<I", data, offset)[0]
+        offset += 4
+    frame_end = end
+    he_data = None
+    for bit, (align, size) in enumerate(RADIOTAP_FIELDS + ((2, 12),)):
+        if not present & (1 << bit):
+            continue
+        offset = start + ((offset - start + align - 1) & ~(align - 1))
+        if offset + size > start + length:
+            break
+        if bit == RADIOTAP_FLAGS and data[offset] & RADIOTAP_FLAGS_FCS:
+            frame_end -= 4
+        elif bit == RADIOTAP_HE:
+            he_data = struct.unpack_from("<6H", data, offset)
+        offset += size
+    return start + length, frame_end, he_data
+
+
+def _iter_pcap(data, endian, resolution=1e6):
+    linktype = struct.unpack_from(endian + "I", data, 20)[0]
+    offset = 24
+    header = struct.Struct(endian + "IIII")
+    size = len(data)
+    while offset + 16 <= size:
+        sec, frac, caplen, _ = header.unpack_from(data, offset)
+        offset += 16
+        if offset + caplen > size:
+            logger.warning("pcap ends with a partial packet")
+            return
+        yield linktype, sec + frac / resolution, offset, offset + caplen
+        offset += caplen
+
+
+def _iter_pcapng(data):
+    size = len(data)
+    offset = 0
+    endian = "<"
+    linktypes = []
+    while offset + 12 <= size:
+        block_type = struct.unpack_from(endian + "I", data, offset)[0]
+        if block_type == PCAPNG_SHB:
+            # byte order magic decides the endianness of this section
+            endian = "<" if data[offset + 8:offset + 12] == b"\x4d\x3c\x2b\x1a" else ">"
+            linktypes = []
+        block_len = struct.unpack_from(endian + "I", data, offset + 4)[0]
+        if block_len < 12 or offset + block_len > size:
+            logger.warning("pcapng ends with a partial block")
+            return
+        if block_type == PCAPNG_IDB:
+            linktypes.append(struct.unpack_from(endian + "H", data, offset + 8)[0])
+        elif block_type == PCAPNG_EPB:
+            interface, high, low, caplen = struct.unpack_from(endian + "IIII", data, offset + 8)
+            start = offset + 28
+            linktype = linktypes[interface] if interface < len(linktypes) else None
+            # default resolution is microseconds
+            yield linktype, ((high << 32) | low) / 1e6, start, start + caplen
+        elif block_type == PCAPNG_SPB:
+            caplen = block_len - 16
+            yield (linktypes[0] if linktypes else None), None, offset + 12, offset + 12 + caplen
+        offset += block_len
+
+
+def iter_frames(data):
+    """
+    :param data: bytes-like capture, pcap or pcapng
+    :return: generator of Frame
+    """
+    magic = bytes(data[:4])
+    if magic in PCAP_MAGIC:
+        packets = _iter_pcap(data, *PCAP_MAGIC[magic])
+    elif len(data) >= 4 and struct.unpack_from("<I", data)[0] == PCAPNG_SHB:
+        packets = _iter_pcapng(data)
+    else:
+        raise ValueError("not a pcap or pcapng capture")
+    number = 0
+    warned = set()
+    for linktype, timestamp, start, end in packets:
+        number += 1
+        he_data = None
+        if linktype == LINKTYPE_IEEE802_11_RADIOTAP:
+            parsed = _radiotap(data, start, end)
+            if parsed is None:
+                continue
+            start, end, he_data = parsed
+        elif linktype != LINKTYPE_IEEE802_11:
+            if linktype not in warned:
+                logger.warning("skipping packets with unsupported link type %s" % linktype)
+                warned.add(linktype)
+            continue
+        yield Frame(number, timestamp, data, start, end, he_data)
+
+
+class PcapAnalyzer:
+    def __init__(self, checks=DEFAULT_CHECKS):
+        """
+        :param checks: PcapCheck objects to run; results are keyed by their names
+        """
+        self.checks = list(checks)
+        self.frames_read = 0
+
+    def analyze(self, pcap_file=None):
+        """
+        Read the capture once and run every check
+        :param pcap_file: pcap or pcapng file
+        :return: dict of check name to the first matched value, NOT_FOUND if no frame matched
+        """
+        results = {check.name: NOT_FOUND for check in self.checks}
+        pending = list(self.checks)
+        self.frames_read = 0
+        with open(pcap_file, "rb") as file:
+            if file.seek(0, 2) == 0:
+                return results
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for frame in iter_frames(data):
+                    self.frames_read += 1
+                    for check in list(pending):
+                        value = check.match(frame)
+                        if value is not None:
+                            results[check.name] = value
+                            pending.remove(check)
+                    if not pending:
+                        break
+        logger.debug("PcapAnalyzer: read %d frames of %s" % (self.frames_read, pcap_file))
+        return results
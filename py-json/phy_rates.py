@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Theoretical 802.11 PHY data rates from precomputed tables.
+
+Rates for HT (802.11n), VHT (802.11ac), HE (802.11ax) and EHT (802.11be) are
+computed once at import into RATE_TABLE, indexed by
+[mode, mcs, nss - 1, channel width, guard interval]. Combinations the standard
+does not define are NaN. The lookup functions accept scalars or arrays and
+broadcast them against each other, so thousands of stations are rated in one call:
+
+    phy_rates.data_rate_mbps(mode="HE", mcs=[11, 9, 7], nss=2, bw_mhz=80, gi_ns=800)
+    -> array([1200.98, 960.78, 720.59])
+
+HT MCS values 0-31 are accepted; the per-stream MCS is mcs % 8 and the caller
+passes the stream count as usual. HT 80 and 160 MHz are filled in with the VHT
+values so probe results reported at those widths still get a rate.
+"""
+import numpy as np
+
+MODES = ("HT", "VHT", "HE", "EHT")
+BANDWIDTHS_MHZ = (20, 40, 80, 160, 320)
+GUARD_INTERVALS_NS = (400, 800, 1600, 3200)
+MAX_NSS = 16
+
+# per MCS: coded bits per subcarrier, coding rate
+BITS_PER_SUBCARRIER = np.array([1, 2, 2, 4, 4, 6, 6, 6, 8, 8, 10, 10, 12, 12], dtype=float)
+CODING_RATE = np.array([1 / 2, 1 / 2, 3 / 4, 1 / 2, 3 / 4, 2 / 3, 3 / 4, 5 / 6,
+                        3 / 4, 5 / 6, 3 / 4, 5 / 6, 3 / 4, 5 / 6])
+# the coding rates as whole numbers, numerator and denominator, for exact bit counts
+CODING_RATE_NUMERATOR = np.array([1, 1, 3, 1, 3, 2, 3, 5, 3, 5, 3, 5, 3, 5])
+CODING_RATE_DENOMINATOR = np.array([2, 2, 4, 2, 4, 3, 4, 6, 4, 6, 4, 6, 4, 6])
+MAX_MCS = {"HT": 7, "VHT": 9, "HE": 11, "EHT": 13}
+MAX_STREAMS = {"HT": 4, "VHT": 8, "HE": 8, "EHT": 16}
+
+# data subcarriers per channel width, 0 where the mode has no such width
+DATA_SUBCARRIERS = {
+    "HT": (52, 108, 234, 468, 0),
+    "VHT": (52, 108, 234, 468, 0),
+    "HE": (234, 468, 980, 1960, 0),
+    "EHT": (234, 468, 980, 1960, 3920),
+}
+# VHT MCS, channel width and stream counts the standard does not define
+VHT_EXCLUDED = (
+    (9, 20, (1, 2, 4, 5, 7, 8)),
+    (6, 80, (3, 7)),
+    (9, 80, (6,)),
+    (9, 160, (3,)),
+)
+# OFDM symbol length without guard interval, in seconds
+SYMBOL_SEC = {"HT": 3.2e-6, "VHT": 3.2e-6, "HE": 12.8e-6, "EHT": 12.8e-6}
+MODE_GUARD_INTERVALS_NS = {
+    "HT": (400, 800),
+    "VHT": (400, 800),
+    "HE": (800, 1600, 3200),
+    "EHT": (800, 1600, 3200),
+}
+
+
+def _build_tables():
+    n_mcs = len(BITS_PER_SUBCARRIER)
+    ndbps = np.full((len(MODES), n_mcs, len(BANDWIDTHS_MHZ)), np.nan)
+    rates = np.full((len(MODES), n_mcs, MAX_NSS, len(BANDWIDTHS_MHZ), len(GUARD_INTERVALS_NS)), np.nan)
+    bits_per_symbol = BITS_PER_SUBCARRIER * CODING_RATE
+    nss = np.arange(1, MAX_NSS + 1, dtype=float)
+    for mode_index, mode in enumerate(MODES):
+        n_sd = np.array(DATA_SUBCARRIERS[mode], dtype=float)
+        n_sd[n_sd == 0] = np.nan
+        valid_mcs = slice(0, MAX_MCS[mode] + 1)
+        # [mcs, bw] data bits per symbol per spatial stream
+        ndbps[mode_index, valid_mcs, :] = np.outer(bits_per_symbol[valid_mcs], n_sd)
+        for gi_ns in MODE_GUARD_INTERVALS_NS[mode]:
+            gi_index = GUARD_INTERVALS_NS.index(gi_ns)
+            symbol_sec = SYMBOL_SEC[mode] + gi_ns * 1e-9
+            per_stream = ndbps[mode_index] / symbol_sec / 1e6
+            rates[mode_index, :, :MAX_STREAMS[mode], :, gi_index] = \
+                per_stream[:, None, :] * nss[None, :MAX_STREAMS[mode], None]
+    vht_index = MODES.index("VHT")
+    for mcs, bw_mhz, streams in VHT_EXCLUDED:
+        rates[vht_index, mcs, np.array(streams) - 1, BANDWIDTHS_MHZ.index(bw_mhz), :] = np.nan
+    return ndbps, rates
+
+
+NDBPS_TABLE, RATE_TABLE = _build_tables()
+# [mode, channel width] data subcarriers, 0 where the mode has no such width
+DATA_SUBCARRIER_TABLE = np.array([DATA_SUBCARRIERS[mode] for mode in MODES])
+
+_MODE_INDEX = {mode: index for index, mode in enumerate(MODES)}
+_BW_INDEX = {bw: index for index, bw in enumerate(BANDWIDTHS_MHZ)}
+_GI_INDEX = {gi: index for index, gi in enumerate(GUARD_INTERVALS_NS)}
+
+
+def _lookup(values, index_map):
+    """ map each value to its table index, -1 where it has none """
+    values = np.asarray(values)
+    flat = [index_map.get(value, -1) for value in values.ravel().tolist()]
+    return np.array(flat, dtype=int).reshape(values.shape)
+
+
+def _indexes(mode, mcs, bw_mhz, nss=None, gi_ns=None):
+    mode_index = _lookup(np.char.upper(np.asarray(mode, dtype=str)), _MODE_INDEX)
+    mcs = np.asarray(mcs, dtype=int)
+    # HT MCS 8-31 are MCS 0-7 on more spatial streams
+    mcs = np.where(mode_index == _MODE_INDEX["HT"], mcs % 8, mcs)
+    bw_index = _lookup(np.asarray(bw_mhz, dtype=int), _BW_INDEX)
+    indexes = [mode_index, mcs, bw_index]
+    if nss is not None:
+        indexes.append(np.asarray(nss, dtype=int) - 1)
+    if gi_ns is not None:
+        indexes.append(_lookup(np.asarray(gi_ns, dtype=int), _GI_INDEX))
+    indexes = np.broadcast_arrays(*indexes)
+    invalid = (indexes[0] < 0) | (indexes[1] < 0) | (indexes[1] >= len(BITS_PER_SUBCARRIER)) | (indexes[2] < 0)
+    if nss is not None:
+        invalid |= (indexes[3] < 0) | (indexes[3] >= MAX_NSS)
+    if gi_ns is not None:
+        invalid |= indexes[4] < 0
+    # point invalid entries at index 0 for the gather, then blank them
+    indexes = [np.where(invalid, 0, index) for index in indexes]
+    return indexes, invalid
+
+
+def data_bits_per_symbol(mode="HT", mcs=0, bw_mhz=20, nss=None):
+    """
+    :param mode: 'HT', 'VHT', 'HE' or 'EHT'
+    :param mcs: MCS index
+    :param bw_mhz: channel width
+    :param nss: number of spatial streams, None for one stream
+    :return: data bits per OFDM symbol for one spatial stream, or the whole number of bits of
+             nss streams; NaN where undefined
+    """
+    if nss is None:
+        (mode_index, mcs_index, bw_index), invalid = _indexes(mode, mcs, bw_mhz)
+        result = NDBPS_TABLE[mode_index, mcs_index, bw_index]
+        return np.where(invalid, np.nan, result)
+    (mode_index, mcs_index, bw_index, nss_index), invalid = _indexes(mode, mcs, bw_mhz, nss=nss)
+    invalid = invalid | np.all(np.isnan(RATE_TABLE[mode_index, mcs_index, nss_index, bw_index]), axis=-1)
+    coded_bits = DATA_SUBCARRIER_TABLE[mode_index, bw_index] * BITS_PER_SUBCARRIER[mcs_index].astype(int) \
+        * (nss_index + 1)
+    result = coded_bits * CODING_RATE_NUMERATOR[mcs_index] // CODING_RATE_DENOMINATOR[mcs_index]
+    return np.where(invalid, np.nan, result)
+
+
+def data_rate_mbps(mode="HT", mcs=0, nss=1, bw_mhz=20, gi_ns=800):
+    """
+    :param mode: 'HT', 'VHT', 'HE' or 'EHT'
+    :param mcs: MCS index
+    :param nss: number of spatial streams
+    :param bw_mhz: channel width: 20, 40, 80, 160 or 320
+    :param gi_ns: guard interval: 400 or 800 for HT/VHT; 800, 1600 or 3200 for HE/EHT
+    :return: PHY data rate in Mbps, NaN where the combination is undefined
+    """
+    (mode_index, mcs_index, bw_index, nss_index, gi_index), invalid = \
+        _indexes(mode, mcs, bw_mhz, nss=nss, gi_ns=gi_ns)
+    result = RATE_TABLE[mode_index, mcs_index, nss_index, bw_index, gi_index]
+    return np.where(invalid, np.nan, result)
+
+
+def match_guard_interval(mode="HT", mcs=0, nss=1, bw_mhz=20, reported_mbps=None):
+    """
+    Find the guard interval whose theoretical rate is closest to the reported rate.
+    :param reported_mbps: rate the driver reported, like the 'tx bitrate' of a probe
+    :return: dict of arrays: 'gi_ns' and 'mbps' for the closest guard interval,
+             'short_mbps' and 'long_mbps' for the shortest and longest guard interval of the mode
+    """
+    (mode_index, mcs_index, bw_index, nss_index), invalid = _indexes(mode, mcs, bw_mhz, nss=nss)
+    # [..., gi]
+    candidates = RATE_TABLE[mode_index, mcs_index, nss_index, bw_index, :]
+    candidates = np.where(invalid[..., None], np.nan, candidates)
+    reported = np.broadcast_to(np.asarray(reported_mbps, dtype=float), invalid.shape)
+    distance = np.abs(candidates - reported[..., None])
+    all_nan = np.all(np.isnan(candidates), axis=-1)
+    closest = np.argmin(np.where(np.isnan(distance), np.inf, distance), axis=-1)
+    gi_values = np.array(GUARD_INTERVALS_NS, dtype=float)
+    mbps = np.take_along_axis(candidates, closest[..., None], axis=-1)[..., 0]
+    with np.errstate(all='ignore'):
+        short_mbps = np.nanmax(np.where(all_nan[..., None], 0, candidates), axis=-1)
+        long_mbps = np.nanmin(np.where(all_nan[..., None], 0, candidates), axis=-1)
+    return {
+        "gi_ns": np.where(all_nan, np.nan, gi_values[closest]),
+        "mbps": np.where(all_nan, np.nan, mbps),
+        "short_mbps": np.where(all_nan, np.nan, short_mbps),
+        "long_mbps": np.where(all_nan, np.nan, long_mbps),
+    }
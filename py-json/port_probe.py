@@ -10,11 +10,17 @@ import sys
 import os
 from pprint import pformat
 import logging
-import traceback
+import numpy
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../")))
 lfcli_base = importlib.import_module("py-json.LANforge.lfcli_base")
 LFCliBase = lfcli_base.LFCliBase
+phy_rates = importlib.import_module("py-json.phy_rates")
+probe_results = importlib.import_module("py-json.probe_results")
+parse_probe_results = probe_results.parse_probe_results
 logger = logging.getLogger(__name__)
 
 
@@ -30,7 +36,12 @@ class ProbePort(LFCliBase):
         hunks = eid_str.split(".")
         self.eid_str = eid_str
         self.probepath = "/probe/1/%s/%s" % (hunks[-2], hunks[-1])
+        self.reset_results()
+
+    def reset_results(self):
+        """ clear values parsed from the previous probe """
         self.response = None
+        self.sample = None
         self.signals = None
         self.ofdma = False
 
@@ -59,115 +70,53 @@ class ProbePort(LFCliBase):
         self.data_rate = None
 
     def refreshProbe(self):
-        self.json_post(self.probepath, {})
+        self.requestProbe()
         sleep(0.2)
-        response = self.json_get(self.probepath)
+        return self.readProbe()
+
+    def requestProbe(self):
+        """ ask the GUI to probe the port; results are ready a short time later """
+        self.json_post(self.probepath, {})
+
+    def readProbe(self):
+        """ fetch the results of the last requestProbe() and parse them """
+        return self.parseProbe(self.json_get(self.probepath))
+
+    def parseProbe(self, response=None):
+        self.reset_results()
         self.response = response
+        if not response or 'probe-results' not in response:
+            logger.warning("No probe results for {eid}".format(eid=self.eid_str))
+            return False
         if self.debug:
             logger.debug("probepath (eid): {probepath}".format(probepath=self.probepath))
             logger.debug(pformat("Probe response: {response}".format(response=self.response)))
-        text = self.response['probe-results'][0][self.eid_str]['probe results'].split('\n')
-        signals = [x.strip('\t').split(':') for x in text if 'signal' in x]
-        updated_s = [[sublist[0], sublist[1].replace('\t', '')] for sublist in signals]
-        keys = [x[0].strip(' ').strip(':') for x in updated_s]
-        values = [x[1].strip('dBm').strip(' ') for x in updated_s]
-        if self.debug:
-            logger.debug("signals keys: {keys}".format(keys=keys))
-            logger.debug("signals values: {values}".format(values=values))
-        self.signals = dict(zip(keys, values))
-        logger.debug(self.signals)
-
         try:
-            tx_bitrate = [x for x in text if 'tx bitrate' in x][0].replace('\t', ' ')
-            # if 'HE' in tx_bitrate:
-            #    logger.info("HE not supported ")
-            logger.debug("tx_bitrate {tx_bitrate}".format(tx_bitrate=tx_bitrate))
-            self.tx_bitrate = tx_bitrate.split(':')[-1].strip(' ')
-            if 'MHz' in tx_bitrate:
-                self.tx_mhz = [x.strip('\t') for x in text if 'tx bitrate' in x][0].split('MHz')[0].rsplit(' ')[-1].strip(
-                    ' ')
-                logger.debug("tx_mhz {tx_mhz}".format(tx_mhz=self.tx_mhz))
-            else:
-                self.tx_mhz = 20
-                logger.debug("HT: tx_mhz {tx_mhz}".format(tx_mhz=self.tx_mhz))
-            tx_mcs = [x.strip('\t') for x in text if 'tx bitrate' in x][0].split(':')[1].strip('\t')
-            if 'MCS' in tx_mcs:
-                self.tx_mcs = int(tx_mcs.split('MCS')[1].strip(' ').split(' ')[0])
-                logger.debug("self.tx_mcs {tx_mcs}".format(tx_mcs=self.tx_mcs))
-                if 'NSS' in text:
-                    self.tx_nss = [x.strip('\t') for x in text if 'tx bitrate' in x][0].split('NSS')[1].strip(' ')
-                else:
-                    # nss is not present need to derive from MCS for HT
-                    if 0 <= self.tx_mcs <= 7:
-                        self.tx_nss = 1
-                    elif 8 <= self.tx_mcs <= 15:
-                        self.tx_nss = 2
-                    elif 16 <= self.tx_mcs <= 23:
-                        self.tx_nss = 3
-                    elif 24 <= self.tx_mcs <= 31:
-                        self.tx_nss = 4
-                logger.debug("tx_nss {tx_nss}".format(tx_nss=self.tx_nss))
-                self.tx_mbit = float(self.tx_bitrate.split(' ')[0])
-                logger.debug("tx_mbit {tx_mbit}".format(tx_mbit=self.tx_mbit))
-                if 'HE' in tx_bitrate:
-                    self.calculated_data_rate_tx_HE()
-                elif 'VHT' in tx_bitrate:
-                    self.calculated_data_rate_tx_VHT()
-                else:
-                    self.calculated_data_rate_tx_HT()
-            else:
-                logger.debug("No tx MCS value:{tx_bitrate}".format(tx_bitrate=tx_bitrate))
-
-            rx_bitrate = [x for x in text if 'rx bitrate' in x][0].replace('\t', ' ')
-            logger.debug("rx_bitrate {rx_bitrate}".format(rx_bitrate=rx_bitrate))
-            self.rx_bitrate = rx_bitrate.split(':')[-1].strip(' ')
-            logger.debug("self.rx_bitrate {rx_bitrate}".format(rx_bitrate=self.rx_bitrate))
-            # rx will received : 6Mbps encoding is legacy frame
-            # for 24g - MHz is 20
-            # try:
-            if 'MHz' in rx_bitrate:
-                self.rx_mhz = [x.strip('\t') for x in text if 'rx bitrate' in x][0].split('MHz')[0].rsplit(' ')[
-                    -1].strip(' ')
-                logger.debug("rx_mhz {rx_mhz}".format(rx_mhz=self.rx_mhz))
-            else:
-                self.rx_mhz = 20
-
-            rx_mcs = [x.strip('\t') for x in text if 'rx bitrate' in x][0].split(':')[1].strip('\t')
-            # MCS is not in the 6.0MBit/s frame
-            if 'MCS' in rx_mcs:
-                self.rx_mcs = int(rx_mcs.split('MCS')[1].strip(' ').split(' ')[0])
-                logger.debug("self.rx_mcs {rx_mcs}".format(rx_mcs=self.rx_mcs))
-                if 'NSS' in text:
-                    self.rx_nss = [x.strip('\t') for x in text if 'rx bitrate' in x][0].split('NSS')[1].strip(' ')
-                else:
-                    # nss is not present need to derive from MCS for HT
-                    if 0 <= self.rx_mcs <= 7:
-                        self.rx_nss = 1
-                    elif 8 <= self.rx_mcs <= 15:
-                        self.rx_nss = 2
-                    elif 16 <= self.rx_mcs <= 23:
-                        self.rx_nss = 3
-                    elif 24 <= self.rx_mcs <= 31:
-                        self.rx_nss = 4
-
-                self.rx_mbit = self.rx_bitrate.split(' ')[0]
-                logger.debug("rx_nss {rx_nss}".format(rx_nss=self.rx_nss))
-                self.rx_mbit = float(self.rx_bitrate.split(' ')[0])
-                logger.debug("rx_mbit {rx_mbit}".format(rx_mbit=self.rx_mbit))
-                if 'HE' in rx_bitrate:
-                    self.calculated_data_rate_rx_HE()
-                elif 'VHT' in rx_bitrate:
-                    self.calculated_data_rate_rx_VHT()
-                else:
-                    self.calculated_data_rate_rx_HT()
-            else:
-                logger.debug("No rx MCS value:{rx_bitrate}".format(rx_bitrate=rx_bitrate))
-            return True
-        except Exception as x:
-            logger.warning("Probe response list was empty.")
-            traceback.print_exception(Exception, x, x.__traceback__, chain=True)
+            text = self.response['probe-results'][0][self.eid_str]['probe results']
+        except (KeyError, IndexError, TypeError) as x:
+            logger.warning("Probe response for {eid} has no probe results: {x}".format(eid=self.eid_str, x=x))
+            return False
+        sample = parse_probe_results(text, eid=self.eid_str)
+        self.sample = sample
+        self.signals = sample.signals
+        logger.debug(self.signals)
+        if sample.tx_bitrate is None or sample.rx_bitrate is None:
+            logger.warning("Probe results for {eid} have no tx/rx bitrate".format(eid=self.eid_str))
             return False
 
+        for direction in ('tx', 'rx'):
+            for field in ('bitrate', 'mbit', 'mcs', 'nss', 'mhz'):
+                setattr(self, direction + '_' + field, getattr(sample, direction + '_' + field))
+            mode = getattr(sample, direction + '_mode')
+            logger.debug("{direction} bitrate {bitrate} mode {mode}".format(
+                direction=direction, bitrate=getattr(sample, direction + '_bitrate'), mode=mode))
+            if mode == 'legacy':
+                # legacy frames, like the 6.0 MBit/s rx rate, have no MCS
+                logger.debug("No {direction} MCS value".format(direction=direction))
+            elif getattr(sample, direction + '_mbit') is not None:
+                self.calculated_data_rate(direction, mode)
+        return True
+
     def getSignalAvgCombined(self):
         return self.signals['signal avg'].split(' ')[0]
 
@@ -183,537 +132,210 @@ class ProbePort(LFCliBase):
     def getBeaconSignalAvg(self):
         return ' '.join(self.signals['beacon signal avg']).replace(' ', '')
 
+    def calculated_data_rate(self, direction='tx', mode='HT'):
+        """
+        Fill in the theoretical rate for the shortest and longest guard interval of
+        the mode, and the guard interval whose rate is closest to the reported rate.
+        :param direction: 'tx' or 'rx'
+        :param mode: 'HT', 'VHT', 'HE' or 'EHT'
+        """
+        mhz = getattr(self, direction + '_mhz')
+        try:
+            bw = int(mhz)
+        except (TypeError, ValueError):
+            bw = 0
+        if bw not in phy_rates.BANDWIDTHS_MHZ:
+            logger.debug("{direction} bw {mhz} cannot be read, assumed to be 20".format(direction=direction, mhz=mhz))
+            bw = 20
+            setattr(self, direction + '_mhz', 20)
+        mcs = getattr(self, direction + '_mcs')
+        nss = getattr(self, direction + '_nss')
+        mbit = getattr(self, direction + '_mbit')
+        if mcs is None or nss is None:
+            return
+        nss = int(nss)
+        rates = phy_rates.match_guard_interval(mode=mode, mcs=mcs, nss=nss, bw_mhz=bw, reported_mbps=mbit)
+        if numpy.isnan(rates["mbps"]):
+            logger.debug("{direction}: no {mode} rate for mcs {mcs} nss {nss} bw {bw}".format(
+                direction=direction, mode=mode, mcs=mcs, nss=nss, bw=bw))
+            return
+        setattr(self, direction + '_data_rate_gi_short_Mbps', float(rates["short_mbps"]))
+        setattr(self, direction + '_data_rate_gi_long_Mbps', float(rates["long_mbps"]))
+        setattr(self, direction + '_mbit_calc', float(rates["mbps"]))
+        setattr(self, direction + '_gi', float(rates["gi_ns"]) * 10 ** -9)
+        logger.debug("{direction}: {mode} mcs {mcs} nss {nss} bw {bw} reported {mbit} calc {calc} Mbps gi {gi} ns".format(
+            direction=direction, mode=mode, mcs=mcs, nss=nss, bw=bw, mbit=mbit,
+            calc=float(rates["mbps"]), gi=float(rates["gi_ns"])))
+
     def calculated_data_rate_tx_HT(self):
-        logger.info("calculated_data_rate_tx_HT")
-        # TODO compare with standard for 40 MHz if values change
-        N_sd = 0  # Number of Data Subcarriers based on modulation and bandwith
-        N_bpscs = 0  # Number of coded bits per Subcarrier(Determined by the modulation, MCS)
-        R = 0  # coding ,  (Determined by the modulation, MCS )
-        N_ss = 0  # Number of Spatial Streams
-        T_dft = 3.2 * 10 ** -6  # Constant for HT
-        T_gi_short = .4 * 10 ** -6  # Guard index.
-        T_gi_long = .8 * 10 ** -6  # Guard index.
-        bw = 20
-        # Note the T_gi is not exactly know so need to calculate bothh with .4 and .8
-        # the nubmer of Data Subcarriers is based on modulation and bandwith
-        bw = int(self.tx_mhz)
-        logger.info("Mhz {Mhz}".format(Mhz=self.tx_mhz))
-        if bw == 20:
-            N_sd = 52
-        elif bw == 40:
-            N_sd = 108
-        elif bw == 80:
-            N_sd = 234
-        elif bw == 160:
-            N_sd = 468
-        else:
-            logger.info("For HT if cannot be read bw is assumed to be 20")
-            N_sd = 52
-            self.tx_mhz = 20
-
-        # NSS
-        N_ss = self.tx_nss
-        # MCS (Modulation Coding Scheme) determines the constands
-        # MCS 0 == Modulation BPSK R = 1/2 ,  N_bpscs = 1,
-        # Only for HT configuration
-        if self.tx_mcs == 0 or self.tx_mcs == 8 or self.tx_mcs == 16 or self.tx_mcs == 24:
-            R = 1 / 2
-            N_bpscs = 1
-        # MCS 1 == Modulation QPSK R = 1/2 , N_bpscs = 2
-        elif self.tx_mcs == 1 or self.tx_mcs == 9 or self.tx_mcs == 17 or self.tx_mcs == 25:
-            R = 1 / 2
-            N_bpscs = 2
-        # MCS 2 == Modulation QPSK R = 3/4 , N_bpscs = 2
-        elif self.tx_mcs == 2 or self.tx_mcs == 10 or self.tx_mcs == 18 or self.tx_mcs == 26:
-            R = 3 / 4
-            N_bpscs = 2
-        # MCS 3 == Modulation 16-QAM R = 1/2 , N_bpscs = 4
-        elif self.tx_mcs == 3 or self.tx_mcs == 11 or self.tx_mcs == 19 or self.tx_mcs == 27:
-            R = 1 / 2
-            N_bpscs = 4
-        # MCS 4 == Modulation 16-QAM R = 3/4 , N_bpscs = 4
-        elif self.tx_mcs == 4 or self.tx_mcs == 12 or self.tx_mcs == 20 or self.tx_mcs == 28:
-            R = 3 / 4
-            N_bpscs = 4
-        # MCS 5 == Modulation 64-QAM R = 2/3 , N_bpscs = 6
-        elif self.tx_mcs == 5 or self.tx_mcs == 13 or self.tx_mcs == 21 or self.tx_mcs == 29:
-            R = 2 / 3
-            N_bpscs = 6
-        # MCS 6 == Modulation 64-QAM R = 3/4 , N_bpscs = 6
-        elif self.tx_mcs == 6 or self.tx_mcs == 14 or self.tx_mcs == 22 or self.tx_mcs == 30:
-            R = 3 / 4
-            N_bpscs = 6
-        # MCS 7 == Modulation 64-QAM R = 5/6 , N_bpscs = 6
-        elif self.tx_mcs == 7 or self.tx_mcs == 15 or self.tx_mcs == 23 or self.tx_mcs == 31:
-            R = 5 / 6
-            N_bpscs = 6
-
-        logger.debug(
-            "tx: mcs {mcs} N_sd {N_sd} N_bpscs {N_bpscs} R {R} N_ss {N_ss}  T_dft {T_dft} T_gi_short {T_gi_short}".format(
-                mcs=self.tx_mcs, N_sd=N_sd, N_bpscs=N_bpscs, R=R, N_ss=N_ss, T_dft=T_dft, T_gi_short=T_gi_short))
-
-        self.tx_data_rate_gi_short_Mbps = ((N_sd * N_bpscs * R * float(N_ss)) / (T_dft + T_gi_short)) / 1000000
-        logger.debug("tx_data_rate gi_short {data_rate} Mbit/s".format(data_rate=self.tx_data_rate_gi_short_Mbps))
-
-        logger.debug(
-            "tx: mcs {mcs} N_sd {N_sd} N_bpscs {N_bpscs} R {R} N_ss {N_ss}  T_dft {T_dft} T_gi_long {T_gi_long}".format(
-                mcs=self.tx_mcs, N_sd=N_sd, N_bpscs=N_bpscs, R=R, N_ss=N_ss, T_dft=T_dft, T_gi_long=T_gi_long))
-
-        self.tx_data_rate_gi_long_Mbps = ((N_sd * N_bpscs * R * float(N_ss)) / (T_dft + T_gi_long)) / 1000000
-        logger.info("data_rate gi_long {data_rate} Mbps".format(data_rate=self.tx_data_rate_gi_long_Mbps))
-
-        if abs(self.tx_mbit - self.tx_data_rate_gi_short_Mbps) <= abs(self.tx_mbit - self.tx_data_rate_gi_long_Mbps):
-            self.tx_mbit_calc = self.tx_data_rate_gi_short_Mbps
-            self.tx_gi = T_gi_short
-        else:
-            self.tx_mbit_calc = self.tx_data_rate_gi_long_Mbps
-            self.tx_gi = T_gi_long
+        self.calculated_data_rate('tx', 'HT')
 
     def calculated_data_rate_rx_HT(self):
-        logger.info("calculated_data_rate_rx_HT")
-        N_sd = 0  # Number of Data Subcarriers based on modulation and bandwith
-        N_bpscs = 0  # Number of coded bits per Subcarrier(Determined by the modulation, MCS)
-        R = 0  # coding ,  (Determined by the modulation, MCS )
-        N_ss = 0  # Number of Spatial Streams
-        T_dft = 3.2 * 10 ** -6  # Constant for HT
-        T_gi_short = .4 * 10 ** -6  # Guard index.
-        T_gi_long = .8 * 10 ** -6  # Guard index.
-        bw = 20
-        # Note the T_gi is not exactly know so need to calculate bothh with .4 and .8
-        # the nubmer of Data Subcarriers is based on modulation and bandwith
-
-        bw = int(self.rx_mhz)
-        logger.info("Mhz {Mhz}".format(Mhz=self.rx_mhz))
-        if bw == 20:
-            N_sd = 52
-        elif bw == 40:
-            N_sd = 108
-        elif bw == 80:
-            N_sd = 234
-        elif bw == 160:
-            N_sd = 468
-        else:
-            logger.info("For HT if cannot be read bw is assumed to be 20")
-            N_sd = 52
-            self.rx_mhz = 20
-        # NSS
-        N_ss = self.rx_nss
-        # MCS (Modulation Coding Scheme) determines the constands
-        # MCS 0 == Modulation BPSK R = 1/2 ,  N_bpscs = 1,
-        # Only for HT configuration
-        if self.rx_mcs == 0 or self.rx_mcs == 8 or self.rx_mcs == 16 or self.rx_mcs == 24:
-            R = 1 / 2
-            N_bpscs = 1
-        # MCS 1 == Modulation QPSK R = 1/2 , N_bpscs = 2
-        elif self.rx_mcs == 1 or self.rx_mcs == 9 or self.rx_mcs == 17 or self.rx_mcs == 25:
-            R = 1 / 2
-            N_bpscs = 2
-        # MCS 2 == Modulation QPSK R = 3/4 , N_bpscs = 2
-        elif self.rx_mcs == 2 or self.rx_mcs == 10 or self.rx_mcs == 18 or self.rx_mcs == 26:
-            R = 3 / 4
-            N_bpscs = 2
-        # MCS 3 == Modulation 16-QAM R = 1/2 , N_bpscs = 4
-        elif self.rx_mcs == 3 or self.rx_mcs == 11 or self.rx_mcs == 19 or self.rx_mcs == 27:
-            R = 1 / 2
-            N_bpscs = 4
-        # MCS 4 == Modulation 16-QAM R = 3/4 , N_bpscs = 4
-        elif self.rx_mcs == 4 or self.rx_mcs == 12 or self.rx_mcs == 20 or self.rx_mcs == 28:
-            R = 3 / 4
-            N_bpscs = 4
-        # MCS 5 == Modulation 64-QAM R = 2/3 , N_bpscs = 6
-        elif self.rx_mcs == 5 or self.rx_mcs == 13 or self.rx_mcs == 21 or self.rx_mcs == 29:
-            R = 2 / 3
-            N_bpscs = 6
-        # MCS 6 == Modulation 64-QAM R = 3/4 , N_bpscs = 6
-        elif self.rx_mcs == 6 or self.rx_mcs == 14 or self.rx_mcs == 22 or self.rx_mcs == 30:
-            R = 3 / 4
-            N_bpscs = 6
-        # MCS 7 == Modulation 64-QAM R = 5/6 , N_bpscs = 6
-        elif self.rx_mcs == 7 or self.rx_mcs == 15 or self.rx_mcs == 23 or self.rx_mcs == 31:
-            R = 5 / 6
-            N_bpscs = 6
-        logger.debug(
-            "mcs {mcs} N_sd {N_sd} N_bpscs {N_bpscs} R {R} N_ss {N_ss}  T_dft {T_dft} T_gi_short {T_gi_short}".format(
-                mcs=self.rx_mcs, N_sd=N_sd, N_bpscs=N_bpscs, R=R, N_ss=N_ss, T_dft=T_dft, T_gi_short=T_gi_short))
-        self.rx_data_rate_gi_short_Mbps = ((N_sd * N_bpscs * R * float(N_ss)) / (T_dft + T_gi_short)) / 1000000
-        logger.debug("rx_data_rate gi_short {data_rate} Mbit/s".format(data_rate=self.rx_data_rate_gi_short_Mbps))
-        logger.debug(
-            "mcs {mcs} N_sd {N_sd} N_bpscs {N_bpscs} R {R} N_ss {N_ss}  T_dft {T_dft} T_gi_long {T_gi_long}".format(
-                mcs=self.rx_mcs, N_sd=N_sd, N_bpscs=N_bpscs, R=R, N_ss=N_ss, T_dft=T_dft, T_gi_long=T_gi_long))
-        self.rx_data_rate_gi_long_Mbps = ((N_sd * N_bpscs * R * float(N_ss)) / (T_dft + T_gi_long)) / 1000000
-        logger.debug("rx_data_rate gi_long {data_rate} Mbps".format(data_rate=self.rx_data_rate_gi_long_Mbps))
-        if abs(self.rx_mbit - self.rx_data_rate_gi_short_Mbps) <= abs(
-                self.rx_mbit - self.rx_data_rate_gi_long_Mbps):
-            self.rx_mbit_calc = self.rx_data_rate_gi_short_Mbps
-            self.rx_gi = T_gi_short
-        else:
-            self.rx_mbit_calc = self.rx_data_rate_gi_long_Mbps
-            self.rx_gi = T_gi_long
+        self.calculated_data_rate('rx', 'HT')
 
     def calculated_data_rate_tx_VHT(self):
-        logger.info("calculated_data_rate_tx_VHT")
-        # TODO compare with standard for 40 MHz if values change
-        N_sd = 0  # Number of Data Subcarriers based on modulation and bandwith
-        N_bpscs = 0  # Number of coded bits per Subcarrier(Determined by the modulation, MCS)
-        R = 0  # coding ,  (Determined by the modulation, MCS )
-        N_ss = 0  # Number of Spatial Streams
-        T_dft = 3.2 * 10 ** -6  # Constant for HT
-        T_gi_short = .4 * 10 ** -6  # Guard index.
-        T_gi_long = .8 * 10 ** -6  # Guard index.
-        bw = 20
-        # Note the T_gi is not exactly know so need to calculate bothh with .4 and .8
-        # the nubmer of Data Subcarriers is based on modulation and bandwith
-        bw = int(self.tx_mhz)
-
-        logger.info("Mhz {Mhz}".format(Mhz=self.tx_mhz))
-        if bw == 20:
-            N_sd = 52
-        elif bw == 40:
-            N_sd = 108
-        elif bw == 80:
-            N_sd = 234
-        elif bw == 160:
-            N_sd = 468
-        else:
-            logger.info("For HT if cannot be read bw is assumed to be 20")
-            N_sd = 52
-            self.tx_mhz = 20
-
-        # NSS
-        N_ss = self.tx_nss
-        # MCS (Modulation Coding Scheme) determines the constands
-        # MCS 0 == Modulation BPSK R = 1/2 ,  N_bpscs = 1,
-        # Only for HT configuration
-        if self.tx_mcs == 0:
-            R = 1 / 2
-            N_bpscs = 1
-        # MCS 1 == Modulation QPSK R = 1/2 , N_bpscs = 2
-        elif self.tx_mcs == 1:
-            R = 1 / 2
-            N_bpscs = 2
-        # MCS 2 == Modulation QPSK R = 3/4 , N_bpscs = 2
-        elif self.tx_mcs == 2:
-            R = 3 / 4
-            N_bpscs = 2
-        # MCS 3 == Modulation 16-QAM R = 1/2 , N_bpscs = 4
-        elif self.tx_mcs == 3:
-            R = 1 / 2
-            N_bpscs = 4
-        # MCS 4 == Modulation 16-QAM R = 3/4 , N_bpscs = 4
-        elif self.tx_mcs == 4:
-            R = 3 / 4
-            N_bpscs = 4
-        # MCS 5 == Modulation 64-QAM R = 2/3 , N_bpscs = 6
-        elif self.tx_mcs == 5:
-            R = 2 / 3
-            N_bpscs = 6
-        # MCS 6 == Modulation 64-QAM R = 3/4 , N_bpscs = 6
-        elif self.tx_mcs == 6:
-            R = 3 / 4
-            N_bpscs = 6
-        # MCS 7 == Modulation 64-QAM R = 5/6 , N_bpscs = 6
-        elif self.tx_mcs == 7:
-            R = 5 / 6
-            N_bpscs = 6
-        # MCS 8 == Modulation 256-QAM R = 3/4 , N_bpscs = 8
-        elif self.tx_mcs == 8:
-            R = 3 / 4
-            N_bpscs = 8
-        # MCS 9 == Modulation 256-QAM R = 5/6 , N_bpscs = 8
-        elif self.tx_mcs == 9:
-            R = 5 / 6
-            N_bpscs = 8
-
-        logger.debug(
-            "tx: mcs {mcs} N_sd {N_sd} N_bpscs {N_bpscs} R {R} N_ss {N_ss}  T_dft {T_dft} T_gi_short {T_gi_short}".format(
-                mcs=self.tx_mcs, N_sd=N_sd, N_bpscs=N_bpscs, R=R, N_ss=N_ss, T_dft=T_dft, T_gi_short=T_gi_short))
-
-        self.tx_data_rate_gi_short_Mbps = ((N_sd * N_bpscs * R * float(N_ss)) / (T_dft + T_gi_short)) / 1000000
-        logger.debug("tx_data_rate gi_short {data_rate} Mbit/s".format(data_rate=self.tx_data_rate_gi_short_Mbps))
-
-        logger.debug(
-            "tx: mcs {mcs} N_sd {N_sd} N_bpscs {N_bpscs} R {R} N_ss {N_ss}  T_dft {T_dft} T_gi_long {T_gi_long}".format(
-                mcs=self.tx_mcs, N_sd=N_sd, N_bpscs=N_bpscs, R=R, N_ss=N_ss, T_dft=T_dft, T_gi_long=T_gi_long))
-
-        self.tx_data_rate_gi_long_Mbps = ((N_sd * N_bpscs * R * float(N_ss)) / (T_dft + T_gi_long)) / 1000000
-        logger.debug("data_rate gi_long {data_rate} Mbps".format(data_rate=self.tx_data_rate_gi_long_Mbps))
-
-        if abs(self.tx_mbit - self.tx_data_rate_gi_short_Mbps) <= abs(self.tx_mbit - self.tx_data_rate_gi_long_Mbps):
-            self.tx_mbit_calc = self.tx_data_rate_gi_short_Mbps
-            self.tx_gi = T_gi_short
-        else:
-            self.tx_mbit_calc = self.tx_data_rate_gi_long_Mbps
-            self.tx_gi = T_gi_long
+        self.calculated_data_rate('tx', 'VHT')
 
     def calculated_data_rate_rx_VHT(self):
-        logger.info("calculated_data_rate_rx_VHT")
-        N_sd = 0  # Number of Data Subcarriers based on modulation and bandwith
-        N_bpscs = 0  # Number of coded bits per Subcarrier(Determined by the modulation, MCS)
-        R = 0  # coding ,  (Determined by the modulation, MCS )
-        N_ss = 0  # Number of Spatial Streams
-        T_dft = 3.2 * 10 ** -6  # Constant for HT
-        T_gi_short = .4 * 10 ** -6  # Guard index.
-        T_gi_long = .8 * 10 ** -6  # Guard index.
-        # Note the T_gi is not exactly know so need to calculate bothh with .4 and .8
-        # the nubmer of Data Subcarriers is based on modulation and bandwith
-        bw = int(self.rx_mhz)
-        logger.info("Mhz {Mhz}".format(Mhz=self.rx_mhz))
-        if bw == 20:
-            N_sd = 52
-        elif bw == 40:
-            N_sd = 108
-        elif bw == 80:
-            N_sd = 234
-        elif bw == 160:
-            N_sd = 468
-        else:
-            logger.info("For HT if cannot be read bw is assumed to be 20")
-            N_sd = 52
-            self.rx_mhz = 20
-        # NSS
-        N_ss = self.rx_nss
-        # MCS (Modulation Coding Scheme) determines the constands
-        # MCS 0 == Modulation BPSK R = 1/2 ,  N_bpscs = 1,
-        # Only for HT configuration
-        if self.rx_mcs == 0:
-            R = 1 / 2
-            N_bpscs = 1
-        # MCS 1 == Modulation QPSK R = 1/2 , N_bpscs = 2
-        elif self.rx_mcs == 1:
-            R = 1 / 2
-            N_bpscs = 2
-        # MCS 2 == Modulation QPSK R = 3/4 , N_bpscs = 2
-        elif self.rx_mcs == 2:
-            R = 3 / 4
-            N_bpscs = 2
-        # MCS 3 == Modulation 16-QAM R = 1/2 , N_bpscs = 4
-        elif self.rx_mcs == 3:
-            R = 1 / 2
-            N_bpscs = 4
-        # MCS 4 == Modulation 16-QAM R = 3/4 , N_bpscs = 4
-        elif self.rx_mcs == 4:
-            R = 3 / 4
-            N_bpscs = 4
-        # MCS 5 == Modulation 64-QAM R = 2/3 , N_bpscs = 6
-        elif self.rx_mcs == 5:
-            R = 2 / 3
-            N_bpscs = 6
-        # MCS 6 == Modulation 64-QAM R = 3/4 , N_bpscs = 6
-        elif self.rx_mcs == 6:
-            R = 3 / 4
-            N_bpscs = 6
-        # MCS 7 == Modulation 64-QAM R = 5/6 , N_bpscs = 6
-        elif self.rx_mcs == 7:
-            R = 5 / 6
-            N_bpscs = 6
-        # MCS 8 == Modulation 256-QAM R = 3/4 , N_bpscs = 8
-        elif self.rx_mcs == 8:
-            R = 3 / 4
-            N_bpscs = 8
-        # MCS 9 == Modulation 256-QAM R = 5/6 , N_bpscs = 8
-        elif self.rx_mcs == 9:
-            R = 5 / 6
-            N_bpscs = 8
-        logger.debug(
-            "mcs {mcs} N_sd {N_sd} N_bpscs {N_bpscs} R {R} N_ss {N_ss}  T_dft {T_dft} T_gi_short {T_gi_short}".format(
-                mcs=self.rx_mcs, N_sd=N_sd, N_bpscs=N_bpscs, R=R, N_ss=N_ss, T_dft=T_dft, T_gi_short=T_gi_short))
-        self.rx_data_rate_gi_short_Mbps = ((N_sd * N_bpscs * R * float(N_ss)) / (T_dft + T_gi_short)) / 1000000
-        logger.debug("rx_data_rate gi_short {data_rate} Mbit/s".format(data_rate=self.rx_data_rate_gi_short_Mbps))
-        logger.debug(
-            "mcs {mcs} N_sd {N_sd} N_bpscs {N_bpscs} R {R} N_ss {N_ss}  T_dft {T_dft} T_gi_long {T_gi_long}".format(
-                mcs=self.rx_mcs, N_sd=N_sd, N_bpscs=N_bpscs, R=R, N_ss=N_ss, T_dft=T_dft, T_gi_long=T_gi_long))
-        self.rx_data_rate_gi_long_Mbps = ((N_sd * N_bpscs * R * float(N_ss)) / (T_dft + T_gi_long)) / 1000000
-        logger.debug("rx_data_rate gi_long {data_rate} Mbps".format(data_rate=self.rx_data_rate_gi_long_Mbps))
-        if abs(self.rx_mbit - self.rx_data_rate_gi_short_Mbps) <= abs(
-                self.rx_mbit - self.rx_data_rate_gi_long_Mbps):
-            self.rx_mbit_calc = self.rx_data_rate_gi_short_Mbps
-            self.rx_gi = T_gi_short
-        else:
-            self.rx_mbit_calc = self.rx_data_rate_gi_long_Mbps
-            self.rx_gi = T_gi_long
-        ##########################################
-        #
-        # HE no OFDMA - changes the calculations
-        #
-        ###########################################
+        self.calculated_data_rate('rx', 'VHT')
 
     def calculated_data_rate_tx_HE(self):
-        logger.info("calculated_data_rate_tx_HE")
-        # TODO compare with standard for 40 MHz if values change
-        N_sd = 0  # Number of Data Subcarriers based on modulation and bandwith
-        N_bpscs = 0  # Number of coded bits per Subcarrier(Determined by the modulation, MCS)
-        R = 0  # coding ,  (Determined by the modulation, MCS )
-        N_ss = 0  # Number of Spatial Streams
-        T_dft = 3.2 * 10 ** -6  # Constant for HT
-        T_gi_short = .4 * 10 ** -6  # Guard index.
-        T_gi_long = .8 * 10 ** -6  # Guard index.
-        bw = 20
-        # Note the T_gi is not exactly know so need to calculate bothh with .4 and .8
-        # the nubmer of Data Subcarriers is based on modulation and bandwith
-        bw = int(self.tx_mhz)
-        logger.info("Mhz {Mhz}".format(Mhz=self.tx_mhz))
-        if bw == 20:
-            N_sd = 52
-        elif bw == 40:
-            N_sd = 108
-        elif bw == 80:
-            N_sd = 234
-        elif bw == 160:
-            N_sd = 468
-        else:
-            logger.info("For HT if cannot be read bw is assumed to be 20")
-            N_sd = 52
-            self.tx_mhz = 20
-
-        # NSS
-        N_ss = self.tx_nss
-        # MCS (Modulation Coding Scheme) determines the constands
-        # MCS 0 == Modulation BPSK R = 1/2 ,  N_bpscs = 1,
-        # Only for HT configuration
-        if self.tx_mcs == 0:
-            R = 1 / 2
-            N_bpscs = 1
-        # MCS 1 == Modulation QPSK R = 1/2 , N_bpscs = 2
-        elif self.tx_mcs == 1:
-            R = 1 / 2
-            N_bpscs = 2
-        # MCS 2 == Modulation QPSK R = 3/4 , N_bpscs = 2
-        elif self.tx_mcs == 2:
-            R = 3 / 4
-            N_bpscs = 2
-        # MCS 3 == Modulation 16-QAM R = 1/2 , N_bpscs = 4
-        elif self.tx_mcs == 3:
-            R = 1 / 2
-            N_bpscs = 4
-        # MCS 4 == Modulation 16-QAM R = 3/4 , N_bpscs = 4
-        elif self.tx_mcs == 4:
-            R = 3 / 4
-            N_bpscs = 4
-        # MCS 5 == Modulation 64-QAM R = 2/3 , N_bpscs = 6
-        elif self.tx_mcs == 5:
-            R = 2 / 3
-            N_bpscs = 6
-        # MCS 6 == Modulation 64-QAM R = 3/4 , N_bpscs = 6
-        elif self.tx_mcs == 6:
-            R = 3 / 4
-            N_bpscs = 6
-        # MCS 7 == Modulation 64-QAM R = 5/6 , N_bpscs = 6
-        elif self.tx_mcs == 7:
-            R = 5 / 6
-            N_bpscs = 6
-        # MCS 8 == Modulation 256-QAM R = 3/4 , N_bpscs = 8
-        elif self.tx_mcs == 8:
-            R = 3 / 4
-            N_bpscs = 8
-        # MCS 9 == Modulation 256-QAM R = 5/6 , N_bpscs = 8
-        elif self.tx_mcs == 9:
-            R = 5 / 6
-            N_bpscs = 8
-
-        logger.debug(
-            "tx: mcs {mcs} N_sd {N_sd} N_bpscs {N_bpscs} R {R} N_ss {N_ss}  T_dft {T_dft} T_gi_short {T_gi_short}".format(
-                mcs=self.tx_mcs, N_sd=N_sd, N_bpscs=N_bpscs, R=R, N_ss=N_ss, T_dft=T_dft, T_gi_short=T_gi_short))
-
-        self.tx_data_rate_gi_short_Mbps = ((N_sd * N_bpscs * R * float(N_ss)) / (T_dft + T_gi_short)) / 1000000
-        logger.debug("tx_data_rate gi_short {data_rate} Mbit/s".format(data_rate=self.tx_data_rate_gi_short_Mbps))
-
-        logger.debug(
-            "tx: mcs {mcs} N_sd {N_sd} N_bpscs {N_bpscs} R {R} N_ss {N_ss}  T_dft {T_dft} T_gi_long {T_gi_long}".format(
-                mcs=self.tx_mcs, N_sd=N_sd, N_bpscs=N_bpscs, R=R, N_ss=N_ss, T_dft=T_dft, T_gi_long=T_gi_long))
-
-        self.tx_data_rate_gi_long_Mbps = ((N_sd * N_bpscs * R * float(N_ss)) / (T_dft + T_gi_long)) / 1000000
-        logger.debug("data_rate gi_long {data_rate} Mbps".format(data_rate=self.tx_data_rate_gi_long_Mbps))
-
-        if abs(self.tx_mbit - self.tx_data_rate_gi_short_Mbps) <= abs(self.tx_mbit - self.tx_data_rate_gi_long_Mbps):
-            self.tx_mbit_calc = self.tx_data_rate_gi_short_Mbps
-            self.tx_gi = T_gi_short
-        else:
-            self.tx_mbit_calc = self.tx_data_rate_gi_long_Mbps
-            self.tx_gi = T_gi_long
+        self.calculated_data_rate('tx', 'HE')
 
     def calculated_data_rate_rx_HE(self):
-        logger.info("calculated_data_rate_rx_HE")
-        N_sd = 0  # Number of Data Subcarriers based on modulation and bandwith
-        N_bpscs = 0  # Number of coded bits per Subcarrier(Determined by the modulation, MCS)
-        R = 0  # coding ,  (Determined by the modulation, MCS )
-        N_ss = 0  # Number of Spatial Streams
-        T_dft = 3.2 * 10 ** -6  # Constant for HT
-        T_gi_short = .4 * 10 ** -6  # Guard index.
-        T_gi_long = .8 * 10 ** -6  # Guard index.
-        # Note the T_gi is not exactly know so need to calculate bothh with .4 and .8
-        # the nubmer of Data Subcarriers is based on modulation and bandwith
-        bw = int(self.rx_mhz)
-        logger.info("Mhz {Mhz}".format(Mhz=self.rx_mhz))
-        if bw == 20:
-            N_sd = 52
-        elif bw == 40:
-            N_sd = 108
-        elif bw == 80:
-            N_sd = 234
-        elif bw == 160:
-            N_sd = 468
-        else:
-            logger.info("For HT if cannot be read bw is assumed to be 20")
-            N_sd = 52
-            self.rx_mhz = 20
-        # NSS
-        N_ss = self.rx_nss
-        # MCS (Modulation Coding Scheme) determines the constands
-        # MCS 0 == Modulation BPSK R = 1/2 ,  N_bpscs = 1,
-        # Only for HT configuration
-        if self.rx_mcs == 0:
-            R = 1 / 2
-            N_bpscs = 1
-        # MCS 1 == Modulation QPSK R = 1/2 , N_bpscs = 2
-        elif self.rx_mcs == 1:
-            R = 1 / 2
-            N_bpscs = 2
-        # MCS 2 == Modulation QPSK R = 3/4 , N_bpscs = 2
-        elif self.rx_mcs == 2:
-            R = 3 / 4
-            N_bpscs = 2
-        # MCS 3 == Modulation 16-QAM R = 1/2 , N_bpscs = 4
-        elif self.rx_mcs == 3:
-            R = 1 / 2
-            N_bpscs = 4
-        # MCS 4 == Modulation 16-QAM R = 3/4 , N_bpscs = 4
-        elif self.rx_mcs == 4:
-            R = 3 / 4
-            N_bpscs = 4
-        # MCS 5 == Modulation 64-QAM R = 2/3 , N_bpscs = 6
-        elif self.rx_mcs == 5:
-            R = 2 / 3
-            N_bpscs = 6
-        # MCS 6 == Modulation 64-QAM R = 3/4 , N_bpscs = 6
-        elif self.rx_mcs == 6:
-            R = 3 / 4
-            N_bpscs = 6
-        # MCS 7 == Modulation 64-QAM R = 5/6 , N_bpscs = 6
-        elif self.rx_mcs == 7:
-            R = 5 / 6
-            N_bpscs = 6
-        # MCS 8 == Modulation 256-QAM R = 3/4 , N_bpscs = 8
-        elif self.rx_mcs == 8:
-            R = 3 / 4
-            N_bpscs = 8
-        # MCS 9 == Modulation 256-QAM R = 5/6 , N_bpscs = 8
-        elif self.rx_mcs == 9:
-            R = 5 / 6
-            N_bpscs = 8
-        logger.debug(
-            "mcs {mcs} N_sd {N_sd} N_bpscs {N_bpscs} R {R} N_ss {N_ss}  T_dft {T_dft} T_gi_short {T_gi_short}".format(
-                mcs=self.rx_mcs, N_sd=N_sd, N_bpscs=N_bpscs, R=R, N_ss=N_ss, T_dft=T_dft, T_gi_short=T_gi_short))
-        self.rx_data_rate_gi_short_Mbps = ((N_sd * N_bpscs * R * float(N_ss)) / (T_dft + T_gi_short)) / 1000000
-        logger.debug("rx_data_rate gi_short {data_rate} Mbit/s".format(data_rate=self.rx_data_rate_gi_short_Mbps))
-        logger.debug(
-            "mcs {mcs} N_sd {N_sd} N_bpscs {N_bpscs} R {R} N_ss {N_ss}  T_dft {T_dft} T_gi_long {T_gi_long}".format(
-                mcs=self.rx_mcs, N_sd=N_sd, N_bpscs=N_bpscs, R=R, N_ss=N_ss, T_dft=T_dft, T_gi_long=T_gi_long))
-        self.rx_data_rate_gi_long_Mbps = ((N_sd * N_bpscs * R * float(N_ss)) / (T_dft + T_gi_long)) / 1000000
-        logger.debug("rx_data_rate gi_long {data_rate} Mbps".format(data_rate=self.rx_data_rate_gi_long_Mbps))
-        if abs(self.rx_mbit - self.rx_data_rate_gi_short_Mbps) <= abs(
-                self.rx_mbit - self.rx_data_rate_gi_long_Mbps):
-            self.rx_mbit_calc = self.rx_data_rate_gi_short_Mbps
-            self.rx_gi = T_gi_short
-        else:
-            self.rx_mbit_calc = self.rx_data_rate_gi_long_Mbps
-            self.rx_gi = T_gi_long
+        self.calculated_data_rate('rx', 'HE')
+
+    def calculated_data_rate_tx_EHT(self):
+        self.calculated_data_rate('tx', 'EHT')
+
+    def calculated_data_rate_rx_EHT(self):
+        self.calculated_data_rate('rx', 'EHT')
+
+
+class ProbeCollector:
+    """
+    Probes many ports at once and caches the parsed results.
+
+    refresh() posts a probe request for every port that needs one, waits once for
+    the GUI to gather results, then reads them back on a pool of worker threads.
+    A result younger than ttl_sec is served from the cache, so several consumers
+    in one monitor interval share one probe per port. get_age() and
+    get_staleness() report how old each sample is.
+    """
+    Default_TTL_Sec = 1.0
+    Default_Settle_Sec = 0.2
+    Default_Max_Workers = 16
+
+    def __init__(self,
+                 lfhost=None,
+                 lfport='8080',
+                 ttl_sec=Default_TTL_Sec,
+                 settle_sec=Default_Settle_Sec,
+                 max_workers=Default_Max_Workers,
+                 debug=False):
+        """
+        :param lfhost: LANforge GUI host
+        :param lfport: LANforge GUI port
+        :param ttl_sec: results younger than this are not probed again
+        :param settle_sec: time between posting the probes and reading the results
+        :param max_workers: probes posted or read at the same time
+        :param debug: turn on debugging output
+        """
+        if not max_workers or int(max_workers) < 1:
+            raise ValueError("ProbeCollector max_workers must be at least 1")
+        self.lfhost = lfhost
+        self.lfport = lfport
+        self.ttl_sec = ttl_sec
+        self.settle_sec = settle_sec
+        self.max_workers = int(max_workers)
+        self.debug = debug
+        self.ports = {}
+        self.collected = {}
+        self.results = {}
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+        return False
+
+    def _port(self, eid_str):
+        if eid_str not in self.ports:
+            self.ports[eid_str] = ProbePort(lfhost=self.lfhost,
+                                            lfport=self.lfport,
+                                            eid_str=eid_str,
+                                            debug=self.debug)
+        return self.ports[eid_str]
+
+    def _request(self, probe_port):
+        try:
+            probe_port.requestProbe()
+            return True
+        except Exception as x:
+            logger.warning("ProbeCollector: probe request for {eid} failed: {x}".format(eid=probe_port.eid_str, x=x))
+            return False
+
+    def _read(self, probe_port):
+        try:
+            return probe_port.readProbe()
+        except Exception as x:
+            logger.warning("ProbeCollector: probe results for {eid} failed: {x}".format(eid=probe_port.eid_str, x=x))
+            return False
+
+    def get_age(self, eid_str=None):
+        """
+        :param eid_str: port eid, like 1.1.sta0000
+        :return: seconds since the port was probed, None if the last probe failed or never ran
+        """
+        with self.lock:
+            collected = self.collected.get(eid_str)
+        if collected is None:
+            return None
+        return time.monotonic() - collected
+
+    def get_staleness(self, eid_list=None):
+        """
+        :param eid_list: ports to report, default every port probed so far
+        :return: dict of eid to seconds since it was probed, None if it has no result
+        """
+        if eid_list is None:
+            eid_list = list(self.ports.keys())
+        return {eid_str: self.get_age(eid_str) for eid_str in eid_list}
+
+    def refresh(self, eid_list=None, force=False):
+        """
+        Probe every port in eid_list whose result is missing or older than ttl_sec
+        :param eid_list: list of port eids, like ['1.1.sta0000', '1.1.sta0001']
+        :param force: probe every port even if its result is still fresh
+        :return: dict of eid to ProbePort, or None where the latest probe failed
+        """
+        if not eid_list:
+            return {}
+        stale = [eid_str for eid_str in eid_list
+                 if force or (self.get_age(eid_str) is None) or (self.get_age(eid_str) > self.ttl_sec)]
+        if stale:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                   thread_name_prefix="probe")
+            started = time.monotonic()
+            probe_ports = [self._port(eid_str) for eid_str in stale]
+            requested = list(self.executor.map(self._request, probe_ports))
+            if self.settle_sec:
+                sleep(self.settle_sec)
+            waiting = [probe_port for probe_port, ok in zip(probe_ports, requested) if ok]
+            read = dict(zip([probe_port.eid_str for probe_port in waiting],
+                            self.executor.map(self._read, waiting)))
+            now = time.monotonic()
+            with self.lock:
+                for eid_str in stale:
+                    if read.get(eid_str):
+                        self.collected[eid_str] = now
+                        self.results[eid_str] = self.ports[eid_str]
+                    else:
+                        self.collected.pop(eid_str, None)
+                        self.results[eid_str] = None
+            if self.debug:
+                logger.debug("ProbeCollector: probed {n} of {total} ports in {sec:.2f} sec".format(
+                    n=len(stale), total=len(eid_list), sec=now - started))
+        with self.lock:
+            return {eid_str: self.results.get(eid_str) for eid_str in eid_list}
+
+    def get_probe(self, eid_str=None, max_age_sec=None):
+        """
+        :param eid_str: port eid, like 1.1.sta0000
+        :param max_age_sec: probe again if the cached result is older, default ttl_sec
+        :return: ProbePort with parsed results, None if the probe failed
+        """
+        if max_age_sec is not None:
+            age = self.get_age(eid_str)
+            return self.refresh([eid_str], force=(age is None or age > max_age_sec))[eid_str]
+        return self.refresh([eid_str])[eid_str]
+
+    def close(self):
+        """ release the worker threads """
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+PortResultsStore keeps the per-port rows of a test run in one append-only file.
+
+Scripts such as test_l3.py used to open one CSV file per port and direction and
+flush it after every row, so a run with 500 stations held 1000 files open and
+flushed 1000 times per polling interval. The store writes every row to a single
+CSV file instead, keyed by kind ('dl', 'ul', ...) and port EID:
+
+    H,<kind>,<port-eid>,<column headers...>
+    R,<kind>,<port-eid>,<row values...>
+
+Rows are buffered and written every flush_rows rows; checkpoint() also fsyncs
+the file, at most every checkpoint_sec seconds from append(). export_port_csvs()
+brings the legacy one-file-per-port CSVs up to date, appending only the rows
+stored since its last call; the module function export_port_csvs() writes them
+all from a store file after the run.
+
+Example:
+    store = PortResultsStore(path="l3-port-results.csv")
+    store.add_port("dl", "1.1.sta0000", headers, legacy_path="l3-dl-1.1.sta0000.csv")
+    store.append("dl", "1.1.sta0000", row)
+    store.export_port_csvs()
+"""
+import csv
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+HEADER_RECORD = "H"
+ROW_RECORD = "R"
+
+
+class PortResultsStore:
+    Default_Flush_Rows = 500
+    Default_Checkpoint_Sec = 10.0
+
+    def __init__(self,
+                 path=None,
+                 flush_rows=Default_Flush_Rows,
+                 checkpoint_sec=Default_Checkpoint_Sec):
+        """
+        :param path: store file, replaced if it exists
+        :param flush_rows: write buffered rows once this many are queued
+        :param checkpoint_sec: fsync the store at most this often, None to only fsync on checkpoint()
+        """
+        if path is None:
+            raise ValueError("PortResultsStore requires path")
+        if not flush_rows or int(flush_rows) < 1:
+            raise ValueError("PortResultsStore flush_rows must be at least 1")
+        self.path = path
+        self.flush_rows = int(flush_rows)
+        self.checkpoint_sec = checkpoint_sec
+        # (kind, port_eid): legacy per-port csv path, in the order ports were added
+        self.legacy_paths = {}
+        self.buffer = []
+        self.rows_written = 0
+        self.last_checkpoint = time.monotonic()
+        # bytes of the store already written to the legacy csv files
+        self.exported_bytes = 0
+        self.file = open(self.path, "w", newline="")
+        self.writer = csv.writer(self.file, delimiter=",")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+        return False
+
+    def add_port(self, kind=None, port_eid=None, headers=None, legacy_path=None):
+        """
+        Record the column headers of a port's rows
+        :param kind: row group, like 'dl' or 'ul'
+        :param port_eid: port EID, like 1.1.sta0000
+        :param headers: list of column names
+        :param legacy_path: file export_port_csvs() writes this port's rows to
+        """
+        self.legacy_paths[(kind, port_eid)] = legacy_path
+        self.buffer.append([HEADER_RECORD, kind, port_eid] + list(headers))
+        self.flush()
+
+    def append(self, kind=None, port_eid=None, row=None):
+        """
+        Queue one row for a port
+        :param kind: row group, like 'dl' or 'ul'
+        :param port_eid: port EID the row belongs to
+        :param row: list of column values
+        """
+        self.buffer.append([ROW_RECORD, kind, port_eid] + list(row))
+        if len(self.buffer) >= self.flush_rows:
+            self.flush()
+        if (self.checkpoint_sec is not None) and (time.monotonic() - self.last_checkpoint >= self.checkpoint_sec):
+            self.checkpoint()
+
+    def flush(self):
+        """ write buffered rows to the store file """
+        if not self.buffer:
+            return
+        self.writer.writerows(self.buffer)
+        self.rows_written += len(self.buffer)
+        self.buffer = []
+        self.file.flush()
+
+    def checkpoint(self):
+        """ write buffered rows and make sure they reach the disk """
+        self.flush()
+        if not self.file.closed:
+            os.fsync(self.file.fileno())
+        self.last_checkpoint = time.monotonic()
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.checkpoint()
+        self.file.close()
+
+    def get_legacy_path(self, kind=None, port_eid=None):
+        return self.legacy_paths.get((kind, port_eid))
+
+    def get_legacy_paths(self, kind=None):
+        """
+        :param kind: row group, like 'dl'
+        :return: dict of port EID to legacy csv path, in the order ports were added
+        """
+        return {port_eid: path for (port_kind, port_eid), path in self.legacy_paths.items()
+                if port_kind == kind}
+
+    def read_rows(self, kind=None, port_eid=None):
+        """
+        Read the rows written so far, call checkpoint() first to include buffered rows
+        :param kind: only this row group, default all
+        :param port_eid: only this port, default all
+        :return: generator of (record type, kind, port_eid, values)
+        """
+        return read_port_results(self.path, kind=kind, port_eid=port_eid)
+
+    def export_port_csvs(self):
+        """
+        Append the rows stored since the last call to each port's legacy csv file;
+        a port whose headers were stored (again) starts its file over
+        :return: dict of (kind, port_eid) to the file written
+        """
+        self.flush()
+        with open(self.path, "rb") as file:
+            file.seek(self.exported_bytes)
+            data = file.read()
+        # flush() writes whole records, so the new data ends on a record boundary
+        self.exported_bytes += len(data)
+        started = set()
+        grouped = {}
+        for record in csv.reader(data.decode().splitlines(True)):
+            if len(record) < 3:
+                continue
+            key = (record[1], record[2])
+            if not self.legacy_paths.get(key):
+                continue
+            if record[0] == HEADER_RECORD:
+                started.add(key)
+                grouped[key] = [record[3:]]
+            elif record[0] == ROW_RECORD:
+                grouped.setdefault(key, []).append(record[3:])
+        written = {}
+        for key, rows in grouped.items():
+            with open(self.legacy_paths[key], "w" if key in started else "a", newline="") as file:
+                csv.writer(file, delimiter=",").writerows(rows)
+            written[key] = self.legacy_paths[key]
+        return written
+
+
+def read_port_results(path=None, kind=None, port_eid=None):
+    """
+    Read a PortResultsStore file, including one from a run that stopped early
+    :param path: store file
+    :param kind: only this row group, default all
+    :param port_eid: only this port, default all
+    :return: generator of (record type, kind, port_eid, values)
+    """
+    with open(path, "r", newline="") as file:
+        for record in csv.reader(file):
+            if len(record) < 3:
+                continue
+            if (kind is not None) and (record[1] != kind):
+                continue
+            if (port_eid is not None) and (record[2] != port_eid):
+                continue
+            yield record[0], record[1], record[2], record[3:]
+
+
+def export_port_csvs(path=None, legacy_paths=None, kind=None):
+    """
+    Split a PortResultsStore file into one csv per port
+    :param path: store file
+    :param legacy_paths: dict of (kind, port_eid) to output csv path; ports not in it are skipped
+    :param kind: only this row group, default all
+    :return: dict of (kind, port_eid) to the file written
+    """
+    grouped = {}
+    for record_type, record_kind, record_eid, values in read_port_results(path, kind=kind):
+        key = (record_kind, record_eid)
+        if not legacy_paths.get(key):
+            continue
+        if record_type == HEADER_RECORD:
+            # a port added again starts over, like reopening its csv would
+            grouped[key] = [values]
+        elif record_type == ROW_RECORD:
+            grouped.setdefault(key, []).append(values)
+    written = {}
+    for key, rows in grouped.items():
+        with open(legacy_paths[key], "w", newline="") as file:
+            csv.writer(file, delimiter=",").writerows(rows)
+        written[key] = legacy_paths[key]
+    logger.debug("export_port_csvs: wrote {count} port files from {path}".format(count=len(written), path=path))
+    return written
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Per-interval snapshots of LANforge port state and AP station statistics.
+
+PortSnapshot reads a set of ports with one /port query per resource, asking only
+for the fields the caller uses:
+
+    /port/1/1/sta0000,sta0001,sta0002?fields=alias,port,mac,...
+
+and indexes the result by port EID and by MAC address.
+
+ApStatsSnapshot asks an AP module (see py-scripts/sandbox/cmr_ap_asus_mod.py) to
+read its tx, rx and chanim statistics once per band, then splits the AP output
+once into rows keyed by station MAC. Looking a station up is then a dict lookup
+instead of a scan over every line of the AP output. AP modules that do not keep
+their raw output in tx_results / rx_results / chanim_results are asked per MAC
+as before.
+
+Example:
+    ports = PortSnapshot(json_get=self.json_get)
+    ap_stats = ApStatsSnapshot(ap=self.ap, bands=self.ap_band_list)
+    while running:
+        ports.refresh(port_eids)
+        ap_stats.refresh()
+        for port_eid in port_eids:
+            port_data = ports.get(port_eid)
+            tx_dl_mac_found, ap_row_tx_dl = ap_stats.tx_dl_stats(port_data['mac'])
+"""
+import importlib
+import logging
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../")))
+LFUtils = importlib.import_module("py-json.LANforge.LFUtils")
+logger = logging.getLogger(__name__)
+
+# port columns used by the test_l3 per-port csv files
+PORT_SNAPSHOT_FIELDS = ("alias", "port", "mac", "channel", "mode", "ap", "signal",
+                        "bps rx", "bps tx", "rx-rate", "tx-rate", "rx drop")
+
+
+class PortSnapshot:
+    def __init__(self, json_get=None, fields=PORT_SNAPSHOT_FIELDS):
+        """
+        :param json_get: function that queries the LANforge GUI, like LFCliBase.json_get
+        :param fields: port columns to request, None for the full record
+        """
+        if json_get is None:
+            raise ValueError("PortSnapshot requires json_get")
+        self.json_get = json_get
+        self.fields = list(fields) if fields else None
+        self.by_eid = {}
+        self.by_mac = {}
+        self.queries = 0
+
+    def _url(self, shelf, resource, names):
+        url = "/port/%s/%s/%s" % (shelf, resource, ",".join(names))
+        if self.fields:
+            url += "?fields=" + ",".join(field.replace(" ", "+") for field in self.fields)
+        return url
+
+    def refresh(self, port_eids=None):
+        """
+        Read the ports, one query per shelf and resource
+        :param port_eids: list of port EIDs like 1.1.sta0000
+        :return: dict of port EID to port record; ports the GUI did not return are missing
+        """
+        self.by_eid = {}
+        self.by_mac = {}
+        # (shelf, resource): {name: port EID as given}
+        groups = {}
+        for port_eid in port_eids:
+            eid = LFUtils.name_to_eid(port_eid)
+            groups.setdefault((eid[0], eid[1]), {})[eid[2]] = port_eid
+        for (shelf, resource), names in groups.items():
+            url = self._url(shelf, resource, list(names.keys()))
+            response = self.json_get(url)
+            self.queries += 1
+            if response is None:
+                logger.info("query-port: %s: no response" % url)
+                continue
+            if "interface" in response:
+                # a single port is not wrapped in a list, key it by its own alias
+                record = response["interface"]
+                records = {}
+                if record and "alias" in record:
+                    records["%s.%s.%s" % (shelf, resource, record["alias"])] = record
+            elif "interfaces" in response:
+                records = {}
+                for entry in response["interfaces"]:
+                    records.update(entry)
+            else:
+                logger.info("query-port: %s: incomplete response:" % url)
+                logger.debug(response)
+                continue
+            for name, port_eid in names.items():
+                port_data = records.get("%s.%s.%s" % (shelf, resource, name))
+                if port_data is None:
+                    logger.info("query-port: %s: no record for %s" % (url, port_eid))
+                    continue
+                self.by_eid[port_eid] = port_data
+                mac = port_data.get("mac")
+                if mac:
+                    self.by_mac[mac.lower()] = port_eid
+        return self.by_eid
+
+    def get(self, port_eid=None):
+        """
+        :return: port record from the last refresh(), None if it was not returned
+        """
+        return self.by_eid.get(port_eid)
+
+    def get_by_mac(self, mac=None):
+        """
+        :return: (port EID, port record) of the port with this MAC, (None, None) if there is none
+        """
+        port_eid = self.by_mac.get(mac.lower()) if mac else None
+        return port_eid, self.by_eid.get(port_eid)
+
+
+def index_ap_rows(results=None, bands=None):
+    """
+    Split AP station statistics into rows keyed by the MAC in their first column
+    :param results: dict of band to AP command output
+    :param bands: bands to index, in order; the first band listing a MAC wins
+    :return: dict of lower case MAC to the row split on white space
+    """
+    rows = {}
+    for band in bands:
+        text = results.get(band)
+        if not text:
+            continue
+        for line in text.splitlines():
+            split_row = line.split()
+            if split_row:
+                rows.setdefault(split_row[0].lower(), split_row)
+    return rows
+
+
+def parse_chanim_utilization(results=None, bands=None):
+    """
+    Channel utilization from 'chanim_stats' output: 100 - xtop of the row after the
+    chanspec header, from the first band that reports one
+    :param results: dict of band to AP command output
+    :param bands: bands to read, in order
+    :return: (xtop reported, channel utilization as a string)
+    """
+    for band in bands:
+        text = results.get(band)
+        if not text:
+            continue
+        xtop_reported = False
+        for line in text.splitlines():
+            split_row = line.split()
+            if xtop_reported:
+                try:
+                    return True, str(float(100) - float(split_row[7]))
+                except (IndexError, ValueError):
+                    logger.info("{band} detected chanspec with reading chanim_stats, exception reading xtop".format(
+                        band=band))
+                    return True, str(0)
+            if split_row and split_row[0].lower() == 'chanspec':
+                xtop_reported = True
+    return False, str(0)
+
+
+class ApStatsSnapshot:
+    def __init__(self, ap=None, bands=None):
+        """
+        :param ap: AP module object with read_tx_dl_stats(band), tx_dl_stats(mac) and friends
+        :param bands: AP bands to read, like ['2g', '5g']
+        """
+        if ap is None:
+            raise ValueError("ApStatsSnapshot requires ap")
+        self.ap = ap
+        self.bands = list(bands) if bands else []
+        self.tx_rows = None
+        self.rx_rows = None
+        self.chanim = None
+
+    def refresh(self):
+        """ read the AP statistics for every band and index them """
+        for band in self.bands:
+            self.ap.read_tx_dl_stats(band)
+            self.ap.read_rx_ul_stats(band)
+            self.ap.read_chanim_stats(band)
+        tx_results = getattr(self.ap, "tx_results", None)
+        rx_results = getattr(self.ap, "rx_results", None)
+        chanim_results = getattr(self.ap, "chanim_results", None)
+        self.tx_rows = index_ap_rows(tx_results, self.bands) if isinstance(tx_results, dict) else None
+        self.rx_rows = index_ap_rows(rx_results, self.bands) if isinstance(rx_results, dict) else None
+        self.chanim = parse_chanim_utilization(chanim_results, self.bands) \
+            if isinstance(chanim_results, dict) else None
+
+    # the lookups return the AP module's (found, row) pairs; rows are copies
+    # because callers append to them
+    def tx_dl_stats(self, mac=None):
+        if self.tx_rows is None:
+            return self.ap.tx_dl_stats(mac)
+        row = self.tx_rows.get(mac.lower())
+        return (True, list(row)) if row is not None else (False, '')
+
+    def rx_ul_stats(self, mac=None):
+        if self.rx_rows is None:
+            return self.ap.rx_ul_stats(mac)
+        row = self.rx_rows.get(mac.lower())
+        return (True, list(row)) if row is not None else (False, '')
+
+    def chanim_stats(self, mac=None):
+        if self.chanim is None:
+            return self.ap.chanim_stats(mac)
+        return self.chanim
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Parser for the 'probe results' text of a /probe/ query.
+
+The text is the station dump of the port, one 'name: value' per line:
+
+    signal:         -36 [-38, -40] dBm
+    signal avg:     -36 [-38, -40] dBm
+    tx bitrate:     1200.9 MBit/s 80MHz HE-MCS 11 HE-NSS 2 HE-GI 0 HE-DCM 0
+    rx bitrate:     866.7 MBit/s VHT-MCS 9 80MHz short GI VHT-NSS 2
+
+parse_probe_results() reads it in one pass with precompiled expressions and
+returns a ProbeSample. Run this module to time the parser over the built-in
+samples or a directory of captured probe results:
+
+    python3 probe_results.py --corpus ./probe_captures --iterations 2000
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+LINE_RE = re.compile(r'^[ \t]*([^:\n]+?)[ \t]*:[ \t]*(.*?)[ \t]*$', re.MULTILINE)
+MBIT_RE = re.compile(r'([0-9.]+)\s*MBit/s')
+MHZ_RE = re.compile(r'(\d+)\s*MHz')
+MCS_RE = re.compile(r'(?:\b(EHT|HE|VHT)-)?MCS\s+(\d+)')
+NSS_RE = re.compile(r'\b(?:EHT|HE|VHT)-NSS\s+(\d+)')
+HE_GI_RE = re.compile(r'\b(?:EHT|HE)-GI\s+(\d+)')
+SIGNAL_RE = re.compile(r'(-?\d+)\s*(?:\[([^\]]*)\])?')
+
+# HE/EHT report the guard interval as an index
+HE_GI_NS = {0: 800, 1: 1600, 2: 3200}
+
+
+class ProbeSample:
+    """
+    Values parsed from one probe. Rates are Mbps, widths MHz, guard intervals ns.
+    A field the probe did not report is None.
+    """
+    __slots__ = ("eid", "signals",
+                 "signal", "signal_per_chain", "signal_avg", "signal_avg_per_chain", "beacon_signal_avg",
+                 "tx_bitrate", "tx_mbit", "tx_mode", "tx_mcs", "tx_nss", "tx_mhz", "tx_gi_ns",
+                 "rx_bitrate", "rx_mbit", "rx_mode", "rx_mcs", "rx_nss", "rx_mhz", "rx_gi_ns")
+
+    def __init__(self, eid=None):
+        for name in self.__slots__:
+            setattr(self, name, None)
+        self.eid = eid
+        self.signals = {}
+
+    @property
+    def he(self):
+        return "HE" in (self.tx_mode, self.rx_mode)
+
+    @property
+    def eht(self):
+        return "EHT" in (self.tx_mode, self.rx_mode)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return "ProbeSample(%s)" % ", ".join("%s=%r" % (name, getattr(self, name))
+                                             for name in self.__slots__ if name != "signals")
+
+
+def _parse_signal(value):
+    match = SIGNAL_RE.match(value)
+    if not match:
+        return None, None
+    per_chain = None
+    if match.group(2):
+        per_chain = [int(chain) for chain in match.group(2).split(',') if chain.strip()]
+    return int(match.group(1)), per_chain
+
+
+def _parse_bitrate(sample, direction, value):
+    setattr(sample, direction + "_bitrate", value)
+    match = MBIT_RE.search(value)
+    if match:
+        setattr(sample, direction + "_mbit", float(match.group(1)))
+    match = MHZ_RE.search(value)
+    # HT 20 MHz rates leave out the width
+    setattr(sample, direction + "_mhz", int(match.group(1)) if match else 20)
+    match = MCS_RE.search(value)
+    if not match:
+        setattr(sample, direction + "_mode", "legacy")
+        return
+    mode = match.group(1) or "HT"
+    mcs = int(match.group(2))
+    setattr(sample, direction + "_mode", mode)
+    setattr(sample, direction + "_mcs", mcs)
+    if mode == "HT":
+        # HT has no NSS field, MCS 8-31 are MCS 0-7 on 2-4 streams
+        setattr(sample, direction + "_nss", mcs // 8 + 1)
+        setattr(sample, direction + "_gi_ns", 400 if "short GI" in value else 800)
+        return
+    match = NSS_RE.search(value)
+    if match:
+        setattr(sample, direction + "_nss", int(match.group(1)))
+    if mode == "VHT":
+        setattr(sample, direction + "_gi_ns", 400 if "short GI" in value else 800)
+    else:
+        match = HE_GI_RE.search(value)
+        if match:
+            setattr(sample, direction + "_gi_ns", HE_GI_NS.get(int(match.group(1))))
+
+
+def parse_probe_results(text=None, eid=None):
+    """
+    :param text: 'probe results' text of a /probe/ query
+    :param eid: port eid recorded in the sample
+    :return: ProbeSample
+    """
+    sample = ProbeSample(eid=eid)
+    if not text:
+        return sample
+    for match in LINE_RE.finditer(text):
+        key = match.group(1)
+        value = match.group(2)
+        if key == "tx bitrate":
+            _parse_bitrate(sample, "tx", value)
+        elif key == "rx bitrate":
+            _parse_bitrate(sample, "rx", value)
+        elif "signal" in key:
+            if value.endswith("dBm"):
+                value = value[:-3].rstrip()
+            sample.signals[key] = value
+            if key == "signal":
+                sample.signal, sample.signal_per_chain = _parse_signal(value)
+            elif key == "signal avg":
+                sample.signal_avg, sample.signal_avg_per_chain = _parse_signal(value)
+            elif key == "beacon signal avg":
+                sample.beacon_signal_avg = _parse_signal(value)[0]
+    return sample
+
+
+SAMPLE_PROBE_RESULTS = [
+    "Station 04:f0:21:8a:3c:11 (on sta0000)\n"
+    "\tinactive time:\t12 ms\n"
+    "\trx bytes:\t1839203\n"
+    "\tsignal:  \t-36 [-38, -40] dBm\n"
+    "\tsignal avg:\t-37 [-39, -41] dBm\n"
+    "\tbeacon signal avg:\t-35 dBm\n"
+    "\ttx bitrate:\t1200.9 MBit/s 80MHz HE-MCS 11 HE-NSS 2 HE-GI 0 HE-DCM 0\n"
+    "\trx bitrate:\t1134.2 MBit/s 80MHz HE-MCS 11 HE-NSS 2 HE-GI 1 HE-DCM 0\n"
+    "\tconnected time:\t83 seconds\n",
+    "Station 04:f0:21:8a:3c:12 (on sta0001)\n"
+    "\tsignal:  \t-52 [-55, -54, -60, -58] dBm\n"
+    "\tsignal avg:\t-53 [-56, -55, -61, -59] dBm\n"
+    "\ttx bitrate:\t866.7 MBit/s VHT-MCS 9 80MHz short GI VHT-NSS 2\n"
+    "\trx bitrate:\t780.0 MBit/s VHT-MCS 8 80MHz VHT-NSS 2\n",
+    "Station 04:f0:21:8a:3c:13 (on sta0002)\n"
+    "\tsignal:  \t-61 [-63, -64] dBm\n"
+    "\tsignal avg:\t-61 [-63, -64] dBm\n"
+    "\ttx bitrate:\t300.0 MBit/s MCS 15 40MHz short GI\n"
+    "\trx bitrate:\t6.0 MBit/s\n",
+    "Station 04:f0:21:8a:3c:14 (on sta0003)\n"
+    "\tsignal:  \t-30 [-32, -33] dBm\n"
+    "\tsignal avg:\t-30 [-32, -33] dBm\n"
+    "\ttx bitrate:\t5764.7 MBit/s 320MHz EHT-MCS 13 EHT-NSS 2 EHT-GI 0\n"
+    "\trx bitrate:\t4803.9 MBit/s 320MHz EHT-MCS 11 EHT-NSS 2 EHT-GI 0\n",
+]
+
+
+def load_corpus(path=None):
+    """
+    :param path: directory of captured 'probe results' text files, one probe per file
+    :return: list of probe results texts, the built-in samples when path is None
+    """
+    if path is None:
+        return list(SAMPLE_PROBE_RESULTS)
+    corpus = []
+    for name in sorted(os.listdir(path)):
+        file_path = os.path.join(path, name)
+        if os.path.isfile(file_path):
+            with open(file_path, 'r') as file:
+                corpus.append(file.read())
+    return corpus
+
+
+def benchmark(corpus=None, iterations=1000):
+    """
+    Time parse_probe_results() over every text in corpus
+    :param corpus: list of probe results texts, default the built-in samples
+    :param iterations: passes over the corpus
+    :return: dict with sample count, total seconds and microseconds per parse
+    """
+    if corpus is None:
+        corpus = SAMPLE_PROBE_RESULTS
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for text in corpus:
+            parse_probe_results(text)
+    elapsed = time.perf_counter() - started
+    parses = iterations * len(corpus)
+    return {
+        "samples": len(corpus),
+        "parses": parses,
+        "elapsed_sec": elapsed,
+        "usec_per_parse": (elapsed / parses * 1e6) if parses else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="probe_results.py",
+                                     description="Time the probe results parser")
+    parser.add_argument("--corpus", help="directory of captured probe results, one probe per file")
+    parser.add_argument("--iterations", type=int, default=1000, help="passes over the corpus")
+    parser.add_argument("--show", action="store_true", help="print the parsed samples")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        print("No probe results found in {corpus}".format(corpus=args.corpus))
+        sys.exit(1)
+    if args.show:
+        for text in corpus:
+            print(parse_probe_results(text))
+    result = benchmark(corpus=corpus, iterations=args.iterations)
+    print("parsed {samples} samples {parses} times in {elapsed_sec:.3f} sec: {usec_per_parse:.1f} usec per parse".format(
+        **result))
+
+
+if __name__ == "__main__":
+    main()
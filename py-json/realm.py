@@ -65,6 +65,8 @@ lfdata = importlib.import_module("py-json.lfdata")
 LFDataCollection = lfdata.LFDataCollection
 vr_profile2 = importlib.import_module("py-json.vr_profile2")
 VRProfile = vr_profile2.VRProfile
+command_batch = importlib.import_module("py-json.command_batch")
+CommandBatch = command_batch.CommandBatch
 
 
 def wpa_ent_list():
@@ -455,7 +457,8 @@ class Realm(LFCliBase):
                        suppress_related_commands_=suppress_related_commands_)
         time.sleep(1)
 
-    def set_endp_details(self, ename, pkt_to_send, debug_=False, suppress_related_commands_=True):
+    def set_endp_details(self, ename, pkt_to_send, debug_=False, suppress_related_commands_=True,
+                         batch=None, batch_key=None):
         req_url = "cli-json/set_endp_details"
         pkt_to_send = pkt_to_send
 
@@ -463,9 +466,13 @@ class Realm(LFCliBase):
             "name": ename,
             "pkts_to_send": pkt_to_send
         }
+        if batch is not None:
+            batch.add(req_url, data, key=batch_key, suppress_related_commands_=suppress_related_commands_)
+            return
         self.json_post(req_url, data, debug_=debug_, suppress_related_commands_=suppress_related_commands_)
 
-    def set_endp_tos(self, ename, _tos, debug_=False, suppress_related_commands_=True):
+    def set_endp_tos(self, ename, _tos, debug_=False, suppress_related_commands_=True,
+                     batch=None, batch_key=None):
         req_url = "cli-json/set_endp_tos"
         tos = _tos
         # Convert some human readable values to numeric needed by LANforge.
@@ -485,6 +492,9 @@ class Realm(LFCliBase):
             "name": ename,
             "tos": tos
         }
+        if batch is not None:
+            batch.add(req_url, data, key=batch_key, suppress_related_commands_=suppress_related_commands_)
+            return
         self.json_post(req_url, data, debug_=debug_, suppress_related_commands_=suppress_related_commands_)
 
     def stop_cx(self, cx_name):
@@ -829,11 +839,19 @@ class Realm(LFCliBase):
         return self.json_get('/port/all')
 
     # timemout_sec of -1 means auto-calculate based on number of stations.
-    def wait_for_ip(self, station_list=None, ipv4=True, ipv6=False, timeout_sec=360, debug=False):
-        timeout_auto = False
-
+    def wait_for_ip(self, station_list=None, ipv4=True, ipv6=False, timeout_sec=360, debug=False,
+                    interval_sec=1.0, ip_timings=None):
+        """
+        Wait for stations to get IP addresses, querying all stations in bulk once per interval_sec.
+        :param ip_timings: optional dict filled with {"ipv4": {eid: sec}, "ipv6": {eid: sec}} giving
+        how long each station took to get an address, summarize it with LFUtils.time_distribution()
+        :return: True if all stations got the requested addresses before timeout_sec
+        """
         if not (ipv4 or ipv6):
             raise ValueError("wait_for_ip: ipv4 and/or ipv6 must be set!")
+        if (station_list is None) or (len(station_list) < 1):
+            logger.critical("wait_for_ip: expects non-empty list of ports")
+            raise ValueError("wait_for_ip: expects non-empty list of ports")
         if timeout_sec >= 0:
             if debug:
                 logger.debug("Waiting for ips, timeout: %i..." % timeout_sec)
@@ -842,82 +860,34 @@ class Realm(LFCliBase):
             if debug:
                 logger.debug("Auto-Timeout requested, using: %s" % timeout_sec)
 
-        stas_without_ip4s = {}
-        stas_without_ip6s = {}
-
-        sec_elapsed = 0
-        start_time = int(time.time())
-        # logger.info(station_list)
-        waiting_states = ["0.0.0.0", "NA", "", 'DELETED', 'AUTO']
-        if (station_list is None) or (len(station_list) < 1):
-            logger.critical("wait_for_ip: expects non-empty list of ports")
-            raise ValueError("wait_for_ip: expects non-empty list of ports")
-
-        wait_more = True
-        while wait_more:
-            wait_more = False
-            stas_without_ip4s = {}
-            stas_without_ip6s = {}
-
-            for sta_eid in station_list:
-                eid = self.name_to_eid(sta_eid)
-
-                response = super().json_get("/port/%s/%s/%s?fields=alias,ip,port+type,ipv6+address" %
-                                            (eid[0], eid[1], eid[2]))
-                # logger.info(pformat(response))
-
-                if (response is None) or ("interface" not in response):
-                    logger.info("station_list: incomplete response for eid: %s:  wait longer" % sta_eid)
-                    logger.info(pformat(response))
-                    wait_more = True
-                    break
-
-                if ipv4:
-                    v = response['interface']
-                    if v['ip'] in waiting_states:
-                        wait_more = True
-                        stas_without_ip4s[sta_eid] = True
-                        if debug:
-                            logger.debug("Waiting for port %s to get IPv4 Address try %s / %s" % (sta_eid, sec_elapsed, timeout_sec))
-                    else:
-                        if debug:
-                            logger.debug("Found IP: %s on port: %s" % (v['ip'], sta_eid))
-
-                if ipv6:
-                    v = response['interface']
-                    # logger.info(v)
-                    ip6a = v['ipv6_address']
-                    if ip6a != 'DELETED' and not ip6a.startswith('fe80') and ip6a != 'AUTO':
-                        if debug:
-                            logger.debug("Found IPv6: %s on port: %s" % (ip6a, sta_eid))
-                    else:
-                        stas_without_ip6s[sta_eid] = True
-                        wait_more = True
-                        if debug:
-                            logger.debug("Waiting for port %s to get IPv6 Address try %s / %s, reported: %s." % (sta_eid, sec_elapsed, timeout_sec, ip6a))
-
-            # Check if we need to wait more but timed out. Otherwise, continue polling
-            cur_time = int(time.time())
-            if wait_more and (cur_time - start_time) > timeout_sec:
-                break  # Timed out. Exit while loop
-            else:
-                sec_elapsed += 1
+        timings = {}
+        rv = LFUtils.wait_until_ports_have_ip(base_url=self.lfclient_url,
+                                              port_list=station_list,
+                                              ipv4=ipv4,
+                                              ipv6=ipv6,
+                                              timeout_sec=timeout_sec,
+                                              interval_sec=interval_sec,
+                                              timings=timings,
+                                              debug=debug)
+        if ip_timings is not None:
+            ip_timings.update(timings)
 
         # If not all ports got IP addresses before timeout, and debugging is enabled, then
         # add logging.
-        if len(stas_without_ip4s) + len(stas_without_ip6s) > 0:
+        if not rv:
             if debug:
-                if len(stas_without_ip4s) > 0:
-                    logger.info('%s did not acquire IPv4 addresses' % stas_without_ip4s.keys())
-                if len(stas_without_ip6s) > 0:
-                    logger.info('%s did not acquire IPv6 addresses' % stas_without_ip6s.keys())
+                for family, reached in timings.items():
+                    missing = [eid for eid in reached if reached[eid] is None]
+                    if missing:
+                        logger.info('%s did not acquire %s addresses' % (missing, family))
                 port_info = self.dump_all_port_info()
                 logger.debug(pformat(port_info))
             return False
-        else:
-            if debug:
-                logger.debug("Found IPs for all requested ports.")
-            return True
+        if debug:
+            logger.debug("Found IPs for all requested ports.")
+            for family, reached in timings.items():
+                logger.debug("%s acquisition times: %s" % (family, LFUtils.time_distribution(reached.values())))
+        return True
 
     def get_curr_num_ips(self, num_sta_with_ips=0, station_list=None, ipv4=True, ipv6=False, debug=False):
         if debug:
@@ -1102,6 +1072,18 @@ class Realm(LFCliBase):
     def find_new_events(self, previous_event_id):
         return self.json_get('/events/since/%s' % previous_event_id)
 
+    def batch(self, max_workers=CommandBatch.Default_Max_Workers, debug_=None):
+        """
+        Queue CLI-JSON commands and post them concurrently when the batch is flushed,
+        which happens when a `with realm.batch() as batch:` block exits.
+        :param max_workers: number of commands posted at the same time
+        :param debug_: turn on debugging output
+        :return: CommandBatch
+        """
+        if debug_ is None:
+            debug_ = self.debug
+        return CommandBatch(local_realm=self, max_workers=max_workers, debug=debug_)
+
     def new_station_profile(self, ipv6=False):
         return StationProfile(self.lfclient_url, local_realm=self, debug_=self.debug, ipv6=ipv6, up=False)
 
@@ -481,7 +481,12 @@ class StationProfile:
                use_radius=False,
                hs20_enable=False,
                sleep_time=0.02,
-               timeout=300):
+               timeout=300,
+               batch_workers=0):
+        """
+        :param batch_workers: when above zero, queue the add_sta/set_port/set_wifi_* commands
+        and post them with this many concurrent requests instead of one at a time with pauses
+        """
         if debug:
             logger.debug('Start station_profile.create')
             logger.debug(pformat('Current ports:{ports}'.format(ports=LFRequest.LFRequest(self.lfclient_url + '/ports', debug_=debug))))
@@ -585,6 +590,9 @@ class StationProfile:
 
         # track the names of stations in case we have stations added multiple times
         finished_sta = []
+        batch = None
+        if batch_workers and not dry_run:
+            batch = self.local_realm.batch(max_workers=batch_workers, debug_=debug)
 
         for eidn in my_sta_eids:
             if eidn in self.station_names:
@@ -622,6 +630,20 @@ class StationProfile:
                 if debug:
                     logger.debug("dry run: not creating {eidn} ".format(eidn=eidn))
                 continue
+            if batch is not None:
+                # commands for one station stay in order, stations are posted concurrently
+                batch.add("/cli-json/add_sta", self.add_sta_data, key=eidn, raw=True)
+                batch.add("/cli-json/set_port", self.set_port_data, key=eidn, raw=True)
+                for modified, uri, data in ((self.wifi_extra_data_modified, "/cli-json/set_wifi_extra", self.wifi_extra_data),
+                                            (self.wifi_extra2_data_modified, "/cli-json/set_wifi_extra2", self.wifi_extra2_data),
+                                            (self.wifi_txo_data_modified, "/cli-json/set_wifi_txo", self.wifi_txo_data)):
+                    if modified:
+                        data["resource"] = radio_resource
+                        data["port"] = name
+                        batch.add(uri, data, key=eidn, raw=True)
+                finished_sta.append(eidn)
+                self.station_names.append("%s.%s.%s" % (radio_shelf, radio_resource, name))
+                continue
             if debug:
                 logger.debug('Timestamp: {time_}'.format(time_=(time.time() * 1000)))
                 logger.debug("- 3264 - ## {eidn} ##  add_sta_r.jsonPost - - - - - - - - - - - - - - - - - - ".format(eidn=eidn))
@@ -658,6 +680,11 @@ class StationProfile:
             self.station_names.append("%s.%s.%s" % (radio_shelf, radio_resource, name))
             time.sleep(sleep_time)
 
+        if batch is not None:
+            batch.flush()
+            if batch.get_errors():
+                logger.error("StationProfile.create: {num} station commands failed".format(num=len(batch.get_errors())))
+
         logger.debug('StationProfile.create debug: {port}'.format(port=pformat(self.local_realm.json_get('/port/'))))
         logger.debug("- ~3287 - waitUntilPortsAppear - - - - - - - - - - - - - - - - - - ")
 
@@ -0,0 +1,640 @@
+#!/usr/bin/env python3
+"""
+Batch versions of the 802.11a/b/g, 802.11n and 802.11ac capacity calculators of
+wlan_theoretical_sta.py.
+
+abg11_batch(), n11_batch() and ac11_batch() take the parameters a capacity sweep varies
+(PHY rate or MCS, spatial streams, channel width, guard interval, frame size, A-MPDU and
+A-MSDU aggregation, CWmin and client count) as scalars or arrays and broadcast them
+against each other. They return a dict of NumPy arrays, one per theoretical result:
+
+    results = wlan_theoretical_batch.ac11_batch(mcs=np.arange(10)[:, None], nss=[1, 2, 3, 4],
+                                                bw_mhz=80, gi_ns=400, clients=[[1], [10]])
+    results["mac_payload_goodput_mbps"]  -> array of shape (2, 10, 4)
+
+The station settings (traffic type, encryption, QoS, basic rate set, PLCP, RTS/CTS ...)
+are single values, given as the strings the scalar calculators take. The scalar
+calculators report 1, 2, 5, 10, 20, 50 and 100 clients; here any client count can be
+given. Results the scalar calculators report as "N/A", and parameter combinations they
+do not define, are NaN.
+
+cross_check() runs the scalar calculators on random scenarios and returns the results
+that differ from the batch results:
+
+    ./wlan_theoretical_batch.py --samples 200
+"""
+import argparse
+import importlib
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../")))
+
+phy_rates = importlib.import_module("py-json.phy_rates")
+
+SIFS_US = 16.0
+DIFS_US = 34.0
+SLOT_US = 9.0
+
+# client counts the scalar calculators report
+CLIENT_COUNTS = (1, 2, 5, 10, 20, 50, 100)
+# largest voice call range whose call capacity is read at each of CLIENT_COUNTS
+VOICE_CALL_RANGES = (1, 2, 5, 10, 20, 50)
+
+# 802.11a/b/g rates, as named in the basic rate set, and the rate a station without a
+# basic rate set uses for control frames when it sends data at that rate or faster
+ABG_RATE_NAMES = ("1", "2", "5.5", "11", "6", "9", "12", "18", "24", "36", "48", "54")
+ABG_RATES = (1, 2, 5.5, 11, 6, 9, 12, 18, 24, 36, 48, 54)
+ABG_MANDATORY_RATES = (1, 2, 5.5, 11, 6, 6, 12, 12, 24, 24, 24, 24)
+DSSS_RATE_NAMES = ABG_RATE_NAMES[:4]
+DSSS_RATES = ABG_RATES[:4]
+OFDM_RATE_NAMES = ABG_RATE_NAMES[4:]
+OFDM_RATES = ABG_RATES[4:]
+OFDM_MANDATORY_RATES = ABG_MANDATORY_RATES[4:]
+
+# non-HT reference rate, HT-LTFs and BCC encoders of each HT MCS
+HT_NON_HT_RATES = np.array([6, 12, 18, 24, 36, 48, 54, 54] * 4)
+HT_LTFS = np.array([0, 1, 3, 3])
+HT_ENCODERS = np.array([1] * 21 + [2] * 3 + [1] * 4 + [2] * 4)
+
+# non-HT reference rate of each VHT MCS, VHT-LTFs of 1-4 spatial streams and
+# BCC encoders by [spatial streams - 1, channel width index * 10 + MCS]
+VHT_NON_HT_RATES = np.array([6, 12, 18, 24, 36, 48, 54, 54, 54, 54])
+VHT_LTFS = np.array([1, 2, 4, 4])
+VHT_BANDWIDTHS_MHZ = (20, 40, 80)
+VHT_ENCODERS = np.array([
+    [1] * 30,
+    [1] * 21 + [2] * 3 + [1] * 3 + [2] * 3,
+    [1] * 21 + [2] * 3 + [1] + [2] * 4 + [3],
+    [1] * 18 + [2] * 2 + [1] * 4 + [2] * 3 + [3] * 3,
+])
+
+
+def _encrypt_hdr(encryption):
+    """ :return: bytes the encryption adds to a MAC frame """
+    if "None" in encryption:
+        return 0
+    if "WEP" in encryption:
+        return 8
+    if "TKIP" in encryption:
+        return 20
+    return 16
+
+
+def _codec(codec_type):
+    """ :return: (IP packet size, frames per second) of a voice codec """
+    if "G.711" in codec_type:
+        return 200, 100
+    if "G.723" in codec_type:
+        return 60, 67
+    if "G.729" in codec_type:
+        return 60, 100
+    return 0, 0
+
+
+def _plcp(plcp):
+    """ :return: 1 for mixed mode, 2 for greenfield """
+    if "Mixed" in plcp:
+        return 1
+    if "Greenfield" in plcp:
+        return 2
+    raise ValueError("PLCP must be Mixed or Greenfield, not {plcp}".format(plcp=plcp))
+
+
+def _control_rate(non_ht_rate, bss_basic_rate):
+    """
+    PHY rate of the control frames of HT and VHT stations
+    :param non_ht_rate: array of non-HT reference rates of the data MCS
+    :param bss_basic_rate: basic rate set of the BSS
+    """
+    no_ofdm_basic_rate = not any(name in bss_basic_rate for name in OFDM_RATE_NAMES)
+    control_rate = np.full(non_ht_rate.shape, 6.0)
+    for name, rate, fallback in zip(OFDM_RATE_NAMES, OFDM_RATES, OFDM_MANDATORY_RATES):
+        if name in bss_basic_rate:
+            allowed = rate
+        else:
+            allowed = fallback if no_ofdm_basic_rate else 0
+        control_rate = np.maximum(control_rate, np.where(non_ht_rate >= rate, allowed, 0))
+    return control_rate
+
+
+def _ofdm_frame_us(byte_count, rate):
+    """ time of a control frame sent at an OFDM rate, without the PLCP header """
+    return np.trunc((byte_count * 8 + 22 + rate * 4 - 1) / (rate * 4)) * 4
+
+
+def _voice_calls(base_interval, backoff, rate_factor, codec_frame_rate, round_frame_rate=False):
+    """
+    Maximum bidirectional voice calls: the frame rate is read at the client count
+    of the voice call range of one client
+    :param base_interval: frame interval without the mean backoff, usec
+    :param backoff: mean backoff of one client, usec
+    :param rate_factor: frames delivered per PPDU
+    :param round_frame_rate: round the frame rate before dividing, as the 802.11a/b/g calculator does
+    """
+    if not codec_frame_rate:
+        return np.full(np.shape(base_interval), np.nan)
+    voice_call_range = np.rint(1000000 / (base_interval + backoff / 1) / codec_frame_rate)
+    clients = np.array(CLIENT_COUNTS)[np.searchsorted(VOICE_CALL_RANGES, voice_call_range)]
+    frame_rate = 1000000 / (base_interval + backoff / clients) * rate_factor
+    if round_frame_rate:
+        frame_rate = np.rint(frame_rate)
+    return frame_rate / codec_frame_rate
+
+
+def abg11_batch(phy_rate_mbps=54,
+                mac_frame=1518,
+                clients=1,
+                cwmin=None,
+                traffic_type="Data",
+                encryption="None",
+                qos="No",
+                basic_rate_set=("1", "2", "5.5", "11", "6", "12", "24"),
+                preamble="Short",
+                slot="Short",
+                codec_type="G.723",
+                rts_cts_handshake="No",
+                cts_to_self="No"):
+    """
+    Theoretical capacity of 802.11a/b/g stations, like abg11_calculator
+    :param phy_rate_mbps: PHY rate of the data frames: 1, 2, 5.5, 11, 6, 9, 12, 18, 24, 36, 48 or 54
+    :param mac_frame: 802.11 MAC frame size of data traffic, bytes
+    :param clients: number of stations sharing the medium
+    :param cwmin: CWmin, None for the default of the PHY rate and basic rate set
+    :param traffic_type: 'Data' or 'Voice'
+    :param encryption: 'None', 'WEP', 'TKIP' or 'CCMP'
+    :param qos: 'Yes' or 'No'
+    :param basic_rate_set: names of the basic rates, like ['1', '2', '5.5', '11']
+    :param preamble: 'Short' or 'Long'
+    :param slot: 'Short' or 'Long'
+    :param codec_type: voice codec: 'G.711', 'G.723' or 'G.729'
+    :param rts_cts_handshake: 'Yes' or 'No'
+    :param cts_to_self: 'Yes' or 'No'
+    :return: dict of arrays: ttxframe_data_us, packet_interval_us, max_frame_rate_fps, max_offered_load_mbps,
+             offered_load_per_client_mbps, offered_load_8023_mbps, ip_throughput_mbps, voice_calls
+    """
+    phy_rate, mac_frame, clients = np.broadcast_arrays(np.asarray(phy_rate_mbps, dtype=float),
+                                                       np.asarray(mac_frame, dtype=float),
+                                                       np.asarray(clients, dtype=float))
+    valid = np.isin(phy_rate, ABG_RATES)
+    # compute invalid entries at 54 Mbps and blank them at the end
+    phy_rate = np.where(valid, phy_rate, 54.0)
+    dsss = np.isin(phy_rate, DSSS_RATES)
+    short_slot = "Short" in slot
+
+    encrypt_hdr = _encrypt_hdr(encryption)
+    qos_hdr = 2 if "Yes" in qos else 0
+    ip_packet = np.trunc(mac_frame) - 36 - encrypt_hdr - qos_hdr
+    ethernet_frame = np.maximum(mac_frame - 24 - 8 + 14 - encrypt_hdr - qos_hdr, 64)
+
+    # PHY rate of the control frames
+    if len(basic_rate_set) > 0:
+        control_rate = np.where(dsss, 1.0, 6.0)
+        for name, rate in zip(ABG_RATE_NAMES, ABG_RATES):
+            if name in basic_rate_set:
+                control_rate = np.maximum(control_rate, np.where(phy_rate >= rate, rate, 0))
+    else:
+        control_rate = np.zeros(phy_rate.shape)
+        for rate, mandatory in zip(ABG_RATES, ABG_MANDATORY_RATES):
+            usable = (phy_rate < 12) if rate in DSSS_RATES else (phy_rate >= 6)
+            control_rate = np.maximum(control_rate, np.where(usable & (phy_rate >= rate), mandatory, 0))
+    dsss_control = np.isin(control_rate, DSSS_RATES)
+
+    if cwmin is None:
+        dsss_basic_only = any(name in basic_rate_set for name in DSSS_RATE_NAMES) and \
+            not any(name in basic_rate_set for name in OFDM_RATE_NAMES)
+        cwmin = np.where(dsss | dsss_basic_only, 31, 15)
+    cwmin = np.asarray(cwmin, dtype=float)
+
+    codec_ip_packet, codec_frame_rate = _codec(codec_type)
+    if "Data" in traffic_type:
+        mac_mpdu = np.trunc(mac_frame)
+    else:
+        mac_mpdu = np.full(phy_rate.shape, float(codec_ip_packet + 28 + encrypt_hdr + qos_hdr + 8))
+
+    preamble_us = 96.0 if "Short" in preamble else 192.0
+    # keep the divisions defined where a rate is 0, those entries are not selected
+    control_divisor = np.where(control_rate > 0, control_rate, 1)
+    ack_us = np.where(dsss_control, 14 * 8 / control_divisor + preamble_us,
+                      _ofdm_frame_us(14, control_divisor) + 20)
+    sifs_us = np.where(dsss, 10.0, 16.0)
+    if ("No" not in rts_cts_handshake) and ("Yes" in rts_cts_handshake):
+        rts_cts_us = np.where(dsss_control, (20 + 14) * 8 / control_divisor + preamble_us,
+                              _ofdm_frame_us(20 + 14, control_divisor) + 2 * 20) + 2 * sifs_us
+    else:
+        rts_cts_us = 0
+    if ("No" not in cts_to_self) and ("Yes" not in rts_cts_handshake):
+        cts_to_self_us = ack_us + sifs_us
+    else:
+        cts_to_self_us = 0
+    difs_us = np.where(dsss | (not short_slot), 50.0, 34.0)
+    backoff_us = cwmin * np.where(dsss | (not short_slot), 20, 9) / 2
+
+    nbits = mac_mpdu * 8
+    ndbps = phy_rate * 4
+    ttxframe_data = np.where(dsss, nbits / phy_rate + preamble_us,
+                             np.trunc((nbits + 22 + ndbps) / ndbps) * 4 + 20.0)
+
+    base_interval = ttxframe_data + sifs_us + ack_us + difs_us + rts_cts_us + cts_to_self_us
+    packet_interval = base_interval + backoff_us / clients
+    frame_rate = 1000000 / packet_interval
+    max_offered_load = frame_rate * nbits / 1000000
+
+    if "Data" in traffic_type:
+        voice_calls = np.full(phy_rate.shape, np.nan)
+    else:
+        voice_calls = _voice_calls(base_interval, backoff_us, 1, codec_frame_rate, round_frame_rate=True)
+
+    results = {
+        "ttxframe_data_us": ttxframe_data,
+        "packet_interval_us": packet_interval,
+        "max_frame_rate_fps": frame_rate,
+        "max_offered_load_mbps": max_offered_load,
+        "offered_load_per_client_mbps": max_offered_load / clients,
+        "offered_load_8023_mbps": frame_rate * ethernet_frame * 8 / 1000000,
+        "ip_throughput_mbps": np.where(ip_packet >= 20, frame_rate * ip_packet * 8 / 1000000, np.nan),
+        "voice_calls": voice_calls,
+    }
+    return {name: np.where(valid, np.broadcast_to(value, valid.shape), np.nan) for name, value in results.items()}
+
+
+def _aggregate_results(ttxframe_data, control_rate, rts_cts_us, cts_to_self_us, mac_mpdu, msdu, ampdu, amsdu,
+                       clients, cwmin, codec_frame_rate, valid):
+    """ results of the HT and VHT calculators from the data frame time and frame sizes """
+    ack_us = _ofdm_frame_us(14, control_rate) + 20
+    block_ack_us = _ofdm_frame_us(32, control_rate) + 20
+    use_block_ack = ampdu != 0
+    ack_overhead = np.where(use_block_ack, 0, SIFS_US + ack_us)
+    block_ack_overhead = np.where(use_block_ack, SIFS_US + block_ack_us, 0)
+    backoff_us = np.trunc(cwmin) * SLOT_US / 2
+
+    base_interval = rts_cts_us + cts_to_self_us + ttxframe_data + ack_overhead + block_ack_overhead + DIFS_US
+    ppdu_interval = base_interval + backoff_us / clients
+    ppdu_rate = 1000000 / ppdu_interval
+    mpdus_per_ppdu = np.where(ampdu > 0, ampdu, 1)
+    msdus_per_mpdu = np.where(amsdu > 0, amsdu, 1)
+    mpdu_rate = mpdus_per_ppdu * ppdu_rate
+    msdu_rate = msdus_per_mpdu * mpdu_rate
+    goodput = msdu * 8 * msdu_rate / 1000000
+    ip_packet = msdu - 8
+    ip_valid = ip_packet >= 20
+    ethernet_frame = np.maximum(ip_packet + 18, 64)
+
+    if codec_frame_rate is None:
+        voice_calls = np.full(valid.shape, np.nan)
+    else:
+        voice_calls = _voice_calls(base_interval, backoff_us, mpdus_per_ppdu * msdus_per_mpdu, codec_frame_rate)
+
+    results = {
+        "ttxframe_data_us": ttxframe_data,
+        "mac_ppdu_interval_us": ppdu_interval,
+        "max_ppdu_rate_fps": ppdu_rate,
+        "max_mpdu_rate_fps": mpdu_rate,
+        "max_msdu_rate_fps": msdu_rate,
+        "mac_frame_data_rate_mbps": mpdu_rate * mac_mpdu * 8 / 1000000,
+        "mac_payload_goodput_mbps": goodput,
+        "goodput_per_client_mbps": goodput / clients,
+        "offered_load_8023_mbps": np.where(ip_valid, msdu_rate * ethernet_frame * 8 / 1000000, np.nan),
+        "ip_goodput_mbps": np.where(ip_valid, msdu_rate * ip_packet * 8 / 1000000, np.nan),
+        "voice_calls": voice_calls,
+    }
+    return {name: np.where(valid, np.broadcast_to(value, valid.shape), np.nan) for name, value in results.items()}
+
+
+def _mac_mpdu_size(traffic_type, mac_mpdu_size, amsdu, codec_ip_packet, qos_hdr, encrypt_hdr):
+    """ MAC MPDU size of data traffic, or of voice frames with amsdu IP packets each """
+    if "Data" in traffic_type:
+        return np.trunc(mac_mpdu_size)
+    voice_mpdu = codec_ip_packet + 28 + qos_hdr + encrypt_hdr + 8
+    return np.where(amsdu == 0, voice_mpdu,
+                    np.trunc((voice_mpdu + amsdu * (14 + 3)) / np.where(amsdu > 0, amsdu, 1)))
+
+
+def _msdu_size(mac_mpdu, amsdu, qos_hdr, encrypt_hdr):
+    """ MSDU size before the rounding of each calculator """
+    return np.where(amsdu == 0, mac_mpdu - 28 - qos_hdr - encrypt_hdr,
+                    (mac_mpdu - 28 - qos_hdr - encrypt_hdr - amsdu * (14 + 3)) / np.where(amsdu > 0, amsdu, 1))
+
+
+def n11_batch(mcs=7,
+              bw_mhz=40,
+              gi_ns=400,
+              mac_mpdu_size=1518,
+              ampdu=42,
+              amsdu=0,
+              clients=1,
+              cwmin=15,
+              traffic_type="Data",
+              encryption="None",
+              qos="Yes",
+              bss_basic_rate=("1", "2", "5.5", "11", "6", "12", "24"),
+              codec_type="G.711",
+              plcp="Mixed",
+              rts_cts_handshake="No",
+              cts_to_self="No"):
+    """
+    Theoretical capacity of 802.11n stations, like n11_calculator
+    :param mcs: HT MCS 0-31, MCS 8-31 are MCS 0-7 on 2, 3 and 4 spatial streams
+    :param bw_mhz: channel width: 20 or 40
+    :param gi_ns: guard interval: 400 or 800
+    :param mac_mpdu_size: MAC MPDU size of data traffic, bytes
+    :param ampdu: MAC frames per A-MPDU, 0 for no A-MPDU
+    :param amsdu: IP packets per A-MSDU, 0 for no A-MSDU
+    :param clients: number of stations sharing the medium
+    :param cwmin: CWmin
+    :param traffic_type: 'Data' or 'Voice'
+    :param encryption: 'None', 'WEP', 'TKIP' or 'CCMP'
+    :param qos: 'Yes' or 'No'
+    :param bss_basic_rate: names of the BSS basic rates, like ['6', '12', '24']
+    :param codec_type: voice codec: 'G.711', 'G.723' or 'G.729'
+    :param plcp: 'Mixed' or 'Greenfield'
+    :param rts_cts_handshake: 'Yes' or 'No'
+    :param cts_to_self: 'Yes' or 'No'
+    :return: dict of arrays: ttxframe_data_us, mac_ppdu_interval_us, max_ppdu_rate_fps, max_mpdu_rate_fps,
+             max_msdu_rate_fps, mac_frame_data_rate_mbps, mac_payload_goodput_mbps, goodput_per_client_mbps,
+             offered_load_8023_mbps, ip_goodput_mbps, voice_calls
+    """
+    mcs, bw_mhz, gi_ns, mac_mpdu_size, ampdu, amsdu, clients, cwmin = np.broadcast_arrays(
+        np.asarray(mcs, dtype=int), np.asarray(bw_mhz, dtype=int), np.asarray(gi_ns, dtype=int),
+        np.asarray(mac_mpdu_size, dtype=float), np.asarray(ampdu, dtype=int), np.asarray(amsdu, dtype=int),
+        np.asarray(clients, dtype=float), np.asarray(cwmin, dtype=float))
+    valid = (mcs >= 0) & (mcs < 32) & np.isin(bw_mhz, (20, 40)) & np.isin(gi_ns, (400, 800)) & \
+        (ampdu >= 0) & (amsdu >= 0)
+    # compute invalid entries with MCS 0 and blank them at the end
+    mcs = np.where(valid, mcs, 0)
+    bw_mhz = np.where(valid, bw_mhz, 20)
+    plcp_configuration = _plcp(plcp)
+
+    control_rate = _control_rate(HT_NON_HT_RATES[mcs], bss_basic_rate)
+    qos_hdr = np.where(("Yes" in qos) | (amsdu > 1), 2, 0)
+    encrypt_hdr = _encrypt_hdr(encryption)
+    codec_ip_packet, codec_frame_rate = _codec(codec_type)
+    mac_mpdu = _mac_mpdu_size(traffic_type, mac_mpdu_size, amsdu, codec_ip_packet, qos_hdr, encrypt_hdr)
+    msdu = _msdu_size(mac_mpdu, amsdu, qos_hdr, encrypt_hdr)
+    # negative sizes with two or more digits round down, as the calculator does
+    msdu = np.trunc(msdu) - ((msdu < 0) & (np.trunc(msdu) <= -10))
+
+    tppdu_fixed = (36.0 if plcp_configuration == 1 else 24.0) + 4 * HT_LTFS[mcs // 8]
+    data_bits = np.trunc(phy_rates.data_bits_per_symbol("HT", mcs, bw_mhz)) * (mcs // 8 + 1)
+    mpdu_pad = np.where(ampdu == 0, 0, (4 - mac_mpdu % 4) % 4)
+    nbits = np.where(ampdu == 0, mac_mpdu * 8, ((mac_mpdu + 4) * ampdu + mpdu_pad * (ampdu - 1)) * 8)
+    short_gi = (gi_ns == 400) & (((mcs > 7) & (plcp_configuration == 2)) | (plcp_configuration == 1))
+    tsymbol = np.where(short_gi, 3.6, 4.0)
+    offset = np.where(bw_mhz == 40, 6 * HT_ENCODERS[mcs], 6)
+    ttxframe_data = np.round(tppdu_fixed + np.trunc((16 + offset + nbits + data_bits - 1) / data_bits) * tsymbol, 2)
+
+    if "Yes" in rts_cts_handshake:
+        rts_cts_us = np.where(bw_mhz == 20, 2 * 20 + 4 * np.trunc((22 + (20 + 14) * 8 + 24 * 4 - 1) / (24 * 4)),
+                              2 * 20 + np.trunc((22 + (20 + 14) * 8 + 24 - 1) / 24) * 4.0) + 2 * SIFS_US
+        cts_to_self_us = 0
+    else:
+        rts_cts_us = 0
+        if "Yes" in cts_to_self:
+            cts_to_self_us = np.where(bw_mhz == 20, 20 + 4 * np.trunc((22 + 14 * 8 + 24 * 4 - 1) / (24 * 4)),
+                                      20 + np.trunc((22 + 14 * 8 + 24 - 1) / 24) * 4.0) + SIFS_US
+        else:
+            cts_to_self_us = 0
+
+    return _aggregate_results(ttxframe_data, control_rate, rts_cts_us, cts_to_self_us, mac_mpdu, msdu, ampdu, amsdu,
+                              clients, cwmin, None if "Data" in traffic_type else codec_frame_rate, valid)
+
+
+def ac11_batch(mcs=9,
+               nss=4,
+               bw_mhz=80,
+               gi_ns=400,
+               mac_mpdu_size=1518,
+               ampdu=64,
+               amsdu=0,
+               clients=1,
+               cwmin=15,
+               traffic_type="Data",
+               encryption="None",
+               qos="Yes",
+               bss_basic_rate=("1", "2", "5.5", "11", "6", "12", "24"),
+               plcp="Mixed",
+               rts_cts="No"):
+    """
+    Theoretical capacity of 802.11ac stations, like ac11_calculator. Voice traffic uses G.711.
+    :param mcs: VHT MCS 0-9
+    :param nss: spatial streams 1-4
+    :param bw_mhz: channel width: 20, 40 or 80
+    :param gi_ns: guard interval: 400 or 800
+    :param mac_mpdu_size: MAC MPDU size of data traffic, bytes
+    :param ampdu: MAC frames per A-MPDU, 0 for no A-MPDU
+    :param amsdu: IP packets per A-MSDU, 0 for no A-MSDU
+    :param clients: number of stations sharing the medium
+    :param cwmin: CWmin
+    :param traffic_type: 'Data' or 'Voice'
+    :param encryption: 'None', 'WEP', 'TKIP' or 'CCMP'
+    :param qos: 'Yes' or 'No'
+    :param bss_basic_rate: names of the BSS basic rates, like ['6', '12', '24']
+    :param plcp: 'Mixed' or 'Greenfield', the Codec_Type of ac11_calculator
+    :param rts_cts: 'Yes' for CTS-to-self protection, 'No'
+    :return: dict of arrays, the same as n11_batch()
+    """
+    mcs, nss, bw_mhz, gi_ns, mac_mpdu_size, ampdu, amsdu, clients, cwmin = np.broadcast_arrays(
+        np.asarray(mcs, dtype=int), np.asarray(nss, dtype=int), np.asarray(bw_mhz, dtype=int),
+        np.asarray(gi_ns, dtype=int), np.asarray(mac_mpdu_size, dtype=float), np.asarray(ampdu, dtype=int),
+        np.asarray(amsdu, dtype=int), np.asarray(clients, dtype=float), np.asarray(cwmin, dtype=float))
+    valid = (mcs >= 0) & (mcs < 10) & (nss >= 1) & (nss <= 4) & np.isin(bw_mhz, VHT_BANDWIDTHS_MHZ) & \
+        np.isin(gi_ns, (400, 800)) & (ampdu >= 0) & (amsdu >= 0)
+    # compute invalid entries with MCS 0 on one stream and blank them at the end
+    mcs = np.where(valid, mcs, 0)
+    nss = np.where(valid, nss, 1)
+    bw_mhz = np.where(valid, bw_mhz, 20)
+    plcp_configuration = _plcp(plcp)
+
+    control_rate = _control_rate(VHT_NON_HT_RATES[mcs], bss_basic_rate)
+    qos_hdr = np.where(("Yes" in qos) | (amsdu > 1), 2, 0)
+    encrypt_hdr = _encrypt_hdr(encryption)
+    codec_ip_packet, codec_frame_rate = _codec("G.711")
+    mac_mpdu = _mac_mpdu_size(traffic_type, mac_mpdu_size, amsdu, codec_ip_packet, qos_hdr, encrypt_hdr)
+    msdu = np.trunc(_msdu_size(mac_mpdu, amsdu, qos_hdr, encrypt_hdr))
+    msdu = msdu - (msdu < 0)
+
+    tppdu_fixed = 36 + 4 * VHT_LTFS[nss - 1]
+    ndbps = phy_rates.data_bits_per_symbol("VHT", mcs, bw_mhz, nss=nss)
+    # MCS the standard does not define for this stream count and width
+    valid = valid & ~np.isnan(ndbps)
+    ndbps = np.where(valid, ndbps, 1)
+    short_gi = (gi_ns == 400) & (((mcs > 7) & (plcp_configuration == 2)) | (plcp_configuration == 1))
+    tsymbol = np.where(short_gi, 3.6, 4.0)
+    mpdu_pad = np.where(ampdu == 0, 0, (4 - mac_mpdu % 4) % 4)
+    nbits = np.where(ampdu == 0, mac_mpdu * 8, ((mac_mpdu + 4) * ampdu + mpdu_pad * (ampdu - 1)) * 8)
+    bw_index = np.searchsorted(VHT_BANDWIDTHS_MHZ, bw_mhz)
+    encoders = VHT_ENCODERS[nss - 1, bw_index * 10 + mcs]
+    ttxframe_data = tppdu_fixed + np.trunc((16 + 6 * encoders + nbits + ndbps - 1) / ndbps) * tsymbol
+
+    # ac11_calculator never sends RTS/CTS, rts_cts turns on CTS-to-self
+    if ("No" not in rts_cts) and ("Yes" in rts_cts):
+        cts_to_self_us = np.where(bw_mhz == 20, 20 + 4 * np.trunc((22 + 14 * 8 + 24 * 4 - 1) / (24 * 4)),
+                                  20 + np.trunc((22 + 14 * 8 + 24 - 1) / 24) * 4.0) + SIFS_US
+    else:
+        cts_to_self_us = 0
+
+    return _aggregate_results(ttxframe_data, control_rate, 0, cts_to_self_us, mac_mpdu, msdu, ampdu, amsdu,
+                              clients, cwmin, None if "Data" in traffic_type else codec_frame_rate, valid)
+
+
+# scalar calculator attribute: (batch result, decimals the calculator keeps)
+ABG11_RESULTS = {
+    "Client_1_new": ("packet_interval_us", 2),
+    "Max_Frame_Rate_C1_round": ("max_frame_rate_fps", 0),
+    "Max_Offered_Load_C1_new": ("max_offered_load_mbps", 3),
+    "Offered_Load_Per_Client1_new": ("offered_load_per_client_mbps", 3),
+    "Offered_Load_C1_new": ("offered_load_8023_mbps", 3),
+    "IP_Throughput_C1_new": ("ip_throughput_mbps", 3),
+    "Maximum_Bidirectional_Voice_Calls": ("voice_calls", 2),
+}
+N11_RESULTS = {
+    "Client_1_new": ("mac_ppdu_interval_us", 2),
+    "Client_8_new": ("max_ppdu_rate_fps", 2),
+    "Client_15_new": ("max_mpdu_rate_fps", 0),
+    "Client_22_new": ("max_msdu_rate_fps", 0),
+    "Client_29_new": ("mac_frame_data_rate_mbps", 3),
+    "Client_36_new": ("mac_payload_goodput_mbps", 3),
+    "Client_43_new": ("goodput_per_client_mbps", 3),
+    "Client_50_new": ("offered_load_8023_mbps", 3),
+    "Client_57_new": ("ip_goodput_mbps", 3),
+    "Maximum_Bidirectional_Voice_Calls": ("voice_calls", 2),
+}
+
+
+def _differences(station, scenario, calculator, results, index, result_names):
+    """ compare the results of one scalar calculator with one entry of the batch results """
+    differences = []
+    for attribute, (name, decimals) in result_names.items():
+        scalar = getattr(calculator, attribute)
+        batch = float(results[name][index])
+        if scalar == "N/A":
+            same = np.isnan(batch)
+        else:
+            # the calculator formats or rounds its results
+            same = abs(float(scalar) - batch) <= 0.5 * 10 ** -decimals * (1 + 1e-9) + 1e-9 * abs(batch)
+        if not same:
+            differences.append((station, scenario, name, batch, scalar))
+    return differences
+
+
+def cross_check(samples=100, sweep=8, seed=0):
+    """
+    Run the scalar calculators of wlan_theoretical_sta.py on random scenarios and compare
+    their 1-client results with the batch results
+    :param samples: station settings to try per calculator
+    :param sweep: parameter sets computed in one batch call for each station settings
+    :param seed: random seed
+    :return: list of (station, scenario, result, batch value, scalar value) that differ
+    """
+    wlan_theoretical_sta = importlib.import_module("py-json.wlan_theoretical_sta")
+    rng = random.Random(seed)
+    differences = []
+    basic_rate_sets = [[], ["1", "2"], ["1", "2", "5.5", "11"], ["6", "12", "24"],
+                       ["1", "2", "5.5", "11", "6", "12", "24"], ["9", "18", "36", "54"]]
+
+    for _ in range(samples):
+        settings = dict(traffic_type=rng.choice(["Data", "Voice"]),
+                        encryption=rng.choice(["None", "WEP", "TKIP", "CCMP"]),
+                        qos=rng.choice(["Yes", "No"]),
+                        basic_rate_set=rng.choice(basic_rate_sets),
+                        preamble=rng.choice(["Short", "Long"]),
+                        slot=rng.choice(["Short", "Long"]),
+                        codec_type=rng.choice(["G.711", "G.723", "G.729"]),
+                        rts_cts_handshake=rng.choice(["Yes", "No"]),
+                        cts_to_self=rng.choice(["Yes", "No"]))
+        sweep_values = dict(phy_rate_mbps=[rng.choice(ABG_RATES) for _ in range(sweep)],
+                            mac_frame=[rng.randint(64, 2346) for _ in range(sweep)])
+        results = abg11_batch(**sweep_values, **settings)
+        for index in range(sweep):
+            scenario = dict(settings, phy_rate_mbps=sweep_values["phy_rate_mbps"][index],
+                            mac_frame=sweep_values["mac_frame"][index])
+            calculator = wlan_theoretical_sta.abg11_calculator(
+                settings["traffic_type"], str(scenario["phy_rate_mbps"]), settings["encryption"], settings["qos"],
+                str(scenario["mac_frame"]), settings["basic_rate_set"], settings["preamble"], settings["slot"],
+                settings["codec_type"], settings["rts_cts_handshake"], settings["cts_to_self"])
+            calculator.calculate()
+            differences += _differences("11abg", scenario, calculator, results, index, ABG11_RESULTS)
+
+    for _ in range(samples):
+        settings = dict(traffic_type=rng.choice(["Data", "Voice"]),
+                        encryption=rng.choice(["None", "WEP", "TKIP", "CCMP"]),
+                        qos=rng.choice(["Yes", "No"]),
+                        bss_basic_rate=rng.choice(basic_rate_sets),
+                        codec_type=rng.choice(["G.711", "G.723", "G.729"]),
+                        plcp=rng.choice(["Mixed", "Greenfield"]),
+                        rts_cts_handshake=rng.choice(["Yes", "No"]),
+                        cts_to_self=rng.choice(["Yes", "No"]))
+        sweep_values = dict(mcs=[rng.randint(0, 31) for _ in range(sweep)],
+                            bw_mhz=[rng.choice([20, 40]) for _ in range(sweep)],
+                            gi_ns=[rng.choice([400, 800]) for _ in range(sweep)],
+                            mac_mpdu_size=[rng.randint(64, 7935) for _ in range(sweep)],
+                            ampdu=[rng.randint(0, 64) for _ in range(sweep)],
+                            amsdu=[rng.randint(0, 20) for _ in range(sweep)],
+                            cwmin=[rng.choice([7, 15, 31]) for _ in range(sweep)])
+        results = n11_batch(**sweep_values, **settings)
+        for index in range(sweep):
+            scenario = dict(settings, **{name: values[index] for name, values in sweep_values.items()})
+            calculator = wlan_theoretical_sta.n11_calculator(
+                settings["traffic_type"], str(scenario["mcs"]), str(scenario["bw_mhz"]), str(scenario["gi_ns"]), "1",
+                settings["encryption"], settings["qos"], str(scenario["amsdu"]), str(scenario["ampdu"]),
+                settings["bss_basic_rate"], str(scenario["mac_mpdu_size"]), settings["codec_type"], settings["plcp"],
+                str(scenario["cwmin"]), settings["rts_cts_handshake"], settings["cts_to_self"])
+            calculator.calculate()
+            differences += _differences("11n", scenario, calculator, results, index, N11_RESULTS)
+
+    for _ in range(samples):
+        settings = dict(traffic_type=rng.choice(["Data", "Voice"]),
+                        encryption=rng.choice(["None", "WEP", "TKIP", "CCMP"]),
+                        qos=rng.choice(["Yes", "No"]),
+                        bss_basic_rate=rng.choice(basic_rate_sets),
+                        plcp=rng.choice(["Mixed", "Greenfield"]),
+                        rts_cts=rng.choice(["Yes", "No"]))
+        sweep_values = dict(mcs=[rng.randint(0, 9) for _ in range(sweep)],
+                            nss=[rng.randint(1, 4) for _ in range(sweep)],
+                            bw_mhz=[rng.choice(VHT_BANDWIDTHS_MHZ) for _ in range(sweep)],
+                            gi_ns=[rng.choice([400, 800]) for _ in range(sweep)],
+                            mac_mpdu_size=[rng.randint(64, 11454) for _ in range(sweep)],
+                            ampdu=[rng.randint(0, 64) for _ in range(sweep)],
+                            amsdu=[rng.randint(0, 20) for _ in range(sweep)],
+                            cwmin=[rng.choice([7, 15, 31]) for _ in range(sweep)])
+        results = ac11_batch(**sweep_values, **settings)
+        for index in range(sweep):
+            scenario = dict(settings, **{name: values[index] for name, values in sweep_values.items()})
+            calculator = wlan_theoretical_sta.ac11_calculator(
+                settings["traffic_type"], str(scenario["mcs"]), str(scenario["nss"]), str(scenario["bw_mhz"]),
+                str(scenario["gi_ns"]), "1", settings["encryption"], settings["qos"], str(scenario["amsdu"]),
+                str(scenario["ampdu"]), settings["bss_basic_rate"], str(scenario["mac_mpdu_size"]), settings["plcp"],
+                str(scenario["cwmin"]), settings["rts_cts"])
+            try:
+                calculator.calculate()
+            except ValueError:
+                # MCS the standard does not define for this stream count and width
+                for name, _ in N11_RESULTS.values():
+                    batch = float(results[name][index])
+                    if not np.isnan(batch):
+                        differences.append(("11ac", scenario, name, batch, "ValueError"))
+                continue
+            differences += _differences("11ac", scenario, calculator, results, index, N11_RESULTS)
+    return differences
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="wlan_theoretical_batch.py",
+                                     description="Compare the batch WLAN capacity calculators with the scalar ones")
+    parser.add_argument("--samples", type=int, default=100, help="station settings to try per calculator")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    differences = cross_check(samples=args.samples, seed=args.seed)
+    for station, scenario, name, batch, scalar in differences:
+        print("{station} {name}: batch {batch} scalar {scalar} {scenario}".format(
+            station=station, name=name, batch=batch, scalar=scalar, scenario=scenario))
+    print("{count} differences".format(count=len(differences)))
+    sys.exit(1 if differences else 0)
+
+
+if __name__ == "__main__":
+    main()
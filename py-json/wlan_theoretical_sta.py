@@ -13,11 +13,38 @@ This Script has three classes :
           2. n11_calculator : It will take all the user input of 802.11n station,calculate Intermediate values and Theoretical values.
           3. ac11_calculator : It will take all the user input of 802.11ac station,calculate Intermediate values and Theoretical values.
 All classes have different functions: input_parameter() that calculates intermediate values and generate theroretical data
+wlan_theoretical_batch.py computes the same theoretical values for arrays of MCS, channel width, frame size, client count ... at once.
 
 """
 
 import argparse
+import importlib
 import json
+import math
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../")))
+
+phy_rates = importlib.import_module("py-json.phy_rates")
+
+
+def ac11_parameter_error(Data_Voice_MCS, spatial, Channel_Bandwidth):
+    """
+    :return: why ac11_calculator cannot compute this MCS, spatial stream count and channel width,
+             None if it can
+    """
+    if Channel_Bandwidth not in ("20", "40", "80"):
+        return "Channel Bandwidth must be 20, 40 or 80 for 11ac, not %s" % Channel_Bandwidth
+    if spatial not in ("1", "2", "3", "4"):
+        return "Spatial Streams must be 1, 2, 3 or 4, not %s" % spatial
+    if Data_Voice_MCS not in [str(mcs) for mcs in range(10)]:
+        return "Data/Voice MCS Index must be 0-9 for 11ac, not %s" % Data_Voice_MCS
+    if math.isnan(float(phy_rates.data_bits_per_symbol("VHT", int(Data_Voice_MCS), int(Channel_Bandwidth),
+                                                       nss=int(spatial)))):
+        return "802.11ac does not define MCS %s with %s spatial streams at %s MHz" \
+            % (Data_Voice_MCS, spatial, Channel_Bandwidth)
+    return None
 
 
 # Class to take all user input (802.11a/b/g Standard)
@@ -699,8 +726,6 @@ class n11_calculator(abg11_calculator):
         Non_HT_Ref = ['6', '12', '18', '24', '36', '48', '54', '54', '6', '12', '18', '24', '36', '48', '54', '54', '6',
                       '12', '18', '24', '36', '48', '54', '54', '6', '12', '18', '24', '36', '48', '54', '54']
         HT_LTFs = ['0', '1', '3', '3']
-        Ndbps_20MHz = ['26', '52', '78', '104', '156', '208', '234', '260']
-        Ndbps_40MHz = ['54', '108', '162', '216', '324', '432', '486', '540']
         Nes = ['1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1',
                '2', '2', '2', '1', '1', '1', '1', '2', '2', '2', '2', ]
 
@@ -972,67 +997,17 @@ class n11_calculator(abg11_calculator):
                                              Allowed_control48, Allowed_control54, 6)
 
         # Ndbps, data bits per symbol (Data)
-
-        def Ndbps_fun():
-            if Data_Voice_MCS_int == 0 or Data_Voice_MCS_int == 8 or Data_Voice_MCS_int == 16 or Data_Voice_MCS_int == 24:
-                Ndbps_20 = Ndbps_20MHz[0]
-                Ndbps_40 = Ndbps_40MHz[0]
-            elif Data_Voice_MCS_int == 1 or Data_Voice_MCS_int == 9 or Data_Voice_MCS_int == 17 or Data_Voice_MCS_int == 25:
-                Ndbps_20 = Ndbps_20MHz[1]
-                Ndbps_40 = Ndbps_40MHz[1]
-            elif Data_Voice_MCS_int == 2 or Data_Voice_MCS_int == 10 or Data_Voice_MCS_int == 18 or Data_Voice_MCS_int == 26:
-                Ndbps_20 = Ndbps_20MHz[2]
-                Ndbps_40 = Ndbps_40MHz[2]
-
-            elif Data_Voice_MCS_int == 3 or Data_Voice_MCS_int == 11 or Data_Voice_MCS_int == 19 or Data_Voice_MCS_int == 27:
-                Ndbps_20 = Ndbps_20MHz[3]
-                Ndbps_40 = Ndbps_40MHz[3]
-            elif Data_Voice_MCS_int == 4 or Data_Voice_MCS_int == 12 or Data_Voice_MCS_int == 20 or Data_Voice_MCS_int == 28:
-                Ndbps_20 = Ndbps_20MHz[4]
-                Ndbps_40 = Ndbps_40MHz[4]
-            elif Data_Voice_MCS_int == 5 or Data_Voice_MCS_int == 13 or Data_Voice_MCS_int == 21 or Data_Voice_MCS_int == 29:
-                Ndbps_20 = Ndbps_20MHz[5]
-                Ndbps_40 = Ndbps_40MHz[5]
-            elif Data_Voice_MCS_int == 6 or Data_Voice_MCS_int == 14 or Data_Voice_MCS_int == 22 or Data_Voice_MCS_int == 30:
-                Ndbps_20 = Ndbps_20MHz[6]
-                Ndbps_40 = Ndbps_40MHz[6]
-            elif Data_Voice_MCS_int == 7 or Data_Voice_MCS_int == 15 or Data_Voice_MCS_int == 23 or Data_Voice_MCS_int == 31:
-                Ndbps_20 = Ndbps_20MHz[7]
-                Ndbps_40 = Ndbps_40MHz[7]
-            Ndbps_20_int = int(Ndbps_20)
-            Ndbps_40_int = int(Ndbps_40)
-            return Ndbps_20_int, Ndbps_40_int
+        # MCS 8-31 repeat MCS 0-7 on 2, 3 and 4 spatial streams
 
         if "20" in self.Channel_Bandwidth:
-
-            if Data_Voice_MCS_int >= 0 and Data_Voice_MCS_int < 8:
-                Ndbps_20_int, Ndbps_40_int = Ndbps_fun()
-                data_bits = Ndbps_20_int * 1
-            if Data_Voice_MCS_int >= 8 and Data_Voice_MCS_int < 16:
-                Ndbps_20_int, Ndbps_40_int = Ndbps_fun()
-                data_bits = Ndbps_20_int * 2
-            if Data_Voice_MCS_int >= 16 and Data_Voice_MCS_int < 24:
-                Ndbps_20_int, Ndbps_40_int = Ndbps_fun()
-                data_bits = Ndbps_20_int * 3
-            if Data_Voice_MCS_int >= 24 and Data_Voice_MCS_int < 32:
-                Ndbps_20_int, Ndbps_40_int = Ndbps_fun()
-                data_bits = Ndbps_20_int * 4
-
-
+            bw_mhz = 20
         elif "40" in self.Channel_Bandwidth:
-
-            if Data_Voice_MCS_int >= 0 and Data_Voice_MCS_int < 8:
-                Ndbps_20_int, Ndbps_40_int = Ndbps_fun()
-                data_bits = Ndbps_40_int * 1
-            if Data_Voice_MCS_int >= 8 and Data_Voice_MCS_int < 16:
-                Ndbps_20_int, Ndbps_40_int = Ndbps_fun()
-                data_bits = Ndbps_40_int * 2
-            if Data_Voice_MCS_int >= 16 and Data_Voice_MCS_int < 24:
-                Ndbps_20_int, Ndbps_40_int = Ndbps_fun()
-                data_bits = Ndbps_40_int * 3
-            if Data_Voice_MCS_int >= 24 and Data_Voice_MCS_int < 32:
-                Ndbps_20_int, Ndbps_40_int = Ndbps_fun()
-                data_bits = Ndbps_40_int * 4
+            bw_mhz = 40
+        else:
+            raise ValueError("Channel Bandwidth must be 20 or 40 for 11n, not %s" % self.Channel_Bandwidth)
+        if 0 <= Data_Voice_MCS_int < 32:
+            data_bits = int(phy_rates.data_bits_per_symbol("HT", Data_Voice_MCS_int, bw_mhz)) \
+                * (Data_Voice_MCS_int // 8 + 1)
 
         # Ndbps, data bits per symbol (Control)
 
@@ -1505,9 +1480,6 @@ class ac11_calculator(n11_calculator):
         # ********************Auxilliary data****************************
 
         HT_LTFs = ['1', '2', '4', '4']
-        Ndbps_20MHz = ['26', '52', '78', '104', '156', '208', '234', '260', '312', '1040']
-        Ndbps_40MHz = ['54', '108', '162', '216', '324', '432', '486', '540', '648', '720']
-        Ndbps_80MHz = ['117', '234', '351', '468', '702', '936', '1053', '1170', '1404', '1560']
         Non_HT_Ref = ['6', '12', '18', '24', '36', '48', '54', '54', '54', '54']
         Nes1 = ['1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1',
                 '1', '1', '1', '1', '1', '1', '1', '1', '1']
@@ -1741,23 +1713,20 @@ class ac11_calculator(n11_calculator):
 
         # c23 VHT Data Rate
         # Ndbps, data bits per symbol (Data)
-        # offset
-        j = 0
-        while True:
-            if Data_Voice_MCS_int == j:
-                if "20" in self.Channel_Bandwidth:
-                    Ndbps_str = Ndbps_20MHz[j]
-                    break
-                elif "40" in self.Channel_Bandwidth:
-                    Ndbps_str = Ndbps_40MHz[j]
-                    break
-                elif "80" in self.Channel_Bandwidth:
-                    Ndbps_str = Ndbps_80MHz[j]
-                    break
-            j = j + 1
-        Ndbps = int(Ndbps_str)
+        if "20" in self.Channel_Bandwidth:
+            bw_mhz = 20
+        elif "40" in self.Channel_Bandwidth:
+            bw_mhz = 40
+        elif "80" in self.Channel_Bandwidth:
+            bw_mhz = 80
+        else:
+            raise ValueError("Channel Bandwidth must be 20, 40 or 80 for 11ac, not %s" % self.Channel_Bandwidth)
+        Ndbps = float(phy_rates.data_bits_per_symbol("VHT", Data_Voice_MCS_int, bw_mhz, nss=spatial_int))
+        if math.isnan(Ndbps):
+            raise ValueError("802.11ac does not define MCS %s with %s spatial streams at %s MHz"
+                             % (Data_Voice_MCS_int, spatial_int, bw_mhz))
 
-        Ndbps_bits_per_symbol_Data = Ndbps * spatial_int
+        Ndbps_bits_per_symbol_Data = int(Ndbps)
 
         # c27 Tsymbol(Data), Data Symbol Period
         if "400" in self.Guard_Interval_value:
@@ -75,7 +75,6 @@ import sys
 import os
 import importlib
 import argparse
-import time
 import logging
 import pandas as pd
 import asyncio
@@ -86,6 +85,7 @@ from collections import defaultdict
 sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../")))
 realm = importlib.import_module("py-json.realm")
 Realm = realm.Realm
+device_readiness = importlib.import_module("py-json.device_readiness")
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(
@@ -487,7 +487,7 @@ class LAPTOPS(Realm):
 
         # Use asyncio.gather to await the completion of all tasks
         await asyncio.gather(*tasks)
-        time.sleep(2)
+        await asyncio.sleep(2)
 
     # add station
     async def add_station(self, port_list=[]):
@@ -571,7 +571,7 @@ class LAPTOPS(Realm):
         # Use asyncio.gather to await the completion of all tasks
         results = await asyncio.gather(*tasks)
         logger.info(results)
-        time.sleep(2)
+        await asyncio.sleep(2)
     # Set Wifi Extra
 
     async def set_wifi_extra(self, port_list=[]):
@@ -897,7 +897,9 @@ class DeviceConfig(Realm):
     def __init__(self, lanforge_ip=None,
                  port=8080, file_name=None,
                  _debug_on=False, csv_name=None, create_csv=False,
-                 wait_time=60
+                 wait_time=60,
+                 config_concurrency=device_readiness.ReadinessPipeline.Default_Max_Concurrency,
+                 config_poll_interval_sec=device_readiness.ReadinessPipeline.Default_Poll_Interval_Sec
                  ):
         super().__init__(lfclient_host=lanforge_ip,
                          debug_=_debug_on)
@@ -906,7 +908,10 @@ class DeviceConfig(Realm):
         self.file_name = file_name
         self.create_csv = create_csv
         self.csv_name = csv_name
+        # longest wait for a device to connect; devices configured at the same time
         self.wait_time = wait_time
+        self.config_concurrency = config_concurrency
+        self.config_poll_interval_sec = config_poll_interval_sec
         # Objects for alptops and adb class
         self.adb_obj = ADB_DEVICES(lanforge_ip=self.lanforge_ip)
         self.laptop_obj = LAPTOPS(lanforge_ip=self.lanforge_ip)
@@ -1499,43 +1504,36 @@ class DeviceConfig(Realm):
         if reboot:
             if (selected_adb_devices != []):
                 await self.adb_obj.reboot_android(port_list=selected_adb_devices)
-                time.sleep(5)
+                await asyncio.sleep(5)
 
             if (selected_laptop_devices != []):
                 await self.laptop_obj.reboot_laptop(port_list=selected_laptop_devices)
-                time.sleep(5)
+                await asyncio.sleep(5)
         if disconnect:
             if (selected_adb_devices != []):
                 await self.adb_obj.forget_all_networks(port_list=selected_adb_devices)
-                time.sleep(10)
+                await asyncio.sleep(10)
             if (selected_laptop_devices != []):
                 await self.laptop_obj.disconnect_wifi(port_list=selected_laptop_devices)
-                time.sleep(10)
+                await asyncio.sleep(10)
         if not reboot and not disconnect:
-            if (selected_adb_devices != []):
-                await self.adb_obj.stop_app(port_list=selected_adb_devices)
-                # await self.adb_obj.forget_all_networks(port_list=selected_adb_devices)
-                await self.adb_obj.configure_wifi(port_list=selected_adb_devices)
-
-                if (selected_laptop_devices == []):
-                    logger.info("WAITING FOR {} seconds".format(self.wait_time))
-                    time.sleep(self.wait_time)
-            if (selected_laptop_devices != []):
-                # if laptop['eap_method']!="" or laptop['eap_method']!= None or laptop['eap_method']!="NA":
-                await self.laptop_obj.rm_station(port_list=selected_laptop_devices)
-                time.sleep(10)
-                # trial for making port up before configuration
-                await self.laptop_obj.set_port_1(port_list=selected_laptop_devices)
-                time.sleep(10)
-                await self.laptop_obj.add_station(port_list=selected_laptop_devices)
-                time.sleep(30)
+            # each device moves on as soon as it is connected, waiting at most wait_time
+            logger.info("WAITING UP TO {} SECONDS FOR CONFIGURATION TO APPLY".format(self.wait_time))
+            pipeline = device_readiness.ReadinessPipeline(json_get=self.json_get,
+                                                          poll_interval_sec=self.config_poll_interval_sec,
+                                                          max_concurrency=self.config_concurrency)
+            configurations = []
+            for device_obj in selected_adb_devices:
+                configurations.append(pipeline.configure_android(self.adb_obj, device_obj, serial=device_obj["serial"],
+                                                                 ssid=device_obj["ssid"],
+                                                                 connect_timeout_sec=self.wait_time))
+            for device_obj in selected_laptop_devices:
                 # check for enterprise configuration
-                await self.laptop_obj.set_wifi_extra(port_list=selected_laptop_devices)
-                time.sleep(10)
-                await self.laptop_obj.set_port(port_list=selected_laptop_devices)
-
-                logger.info("WAITING TOTAL {} SECONDS FOR CONFIGURATION TO APPLY".format(self.wait_time))
-                time.sleep(self.wait_time)
+                configurations.append(pipeline.configure_laptop(self.laptop_obj, device_obj, ssid=device_obj["ssid"],
+                                                                wifi_extra=True,
+                                                                connect_timeout_sec=self.wait_time))
+            await pipeline.run(configurations)
+            pipeline.log_phase_timings()
             return self.monitor_connection(selected_adb_devices, selected_laptop_devices)
 
     def monitor_connection(self, selected_androids, selected_laptops):
@@ -3,8 +3,20 @@
 import sys
 import os
 import argparse
+import csv
+import io
+import itertools
+import logging
+import operator
 import pandas as pd
 
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
 #https://pandas.pydata.org/pandas-docs/stable/user_guide/visualization.html
 #https://queirozf.com/entries/pandas-dataframe-plot-examples-with-matplotlib-pyplot
 
@@ -16,8 +28,218 @@ if sys.version_info[0] != 3:
  
 sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../")))
 
+logger = logging.getLogger(__name__)
+
+
+class CSVSplitter:
+    """
+    Split the columns of a CSV file into several CSV files in one pass.
+
+    The file is read once, chunk_rows rows at a time, so multi-GB longevity results
+    are never held in memory. Each output gets the columns whose names contain any of
+    its substrings, in file order, with the values copied as they are in the input.
+    With columnar_format, a compressed Arrow or Parquet copy of every column is written
+    in the same pass; numeric columns are float64, the others text, as decided by the
+    first chunk. metrics_recorder.read_metrics() loads it.
+
+    Example:
+        splitter = CSVSplitter(csv_file="results_08_14_2020_14_37.csv",
+                               outputs={"results_rx.csv": ["Time", "Monitor", "rx"],
+                                        "results_tx.csv": ["Time", "Monitor", "tx"]},
+                               columnar_format="parquet")
+        splitter.split()
+    """
+    Default_Chunk_Rows = 100000
+    Default_Compression = "zstd"
+    Columnar_Formats = ("arrow", "parquet")
+
+    def __init__(self,
+                 csv_file=None,
+                 outputs=None,
+                 columnar_format=None,
+                 columnar_path=None,
+                 compression=Default_Compression,
+                 chunk_rows=Default_Chunk_Rows):
+        """
+        :param csv_file: CSV file to split, with a header row
+        :param outputs: dict of output CSV file to list of column name substrings
+        :param columnar_format: None, 'arrow' or 'parquet'; requires pyarrow
+        :param columnar_path: columnar file to write, defaults to csv_file with the format as extension
+        :param compression: codec of the columnar copy, 'zstd' or 'lz4' for arrow, also 'snappy', 'gzip' ... for parquet
+        :param chunk_rows: rows read and written at a time
+        """
+        if csv_file is None:
+            raise ValueError("CSVSplitter requires csv_file")
+        if columnar_format:
+            columnar_format = columnar_format.lower()
+            if columnar_format not in self.Columnar_Formats:
+                raise ValueError("CSVSplitter columnar_format must be one of %s, not %s"
+                                 % (", ".join(self.Columnar_Formats), columnar_format))
+            if pyarrow is None:
+                raise ValueError("CSVSplitter columnar_format %s requires pyarrow, try: pip install pyarrow"
+                                 % columnar_format)
+            if columnar_path is None:
+                columnar_path = os.path.splitext(csv_file)[0] + "." + columnar_format
+        if not outputs and not columnar_format:
+            raise ValueError("CSVSplitter requires outputs or columnar_format")
+        if not chunk_rows or int(chunk_rows) < 1:
+            raise ValueError("CSVSplitter chunk_rows must be at least 1")
+        # the outputs are opened for writing before the input is read
+        written = {os.path.realpath(csv_file): csv_file}
+        for output in list(outputs or []) + ([columnar_path] if columnar_format else []):
+            if os.path.realpath(output) in written:
+                raise ValueError("CSVSplitter output %s is the same file as %s"
+                                 % (output, written[os.path.realpath(output)]))
+            written[os.path.realpath(output)] = output
+        self.csv_file = csv_file
+        self.outputs = dict(outputs) if outputs else {}
+        self.columnar_format = columnar_format
+        self.columnar_path = columnar_path
+        self.compression = compression
+        self.chunk_rows = int(chunk_rows)
+        self.header = None
+        # output file: indexes of its columns in the input
+        self.output_columns = {}
+        self.columnar_names = None
+        self.numeric_columns = None
+        self.schema = None
+        self.columnar_writer = None
+        self.columnar_sink = None
+        self.rows = 0
+
+    def _select(self, header):
+        self.header = header
+        for output, substrings in self.outputs.items():
+            self.output_columns[output] = [index for index, column in enumerate(header)
+                                           if any(substr in column for substr in substrings)]
+            if not self.output_columns[output]:
+                logger.warning("CSVSplitter: no column of %s matches %s" % (self.csv_file, substrings))
+
+    def _columnar_names(self):
+        # Arrow needs unique names, number repeated columns like pandas does
+        names = []
+        seen = {}
+        for column in self.header:
+            count = seen.get(column, 0)
+            seen[column] = count + 1
+            names.append(column if count == 0 else "%s.%d" % (column, count))
+        return names
+
+    def _columnar_table(self, lines):
+        # let the C parser type the lines of the chunk, only an empty field is a missing value
+        text_columns = None
+        if self.schema is not None:
+            text_columns = {index: str for index in range(len(self.columnar_names))
+                            if index not in self.numeric_columns}
+        # usecols drops fields past the header and fills short rows, like the CSV outputs
+        width = len(self.columnar_names)
+        dataframe = pd.read_csv(io.StringIO("".join(lines)), header=None, names=range(width), usecols=range(width),
+                                dtype=text_columns, keep_default_na=False, na_values=[""])
+        if self.schema is None:
+            # numeric columns are float64 so a missing value does not change the type,
+            # everything else is text; every chunk then shares the first chunk's schema
+            self.numeric_columns = set(index for index in dataframe.columns
+                                       if pd.api.types.is_numeric_dtype(dataframe[index])
+                                       and not pd.api.types.is_bool_dtype(dataframe[index]))
+            self.schema = pyarrow.schema([(name,
+                                           pyarrow.float64() if index in self.numeric_columns
+                                           else pyarrow.string())
+                                          for index, name in enumerate(self.columnar_names)])
+        data = {}
+        for index, name in enumerate(self.columnar_names):
+            column = dataframe[index]
+            if index in self.numeric_columns:
+                data[name] = pd.to_numeric(column, errors='coerce').astype('float64')
+            else:
+                data[name] = column.where(column.isna(), column.astype(str))
+        return pyarrow.Table.from_pandas(pd.DataFrame(data, columns=self.columnar_names),
+                                         schema=self.schema,
+                                         preserve_index=False)
+
+    def _open_columnar(self):
+        if self.columnar_format == "arrow":
+            self.columnar_sink = pyarrow.OSFile(self.columnar_path, 'wb')
+            options = pyarrow.ipc.IpcWriteOptions(compression=self.compression)
+            self.columnar_writer = pyarrow.ipc.new_stream(self.columnar_sink, self.schema, options=options)
+        else:
+            self.columnar_writer = pyarrow.parquet.ParquetWriter(self.columnar_path, self.schema,
+                                                                 compression=self.compression)
+
+    def split(self):
+        """
+        Read the CSV file and write the outputs
+        :return: number of data rows read
+        """
+        self.rows = 0
+        self.numeric_columns = None
+        self.schema = None
+        self.columnar_sink = None
+        self.columnar_writer = None
+        files = {}
+        # lines the reader consumed for the current chunk, a record may span several
+        lines = []
+
+        def recorded(csv_obj):
+            for line in csv_obj:
+                lines.append(line)
+                yield line
+
+        try:
+            with open(self.csv_file, 'r', newline='') as csv_obj:
+                csv_reader = csv.reader(recorded(csv_obj))
+                header = next(csv_reader, None)
+                if header is None:
+                    raise ValueError("CSVSplitter: %s is empty" % self.csv_file)
+                self._select(header)
+                self.columnar_names = self._columnar_names()
+                width = len(header)
+                writers = {}
+                del lines[:]
+                for output, indexes in self.output_columns.items():
+                    files[output] = open(output, 'w', newline='')
+                    writer = csv.writer(files[output], lineterminator='\n')
+                    writer.writerow([header[index] for index in indexes])
+                    if len(indexes) == 1:
+                        # a slice so the row is still a sequence
+                        writers[output] = (writer, operator.itemgetter(slice(indexes[0], indexes[0] + 1)))
+                    elif indexes:
+                        writers[output] = (writer, operator.itemgetter(*indexes))
+                while True:
+                    rows = [row for row in itertools.islice(csv_reader, self.chunk_rows) if row]
+                    if not rows:
+                        break
+                    # a run cut short can leave a partial last row, pad it to the header
+                    rows = [row if len(row) >= width else row + [""] * (width - len(row)) for row in rows]
+                    for writer, getter in writers.values():
+                        writer.writerows(map(getter, rows))
+                    if self.columnar_format:
+                        table = self._columnar_table(lines)
+                        if self.columnar_writer is None:
+                            self._open_columnar()
+                        self.columnar_writer.write_table(table)
+                    self.rows += len(rows)
+                    del lines[:]
+        finally:
+            for output_file in files.values():
+                output_file.close()
+            if self.columnar_writer is not None:
+                self.columnar_writer.close()
+            if self.columnar_sink is not None:
+                self.columnar_sink.close()
+        written = list(self.outputs) + ([self.columnar_path] if self.columnar_format else [])
+        logger.info("CSVSplitter: %d rows of %s to %s" % (self.rows, self.csv_file, ", ".join(written)))
+        return self.rows
+
+
 class L3CSVParcer():
-    def __init__(self,csv_file):
+    def __init__(self, csv_file, columnar_format=None, outputs=None, chunk_rows=CSVSplitter.Default_Chunk_Rows):
+        """
+        Split a test_l3_longevity results_ CSV file into results_summary_ and results_raw_ files
+        :param csv_file: results_ CSV file
+        :param columnar_format: None, 'arrow' or 'parquet', also write a compressed columnar copy
+        :param outputs: dict of output CSV file to list of column name substrings, replaces the summary and raw files
+        :param chunk_rows: rows read and written at a time
+        """
 
 
         # left this in for testing
@@ -30,20 +252,20 @@ class L3CSVParcer():
                 print(row)'''
 
         include_summary = ['Time epoch','Time','Monitor','least','most','average']
+        include_raw = ['Time epoch','Time','Monitor','LT','MT']
         self.csv_file = csv_file
-        df_s = pd.read_csv(self.csv_file,header = 0, usecols = lambda column : any(substr in column for substr in include_summary))
 
         print('{}'.format(csv_file))
-        csv_file_summary = self.csv_file.replace('results_','results_summary_')
-
-        df_s.to_csv(csv_file_summary, index = False, header=True)
-
-        include_raw = ['Time epoch','Time','Monitor','LT','MT']
-        self.csv_file = csv_file
-        df_r = pd.read_csv(self.csv_file,header = 0, usecols = lambda column : any(substr in column for substr in include_raw))
+        if outputs is None:
+            if 'results_' not in os.path.basename(self.csv_file):
+                raise ValueError("L3CSVParcer: {} has no results_ in its name, give the outputs".format(csv_file))
+            outputs = {self.csv_file.replace('results_','results_summary_'): include_summary,
+                       self.csv_file.replace('results_','results_raw_'): include_raw}
 
-        csv_file_raw = self.csv_file.replace('results_','results_raw_')
-        df_r.to_csv(csv_file_raw, index = False, header=True)
+        # one pass over the file for every output
+        self.splitter = CSVSplitter(csv_file=self.csv_file, outputs=outputs, columnar_format=columnar_format,
+                                    chunk_rows=chunk_rows)
+        self.splitter.split()
 
         '''df_rx_delta = df_r.loc[df['Monitor'] == 'rx_delta']
 
@@ -137,6 +359,13 @@ def main():
 
 
     parser.add_argument('-i','--infile', help="file of csv data", default='longevity_results_08_14_2020_14_37.csv')
+    parser.add_argument('--split', action='append', metavar='OUTFILE=SUBSTR[,SUBSTR...]',
+                        help='write the columns whose names contain a SUBSTR to OUTFILE, may be repeated,\n'
+                             'replaces the results_summary_ and results_raw_ files')
+    parser.add_argument('--columnar_format', choices=CSVSplitter.Columnar_Formats,
+                        help='also write a compressed arrow or parquet copy of the csv file, requires pyarrow')
+    parser.add_argument('--chunk_rows', type=int, default=CSVSplitter.Default_Chunk_Rows,
+                        help='rows read and written at a time, default %(default)s')
     parser.add_argument('--debug', help='--debug:  Enable debugging',default=True)
     parser.add_argument('--help_summary', action="store_true", help='Show summary of what this script does')
 
@@ -155,7 +384,18 @@ This script is no longer supported.
     if args.infile:
         csv_file_name = args.infile
 
-    L3CSVParcer(csv_file_name)
+    outputs = None
+    if args.split:
+        outputs = {}
+        for split in args.split:
+            if '=' not in split:
+                parser.error('--split {} is not OUTFILE=SUBSTR[,SUBSTR...]'.format(split))
+            output, substrings = split.split('=', 1)
+            if output in outputs:
+                parser.error('--split {} is given more than once'.format(output))
+            outputs[output] = substrings.split(',')
+
+    L3CSVParcer(csv_file_name, columnar_format=args.columnar_format, outputs=outputs, chunk_rows=args.chunk_rows)
 
 
 
@@ -79,6 +79,7 @@ sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../")))
 realm = importlib.import_module("py-json.realm")
 Realm = realm.Realm
 interop_connectivity = importlib.import_module("py-json.interop_connectivity")
+device_readiness = importlib.import_module("py-json.device_readiness")
 from lanforge_client.lanforge_api import LFSession  # noqa: 402
 from lanforge_client.lanforge_api import LFJsonCommand  # noqa: 402
 from lanforge_client.lanforge_api import LFJsonQuery  # noqa: 402
@@ -720,9 +721,14 @@ class RealDevice(Realm):
                  _debug_on=False,
                  _exit_on_error=False,
                  all_android=None,
-                 all_laptops=None):
+                 all_laptops=None,
+                 config_concurrency=device_readiness.ReadinessPipeline.Default_Max_Concurrency,
+                 config_poll_interval_sec=device_readiness.ReadinessPipeline.Default_Poll_Interval_Sec):
         super().__init__(lfclient_host=manager_ip,
                          debug_=_debug_on)
+        # devices configured at the same time, and how often their state is polled meanwhile
+        self.config_concurrency = config_concurrency
+        self.config_poll_interval_sec = config_poll_interval_sec
         self.manager_ip = manager_ip
         self.manager_port = port
         self.server_ip = server_ip
@@ -1156,86 +1162,38 @@ class RealDevice(Realm):
         if self.reboot:
             if (selected_androids != []):
                 await self.androids_obj.reboot_android(port_list=selected_androids)
-                time.sleep(5)
+                await asyncio.sleep(5)
             if (selected_laptops != []):
                 await self.laptops_obj.reboot_laptop(port_list=selected_laptops)
-                time.sleep(5)
+                await asyncio.sleep(5)
         if self.disconnect_devices:
             if (selected_androids != []):
                 await self.androids_obj.forget_all_networks(port_list=selected_androids)
-                time.sleep(10)
+                await asyncio.sleep(10)
             if (selected_laptops != []):
                 await self.laptops_obj.disconnect_wifi(port_list=selected_laptops)
-                time.sleep(10)
+                await asyncio.sleep(10)
         # if self.reboot==False and self.disconnect_devices==False:
-        if (selected_androids != []):
-            await self.androids_obj.stop_app(port_list=selected_androids)
-            # await self.androids_obj.forget_all_networks(port_list=selected_androids)
-            await self.androids_obj.configure_wifi(port_list=selected_androids)
-
-            if (selected_laptops == []):
-                logging.info("WAITING FOR 120 seconds")
-                time.sleep(120)
-        if (selected_laptops != []):
-            # if laptop['eap_method']!="" or laptop['eap_method']!= None or laptop['eap_method']!="NA":
-            await self.laptops_obj.rm_station(port_list=selected_laptops)
-            time.sleep(10)
-            # trial for making port up before configuration
-            await self.laptops_obj.set_port_1(port_list=selected_laptops)
-            time.sleep(10)
-            await self.laptops_obj.add_station(port_list=selected_laptops)
-            time.sleep(30)
+        # each device moves on to its next phase as soon as the GUI reports it ready
+        ssids = {'2g': self.ssid_2g, '5g': self.ssid_5g, '6g': self.ssid_6g}
+        pipeline = device_readiness.ReadinessPipeline(json_get=self.json_get,
+                                                      poll_interval_sec=self.config_poll_interval_sec,
+                                                      max_concurrency=self.config_concurrency)
+        configurations = []
+        for android in selected_androids:
+            configurations.append(pipeline.configure_android(self.androids_obj, android, serial=android[2],
+                                                             ssid=ssids.get(android[3]),
+                                                             connect_timeout_sec=120))
+        for laptop in selected_laptops:
             # check for enterprise for enterprise configuration
-            if i:
-                await self.laptops_obj.set_wifi_extra(port_list=selected_laptops)
-                time.sleep(10)
-            await self.laptops_obj.set_port(port_list=selected_laptops)
-            # await self.laptops_obj.set_port(port_list=selected_laptops)
-            # time.sleep(60)
-            # logging.info('Applying the new Wi-Fi configuration. Waiting for 2 minutes for the new configuration to apply.')
-            logging.info("WAITING TOTAL 70 SECONDS FOR CONFIGURATION TO APPLY")
-            time.sleep(70)
-            exclude_laptops_con = []
-            for laptop in selected_laptops:
-                current_laptop_port_data = self.json_get('/port/{}/{}/{}'.format(laptop['shelf'], laptop['resource'], laptop['sta_name']))
-                current_laptop_port_data = current_laptop_port_data['interface']
-                if current_laptop_port_data['down']:
-                    exclude_laptops_con.append(laptop)
-                    continue
-            if exclude_laptops_con != []:
-                logging.debug(exclude_laptops_con)
-                logging.info("WAITING FOR EXTRA 30 SECONDS")
-                time.sleep(30)
-
-            exclude_laptops_1 = []
-            for laptop in selected_laptops:
-                current_laptop_port_data = self.json_get('/port/{}/{}/{}'.format(laptop['shelf'], laptop['resource'], laptop['sta_name']))
-                current_laptop_port_data = current_laptop_port_data['interface']
-                if current_laptop_port_data['down']:
-                    exclude_laptops_1.append(laptop)
-                    continue
-            if (exclude_laptops_1 != []):
-                logging.info("RETRY FOR: ", exclude_laptops_1)
-                await self.laptops_obj.set_port_1(port_list=exclude_laptops_1)
-                time.sleep(10)
-                await self.laptops_obj.add_station(port_list=exclude_laptops_1)
-                time.sleep(30)
-                await self.laptops_obj.set_port(port_list=exclude_laptops_1)
-                time.sleep(60)
-            exclude_laptops_2 = []
-
-            for laptop in selected_laptops:
-                current_laptop_port_data = self.json_get('/port/{}/{}/{}'.format(laptop['shelf'], laptop['resource'], laptop['sta_name']))
-                current_laptop_port_data = current_laptop_port_data['interface']
-                if current_laptop_port_data['down']:
-                    exclude_laptops_2.append(laptop)
-                    continue
-            if (exclude_laptops_2 != []):
-                logging.info("RETRY-2 FOR: ", exclude_laptops_2)
-                await self.laptops_obj.add_station(port_list=exclude_laptops_2)
-                await self.laptops_obj.set_port(port_list=exclude_laptops_2)
-                # await self.laptops_obj.set_port_1(port_list=exclude_laptops_2)
-                time.sleep(60)
+            configurations.append(pipeline.configure_laptop(self.laptops_obj, laptop,
+                                                            ssid=ssids.get(laptop['band']),
+                                                            wifi_extra=bool(laptop.get('ieee80211_' + laptop['band'])),
+                                                            connect_timeout_sec=100,
+                                                            retries=2,
+                                                            retry_timeout_sec=60))
+        await pipeline.run(configurations)
+        pipeline.log_phase_timings()
 
         # for androids
         exclude_androids = []
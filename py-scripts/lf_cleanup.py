@@ -27,6 +27,9 @@ EXAMPLE:
             # This includes names 'phy' (not 'wiphy') and '1.1.eth'
             ./lf_cleanup.py --misc
 
+            # Show what a full cleanup would delete, without deleting anything
+            ./lf_cleanup.py --sanitize --dry_run
+
             # Remove all stations with JSON
             "args": ["--mgr", "192.168.30.12", "--resource", "1", "--sta"]
 
@@ -56,6 +59,10 @@ NOTES:      The script will only cleanup what is present in the GUI. If object c
             is in process but the object is not yet present in the GUI, then this script may need to be run
             multiple times for deletion to take effect.
 
+            All requested object types are read once and deleted in dependency order: CXs, then endpoints,
+            then stations, other virtual ports and bridges. Each step posts its deletes concurrently
+            (--max_workers) and waits up to --timeout seconds for the objects to disappear.
+
 VERIFIED_ON:
             Working date:   03/17/2023
             Build version:  5.4.6
@@ -80,6 +87,7 @@ sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../")))
 LFUtils = importlib.import_module("py-json.LANforge.LFUtils")
 realm = importlib.import_module("py-json.realm")
 Realm = realm.Realm
+cleanup_plan = importlib.import_module("py-json.cleanup_plan")
 logger = logging.getLogger(__name__)
 lf_logger_config = importlib.import_module("py-scripts.lf_logger_config")
 
@@ -93,7 +101,10 @@ class lf_clean(Realm):
                  clean_endp=None,
                  clean_sta=None,
                  clean_port_mgr=None,
-                 clean_misc=None):
+                 clean_misc=None,
+                 dry_run=False,
+                 max_workers=cleanup_plan.CleanupRunner.Default_Max_Workers,
+                 timeout_sec=cleanup_plan.CleanupRunner.Default_Timeout_Sec):
         super().__init__(lfclient_host=host, lfclient_port=port)
 
         self.host = host
@@ -104,6 +115,9 @@ class lf_clean(Realm):
         self.clean_sta = clean_sta
         self.clean_port_mgr = clean_port_mgr
         self.clean_misc = clean_misc
+        self.dry_run = dry_run
+        self.max_workers = max_workers
+        self.timeout_sec = timeout_sec
         self.cxs_done = False
         self.endp_done = False
         self.sta_done = False
@@ -111,79 +125,51 @@ class lf_clean(Realm):
         self.br_done = False
         self.misc_done = False
 
+    def cleanup(self, cxs=False, l3_endp=False, layer4=False, sta=False, port_mgr=False, br=False, misc=False):
+        """
+        Remove the selected object types in one planned pass.
+
+        The cx, endp, layer4 and port tables are read once, then CXs, endpoints,
+        stations, other virtual ports and bridges are removed in that order, each
+        stage posted concurrently and waited on with one query per poll.
+
+        :return: True if objects were left behind, False once all are gone
+        """
+        started = time.monotonic()
+        snapshot = cleanup_plan.CleanupSnapshot(json_get=self.json_get)
+        snapshot.refresh(tables=[table for table, wanted in (("cx", cxs or layer4),
+                                                             ("endp", l3_endp),
+                                                             ("layer4", layer4),
+                                                             ("port", sta or port_mgr or br or misc)) if wanted])
+        plan = cleanup_plan.CleanupPlan(snapshot,
+                                        resources=self.resource,
+                                        cxs=cxs,
+                                        l3_endp=l3_endp,
+                                        layer4=layer4,
+                                        sta=sta,
+                                        port_mgr=port_mgr,
+                                        br=br,
+                                        misc=misc)
+        runner = cleanup_plan.CleanupRunner(local_realm=self,
+                                            max_workers=self.max_workers,
+                                            timeout_sec=self.timeout_sec,
+                                            dry_run=self.dry_run)
+        remaining = runner.run(plan, snapshot)
+        runner.log_report()
+        logger.info("cleanup: {count} objects in {sec:.1f}s, {queries} table reads".format(
+            count=len(plan), sec=time.monotonic() - started, queries=snapshot.queries))
+        if not remaining and not self.dry_run:
+            self.cxs_done = self.cxs_done or cxs
+            self.endp_done = self.endp_done or l3_endp or layer4
+            self.sta_done = self.sta_done or sta
+            self.port_mgr_done = self.port_mgr_done or port_mgr
+            self.br_done = self.br_done or br
+            self.misc_done = self.misc_done or misc
+        return bool(remaining)
+
     def layer4_endp_clean(self):
         """Delete L4-7 endpoints (see the Layer 4-7 tab of the LANforge GUI)."""
-        still_looking_endp = True
-        iterations_endp = 0
-
-        while still_looking_endp and iterations_endp <= 10:
-            iterations_endp += 1
-            logger.debug(f"layer4_endp_clean: iterations_endp: {iterations_endp}")
-            layer4_endp_json = super().json_get("layer4")
-            # logger.info(layer4_endp_json)
-            if layer4_endp_json is not None and 'empty' not in layer4_endp_json:
-                logger.info("Removing old Layer 4-7 endpoints")
-                layer4_endp_json.pop("handler")
-                layer4_endp_json.pop("uri")
-                if 'warnings' in layer4_endp_json:
-                    layer4_endp_json.pop("warnings")
-
-                for name in list(layer4_endp_json):
-                    if name == 'endpoint':
-                        # Single endpoint
-                        if type(layer4_endp_json['endpoint']) is dict:
-                            endp_name = layer4_endp_json['endpoint']['name']
-
-                            # Delete Layer 4-7 cross connection:
-                            req_url = "cli-json/rm_cx"
-                            data = {
-                                "test_mgr": "default_tm",
-                                "cx_name": "CX_" + endp_name
-                            }
-                            logger.info("Removing {endp_name}...".format(endp_name="CX_" + endp_name))
-                            super().json_post(req_url, data)
-
-                            # Delete Layer 4-7 endpoint
-                            req_url = "cli-json/rm_endp"
-                            data = {
-                                "endp_name": endp_name
-                            }
-                            logger.info("Removing {endp_name}...".format(endp_name=endp_name))
-                            super().json_post(req_url, data)
-
-                        # More than one endpoint
-                        else:
-                            for endp_num in layer4_endp_json['endpoint']:
-                                # get L4-Endp name:
-                                for endp_values in endp_num.values():
-                                    endp_name = endp_values['name']
-                                    if endp_name != '':
-                                        # Delete Layer 4-7 cross connections:
-                                        req_url = "cli-json/rm_cx"
-                                        data = {
-                                            "test_mgr": "default_tm",
-                                            "cx_name": "CX_" + endp_name
-                                        }
-                                        logger.info("Removing {endp_name}...".format(endp_name="CX_" + endp_name))
-                                        super().json_post(req_url, data)
-
-                                        # Delete Layer 4-7 endpoint
-                                        req_url = "cli-json/rm_endp"
-                                        data = {
-                                            "endp_name": endp_name
-                                        }
-                                        logger.info("Removing {endp_name}...".format(endp_name=endp_name))
-                                        super().json_post(req_url, data)
-                time.sleep(1)
-            else:
-                logger.info("No further endpoints found")
-                still_looking_endp = False
-                logger.debug(f"clean_endp still_looking_endp {still_looking_endp}")
-
-            if not still_looking_endp:
-                self.endp_done = True
-
-            return still_looking_endp
+        return self.cleanup(layer4=True)
 
     def cxs_clean(self):
         """
@@ -192,51 +178,7 @@ class lf_clean(Realm):
         See the 'Layer-3' and 'L3 Endps' tabs in the LANforge GUI.
         NOTE: Previously this function removed Layer-3 endpoints as well.
         """
-        still_looking_cxs = True
-        iterations_cxs = 1
-
-        while still_looking_cxs and iterations_cxs <= 10:
-            iterations_cxs += 1
-            logger.debug("cxs_clean: iterations_cxs: {iterations_cxs}".format(iterations_cxs=iterations_cxs))
-            cx_json = super().json_get("cx")
-            # endp_json = super().json_get("endp")
-            if cx_json is not None and 'empty' not in cx_json:
-                logger.debug(cx_json.keys())
-                logger.debug("Removing old cross connects")
-
-                # delete L3-CX based upon the L3-Endp name & the resource value from
-                # the e.i.d of the associated L3-Endps
-                cx_json.pop("handler")
-                cx_json.pop("uri")
-                if 'warnings' in cx_json:
-                    cx_json.pop("warnings")
-
-                for cx_name in list(cx_json):
-                    cxs_eid = cx_json[cx_name]['entity id']
-                    cxs_eid_split = cxs_eid.split('.')
-                    resource_eid = str(cxs_eid_split[1])
-                    # logger.info(resource_eid)
-
-                    if resource_eid in self.resource or 'all' in self.resource:
-                        # remove Layer-3 cx:
-                        req_url = "cli-json/rm_cx"
-                        data = {
-                            "test_mgr": "default_tm",
-                            "cx_name": cx_name
-                        }
-                        logger.debug(f"Removing {cx_name}")
-                        super().json_post(req_url, data)
-
-                time.sleep(5)
-            else:
-                logger.info("No further Layer-3 CXs found")
-                still_looking_cxs = False
-                logger.debug(f"clean_cxs still_looking_cxs {still_looking_cxs}")
-
-            if not still_looking_cxs:
-                self.cxs_done = True
-
-            return still_looking_cxs
+        return self.cleanup(cxs=True)
 
     def get_json1(self):
         response = self.json_get("port/all")
@@ -250,136 +192,11 @@ class lf_clean(Realm):
         first cleanup the CX then cleanup its associated Layer-3 endpoints.
         See the 'Layer-3' and 'L3 Endps' tabs in the LANforge GUI.
         """
-        still_looking_endp = True
-        iterations_endp = 0
-
-        while still_looking_endp and iterations_endp <= 10:
-            iterations_endp += 1
-            logger.debug("layer3_endp_clean: iterations_endp: {iterations_endp}".format(iterations_endp=iterations_endp))
-            endp_json = super().json_get("endp")
-            # logger.info(endp_json)
-            if endp_json is not None:
-                logger.debug("Removing old Layer 3 endpoints")
-
-                # Single endpoint
-                if type(endp_json['endpoint']) is dict:
-                    endp_name = endp_json['endpoint']['name']
-                    req_url = "cli-json/rm_endp"
-                    data = {
-                        "endp_name": endp_name
-                    }
-                    # logger.info(data)
-                    logger.debug(f"Removing {endp_name}")
-                    super().json_post(req_url, data)
-
-                # More than one endpoint
-                else:
-                    for name in list(endp_json['endpoint']):
-                        endp_name = list(name)[0]
-                        if name[list(name)[0]]["name"] == '':
-                            continue
-                        req_url = "cli-json/rm_endp"
-                        data = {
-                            "endp_name": endp_name
-                        }
-                        # logger.info(data)
-                        logger.debug(f"Removing {endp_name}")
-                        super().json_post(req_url, data)
-                time.sleep(1)
-            else:
-                logger.info("No further Layer-3 endpoints found")
-                still_looking_endp = False
-                logger.debug(f"layer3_clean_endp still_looking_endp {still_looking_endp}")
-
-            if not still_looking_endp:
-                self.endp_done = True
-
-            return still_looking_endp
+        return self.cleanup(l3_endp=True)
 
     def sta_clean(self):
-        still_looking_sta = True
-        iterations_sta = 0
-
-        while still_looking_sta and iterations_sta <= 10:
-            iterations_sta += 1
-            logger.debug(f"sta_clean: iterations_sta: {iterations_sta}")
-            try:
-                sta_json = super().json_get("/port/?fields=alias")['interfaces']
-                # logger.info(sta_json)
-            except TypeError:
-                # TODO: When would this be the case
-                sta_json = None
-                logger.warning("sta_json set to None")
-
-            # TODO: Refactor this to make common w/ port removal
-            #       And delete on type not on alias
-            # get and remove current stations
-            if sta_json is not None:
-                logger.debug("Removing old stations")
-                for name in list(sta_json):
-                    for alias in list(name):
-                        info = self.name_to_eid(alias)
-                        sta_resource = str(info[1])
-                        if sta_resource in self.resource or 'all' in self.resource:
-                            # logger.info("alias {alias}".format(alias=alias))
-                            if 'sta' in alias:
-                                info = self.name_to_eid(alias)
-                                req_url = "cli-json/rm_vlan"
-                                data = {
-                                    "shelf": info[0],
-                                    "resource": info[1],
-                                    "port": info[2]
-                                }
-                                # logger.info(data)
-                                logger.debug(f"Removing {alias}")
-                                super().json_post(req_url, data)
-                            if 'wlan' in alias:
-                                info = self.name_to_eid(alias)
-                                req_url = "cli-json/rm_vlan"
-                                data = {
-                                    "shelf": info[0],
-                                    "resource": info[1],
-                                    "port": info[2]
-                                }
-                                # logger.info(data)
-                                logger.debug(f"Removing {alias}")
-                                super().json_post(req_url, data)
-
-                            # TODO: This isn't a station type port
-                            if 'moni' in alias:
-                                info = self.name_to_eid(alias)
-                                req_url = "cli-json/rm_vlan"
-                                data = {
-                                    "shelf": info[0],
-                                    "resource": info[1],
-                                    "port": info[2]
-                                }
-                                # logger.info(data)
-                                logger.debug(f"Removing {alias}")
-                                super().json_post(req_url, data)
-
-                            # TODO: Move this to misc cleanup logic
-                            if 'Unknown' in alias:
-                                info = self.name_to_eid(alias)
-                                req_url = "cli-json/rm_vlan"
-                                data = {
-                                    "shelf": info[0],
-                                    "resource": info[1],
-                                    "port": info[2]
-                                }
-                                # logger.info(data)
-                                logger.debug(f"Removing {alias}")
-                                super().json_post(req_url, data)
-                time.sleep(1)
-            else:
-                logger.info("No further stations found")
-                still_looking_sta = False
-                logger.debug(f"clean_sta still_looking_sta {still_looking_sta}")
-
-            if not still_looking_sta:
-                self.sta_done = True
-
-            return still_looking_sta
+        """Delete WiFi stations, and ports named like stations or monitors."""
+        return self.cleanup(sta=True)
 
     # cleans all gui or script created objects from Port Mgr tab
     def port_mgr_clean(self):
@@ -389,189 +206,28 @@ class lf_clean(Realm):
         Read differently, this function attempts to delete anything
         that isn't a physical port on the system.
         """
-        still_looking_san = True
-        iterations_san = 0
-
-        while still_looking_san and iterations_san <= 10:
-            iterations_san += 1
-            try:
-                port_mgr_json = super().json_get("/port/?fields=port+type,alias")['interfaces']
-                # logger.info(port_mgr_json)
-                # logger.info(len(port_mgr_json))
-            except TypeError:
-                port_mgr_json = None
-                logger.warning("port_mgr_json set to None")
-
-            # get and remove LF Port Mgr objects
-            if port_mgr_json is not None:
-                logger.debug("Removing old stations ")
-                for name in list(port_mgr_json):
-                    # logger.info(name)
-                    # alias is the eid (ex: 1.1.eth0)
-                    for alias in list(name):
-                        # logger.info(alias)
-                        port_type = name[alias]['port type']
-                        # logger.info(port_type)
-                        if port_type != 'Ethernet' and port_type != 'WIFI-Radio' and port_type != 'NA':
-                            info = self.name_to_eid(alias)
-                            port_mgr_resource = str(info[1])
-                            if port_mgr_resource in self.resource or 'all' in self.resource:
-                                req_url = "cli-json/rm_vlan"
-                                data = {
-                                    "shelf": info[0],
-                                    "resource": info[1],
-                                    "port": info[2]
-                                }
-                                # logger.info(data)
-                                logger.debug(f"Removing {alias}")
-                                super().json_post(req_url, data)
-                time.sleep(1)
-            else:
-                logger.info("No further ports found")
-                still_looking_san = False
-                logger.debug(f"port_mgr_clean still_looking_san {still_looking_san}")
-
-            if not still_looking_san:
-                self.port_mgr_done = True
-
-            return still_looking_san
+        return self.cleanup(port_mgr=True)
 
     def bridge_clean(self):
-        still_looking_br = True
-        iterations_br = 0
-
-        # TODO: Merge this w/ prot deletion logic
-        while still_looking_br and iterations_br <= 10:
-            iterations_br += 1
-            logger.debug(f"bridge_clean: iterations_br: {iterations_br}")
-            try:
-                # br_json = super().json_get("port/1/1/list?field=alias")['interfaces']
-                br_json = super().json_get("/port/?fields=port+type,alias")['interfaces']
-            except TypeError:
-                br_json = None
-
-            # get and remove current stations
-            if br_json is not None:
-                # logger.info(br_json)
-                logger.debug("Removing old bridges")
-                for name in list(br_json):
-                    for alias in list(name):
-                        port_type = name[alias]['port type']
-                        # if 'br' in alias:
-                        if 'Bridge' in port_type:
-                            # logger.info(alias)
-                            info = self.name_to_eid(alias)
-                            bridge_resource = str(info[1])
-                            if bridge_resource in self.resource or 'all' in self.resource:
-                                req_url = "cli-json/rm_vlan"
-                                data = {
-                                    "shelf": info[0],
-                                    "resource": info[1],
-                                    "port": info[2]
-                                }
-                                # logger.info(data)
-                                logger.debug(f"Removing {alias}")
-                                super().json_post(req_url, data)
-                time.sleep(1)
-            else:
-                logger.info("No further bridge ports found")
-                still_looking_br = False
-                logger.debug(f"clean_bridge still_looking_br {still_looking_br}")
-
-            if not still_looking_br:
-                self.br_done = True
-
-            return still_looking_br
+        return self.cleanup(br=True)
 
     # Some test have various station names or a station named 1.1.eth2
     def misc_clean(self):
-        still_looking_misc = True
-        iterations_misc = 0
-
-        while still_looking_misc and iterations_misc <= 10:
-            iterations_misc += 1
-            logger.debug(f"misc_clean: iterations_misc: {iterations_misc}")
-            try:
-                # misc_json = super().json_get("port/1/1/list?field=alias")['interfaces']
-                misc_json = super().json_get("/port/?fields=alias")['interfaces']
-            except TypeError:
-                misc_json = None
-
-            # get and remove current stations
-            if misc_json is not None:
-                # logger.info(misc_json)
-                logger.debug("Removing misc station names phy, 1.1.eth (malformed station name) ")
-                for name in list(misc_json):
-                    for alias in list(name):
-                        if 'phy' in alias and 'wiphy' not in alias:
-                            # logger.info(alias)
-                            info = self.name_to_eid(alias)
-                            misc_resource = str(info[1])
-                            if misc_resource in self.resource or 'all' in self.resource:
-                                req_url = "cli-json/rm_vlan"
-                                data = {
-                                    "shelf": info[0],
-                                    "resource": info[1],
-                                    "port": info[2]
-                                }
-                                # logger.info(data)
-                                logger.debug(f"Removing {alias}")
-                                super().json_post(req_url, data)
-
-                        if '1.1.1.1.eth' in alias:
-                            logger.debug(f"alias 1.1.1.1.eth {alias}")
-                            # need to hand construct for delete.
-                            info = alias.split('.')
-                            logger.debug(f'info {info}')
-                            req_url = "cli-json/rm_vlan"
-                            # info_2 = "{info2}.{info3}.{info4}".format(info2=info[2], info3=info[3], info4=info[4])
-                            misc_resource = str(info[3])
-                            if misc_resource in self.resource or 'all' in self.resource:
-                                data = {
-                                    "shelf": info[2],
-                                    "resource": info[3],
-                                    "port": info[4]
-                                }
-                                # logger.info(data)
-                                logger.debug(f"Removing {alias}")
-                                super().json_post(req_url, data)
-                time.sleep(1)
-            else:
-                logger.info("No further miscellaneous ports found")
-                still_looking_misc = False
-                logger.debug(f"clean_misc still_looking_misc {still_looking_misc}")
-
-            if not still_looking_misc:
-                self.misc_done = True
-
-            return still_looking_misc
+        return self.cleanup(misc=True)
 
     def sanitize_all(self):
         """Run comprehensive, multi-step cleanup
 
-            1: Delete Layer-3 CXs
-            2: Delete Layer-3 endpoints
-            3: Delete Layer-4 endpoints
-            4: Delete ports
+            1: Delete Layer-3 and Layer-4 CXs
+            2: Delete Layer-3 and Layer-4 endpoints
+            3: Delete ports
 
             NOTE: When deleting ports before Layer-3 CXs, any CXs
                   which use the deleted ports will then appear as phantom
         """
-        # 1. clean Layer-3 tab:
-        finished_clean_cxs = self.cxs_clean()
-        logger.debug(f"clean_cxs: finished_clean_cxs {finished_clean_cxs}")
-
-        # 2. clean L3 Endps tab:
-        finished_clean_endp = self.layer3_endp_clean()
-        logger.debug(f"layer3_clean_endp: finished_clean_endp {finished_clean_endp}")
-
-        # 3. clean Layer 4-7 tab:
-        finished_clean_l4 = self.layer4_endp_clean()
-        logger.debug(f"clean_l4_endp: finished_clean_l4 {finished_clean_l4}")
-
-        # 4. clean Port Mgr tab:
-        finished_clean_port_mgr = self.port_mgr_clean()
-        logger.debug(f"clean_sta: finished_clean_port_mgr {finished_clean_port_mgr}")
+        finished_clean = self.cleanup(cxs=True, l3_endp=True, layer4=True, port_mgr=True)
+        logger.debug(f"sanitize_all: finished_clean {finished_clean}")
+        return finished_clean
 
 
 def parse_args():
@@ -610,6 +266,9 @@ EXAMPLE:
             # This includes names 'phy' (not 'wiphy') and '1.1.eth'
             ./lf_cleanup.py --misc
 
+            # Show what a full cleanup would delete, without deleting anything
+            ./lf_cleanup.py --sanitize --dry_run
+
             # Remove all stations with JSON
             "args": ["--mgr", "192.168.30.12", "--resource", "1", "--sta"]
 
@@ -639,6 +298,10 @@ NOTES:      The script will only cleanup what is present in the GUI. If object c
             is in process but the object is not yet present in the GUI, then this script may need to be run
             multiple times for deletion to take effect.
 
+            All requested object types are read once and deleted in dependency order: CXs, then endpoints,
+            then stations, other virtual ports and bridges. Each step posts its deletes concurrently
+            (--max_workers) and waits up to --timeout seconds for the objects to disappear.
+
 VERIFIED_ON:
             Working date:   03/17/2023
             Build version:  5.4.6
@@ -699,6 +362,17 @@ LICENSE:    Free to distribute and modify. LANforge systems must be licensed.
     parser.add_argument('--sleep',
                         help="Time in seconds to sleep after cleanup",
                         default=0)
+    parser.add_argument('--dry_run',
+                        help="Log what would be deleted without deleting anything",
+                        action='store_true')
+    parser.add_argument('--max_workers',
+                        help="Number of delete commands posted at the same time",
+                        type=int,
+                        default=cleanup_plan.CleanupRunner.Default_Max_Workers)
+    parser.add_argument('--timeout',
+                        help="Seconds to wait for each kind of object to disappear before deleting again",
+                        type=float,
+                        default=cleanup_plan.CleanupRunner.Default_Timeout_Sec)
 
     # Logging configuration options
     parser.add_argument("--debug",
@@ -761,7 +435,10 @@ def main():
                      clean_endp=args.l3_endp,
                      clean_sta=args.sta,
                      clean_port_mgr=args.port_mgr,
-                     clean_misc=args.misc)
+                     clean_misc=args.misc,
+                     dry_run=args.dry_run,
+                     max_workers=args.max_workers,
+                     timeout_sec=args.timeout)
     logger.debug("cleaning cxs: {cxs} endpoints: {endp} stations: {sta} start".format(cxs=args.cxs, endp=args.l3_endp, sta=args.sta))
 
     response = clean.get_json1()
@@ -771,32 +448,31 @@ def main():
         response2 = list(response["interfaces"][i].keys())
         logger.debug(response2)
 
+    # everything requested is removed in one planned pass, CXs before endpoints before ports
     if args.cxs:
         logger.info("Deleting Layer-3 CXs")
         logger.info("Requesting CX cleanup will also cleanup endpoints")
-        clean.cxs_clean()
-        clean.layer3_endp_clean()
     if args.l3_endp:
         logger.info("Deleting Layer-3 endpoints")
-        clean.layer3_endp_clean()
     if args.sta:
         logger.info("Deleting stations")
-        clean.sta_clean()
     if args.port_mgr:
         logger.info("Deleting ports")
-        clean.port_mgr_clean()
     if args.br:
         logger.info("Deleting bridges")
-        clean.bridge_clean()
     if args.misc:
         logger.info("Deleting miscellaneous ports")
-        clean.misc_clean()
     if args.layer4:
         logger.info("Deleting Layer-4 endpoints")
-        clean.layer4_endp_clean()
     if args.sanitize:
         logger.info("Deleting ports, Layer-3 CXs and endpoints, and Layer-4 endpoints")
-        clean.sanitize_all()
+    clean.cleanup(cxs=args.cxs or args.sanitize,
+                  l3_endp=args.cxs or args.l3_endp or args.sanitize,
+                  layer4=args.layer4 or args.sanitize,
+                  sta=args.sta,
+                  port_mgr=args.port_mgr or args.sanitize,
+                  br=args.br,
+                  misc=args.misc)
 
     # Optional sleep after performing requested cleanup
     if args.sleep > 0:
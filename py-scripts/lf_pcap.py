@@ -35,6 +35,7 @@ realm = importlib.import_module("py-json.realm")
 Realm = realm.Realm
 cv_test_reports = importlib.import_module("py-json.cv_test_reports")
 lf_report = cv_test_reports.lanforge_reports
+pcap_analysis = importlib.import_module("py-json.pcap_analysis")
 
 
 class LfPcap(Realm):
@@ -65,6 +66,9 @@ class LfPcap(Realm):
         self.live_cap_timeout = _live_cap_timeout
         self.remote_cap_host = _live_remote_cap_host
         self.remote_cap_interface = _live_remote_cap_interface
+        # results of the single pass checks, for the file identified by analysis_key
+        self.analysis = None
+        self.analysis_key = None
         # self.wifi_monitor = WiFiMonitor(self.lfclient_url, local_realm=self, debug_=self.debug)
 
     def read_pcap(self, pcap_file, apply_filter=None):
@@ -166,283 +170,96 @@ class LfPcap(Realm):
         except ValueError:
             raise "pcap file is required"
 
+    def analyze_pcap(self, pcap_file):
+        """
+        Run every check of pcap_analysis.DEFAULT_CHECKS in one read of the capture.
+        Results are kept until the file changes, so the check_* methods below share one read.
+        :return: dict of check name to result
+        """
+        stat = os.stat(pcap_file)
+        key = (os.path.abspath(pcap_file), stat.st_mtime_ns, stat.st_size)
+        if self.analysis_key != key:
+            print("pcap file path:  %s" % pcap_file)
+            self.analysis = pcap_analysis.PcapAnalyzer().analyze(pcap_file)
+            self.analysis_key = key
+        return self.analysis
+
     def check_group_id_mgmt(self, pcap_file):
-        print("pcap file path:  %s" % pcap_file)
-        try:
-            if pcap_file is not None:
-                print("Checking for Group ID Management Actions Frame...")
-                cap = self.read_pcap(pcap_file=pcap_file, apply_filter='wlan.mgt && wlan.vht.group_id_management')
-                packet_count = 0
-                value = "Packet Not Found"
-                for pkt in cap:
-                    if 'wlan.mgt' in pkt:
-                        value = pkt['wlan.mgt'].get_field_value('wlan_vht_group_id_management')
-                        if value is not None:
-                            print("Group ID Management: ", value)
-                            value = f"Group ID Management: {value}"
-                            packet_count += 1
-                        if packet_count == 1:
-                            break
-                if packet_count >= 1:
-                    return f"{value}"
-                else:
-                    return f"{value}"
-        except ValueError:
-            raise "pcap file is required"
+        if pcap_file is None:
+            return None
+        value = self.analyze_pcap(pcap_file)["group_id_mgmt"]
+        print(value)
+        return value
 
     def check_beamformee_association_request(self, pcap_file):
-        print("pcap file path:  %s" % pcap_file)
-        try:
-            if pcap_file is not None:
-                cap = self.read_pcap(pcap_file=pcap_file, apply_filter='wlan.vht.capabilities.mubeamformee == 1 &&  '
-                                                                       'wlan.fc.type_subtype == 0')
-                packet_count = 0
-                value = "Packet Not Found"
-                for pkt in cap:
-                    if 'wlan.mgt' in pkt:
-                        value = pkt['wlan.mgt'].get_field_value('wlan_vht_capabilities_mubeamformee')
-                        if value is not None:
-                            print(value)
-                            packet_count += 1
-                            if value == 0:
-                                value = "MU Beamformee Capable: Not Supported"
-                            if value == 1:
-                                value = "MU Beamformee Capable: Supported"
-                            if packet_count == 1:
-                                break
-                print(packet_count)
-                if packet_count >= 1:
-                    return f"{value}"
-                else:
-                    return f"{value}"
-        except ValueError:
-            raise "pcap file is required"
+        if pcap_file is None:
+            return None
+        value = self.analyze_pcap(pcap_file)["beamformee_association_request"]
+        print(value)
+        return value
 
     def check_beamformer_association_response(self, pcap_file):
-        try:
-            if pcap_file is not None:
-                cap = self.read_pcap(pcap_file=pcap_file, apply_filter='wlan.vht.capabilities.mubeamformer == 1 &&  '
-                                                                       'wlan.fc.type_subtype == 1')
-                packet_count = 0
-                value = "Packet Not Found"
-                for pkt in cap:
-                    if 'wlan.mgt' in pkt:
-                        value = pkt['wlan.mgt'].get_field_value('wlan_vht_capabilities_mubeamformer')
-                        if value is not None:
-                            print(value)
-                            packet_count += 1
-                            if value == 0:
-                                value = "MU Beamformer Capable: Not Supported"
-                            if value == 1:
-                                value = "MU Beamformer Capable: Supported"
-                            if packet_count == 1:
-                                break
-                if packet_count >= 1:
-                    return f"{value}"
-                else:
-                    return f"{value}"
-        except ValueError:
-            raise "pcap file is required"
+        if pcap_file is None:
+            return None
+        value = self.analyze_pcap(pcap_file)["beamformer_association_response"]
+        print(value)
+        return value
 
     def check_beamformer_beacon_frame(self, pcap_file):
-        try:
-            if pcap_file is not None:
-                cap = self.read_pcap(pcap_file=pcap_file, apply_filter='wlan.vht.capabilities.mubeamformer == 1 && '
-                                                                       'wlan.fc.type_subtype == 8')
-                packet_count = 0
-                value = "Packet Not Found"
-                for pkt in cap:
-                    if 'wlan.mgt' in pkt:
-                        value = pkt['wlan.mgt'].get_field_value('wlan_vht_capabilities_mubeamformer')
-                        if value is not None:
-                            print(value)
-                            packet_count += 1
-                            if value == 0:
-                                value = "MU Beamformer Capable: Not Supported"
-                            if value == 1:
-                                value = "MU Beamformer Capable: Supported"
-                            if packet_count == 1:
-                                break
-                if packet_count >= 1:
-                    return f"{value}"
-                else:
-                    return f"{value}"
-        except ValueError:
-            raise "pcap file is required."
+        if pcap_file is None:
+            return None
+        value = self.analyze_pcap(pcap_file)["beamformer_beacon_frame"]
+        print(value)
+        return value
 
     def check_beamformer_probe_response(self, pcap_file):
-        try:
-            if pcap_file is not None:
-                cap = self.read_pcap(pcap_file=pcap_file, apply_filter='wlan.vht.capabilities.mubeamformer == 1 && wlan.fc.type_subtype==5')
-                packet_count = 0
-                value = "Packet Not Found"
-                for pkt in cap:
-                    if 'wlan' in pkt:
-                        value = pkt['wlan'].get_field_value('wlan_vht_capabilities_mubeamformer')
-                        if value is not None:
-                            print(value)
-                            if value == 0:
-                                value = "MU Beamformer Capable: Not Supported"
-                            if value == 1:
-                                value = "MU Beamformer Capable: Supported"
-                            packet_count += 1
-                            if packet_count == 1:
-                                break
-                if packet_count >= 1:
-
-                    return f"{value}"
-                else:
-                    return f"{value}"
-        except ValueError:
-            raise "pcap file is required."
+        if pcap_file is None:
+            return None
+        value = self.analyze_pcap(pcap_file)["beamformer_probe_response"]
+        print(value)
+        return value
 
     def check_he_capability_beacon_frame(self, pcap_file):
-        try:
-            if pcap_file is not None:
-                cap = self.read_pcap(pcap_file=pcap_file, apply_filter='wlan.ext_tag.he_phy_cap.he_su_ppdu_etc_gi == 1 && wlan.fc.type_subtype == 8')
-                packet_count = 0
-                value = "Packet Not Found"
-                for pkt in cap:
-                    if 'wlan.mgt' in pkt:
-                        value = pkt['wlan.mgt'].get_field_value('wlan_ext_tag_he_phy_cap_he_su_ppdu_with_1x_he_ltf_08us')
-                        if value is not None:
-                            print(value)
-                            packet_count += 1
-                            if str(value) == '0':
-                                value = "HE SU PPDU & HE MU PPDU w 4x HE-LTF & 0.8us GI: Not Supported"
-                            if str(value) == '1':
-                                value = "HE SU PPDU & HE MU PPDU w 4x HE-LTF & 0.8us GI: Supported"
-                            if packet_count == 1:
-                                break
-                if packet_count >= 1:
-                    return f"{value}"
-                else:
-                    return f"{value}"
-        except ValueError:
-            raise "pcap file is required."
+        if pcap_file is None:
+            return None
+        value = self.analyze_pcap(pcap_file)["he_capability_beacon_frame"]
+        print(value)
+        return value
 
     def check_he_capability_probe_request(self, pcap_file):
-        try:
-            if pcap_file is not None:
-                cap = self.read_pcap(pcap_file=pcap_file, apply_filter='wlan.ext_tag.he_phy_cap.he_su_ppdu_etc_gi == 1 && wlan.fc.type_subtype == 4')
-                packet_count = 0
-                value = "Packet Not Found"
-                for pkt in cap:
-                    if 'wlan.mgt' in pkt:
-                        value = pkt['wlan.mgt'].get_field_value('wlan_ext_tag_he_phy_cap_he_su_ppdu_etc_gi')
-                        if value is not None:
-                            print(value)
-                            packet_count += 1
-                            if str(value) == '0':
-                                value = "HE SU PPDU & HE MU PPDU w 4x HE-LTF & 0.8us GI: Not Supported"
-                            if str(value) == '1':
-                                value = "HE SU PPDU & HE MU PPDU w 4x HE-LTF & 0.8us GI: Supported"
-                            if packet_count == 1:
-                                break
-                if packet_count >= 1:
-                    return f"{value}"
-                else:
-                    return f"{value}"
-        except ValueError:
-            raise "pcap file is required."
+        if pcap_file is None:
+            return None
+        value = self.analyze_pcap(pcap_file)["he_capability_probe_request"]
+        print(value)
+        return value
 
     def check_he_capability_probe_response(self, pcap_file):
-        try:
-            if pcap_file is not None:
-                cap = self.read_pcap(pcap_file=pcap_file, apply_filter='wlan.ext_tag.he_phy_cap.he_su_ppdu_etc_gi == 1 && wlan.fc.type_subtype == 5')
-                packet_count = 0
-                value = "Packet Not Found"
-                for pkt in cap:
-                    if 'wlan.mgt' in pkt:
-                        value = pkt['wlan.mgt'].get_field_value('wlan_ext_tag_he_phy_cap_he_su_ppdu_with_1x_he_ltf_08us')
-                        if value is not None:
-                            print(value)
-                            packet_count += 1
-                            if str(value) == '0':
-                                value = "HE SU PPDU & HE MU PPDU w 4x HE-LTF & 0.8us GI: Not Supported"
-                            if str(value) == '1':
-                                value = "HE SU PPDU & HE MU PPDU w 4x HE-LTF & 0.8us GI: Supported"
-                            if packet_count == 1:
-                                break
-                if packet_count >= 1:
-                    return f"{value}"
-                else:
-                    return f"{value}"
-        except ValueError:
-            raise "pcap file is required."
+        if pcap_file is None:
+            return None
+        value = self.analyze_pcap(pcap_file)["he_capability_probe_response"]
+        print(value)
+        return value
 
     def check_he_capability_association_request(self, pcap_file):
-        try:
-            if pcap_file is not None:
-                cap = self.read_pcap(pcap_file=pcap_file, apply_filter='wlan.ext_tag.he_phy_cap.he_su_ppdu_etc_gi == 1 && wlan.fc.type_subtype == 0')
-                packet_count = 0
-                value = "Packet Not Found"
-                for pkt in cap:
-                    if 'wlan.mgt' in pkt:
-                        value = pkt['wlan.mgt'].get_field_value('wlan_ext_tag_he_phy_cap_he_su_ppdu_etc_gi')
-                        if value is not None:
-                            print(value)
-                            packet_count += 1
-                            if str(value) == '0':
-                                value = "HE SU PPDU & HE MU PPDU w 4x HE-LTF & 0.8us GI: Not Supported"
-                            if str(value) == '1':
-                                value = "HE SU PPDU & HE MU PPDU w 4x HE-LTF & 0.8us GI: Supported"
-                            if packet_count == 1:
-                                break
-                print(packet_count)
-                if packet_count >= 1:
-                    return f"{value}"
-                else:
-                    return f"{value}"
-        except ValueError:
-            raise "pcap file is required"
+        if pcap_file is None:
+            return None
+        value = self.analyze_pcap(pcap_file)["he_capability_association_request"]
+        print(value)
+        return value
 
     def check_he_capability_association_response(self, pcap_file):
-        try:
-            if pcap_file is not None:
-                cap = self.read_pcap(pcap_file=pcap_file, apply_filter='wlan.ext_tag.he_phy_cap.he_su_ppdu_etc_gi == 1 && wlan.fc.type_subtype == 1')
-                packet_count = 0
-                value = "Packet Not Found"
-                for pkt in cap:
-                    if 'wlan.mgt' in pkt:
-                        value = pkt['wlan.mgt'].get_field_value('wlan_ext_tag_he_phy_cap_he_su_ppdu_etc_gi')
-                        if value is not None:
-                            print(value)
-                            packet_count += 1
-                            if str(value) == '0':
-                                value = "HE SU PPDU & HE MU PPDU w 4x HE-LTF & 0.8us GI: Not Supported"
-                            if str(value) == '1':
-                                value = "HE SU PPDU & HE MU PPDU w 4x HE-LTF & 0.8us GI: Supported"
-                            if packet_count == 1:
-                                break
-                if packet_count >= 1:
-                    return f"{value}"
-                else:
-                    return f"{value}"
-        except ValueError:
-            raise "pcap file is required"
+        if pcap_file is None:
+            return None
+        value = self.analyze_pcap(pcap_file)["he_capability_association_response"]
+        print(value)
+        return value
 
     def check_he_guard_interval(self, pcap_file):
-        try:
-            if pcap_file is not None:
-                cap = self.read_pcap(pcap_file=pcap_file, apply_filter='radiotap.he.data_5.gi')
-                packet_count = 0
-                value = "Packet Not Found"
-                for pkt in cap:
-                    if 'radiotap' in pkt:
-                        value = pkt['radiotap'].get_field_value('he_data_5_gi')
-                        if value is not None:
-                            print(value)
-                            value = f"GI: {str(value)}us"
-                            packet_count += 1
-                        if packet_count == 1:
-                            break
-                if packet_count >= 1:
-                    return f"{value}"
-                else:
-                    return f"{value}"
-        except ValueError:
-            raise "pcap file is required"
+        if pcap_file is None:
+            return None
+        value = self.analyze_pcap(pcap_file)["he_guard_interval"]
+        print(value)
+        return value
 
     def sniff_packets(self, interface_name="wiphy1", test_name="mu-mimo", channel=-1, sniff_duration=180):
         if test_name is not None:
@@ -77,6 +77,7 @@ class MeasureTimeUp(Realm):
         self.quiesce = _quiesce
         self.stop = _stop
         self.clean_dut = _clean_dut
+        self.ip_timings = {}
 
     def build(self):
         # Build stations
@@ -104,7 +105,8 @@ class MeasureTimeUp(Realm):
         if self.up:
             self.station_profile.admin_up()
         # TODO:  Add checks for whethere it actually got IP or not
-        self.wait_for_ip(station_list=self.station_profile.station_names)
+        self.ip_timings = {}
+        self.wait_for_ip(station_list=self.station_profile.station_names, ip_timings=self.ip_timings)
         self._pass("PASS: Station build finished")
 
     def scenario(self):
@@ -200,13 +202,16 @@ measures the time it took to admin them up and get IP addresses.
         built = datetime.datetime.now()
         create_station.station_up()
         stationsup = datetime.datetime.now()
-        dictionary[num_sta] = [start, built, stationsup]
+        ip_times = LFUtils.time_distribution(create_station.ip_timings.get("ipv4", {}).values())
+        dictionary[num_sta] = [start, built, stationsup,
+                               ip_times["min"], ip_times["median"], ip_times["p95"], ip_times["max"]]
         # TODO:  Check return code of the method below.
         create_station.wait_until_ports_disappear()
         # TODO:  Remove this sleep or add comment as to why it is needed.
         time.sleep(5.0 + num_sta / 20)
     df = pd.DataFrame.from_dict(dictionary).transpose()
-    df.columns = ['Start', 'Built', 'Stations Up']
+    df.columns = ['Start', 'Built', 'Stations Up',
+                  'IPv4 time min', 'IPv4 time median', 'IPv4 time p95', 'IPv4 time max']
     df['built duration'] = df['Built'] - df['Start']
     df['Up Stations'] = df['Stations Up'] - df['Built']
     df['duration'] = df['Stations Up'] - df['Start']
@@ -220,8 +225,6 @@ measures the time it took to admin them up and get IP addresses.
         df.to_excel(args.report_file)
 
     # TODO:  Check pass/fail and exit accordingly
-    # TODO:  Add KPI:  Min/max/avg of each station's time to get an IP address, data can be read/deduced
-    # by looking at port-mgr output.
 
 if __name__ == "__main__":
     main()
@@ -526,7 +526,6 @@ import platform
 import itertools
 import pandas as pd
 import traceback
-import json
 
 if sys.version_info[0] != 3:
     print("This script requires Python 3")
@@ -541,6 +540,10 @@ lf_kpi_csv = importlib.import_module("py-scripts.lf_kpi_csv")
 lf_logger_config = importlib.import_module("py-scripts.lf_logger_config")
 LFUtils = importlib.import_module("py-json.LANforge.LFUtils")
 realm = importlib.import_module("py-json.realm")
+port_results_store = importlib.import_module("py-json.port_results_store")
+PortResultsStore = port_results_store.PortResultsStore
+live_status = importlib.import_module("py-json.live_status")
+port_snapshot = importlib.import_module("py-json.port_snapshot")
 
 # from lf_graph import lf_bar_graph_horizontal
 # from lf_graph import lf_bar_graph
@@ -790,15 +793,22 @@ class L3VariableTime(Realm):
         self.cx_profile.side_b_min_bps = side_b_min_rate[0]
         self.cx_profile.side_b_max_bps = side_b_max_rate[0]
 
-        # Lookup key is port-eid name
+        # port state read once per polling interval for all monitored ports
+        self.port_snapshot = port_snapshot.PortSnapshot(json_get=self.json_get)
+
+        # Per-port dl/ul rows go to one store file for the run; the legacy
+        # per-port csv files are exported from it.  Lookup key is port-eid name
+        self.port_results = None
         self.dl_port_csv_files = {}
-        self.dl_port_csv_writers = {}
+        self.ul_port_csv_files = {}
 
         self.dl_port_total_csv_files = {}
         self.dl_port_total_csv_writers = {}
 
-        self.ul_port_csv_files = {}
-        self.ul_port_csv_writers = {}
+        # endpoint snapshot from __get_rx_values() indexed by port and cross-connect,
+        # rebuilt when get_endp_stats_for_port() is handed a new snapshot
+        self.endp_index = None
+        self.endp_index_source = None
 
         # Interopt graphs
         # Data used for graphing the TOS bar graphs
@@ -1168,6 +1178,8 @@ class L3VariableTime(Realm):
 
             # this is needed to access the methods of the imported object
             self.ap.say_hi()
+            # AP statistics are read and indexed by station MAC once per interval
+            self.ap_stats = port_snapshot.ApStatsSnapshot(ap=self.ap, bands=self.ap_band_list)
 
         else:
             logger.info(
@@ -1357,6 +1369,26 @@ class L3VariableTime(Realm):
         return self.csv_results_file.name
 
     # Find avg latency, jitter for connections using specified port.
+    @staticmethod
+    def index_endps(endps):
+        """
+        Index an endpoint snapshot so per-port lookups do not scan every endpoint.
+        The endp eid is shelf.resource.port.endp-id, so the first three fields
+        name the port the endpoint is using.
+        :param endps: list of endpoint records from __get_rx_values()
+        :return: dict with 'port': {(shelf, resource, port): [endp, ...]} and
+                 'cx': {cx-name: {'A': [endp, ...], 'B': [endp, ...]}}
+        """
+        by_port = {}
+        by_cx = {}
+        for endp in endps:
+            port_key = tuple(endp["eid"].split(".")[:3])
+            by_port.setdefault(port_key, []).append(endp)
+            name = endp["name"]
+            if name.endswith("-A") or name.endswith("-B"):
+                by_cx.setdefault(name[:-2], {"A": [], "B": []})[name[-1]].append(endp)
+        return {"port": by_port, "cx": by_cx}
+
     def get_endp_stats_for_port(self, port_eid, endps):
         lat = 0
         jit = 0
@@ -1368,73 +1400,52 @@ class L3VariableTime(Realm):
         total_ul_rate_ll = 0
         total_ul_pkts_ll = 0
         ul_rx_drop_percent = 0
-        count = 0
-        sta_name = 'no_station'
 
-        eid = port_eid
+        if (self.endp_index is None) or (self.endp_index_source is not endps):
+            self.endp_index = self.index_endps(endps)
+            self.endp_index_source = endps
+
         eid = self.name_to_eid(port_eid)
+        port_key = (str(eid[0]), str(eid[1]), str(eid[2]))
+        port_endps = self.endp_index["port"].get(port_key, [])
         if self.dowebgui != True:
-            # logger.info("endp-stats-for-port, port-eid: {}".format(port_eid))
-            logger.debug(
-                "eid: {eid}".format(eid=eid))
-
-        # Convert all eid elements to strings
-        eid[0] = str(eid[0])
-        eid[1] = str(eid[1])
-        eid[2] = str(eid[2])
-
-        for endp in endps:
-            # pprint(endp)
-            if self.dowebgui != True:
-                logging.info(endp)
-            eid_endp = endp["eid"].split(".")
-            logger.debug(
-                "Comparing eid:{eid} to endp-id {eid_endp}".format(eid=eid, eid_endp=eid_endp))
-            # Look through all the endpoints (endps), to find the port the port_eid is using.
-            # The port_eid that has the same Shelf, Resource, and Port as the eid_endp (looking at all the endps)
-            # Then read the eid_endp to get the delay, jitter and rx rate
-            # Note: the endp eid is shelf.resource.port.endp-id, the eid can be treated somewhat as
-            # child class of port-eid , and look up the port the eid is using.
-            if eid[0] == eid_endp[0] and eid[1] == eid_endp[1] and eid[2] == eid_endp[2]:
-                lat += int(endp["delay"])
-                jit += int(endp["jitter"])
-                name = endp["name"]
-                logger.debug("endp name {name}".format(name=name))
-                sta_name = name.replace('-A', '')
-                # only the -A endpoint will be found
-
-                count += 1
-                logger.debug(
-                    "Matched: name: {name} eid:{eid} to endp-id {eid_endp}".format(
-                        name=name, eid=eid, eid_endp=eid_endp))
-            else:
-                name = endp["name"]
-                logger.debug(
-                    "No Match: name: {name} eid:{eid} to endp-id {eid_endp}".format(
-                        name=name, eid=eid, eid_endp=eid_endp))
-
+            logger.debug("eid: {eid} endpoints: {names}".format(
+                eid=eid, names=[endp["name"] for endp in port_endps]))
+
+        # delay and jitter are averaged over the endpoints using this port
+        for endp in port_endps:
+            lat += int(endp["delay"])
+            jit += int(endp["jitter"])
+        count = len(port_endps)
         if count > 1:
             lat = int(lat / count)
             jit = int(jit / count)
 
-        # need to loop though again to find the upload and download per station
-        # if the name matched
-        for endp in endps:
-            if sta_name in endp["name"]:
-                name = endp["name"]
-                if name.endswith("-A"):
-                    logger.info("name has -A")
-                    total_dl_rate += int(endp["rx rate"])
-                    total_dl_rate_ll += int(endp["rx rate ll"])
-                    total_dl_pkts_ll += int(endp["rx pkts ll"])
-                    dl_tx_drop_percent = round(endp["rx drop %"], 2)
-
-                # -B upload side
-                else:
-                    total_ul_rate += int(endp["rx rate"])
-                    total_ul_rate_ll += int(endp["rx rate ll"])
-                    total_ul_pkts_ll += int(endp["rx pkts ll"])
-                    ul_rx_drop_percent = round(endp["rx drop %"], 2)
+        # upload and download are read from both sides of the cross-connect of the
+        # last endpoint on this port; a -B endpoint only reports itself
+        dl_endps = []
+        ul_endps = []
+        if port_endps:
+            name = port_endps[-1]["name"]
+            if name.endswith("-A"):
+                sides = self.endp_index["cx"][name[:-2]]
+                dl_endps = sides["A"]
+                ul_endps = sides["B"]
+            else:
+                ul_endps = [port_endps[-1]]
+
+        for endp in dl_endps:
+            total_dl_rate += int(endp["rx rate"])
+            total_dl_rate_ll += int(endp["rx rate ll"])
+            total_dl_pkts_ll += int(endp["rx pkts ll"])
+            dl_rx_drop_percent = round(endp["rx drop %"], 2)
+
+        # -B upload side
+        for endp in ul_endps:
+            total_ul_rate += int(endp["rx rate"])
+            total_ul_rate_ll += int(endp["rx rate ll"])
+            total_ul_pkts_ll += int(endp["rx pkts ll"])
+            ul_rx_drop_percent = round(endp["rx drop %"], 2)
 
         return lat, jit, total_dl_rate, total_dl_rate_ll, total_dl_pkts_ll, dl_rx_drop_percent, total_ul_rate, total_ul_rate_ll, total_ul_pkts_ll, ul_rx_drop_percent
 
@@ -1898,6 +1909,13 @@ class L3VariableTime(Realm):
                     total_ul_ll_bps = 0
                     reset_timer = 0
                     self.overall = []
+                    if self.dowebgui == True:
+                        # rows are appended as they are polled rather than rewriting the history
+                        self.overall_csv = live_status.LiveCsvAppender(
+                            path='{}/overall_multicast_throughput.csv'.format(self.result_dir))
+                        self.running_status = live_status.RunningStatusWatcher(
+                            path=self.result_dir + "/../../Running_instances/{}_{}_running.json".format(
+                                self.ip, self.test_name))
 
                     # Monitor loop
                     while cur_time < end_time:
@@ -1935,16 +1953,11 @@ class L3VariableTime(Realm):
                                  "status": "Running",
                                  "start_time": start_time.strftime('%Y-%m-%d-%H-%M-%S'),
                                  "end_time": end_time.strftime('%Y-%m-%d-%H-%M-%S'), "remaining_time": remaining_time})
-                            df1 = pd.DataFrame(self.overall)
-                            df1.to_csv('{}/overall_multicast_throughput.csv'.format(self.result_dir), index=False)
-                            with open(self.result_dir + "/../../Running_instances/{}_{}_running.json".format(self.ip,
-                                                                                                             self.test_name),
-                                      'r') as file:
-                                data = json.load(file)
-                                if data["status"] != "Running":
-                                    logging.warning('Test is stopped by the user')
-                                    self.overall[len(self.overall) - 1]["end_time"] = self.get_time_stamp_local()
-                                    break
+                            self.overall_csv.append(self.overall[-1])
+                            if not self.running_status.is_running():
+                                logging.warning('Test is stopped by the user')
+                                self.overall[len(self.overall) - 1]["end_time"] = self.get_time_stamp_local()
+                                break
                         if self.dowebgui != True:
                             logger.debug(log_msg)
 
@@ -1954,61 +1967,46 @@ class L3VariableTime(Realm):
                         # Query all of our ports
                         # Note: the endp eid is the
                         # shelf.resource.port.endp-id
-                        if self.ap_read:
-                            for band in self.ap_band_list:
-                                # request the data to be read
-                                self.ap.read_tx_dl_stats(band)
-                                self.ap.read_rx_ul_stats(band)
-                                self.ap.read_chanim_stats(band)
+                        # one /port query per resource for the fields the port csv files use
+                        port_eids = self.gather_port_eids()
+                        if not self.ap_read and self.use_existing_station_lists:
+                            port_eids.extend(
+                                self.existing_station_lists.copy())
+                            # for existing_station in self.existing_station_lists:
+                            #    port_eids.append(self.existing_station)
+                        self.port_snapshot.refresh(port_eids)
 
-                            # Query all of ports
-                            # Note: the endp eid is : shelf.resource.port.endp-id
-                            port_eids = self.gather_port_eids()
+                        if self.ap_read:
+                            # request the data to be read
+                            self.ap_stats.refresh()
 
                             for port_eid in port_eids:
-                                eid = self.name_to_eid(port_eid)
-                                url = "/port/%s/%s/%s" % (eid[0],
-                                                          eid[1], eid[2])
-
-                                # read LANforge to get the mac
-                                response = self.json_get(url)
-                                if (response is None) or ("interface" not in response):
-                                    logger.info(
-                                        "query-port: %s: incomplete response:" % url)
-                                    logger.info(pformat(response))
-                                else:
-                                    if self.dowebgui != True:
-                                        # print("response".format(response))
-                                        logger.info(pformat(response))
-                                    port_data = response['interface']
+                                port_data = self.port_snapshot.get(port_eid)
+                                if port_data is None:
+                                    continue
+                                if self.dowebgui != True:
                                     logger.info(
-                                        "From LANforge: port_data, response['insterface']:{}".format(port_data))
-                                    mac = port_data['mac']
-                                    if self.dowebgui != True:
-                                        logger.info(
-                                            "From LANforge: port_data, response['insterface']:{}".format(port_data))
-                                    mac = port_data['mac']
-                                    logger.debug("mac : {mac}".format(mac=mac))
-
-                                    # search for data fro the port mac
-                                    tx_dl_mac_found, ap_row_tx_dl = self.ap.tx_dl_stats(
-                                        mac)
-                                    rx_ul_mac_found, ap_row_rx_ul = self.ap.rx_ul_stats(
-                                        mac)
-                                    xtop_reported, ap_row_chanim = self.ap.chanim_stats(
-                                        mac)
-
-                                    self.get_endp_stats_for_port(
-                                        port_data["port"], endps)
+                                        "From LANforge: port_data:{}".format(port_data))
+                                mac = port_data['mac']
+                                logger.debug("mac : {mac}".format(mac=mac))
+
+                                # look up the AP data for the port mac
+                                tx_dl_mac_found, ap_row_tx_dl = self.ap_stats.tx_dl_stats(
+                                    mac)
+                                rx_ul_mac_found, ap_row_rx_ul = self.ap_stats.rx_ul_stats(
+                                    mac)
+                                xtop_reported, ap_row_chanim = self.ap_stats.chanim_stats(
+                                    mac)
+
+                                # Find latency, jitter for connections
+                                # using this port.
+                                latency, jitter, total_ul_rate, total_ul_rate_ll, total_ul_pkts_ll, ul_rx_drop_percent, total_dl_rate, total_dl_rate_ll, total_dl_pkts_ll, dl_rx_drop_percent = self.get_endp_stats_for_port(
+                                    port_data["port"], endps)
 
                                 if tx_dl_mac_found:
                                     if self.dowebgui != True:
                                         logger.info("mac {mac} ap_row_tx_dl {ap_row_tx_dl}".format(
                                             mac=mac, ap_row_tx_dl=ap_row_tx_dl))
-                                    # Find latency, jitter for connections
-                                    # using this port.
-                                    latency, jitter, total_ul_rate, total_ul_rate_ll, total_ul_pkts_ll, ul_rx_drop_percent, total_dl_rate, total_dl_rate_ll, total_dl_pkts_ll, dl_rx_drop_percent = self.get_endp_stats_for_port(
-                                        port_data["port"], endps)
 
                                     ap_row_tx_dl.append(ap_row_chanim)
 
@@ -2036,10 +2034,6 @@ class L3VariableTime(Realm):
                                     # now report the ap_chanim_stats
 
                                 if rx_ul_mac_found:
-                                    # Find latency, jitter for connections
-                                    # using this port.
-                                    # latency, jitter, total_ul_rate, total_ul_rate_ll, total_ul_pkts_ll, ul_rx_drop_percent, total_dl_rate, total_dl_rate_ll, total_dl_pkts_ll, dl_tx_drop_percent = self.get_endp_stats_for_port(
-                                    #    port_data["port"], endps)
                                     self.write_ul_port_csv(
                                         len(temp_stations_list),
                                         ul,
@@ -2058,7 +2052,7 @@ class L3VariableTime(Realm):
                                         total_dl_rate,
                                         total_dl_rate_ll,
                                         total_dl_pkts_ll,
-                                        dl_tx_drop_percent,
+                                        dl_rx_drop_percent,
                                         ap_row_rx_ul)  # ap_ul_row added
                                 if self.dowebgui != True:
                                     logger.info("ap_row_rx_ul {ap_row_rx_ul}".format(
@@ -2068,47 +2062,33 @@ class L3VariableTime(Realm):
                         ####################################
                         else:
                             # NOT Reading the AP
-                            port_eids = self.gather_port_eids()
-                            if self.use_existing_station_lists:
-                                port_eids.extend(
-                                    self.existing_station_lists.copy())
-                                # for existing_station in self.existing_station_lists:
-                                #    port_eids.append(self.existing_station)
                             for port_eid in port_eids:
-                                eid = self.name_to_eid(port_eid)
-                                url = "/port/%s/%s/%s" % (eid[0],
-                                                          eid[1], eid[2])
-                                response = self.json_get(url)
-                                if (response is None) or (
-                                        "interface" not in response):
-                                    logger.info(
-                                        "query-port: %s: incomplete response:" % url)
-                                    logger.debug(pformat(response))
-                                else:
-                                    port_data = response['interface']
-                                    logger.info(f"RSSI for %s: %s" % (port_data['alias'], port_data['signal']))
-                                    logger.info(f"Rx Drop Percentage for {port_data['alias']}: {port_data['rx drop']} %")
-                                    latency, jitter, total_ul_rate, total_ul_rate_ll, total_ul_pkts_ll, ul_rx_drop_percent, total_dl_rate, total_dl_rate_ll, total_dl_pkts_ll, dl_rx_drop_percent = self.get_endp_stats_for_port(
-                                        port_data["port"], endps)
-                                    self.write_dl_port_csv(
-                                        len(temp_stations_list),
-                                        ul,
-                                        dl,
-                                        ul_pdu_str,
-                                        dl_pdu_str,
-                                        atten_val,
-                                        port_eid,
-                                        port_data,
-                                        latency,
-                                        jitter,
-                                        total_ul_rate,
-                                        total_ul_rate_ll,
-                                        total_ul_pkts_ll,
-                                        ul_rx_drop_percent,
-                                        total_dl_rate,
-                                        total_dl_rate_ll,
-                                        total_dl_pkts_ll,
-                                        dl_rx_drop_percent)
+                                port_data = self.port_snapshot.get(port_eid)
+                                if port_data is None:
+                                    continue
+                                logger.info(f"RSSI for %s: %s" % (port_data['alias'], port_data['signal']))
+                                logger.info(f"Rx Drop Percentage for {port_data['alias']}: {port_data['rx drop']} %")
+                                latency, jitter, total_ul_rate, total_ul_rate_ll, total_ul_pkts_ll, ul_rx_drop_percent, total_dl_rate, total_dl_rate_ll, total_dl_pkts_ll, dl_rx_drop_percent = self.get_endp_stats_for_port(
+                                    port_data["port"], endps)
+                                self.write_dl_port_csv(
+                                    len(temp_stations_list),
+                                    ul,
+                                    dl,
+                                    ul_pdu_str,
+                                    dl_pdu_str,
+                                    atten_val,
+                                    port_eid,
+                                    port_data,
+                                    latency,
+                                    jitter,
+                                    total_ul_rate,
+                                    total_ul_rate_ll,
+                                    total_ul_pkts_ll,
+                                    ul_rx_drop_percent,
+                                    total_dl_rate,
+                                    total_dl_rate_ll,
+                                    total_dl_pkts_ll,
+                                    dl_rx_drop_percent)
 
                             # TODO add collect layer 3 data
 
@@ -2123,10 +2103,13 @@ class L3VariableTime(Realm):
                     # if self.use_existing_station_lists:
                     #    port_eids.extend(self.existing_station_lists.copy())
 
+                    # bring the per-port csv files up to date from the run's store
+                    if self.port_results is not None:
+                        self.port_results.export_port_csvs()
                     for port_eid in port_eids:
                         logger.debug("port files: {port_file}".format(
                             port_file=self.dl_port_csv_files[port_eid]))
-                        name = self.dl_port_csv_files[port_eid].name
+                        name = self.dl_port_csv_files[port_eid]
                         logger.debug("name : {name}".format(name=name))
                         df_dl_tmp = pd.read_csv(name)
                         all_dl_ports_df = pd.concat(
@@ -2200,7 +2183,7 @@ class L3VariableTime(Realm):
                         for port_eid in port_eids:
                             logger.debug("ul port files: {port_file}".format(
                                 port_file=self.ul_port_csv_files[port_eid]))
-                            name = self.ul_port_csv_files[port_eid].name
+                            name = self.ul_port_csv_files[port_eid]
                             logger.debug("name : {name}".format(name=name))
                             df_ul_tmp = pd.read_csv(name)
                             all_ul_ports_df = pd.concat(
@@ -2312,6 +2295,8 @@ class L3VariableTime(Realm):
                             "PASS: Requested-Rate: %s <-> %s  PDU: %s <-> %s   All tests passed" %
                             (ul, dl, ul_pdu, dl_pdu), print_pass)
 
+        if self.port_results is not None:
+            self.port_results.close()
         return 0
 
     def write_dl_port_csv(
@@ -2368,9 +2353,7 @@ class L3VariableTime(Realm):
                     # print("col {}".format(col))
                     row.append(col)
 
-        writer = self.dl_port_csv_writers[port_eid]
-        writer.writerow(row)
-        self.dl_port_csv_files[port_eid].flush()
+        self.port_results.append("dl", port_eid, row)
 
     def write_ul_port_csv(
             self,
@@ -2430,9 +2413,7 @@ class L3VariableTime(Realm):
                     logger.debug("col {}".format(col))
                     row.append(col)
 
-        writer = self.ul_port_csv_writers[port_eid]
-        writer.writerow(row)
-        self.ul_port_csv_files[port_eid].flush()
+        self.port_results.append("ul", port_eid, row)
 
     def record_kpi_csv(
             self,
@@ -5074,30 +5055,27 @@ class L3VariableTime(Realm):
                 self.csv_generate_results_column_headers())
             self.csv_results_file.flush()
 
+    # Store holding the per-port rows of this run, opened with the first port
+    def get_port_results_store(self):
+        if (self.port_results is None) or self.port_results.file.closed:
+            fname = self.outfile[:-4]  # Strip '.csv' from file name
+            self.port_results = PortResultsStore(path=fname + "-port-results.csv")
+        return self.port_results
+
     # Write initial headers to port csv file.
     def csv_add_port_column_headers(self, port_eid, headers):
         # if self.csv_file is not None:
         fname = self.outfile[:-4]  # Strip '.csv' from file name
         fname = fname + "-dl-" + port_eid + ".csv"
-        pfile = open(fname, "w")
-        port_csv_writer = csv.writer(pfile, delimiter=",")
-        self.dl_port_csv_files[port_eid] = pfile
-        self.dl_port_csv_writers[port_eid] = port_csv_writer
-
-        port_csv_writer.writerow(headers)
-        pfile.flush()
+        self.dl_port_csv_files[port_eid] = fname
+        self.get_port_results_store().add_port("dl", port_eid, headers, legacy_path=fname)
 
     def csv_add_ul_port_column_headers(self, port_eid, headers):
         # if self.csv_file is not None:
         fname = self.outfile[:-4]  # Strip '.csv' from file name
         fname = fname + "-ul-" + port_eid + ".csv"
-        pfile = open(fname, "w")
-        ul_port_csv_writer = csv.writer(pfile, delimiter=",")
-        self.ul_port_csv_files[port_eid] = pfile
-        self.ul_port_csv_writers[port_eid] = ul_port_csv_writer
-
-        ul_port_csv_writer.writerow(headers)
-        pfile.flush()
+        self.ul_port_csv_files[port_eid] = fname
+        self.get_port_results_store().add_port("ul", port_eid, headers, legacy_path=fname)
 
     @staticmethod
     def csv_validate_list(csv_list, length):
@@ -5381,11 +5359,11 @@ class L3VariableTime(Realm):
                     # read the csv file
                     self.report.set_table_title("Layer 3 Cx Traffic  {key}".format(key=key))
                     self.report.build_table_title()
-                    self.report.set_table_dataframe_from_csv(value.name)
+                    self.report.set_table_dataframe_from_csv(value)
                     self.report.build_table()
 
                 # read in column heading and last line
-                df = pd.read_csv(value.name)
+                df = pd.read_csv(value)
                 rssi_list = []
                 rx_drop_list = []
                 for index, row in df.iterrows():
@@ -7227,15 +7205,14 @@ INCLUDE_IN_README: False
         test_passed = True
         logger.info("Full test passed, all connections increased rx bytes")
     if ip_var_test.dowebgui == True:
-        last_entry = ip_var_test.overall[len(ip_var_test.overall) - 1]
+        last_entry = dict(ip_var_test.overall[len(ip_var_test.overall) - 1])
         last_entry["status"] = "Stopped"
         last_entry["timestamp"] = ip_var_test.get_time_stamp_local()
         last_entry["end_time"] = ip_var_test.get_time_stamp_local()
         ip_var_test.overall.append(
             last_entry
         )
-        df1 = pd.DataFrame(ip_var_test.overall)
-        df1.to_csv('{}/overall_multicast_throughput.csv'.format(ip_var_test.result_dir), index=False)
+        ip_var_test.overall_csv.append(last_entry)
     if test_passed:
         ip_var_test.exit_success()
     else:
@@ -14,6 +14,10 @@ EXAMPLE:
 ./lf_check.py  --json_rig ct_us_001_rig.json --json_dut ct_001_AX88U_dut.json
     --json_test ct_us_001_tests.json  --suite "suite_wc_dp"  --path '/home/lanforge/html-reports/ct-us-001'
 
+./lf_check.py  --json_rig ct_us_001_rig.json --json_dut ct_001_AX88U_dut.json
+    --json_test ct_us_001_tests.json  --suite "suite_wc_dp"  --max_concurrent_tests 2
+    tests whose "resources" (example "resources": "1.1.wiphy0") do not overlap run at the same time
+
 
 rig is the LANforge
 dut is the device under test
@@ -133,6 +137,7 @@ import sys
 import traceback
 from pprint import pformat
 import copy
+import concurrent.futures
 
 
 if sys.version_info[0] != 3:
@@ -157,6 +162,81 @@ sys.path.insert(0, parent_dir_path)
 FORMAT = '%(asctime)s %(name)s %(levelname)s: %(message)s'
 
 
+# lf_check_scheduler runs the commands of tests at the same time when the
+# LANforge resources they declare do not overlap.  Tests are started in the
+# order they were submitted: a test waits while it shares a resource with a
+# running test or with an earlier test that is still waiting.  A test without
+# "resources" in its json may use anything, so it runs on its own.
+class lf_check_scheduler():
+    def __init__(self,
+                 max_workers=2,
+                 execute=None):
+        if execute is None:
+            raise ValueError("lf_check_scheduler requires execute")
+        self.max_workers = int(max_workers)
+        self.execute = execute
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        self.submitted = 0
+        self.waiting = []
+        # future: job
+        self.running = {}
+        self.finished = []
+
+    @staticmethod
+    def resources_overlap(resources_a, resources_b):
+        # 1.1.wiphy0 overlaps 1.1.wiphy0 and the resource 1.1 it is on
+        for a in resources_a:
+            for b in resources_b:
+                if a == b or a.startswith(b + '.') or b.startswith(a + '.'):
+                    return True
+        return False
+
+    def conflicts(self, job_a, job_b):
+        if job_a['test'] == job_b['test']:
+            # iterations of a test share the stdout log and run in order
+            return True
+        if not job_a['resources'] or not job_b['resources']:
+            return True
+        return self.resources_overlap(job_a['resources'], job_b['resources'])
+
+    def submit(self, job):
+        job['index'] = self.submitted
+        self.submitted += 1
+        self.waiting.append(job)
+        self.start_ready()
+
+    def start_ready(self):
+        blocking = list(self.running.values())
+        waiting = []
+        for job in self.waiting:
+            if len(self.running) < self.max_workers and \
+                    not any(self.conflicts(job, other) for other in blocking):
+                self.running[self.executor.submit(self.execute, job)] = job
+            else:
+                waiting.append(job)
+            blocking.append(job)
+        self.waiting = waiting
+
+    def wait_one(self):
+        done, _ = concurrent.futures.wait(list(self.running.keys()),
+                                          return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            self.running.pop(future)
+            self.finished.append(future.result())
+        self.start_ready()
+
+    def drain(self):
+        # wait for every submitted test, return them in submission order
+        while self.running or self.waiting:
+            self.wait_one()
+        finished = sorted(self.finished, key=lambda job: job['index'])
+        self.finished = []
+        return finished
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
 # lf_check class contains verificaiton configuration and ocastrates the
 # testing.
 class lf_check():
@@ -179,7 +259,8 @@ class lf_check():
                  _outfile_name,
                  _report_path,
                  _log_path,
-                 _json_test_name):
+                 _json_test_name,
+                 _max_concurrent_tests=1):
 
 
         # get the server information
@@ -225,6 +306,11 @@ class lf_check():
 
         self.test_fail_list = []
         self.test_timeout_list = []
+
+        # tests run at the same time when their resources do not overlap, see lf_check_scheduler
+        self.max_concurrent_tests = int(_max_concurrent_tests)
+        self.scheduler = None
+        self.test_wall_times = []
         # This is needed for iterations and batch testing.
         self.test_dict_original_json = {}
         path_parent = os.path.dirname(os.getcwd())
@@ -281,6 +367,7 @@ class lf_check():
         self.lf_mgr_ssh_port = "22"
         self.lf_mgr_user = "lanforge"
         self.lf_mgr_pass = "lanforge"
+        self.ssh = None
         self.upstream_port = ""
         self.upstream_alias = ""
         self.attenuator_1 = ""
@@ -437,64 +524,41 @@ class lf_check():
     def get_lanforge_system_ip(self):
         return self.lf_mgr_ip
 
+    # one SSH session is used for all the LANforge system information queries
+    def get_ssh_session(self):
+        if self.ssh is None or self.ssh.get_transport() is None or not self.ssh.get_transport().is_active():
+            # creating shh client object we use this object to connect to router
+            self.ssh = paramiko.SSHClient()
+            # automatically adds the missing host key
+            self.ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            self.ssh.connect(hostname=self.lf_mgr_ip, port=self.lf_mgr_ssh_port, username=self.lf_mgr_user, password=self.lf_mgr_pass,
+                             allow_agent=False, look_for_keys=False, banner_timeout=600)
+        return self.ssh
+
+    def run_ssh_command(self, command):
+        stdin, stdout, stderr = self.get_ssh_session().exec_command(command)
+        return [line.replace('\n', '') for line in stdout.readlines()]
+
+    def close_ssh_session(self):
+        if self.ssh is not None:
+            self.ssh.close()
+            self.ssh = None
+
     def get_lanforge_system_node_version(self):
-        # creating shh client object we use this object to connect to router
-        ssh = paramiko.SSHClient()
-        # automatically adds the missing host key
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(hostname=self.lf_mgr_ip, port=self.lf_mgr_ssh_port, username=self.lf_mgr_user, password=self.lf_mgr_pass,
-                    allow_agent=False, look_for_keys=False, banner_timeout=600)
-        stdin, stdout, stderr = ssh.exec_command('uname -n')
-        self.lanforge_system_node_version = stdout.readlines()
-        self.lanforge_system_node_version = [line.replace(
-            '\n', '') for line in self.lanforge_system_node_version]
-        ssh.close()
-        time.sleep(1)
+        self.lanforge_system_node_version = self.run_ssh_command('uname -n')
         return self.lanforge_system_node_version
 
     def get_lanforge_fedora_version(self):
-        # creating shh client object we use this object to connect to router
-        ssh = paramiko.SSHClient()
-        # automatically adds the missing host key
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(hostname=self.lf_mgr_ip, port=self.lf_mgr_ssh_port, username=self.lf_mgr_user, password=self.lf_mgr_pass,
-                    allow_agent=False, look_for_keys=False, banner_timeout=600)
-        stdin, stdout, stderr = ssh.exec_command('cat /etc/fedora-release')
-        self.lanforge_fedora_version = stdout.readlines()
-        self.lanforge_fedora_version = [line.replace(
-            '\n', '') for line in self.lanforge_fedora_version]
-        ssh.close()
-        time.sleep(1)
+        self.lanforge_fedora_version = self.run_ssh_command('cat /etc/fedora-release')
         return self.lanforge_fedora_version
 
     def get_lanforge_kernel_version(self):
-        # creating shh client object we use this object to connect to router
-        ssh = paramiko.SSHClient()
-        # automatically adds the missing host key
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(hostname=self.lf_mgr_ip, port=self.lf_mgr_ssh_port, username=self.lf_mgr_user, password=self.lf_mgr_pass,
-                    allow_agent=False, look_for_keys=False, banner_timeout=600)
         # stdin, stdout, stderr = ssh.exec_command('uname -r')
-        stdin, stdout, stderr = ssh.exec_command('uname -a')
-        self.lanforge_kernel_version = stdout.readlines()
-        self.lanforge_kernel_version = [line.replace(
-            '\n', '') for line in self.lanforge_kernel_version]
-        ssh.close()
-        time.sleep(1)
+        self.lanforge_kernel_version = self.run_ssh_command('uname -a')
         return self.lanforge_kernel_version
 
     def get_lanforge_server_version(self):
-        # creating shh client object we use this object to connect to router
-        ssh = paramiko.SSHClient()
-        # automatically adds the missing host key
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(hostname=self.lf_mgr_ip, port=self.lf_mgr_ssh_port, username=self.lf_mgr_user, password=self.lf_mgr_pass,
-                    allow_agent=False, look_for_keys=False, banner_timeout=600)
-        stdin, stdout, stderr = ssh.exec_command(
-            './btserver --version | grep  Version')
-        self.lanforge_server_version_full = stdout.readlines()
-        self.lanforge_server_version_full = [line.replace(
-            '\n', '') for line in self.lanforge_server_version_full]
+        self.lanforge_server_version_full = self.run_ssh_command('./btserver --version | grep  Version')
         self.logger.info("lanforge_server_version_full: {lanforge_server_version_full}".format(
             lanforge_server_version_full=self.lanforge_server_version_full))
         self.lanforge_server_version = self.lanforge_server_version_full[0].split(
@@ -502,22 +566,10 @@ class lf_check():
         self.lanforge_server_version = self.lanforge_server_version.strip()
         self.logger.info("lanforge_server_version: {lanforge_server_version}".format(
             lanforge_server_version=self.lanforge_server_version))
-        ssh.close()
-        time.sleep(1)
         return self.lanforge_server_version_full
 
     def get_lanforge_server_build_info(self):
-        # creating shh client object we use this object to connect to router
-        ssh = paramiko.SSHClient()
-        # automatically adds the missing host key
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(hostname=self.lf_mgr_ip, port=self.lf_mgr_ssh_port, username=self.lf_mgr_user, password=self.lf_mgr_pass,
-                    allow_agent=False, look_for_keys=False, banner_timeout=600)
-        stdin, stdout, stderr = ssh.exec_command(
-            './btserver --version')
-        self.lanforge_server_build_info = stdout.readlines()
-        self.lanforge_server_build_info = [line.replace(
-            '\n', '') for line in self.lanforge_server_build_info]
+        self.lanforge_server_build_info = self.run_ssh_command('./btserver --version')
 
         # self.lanforge_server_build_info = ''.join(self.lanforge_server_build_info)
         self.logger.info("lanforge_server_build_info: {lanforge_server_build_info}".format(
@@ -525,23 +577,12 @@ class lf_check():
         # self.lanforge_server_build_info = self.lanforge_server_build_info.strip()
         self.logger.info("lanforge_server_build_info: {lanforge_server_build_info}".format(
             lanforge_server_build_info=self.lanforge_server_build_info))
-        ssh.close()
-        time.sleep(1)
         return self.lanforge_server_build_info
 
     def get_lanforge_gui_version(self):
-        # creating shh client object we use this object to connect to router
-        ssh = paramiko.SSHClient()
-        # automatically adds the missing host key
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        ssh.connect(hostname=self.lf_mgr_ip, port=self.lf_mgr_ssh_port, username=self.lf_mgr_user, password=self.lf_mgr_pass,
-                    allow_agent=False, look_for_keys=False, banner_timeout=600)
-        stdin, stdout, stderr = ssh.exec_command(
+        self.lanforge_gui_version_full = self.run_ssh_command(
             'curl -H "Accept: application/json" http://{lanforge_ip}:8080 | json_pp  | grep -A 7 "VersionInfo"'.format(lanforge_ip=self.lf_mgr_ip))
-        self.lanforge_gui_version_full = stdout.readlines()
         # self.logger.info("lanforge_gui_version_full pre: {lanforge_gui_version_full}".format(lanforge_gui_version_full=self.lanforge_gui_version_full))
-        self.lanforge_gui_version_full = [line.replace(
-            '\n', '') for line in self.lanforge_gui_version_full]
         # self.logger.info("lanforge_gui_version_full: {lanforge_gui_version_full}".format(lanforge_gui_version_full=self.lanforge_gui_version_full))
         for element in self.lanforge_gui_version_full:
             if "BuildVersion" in element:
@@ -564,8 +605,6 @@ class lf_check():
                 self.logger.info("GitVersion {}".format(
                     self.lanforge_gui_git_sha))
 
-        ssh.close()
-        time.sleep(1)
         return self.lanforge_gui_version_full, self.lanforge_gui_version, self.lanforge_gui_build_date, self.lanforge_gui_git_sha
 
     def no_send_results_email(self, report_file=None):
@@ -1210,7 +1249,18 @@ junit.xml path: allure serve {junit_path}
         # The underlying netsmith objects
         sleep(15)
 
+    # run_script() runs one test: prepare_test_command() builds the command from the
+    # current test, execute_test_command() runs it and report_test_result() records
+    # the result. With --max_concurrent_tests the executions of tests that use
+    # disjoint resources overlap, see lf_check_scheduler.
     def run_script(self):
+        job = self.prepare_test_command()
+        if self.scheduler is not None:
+            self.scheduler.submit(job)
+        else:
+            self.report_test_result(self.execute_test_command(job))
+
+    def prepare_test_command(self):
         # The network arguments need to be changed when in a list
         for index, args_list_element in enumerate(
                 self.test_dict[self.test]['args_list']):
@@ -1376,6 +1426,9 @@ junit.xml path: allure serve {junit_path}
                     self.test_dict[self.test]['load_db']))
             if str(self.test_dict[self.test]['load_db']).lower() != "none" and str(
                     self.test_dict[self.test]['load_db']).lower() != "skip":
+                # the database replaces the configuration other tests are using
+                if self.scheduler is not None:
+                    self.report_scheduled_tests()
                 try:
                     self.load_custom_database(
                         self.test_dict[self.test]['load_db'])
@@ -1417,7 +1470,6 @@ junit.xml path: allure serve {junit_path}
                 self.log_path, "{}-{}-stdout.txt".format(self.outfile_name, self.test))
             self.logger.info(
                 "stdout_log_txt: {}".format(stdout_log_txt))
-            stdout_log = open(stdout_log_txt, 'a')
             stderr_log_txt = os.path.join(
                 self.log_path, "{}-{}-stderr.txt".format(self.outfile_name, self.test))
             self.logger.info(
@@ -1435,27 +1487,40 @@ junit.xml path: allure serve {junit_path}
         self.logger.info(
             "running {command_to_run}".format(
                 command_to_run=command_to_run))
-        self.test_start_time = str(datetime.datetime.now().strftime(
-            "%Y-%m-%d-%H-%M-%S")).replace(':', '-')
-        self.logger.info(
-            "Test start: {time} Timeout: {timeout}".format(
-                time=self.test_start_time, timeout=self.test_timeout))
+
+        # tests declare the resources they use as "resources": "1.1.wiphy0 1.1.wiphy1"
+        resources = str(self.test_dict[self.test].get('resources', '')).split()
+        return {
+            'test': self.test,
+            'iteration': self.iteration,
+            'command': command,
+            'command_to_run': command_to_run,
+            'stdout_log_txt': stdout_log_txt,
+            'stderr_log_txt': stderr_log_txt,
+            'timeout': self.test_timeout,
+            'resources': resources,
+        }
+
+    # only reads the job, runs on a scheduler thread when tests run concurrently
+    def execute_test_command(self, job):
+        command_to_run = job['command_to_run']
         start_time = datetime.datetime.now()
+        self.logger.info(
+            "Test {test} start: {time} Timeout: {timeout}".format(
+                test=job['test'], time=start_time.strftime("%Y-%m-%d-%H-%M-%S"), timeout=job['timeout']))
         summary_output = ''
+        timed_out = False
         # have stderr go to stdout
         try:
             summary = subprocess.Popen(command_to_run, shell=False, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-                                       universal_newlines=True)
+                                       universal_newlines=True, cwd=self.scripts_wd)
         # TODO the looks one directory higher,  there needs to be a way to execute from higher directory.
         except FileNotFoundError:
             # TODO tx_power is one directory up from py-scripts
             self.logger.info(
-                "FileNotFoundError will try to execute from lanforge Top directory")
-            os.chdir(self.lanforge_wd)
-            self.logger.info(
-                "Changed Current Working Directory to {}".format(os.getcwd()))
+                "FileNotFoundError will try to execute from lanforge Top directory {}".format(self.lanforge_wd))
             summary = subprocess.Popen(command_to_run, shell=False, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-                                       universal_newlines=True)
+                                       universal_newlines=True, cwd=self.lanforge_wd)
 
         except PermissionError:
             self.logger.info("PermissionError on execution of {command}".format(
@@ -1470,19 +1535,16 @@ junit.xml path: allure serve {junit_path}
             self.logger.info(line)
             summary_output += line
         try:
-            if int(self.test_timeout != 0):
-                summary.wait(timeout=int(self.test_timeout))
+            if int(job['timeout'] != 0):
+                summary.wait(timeout=int(job['timeout']))
             else:
                 summary.wait()
         except TimeoutExpired:
-            summary.terminate
-            self.test_result = "TIMEOUT"
-        # TODO will change back to the scripts_wd since a script like tx_power.py will run in the parent directoy to
-        # py-scripts
-        os.chdir(self.scripts_wd)
-        self.logger.info("Current Working Directory {}".format(os.getcwd()))
+            summary.terminate()
+            timed_out = True
 
         # Since using "wait" above the return code will be set.
+        return_code = None
         try:
             return_code = summary.returncode
             if return_code == 0:
@@ -1497,11 +1559,30 @@ junit.xml path: allure serve {junit_path}
                 "issue reading return code err:{err}".format(err=err))
 
         self.logger.info(summary_output)
-        stdout_log.write(summary_output)
-        stdout_log.close()
-        end_time = datetime.datetime.now()
-        self.test_end_time = str(datetime.datetime.now().strftime(
-            "%Y-%m-%d-%H-%M-%S")).replace(':', '-')
+        with open(job['stdout_log_txt'], 'a') as stdout_log:
+            stdout_log.write(summary_output)
+        job['summary_output'] = summary_output
+        job['return_code'] = return_code
+        job['timed_out'] = timed_out
+        job['start_time'] = start_time
+        job['end_time'] = datetime.datetime.now()
+        return job
+
+    def report_test_result(self, job):
+        self.test = job['test']
+        self.iteration = job['iteration']
+        command = job['command']
+        command_to_run = job['command_to_run']
+        stdout_log_txt = job['stdout_log_txt']
+        stderr_log_txt = job['stderr_log_txt']
+        summary_output = job['summary_output']
+        return_code = job['return_code']
+        if job['timed_out']:
+            self.test_result = "TIMEOUT"
+        start_time = job['start_time']
+        end_time = job['end_time']
+        self.test_start_time = start_time.strftime("%Y-%m-%d-%H-%M-%S")
+        self.test_end_time = end_time.strftime("%Y-%m-%d-%H-%M-%S")
         self.logger.info(
             "Test end time {time}".format(
                 time=self.test_end_time))
@@ -1884,8 +1965,39 @@ junit.xml path: allure serve {junit_path}
         self.csv_results_writer.writerow(row)
         self.csv_results_file.flush()
         # self.logger.info("row: {}".format(row))
+        self.test_wall_times.append({
+            'test': self.test,
+            'iteration': self.iteration,
+            'start': start_time.strftime("%Y-%m-%d %H:%M:%S"),
+            'end': end_time.strftime("%Y-%m-%d %H:%M:%S"),
+            'wall_time_sec': round(time_delta.total_seconds(), 3),
+            'result': self.test_result,
+            'resources': ' '.join(job['resources']),
+            'command': command,
+        })
         self.logger.info("test: {} executed".format(self.test))
 
+    def report_scheduled_tests(self):
+        # report in the order the tests were started, keeping the test being prepared
+        test = self.test
+        iteration = self.iteration
+        for job in self.scheduler.drain():
+            self.report_test_result(job)
+        self.test = test
+        self.iteration = iteration
+
+    def write_test_wall_times(self):
+        wall_times_csv = os.path.join(
+            self.log_path, "{}-test-wall-times.csv".format(self.outfile_name))
+        with open(wall_times_csv, 'w', newline='') as wall_times_fd:
+            writer = csv.DictWriter(wall_times_fd, fieldnames=[
+                'test', 'iteration', 'start', 'end', 'wall_time_sec', 'result', 'resources', 'command'])
+            writer.writeheader()
+            writer.writerows(self.test_wall_times)
+        total_sec = sum(wall_time['wall_time_sec'] for wall_time in self.test_wall_times)
+        self.logger.info("test wall times: {file} tests: {tests} total test time: {total:.1f} sec".format(
+            file=wall_times_csv, tests=len(self.test_wall_times), total=total_sec))
+
     # TODO the command needs to be updated for the batch iterations
     def run_script_test(self):
         self.start_html_results()
@@ -1902,6 +2014,10 @@ junit.xml path: allure serve {junit_path}
 
         self.start_junit_testsuite()
 
+        if self.max_concurrent_tests > 1:
+            self.scheduler = lf_check_scheduler(max_workers=self.max_concurrent_tests,
+                                                execute=self.execute_test_command)
+
         # Configure Tests
         for self.test in self.test_dict:
 
@@ -1921,6 +2037,9 @@ junit.xml path: allure serve {junit_path}
                             user_prompt = 'Default prompt User Intervention requested for test: {test}, hit enter to continue: '.format(
                                 test=self.test)
 
+                        # the user changes the configuration, so nothing may still be running
+                        if self.scheduler is not None:
+                            self.report_scheduled_tests()
                         user_input = input(user_prompt)
                         logger.info(
                             "user input received {input}".format(input=user_input))
@@ -2046,6 +2165,11 @@ junit.xml path: allure serve {junit_path}
                 self.logger.warning(
                     "enable value {} for test: {} ".format(self.test_dict[self.test]['enabled'], self.test))
 
+        if self.scheduler is not None:
+            self.report_scheduled_tests()
+            self.scheduler.shutdown()
+            self.scheduler = None
+
         # The test suite has run
         self.finish_junit_testsuite()
         self.finish_junit_testsuites()
@@ -2062,6 +2186,9 @@ junit.xml path: allure serve {junit_path}
             day=suite_time_delta.days, hours=hours, minutes=minutes, seconds=seconds, msec=suite_time_delta.microseconds)
         self.logger.info("Suite Duration:  {suite_duration}".format(
             suite_duration=self.suite_duration))
+        self.write_test_wall_times()
+        self.logger.info("Suite wall time: {suite:.1f} sec max_concurrent_tests: {max_tests}".format(
+            suite=suite_time_delta.total_seconds(), max_tests=self.max_concurrent_tests))
         self.finish_html_results()
 
 
@@ -2177,6 +2304,13 @@ If parameter not set will read TEST_WINDOW_DAYS from rig.json""")
                         help="--no_exit_if_no_gui store true , if gui unavailable do not exit to allow gui restart",
                         action='store_true')
 
+    parser.add_argument('--max_concurrent_tests', type=int,
+                        help="""--max_concurrent_tests <number>  run up to this many tests at the same time,
+tests run together only when the "resources" in their test json do not overlap,
+example test json entry:  "resources": "1.1.wiphy0 1.1.wiphy1",
+a test without "resources" runs on its own. Default 1, tests run one after another""",
+                        default=1)
+
 
     args = parser.parse_args()
 
@@ -2427,7 +2561,8 @@ If parameter not set will read TEST_WINDOW_DAYS from rig.json""")
                                  _outfile_name=outfile_name,
                                  _report_path=report_path,
                                  _log_path=log_path,
-                                 _json_test_name=json_test_name)
+                                 _json_test_name=json_test_name,
+                                 _max_concurrent_tests=args.max_concurrent_tests)
 
                 # set up logging
                 logfile = args.logfile[:-4]
@@ -2599,6 +2734,9 @@ If parameter not set will read TEST_WINDOW_DAYS from rig.json""")
                     # TODO should we exit or should it be a work around
                     # exit(1)
 
+                # the LANforge system information has been read
+                check.close_ssh_session()
+
                 # LANforge and scripts config for results
                 lf_test_setup = pd.DataFrame()
                 lf_test_setup['LANforge'] = lanforge_system_node_version
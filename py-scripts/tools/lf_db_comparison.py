@@ -74,6 +74,14 @@ lf_graph = importlib.import_module("py-scripts.lf_graph")
 logger = logging.getLogger(__name__)
 lf_logger_config = importlib.import_module("py-scripts.lf_logger_config")
 
+# columns compared between two databases, and between two test runs of one database
+DB_COMPARISON_COLUMNS = ["test-tag", "short-description", "kernel", "gui_ver", "gui_build_date", "numeric-score"]
+TEST_RUN_COLUMNS = ["test-tag", "short-description", "Date", "kernel", "gui_ver", "numeric-score"]
+# column lf_qa.py stores with every row: the directory of the kpi.csv of its test run
+TEST_RUN_KEY = "kpi_path"
+# queries read with one statement, three parameters each stay below the sqlite limit of 999
+QUERY_CHUNK = 300
+
 
 class db_comparison:
     def __init__(self, host, database, data_base1=None, data_base2=None, table_name=None, dp=False, wct=False,
@@ -165,7 +173,88 @@ class db_comparison:
         else:
             logger.info("Data is not identical in the given two databases.")
 
+    def table_columns(self, conn):
+        """ :return: column names of the table """
+        cursor = conn.execute('PRAGMA table_info("{table}")'.format(table=self.table_name))
+        return [row[1] for row in cursor.fetchall()]
+
+    def read_queries(self, conn, querylist, columns, order_by_date=False):
+        """
+        Read the rows of every query from one database with one statement per QUERY_CHUNK
+        queries. The patterns are bound as parameters, so every full chunk reuses the
+        statement sqlite3 has already prepared on the connection.
+        :param conn: sqlite3 connection of the database
+        :param querylist: list of ("test-tag", "short-description") LIKE patterns
+        :param columns: columns to read
+        :param order_by_date: order the rows of each query by Date, oldest first
+        :return: DataFrame of the distinct rows of every query, with its position in querylist in "query_id"
+        """
+        column_names = ', '.join('"' + column + '"' for column in columns)
+        frames = []
+        for start in range(0, len(querylist), QUERY_CHUNK):
+            chunk = querylist[start:start + QUERY_CHUNK]
+            query = ('WITH "queries"("query_id", "tag", "description") AS (VALUES ' +
+                     ', '.join(['(?, ?, ?)'] * len(chunk)) + ') ' +
+                     'SELECT "queries"."query_id", ' + column_names + ' FROM ' + self.table_name +
+                     ' JOIN "queries" ON "test-tag" LIKE "queries"."tag"' +
+                     ' AND "short-description" LIKE "queries"."description"' +
+                     ' ORDER BY "queries"."query_id", ' + ('"Date", ' if order_by_date else '') +
+                     self.table_name + '.rowid;')
+            params = [param for query_id, (test_tag, short_description) in enumerate(chunk, start)
+                      for param in (query_id, test_tag, short_description)]
+            frames.append(pd.read_sql_query(query, conn, params=params))
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['query_id'] + columns)
+        return df.drop_duplicates().replace('\n', '', regex=True).reset_index(drop=True)
+
+    @staticmethod
+    def split_queries(df, count):
+        """
+        :param df: DataFrame from read_queries()
+        :param count: number of queries
+        :return: list with one DataFrame per query, empty for queries without rows
+        """
+        query_dfs = {query_id: query_df.drop(columns='query_id').reset_index(drop=True)
+                     for query_id, query_df in df.groupby('query_id', sort=False)}
+        empty_df = df.drop(columns='query_id').iloc[0:0]
+        return [query_dfs.get(query_id, empty_df) for query_id in range(count)]
+
+    @staticmethod
+    def test_run_ids(df, run_key=None):
+        """
+        Number the test runs of every query. Rows are ordered by Date within a query. With a
+        run_key column, a run starts where its value changes. Databases without one fall back
+        to the short-descriptions: the n-th row of a short-description is from the n-th run or
+        a later one, so the running maximum of that count is the run of the row. Date alone
+        does not mark a run, lf_kpi_csv.py may give every row of a run its own time.
+        :param df: DataFrame from read_queries()
+        :param run_key: column with the same value on every row of a test run, like kpi_path
+        :return: Series of test run numbers, 0 for the oldest run of each query
+        """
+        if run_key is not None:
+            run = df[run_key].fillna('')
+            started = (run != run.shift()) | (df['query_id'] != df['query_id'].shift())
+            return started.astype(int).groupby(df['query_id'], sort=False).cumsum() - 1
+        occurrence = df.groupby(['query_id', 'short-description'], sort=False).cumcount()
+        return occurrence.groupby(df['query_id'], sort=False).cummax()
+
+    @staticmethod
+    def select_test_run(df, run_ids, run_counts, choice):
+        """
+        :param df: DataFrame from read_queries()
+        :param run_ids: Series from test_run_ids()
+        :param run_counts: number of test runs of every query_id
+        :param choice: test run to select, negative to count back from the latest
+        :return: rows of that test run of every query that has it
+        """
+        position = run_counts + choice if choice < 0 else run_counts * 0 + choice
+        position = position[(position >= 0) & (position < run_counts)]
+        return df[run_ids.values == df['query_id'].map(position).values]
+
     def sort_and_merge_db(self, querylist):
+        """
+        :param querylist: list of ("test-tag", "short-description") LIKE patterns
+        :return: dict of the query results; 'merged_df' has one comparison table per query
+        """
         # Query dataframe dictionary
         self.query_df_dict = {
             "single_db_df": [],
@@ -178,86 +267,53 @@ class db_comparison:
         }
         if querylist:
             if (self.db1 and self.db2) is not None:
-                # reading the sql query's from the both databases
-                for i in querylist:
-                    self.query_df_dict['db1_df'].append(pd.read_sql_query(i, self.conn1))
-                    self.query_df_dict['db2_df'].append(pd.read_sql_query(i, self.conn2))
-                # sorting the two databases based on test-tags and placing in different list
-                for df in range(
-                    len(self.query_df_dict['db1_df'])):  #TODO: Need to avoid the length of 'self.query_df_dict['db1_df']'
-                    self.query_df_dict["sorted_db1_df"].append(
-                        self.query_df_dict["db1_df"][df].replace('\n', '', regex=True).sort_values(by='test-tag', ascending=True))
-                    self.query_df_dict["sorted_db2_df"].append(
-                        self.query_df_dict["db2_df"][df].replace('\n', '', regex=True).sort_values(by='test-tag', ascending=True))
-                for sorted_df in range(len(self.query_df_dict[
-                                               'sorted_db1_df'])):  #TODO: Need to avoid the length of 'self.query_df_dict['sorted_db1_df']'
-                    self.query_df_dict["merged_df"].append(self.query_df_dict["sorted_db1_df"][sorted_df].merge(
-                        self.query_df_dict["sorted_db2_df"][sorted_df], on=['test-tag', 'short-description'],
-                        suffixes=('_1', '_2')))
+                # reading the queries from both databases
+                df1 = self.read_queries(self.conn1, querylist, DB_COMPARISON_COLUMNS)
+                df2 = self.read_queries(self.conn2, querylist, DB_COMPARISON_COLUMNS)
+                self.query_df_dict['db1_df'] = self.split_queries(df1, len(querylist))
+                self.query_df_dict['db2_df'] = self.split_queries(df2, len(querylist))
+                for df1, df2 in zip(self.query_df_dict['db1_df'], self.query_df_dict['db2_df']):
+                    sorted_df1 = df1.sort_values(by='test-tag', ascending=True, kind='stable')
+                    sorted_df2 = df2.sort_values(by='test-tag', ascending=True, kind='stable')
+                    self.query_df_dict["sorted_db1_df"].append(sorted_df1)
+                    self.query_df_dict["sorted_db2_df"].append(sorted_df2)
+                    self.query_df_dict["merged_df"].append(sorted_df1.merge(
+                        sorted_df2, on=['test-tag', 'short-description'], suffixes=('_1', '_2')))
             elif self.database is not None:
-                # CONVERTING DF INTO SUB LIST OF DFs BASED ON THE 'Date'
-                for i in querylist:
-                    self.query_df_dict['single_db_df'].append(pd.read_sql_query(i, self.db_conn))
-                new = [[self.query_df_dict['single_db_df'][i].replace('\n', '', regex=True)] for i in range(0, len(self.query_df_dict['single_db_df']))]
-                # FETCHING THE INDEX items INTO A LIST TO BREAK THE DATA FRAMES
-                sub_lists = []
-                for n in range(len(new)):
-                    DF = pd.DataFrame(new[n][0])
-                    short_description_first_item = DF["short-description"][0]
-                    for i, row in new[n][0].iterrows():
-                        short_desc = row["short-description"]
-                        if short_desc == short_description_first_item:
-                            sub_lists.append(i)
-                # CONVERTING LIST OF INDEX items into SUB-LISTS
-                _index_list = [[]]
-                for item in sub_lists:
-                    if item == 0:
-                        _index_list.append([])
-                    else:
-                        _index_list[-1].append(item)
-                _index_list = [sublist for sublist in _index_list if sublist]
-
-                for sublist in _index_list:
-                    if len(sublist) > 1:
-                        average_difference = sum(sublist[i] - sublist[i - 1] for i in range(1, len(sublist))) / (
-                                len(sublist) - 1)
-                        sublist.append(sublist[-1] + int(average_difference))
-
-                # # CONVERTING DF INTO SUB LIST OF DFs BASED ON THE SHORT-DESCRIPTION
-                dfs = []
-                for i in range(len(new)):
-                    last_check = 0
-                    for ind in _index_list[i]:
-                        dfs.append(new[i][0].loc[last_check:ind - 1])
-                        last_check = ind
-
-                # AGAIN CONVERSING LIST WITH IN LIST TO SEPARATE THE DFs
-                _index_list = []
-                for i in dfs:
-                    if i.index[0] == 0:
-                        _index_list.append([i])
-                    else:
-                        _index_list[-1].append(i)
-                logger.info("The Total Existing Test Runs in given Data Base : %s" % len(_index_list[0]))
-                logger.info("The min existing test runs in given DB : %s" % min([len(i) - 1 for i in _index_list]))
-
-                first_choice = self.index[0]
-                second_choice = self.index[1]
-                # merging the dataframes and placing in a 'merged_df' list
-                for df_length in range(len(_index_list)):
-                    self.query_df_dict["merged_df"].append(_index_list[df_length][first_choice].merge(
-                        _index_list[df_length][second_choice], on=['test-tag', 'short-description'],
-                        suffixes=('_1', '_2')))
+                run_key = TEST_RUN_KEY if TEST_RUN_KEY in self.table_columns(self.db_conn) else None
+                columns = TEST_RUN_COLUMNS + ([run_key] if run_key else [])
+                df = self.read_queries(self.db_conn, querylist, columns, order_by_date=True)
+                run_ids = self.test_run_ids(df, run_key)
+                if run_key:
+                    df = df.drop(columns=run_key)
+                self.query_df_dict['single_db_df'] = self.split_queries(df, len(querylist))
+                if df.empty:
+                    logger.info("The query results are empty...")
+                    return self.query_df_dict
+                run_counts = run_ids.groupby(df['query_id'], sort=False).max() + 1
+                logger.info("The Total Existing Test Runs in given Data Base : %s" % run_counts.iloc[0])
+                logger.info("The min existing test runs in given DB : %s" % run_counts.min())
+
+                first_choice = self.select_test_run(df, run_ids, run_counts, self.index[0])
+                second_choice = self.select_test_run(df, run_ids, run_counts, self.index[1])
+                compared = set(first_choice['query_id']) & set(second_choice['query_id'])
+                for query_id in run_counts.index:
+                    if query_id not in compared:
+                        logger.warning("{test_tag}: only {count} test runs, skipped".format(
+                            test_tag=querylist[query_id][0], count=run_counts[query_id]))
+                # merging the test runs of every query at once and splitting the result into the 'merged_df' list
+                merged_df = first_choice.merge(second_choice, on=['query_id', 'test-tag', 'short-description'],
+                                               suffixes=('_1', '_2'))
 
                 # Define the date format
                 date_format = "%d-%b-%Y %H:%M:%S"
 
                 # Convert the Date_1 and Date_2 columns to human-readable date format
-                for i in range(len(self.query_df_dict["merged_df"])):
-                    self.query_df_dict["merged_df"][i]["Date_1"] = self.query_df_dict["merged_df"][i]["Date_1"].apply(
-                        lambda x: datetime.datetime.fromtimestamp(x / 1000).strftime(date_format))
-                    self.query_df_dict["merged_df"][i]["Date_2"] = self.query_df_dict["merged_df"][i]["Date_2"].apply(
+                for column in ("Date_1", "Date_2"):
+                    merged_df[column] = merged_df[column].apply(
                         lambda x: datetime.datetime.fromtimestamp(x / 1000).strftime(date_format))
+                self.query_df_dict["merged_df"] = [query_df.drop(columns='query_id').reset_index(drop=True)
+                                                   for _, query_df in merged_df.groupby('query_id', sort=True)]
         else:
             logger.info("The List of the query result are empty...")
         return self.query_df_dict
@@ -603,9 +659,7 @@ class db_comparison:
                         for short_desc in list_of_short_desc:
                             self.short_description = short_desc
                             # querying the db for Wi-fi Capacity
-                            query_results.append(
-                                'SELECT DISTINCT "test-tag",  "short-description", "kernel", "gui_ver", "gui_build_date", "numeric-score" FROM ' + self.table_name + ' WHERE "test-tag" LIKE \"' +
-                                test_tags[i] + '\" and "short-description" LIKE \"' + self.short_description + '\";')
+                            query_results.append((test_tags[i], self.short_description))
                         break_flag = False
                     elif self.database:
                         dp_short_desc = self.db_querying_with_where_clause(column_names='test-tag, short-description',
@@ -619,20 +673,11 @@ class db_comparison:
                         for short_desc in sorted_short_description:
                             self.short_description = short_desc
                             # querying the db for Wi-fi Capacity
-                            query_results.append(
-                                'SELECT DISTINCT "test-tag",  "short-description", "Date", "kernel", "gui_ver", "numeric-score" FROM ' + self.table_name + ' WHERE "test-tag" LIKE \"' +
-                                test_tags[i] + '\" and "short-description" LIKE \"' + self.short_description + '\" ORDER BY "Date" ASC;')
+                            query_results.append((test_tags[i], self.short_description))
                         break_flag = False
                 # querying the db for Wi-fi Capacity
                 if break_flag:
-                    if (self.db1 and self.db2) is not None:
-                        query_results.append(
-                            'SELECT DISTINCT "test-tag",  "short-description", "kernel", "gui_ver", "gui_build_date",  "numeric-score" FROM ' + self.table_name + ' WHERE "test-tag" LIKE \"' +
-                            test_tags[i] + '\" and "short-description" LIKE \"' + self.short_description + '\";')
-                    elif self.database:
-                        query_results.append(
-                            'SELECT DISTINCT "test-tag",  "short-description", "Date", "kernel", "gui_ver", "numeric-score" FROM ' + self.table_name + ' WHERE "test-tag" LIKE \"' +
-                            test_tags[i] + '\" and "short-description" LIKE \"' + self.short_description + '\" ORDER BY "Date" ASC;')
+                    query_results.append((test_tags[i], self.short_description))
             # sort and merge the data frames
             self.query_df_dict = self.sort_and_merge_db(querylist=query_results)
 
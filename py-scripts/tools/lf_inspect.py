@@ -37,6 +37,63 @@ lf_logger_config = importlib.import_module("py-scripts.lf_logger_config")
 # Any style components can be used
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 
+# a kpi is compared between runs with the same test-tag, Graph-Group and short-description
+COMPARE_KEYS = ['test-tag', 'Graph-Group', 'short-description']
+
+
+def read_compare_table(conn, table, element_column=None, element_value=None, window_start=None):
+    """
+    Read the rows of a kpi table to compare, filtering in the query
+    :param conn: sqlite3 connection
+    :param table: kpi table, qa_table
+    :param element_column: only rows where this column, like dut-model-num, is element_value
+    :param window_start: only the groups with a run after this time, epoch milliseconds
+    :return: dataframe with duplicate rows dropped, most recent run first
+    """
+    conditions = []
+    params = []
+    if element_column is not None:
+        conditions.append('"{column}" = ?'.format(column=element_column))
+        params.append(element_value)
+    if window_start is not None:
+        keys = ', '.join('"{key}"'.format(key=key) for key in COMPARE_KEYS)
+        window_conditions = conditions + ['CAST("Date" AS INTEGER) > ?']
+        conditions.append('({keys}) IN (SELECT {keys} FROM "{table}" WHERE {where})'.format(
+            keys=keys, table=table, where=' AND '.join(window_conditions)))
+        params = params + params + [int(window_start)]
+    query = 'SELECT * FROM "{table}"'.format(table=table)
+    if conditions:
+        query += ' WHERE ' + ' AND '.join(conditions)
+    df = pd.read_sql_query(query, conn, params=params)
+    df.drop_duplicates(inplace=True)
+    # sort by date from newest to oldest.
+    try:
+        df.sort_values(by='Date', ascending=False, inplace=True, kind='stable')
+    except Exception as x:
+        traceback.print_exception(Exception, x, x.__traceback__, chain=True)
+        logger.info("Database empty: KeyError(key) when sorting by Date, check Database name, path to kpi, typo in path, exiting")
+        exit(1)
+    return df
+
+
+def select_db_index(df, db_index):
+    """
+    :param df: rows from read_compare_table(), most recent run first
+    :param db_index: run to take from each group, 0 the most recent, 1 the one before, -1 the oldest
+    :return: one row per test-tag, Graph-Group and short-description that has that run, ordered by
+             the tags, then groups, then descriptions as they are first found in df
+    """
+    if df.empty:
+        return df
+    groups = df.groupby(COMPARE_KEYS, sort=False)
+    position = groups.cumcount()
+    if db_index < 0:
+        position = position - groups[COMPARE_KEYS[0]].transform('size')
+    selected = df[(position == db_index).to_numpy()]
+    ranks = pd.DataFrame({key: pd.factorize(df[key])[0] for key in COMPARE_KEYS}, index=df.index)
+    order = ranks.loc[selected.index].sort_values(by=COMPARE_KEYS, kind='stable').index
+    return selected.loc[order]
+
 
 class inspect_sql:
     def __init__(self,
@@ -163,9 +220,8 @@ class inspect_sql:
         if(len(self.database_list)) == 1:
             # remove file extenstion from db name
             lf_inspect_database_name = os.path.splitext(str(os.path.basename(self.database_list[0])))[0]
-            # for now assume 2, TODO loop though list
         else:
-            lf_inspect_database_name = os.path.splitext(str(os.path.basename(self.database_list[0])))[0]+"_"+os.path.spliter(str(os.path.basename(self.database_list[1])))[0]
+            lf_inspect_database_name = "_".join(os.path.splitext(str(os.path.basename(database)))[0] for database in self.database_list)
 
         #self.junit_results += """
         #<testsuite name="{suite}  time="{duration}" timestamp="{start}">
@@ -257,17 +313,15 @@ class inspect_sql:
                 self.compare_single_db_info()
             else:
                 self.compare_element_single_db_info()
-        elif len(self.database_list) == 2:
-            self.compare_multi_db_info()
         else:
-            logger.critical("Only one or two database may be entered for compare")
-            exit(1)
+            self.compare_multi_db_info()
 
     def compare_multi_db_info(self):
         logger.info("compare the data in multiple db: {db_list}".format(db_list=self.database_list))
 
         col_list= []
         attrib_list = []
+        sub_attrib_list = []
         #if the element list is empty the compare only on db index
         if self.element_list:
             self.compare_on_element = True
@@ -277,8 +331,6 @@ class inspect_sql:
                 attrib_list.append(element_tmp[1])  # note this is a list of two elements separated by &&
             sub_attrib_list = attrib_list[0].split('&&')
 
-
-
         # start the html results for the compare
         self.start_html_results()
 
@@ -287,306 +339,255 @@ class inspect_sql:
         self.start_junit_testsuites()
         self.start_junit_testsuite()
 
-        # TODO iterrate over multiple DB?
+        # the first db is compared to each of the others
         self.database = self.database_list[0]
-        self.database_comp = self.database_list[1]
-
-        # get intial datafram
-        self.conn = sqlite3.connect(self.database)
-        df_1 = pd.read_sql_query("SELECT * from {}".format(self.table), self.conn)
-        df_1.drop_duplicates(inplace=True)
-        # sort by date from oldest to newest.
-        try:
-            df_1.sort_values(by='Date', ascending=False, inplace=True)
-        except Exception as x:
-            traceback.print_exception(Exception, x, x.__traceback__, chain=True)
-            logger.info("Database empty: KeyError(key) when sorting by Date, check Database name, path to kpi, typo in path, exiting")
-            exit(1)
-
-        if self.element_list:
-            df_1 = df_1.loc[df_1[col_list[0]] == sub_attrib_list[0]]         
-
-        self.conn.close()
-
-        # get intial datafram
-        self.conn_comp = sqlite3.connect(self.database_comp)
-        df_2 = pd.read_sql_query("SELECT * from {}".format(self.table), self.conn_comp)
-        df_2.drop_duplicates(inplace=True)
-
-        # sort by date from oldest to newest.
-        try:
-            df_2.sort_values(by='Date', ascending=False, inplace=True)
-        except Exception as x:
-            traceback.print_exception(Exception, x, x.__traceback__, chain=True)
-            logger.info("Database empty: KeyError(key) when sorting by Date, check Database name, path to kpi, typo in path, exiting")
-            exit(1)
-
-        if self.element_list:
-            df_2 = df_2.loc[df_2[col_list[0]] == sub_attrib_list[1]]
-
-        self.conn_comp.close()
 
+        # only the groups of the first db with a run inside the test window are compared
         # Time now generating the report
         time_now = round(time.time() * 1000)
         test_window_epoch = int(float(self.test_window_days) * 86400000)
+        window_start = time_now - test_window_epoch
+        logger.info("time_now: {time_now} test_window_epoch: {test_window_epoch} window_start: {window_start}".format(
+            time_now=time_now, test_window_epoch=test_window_epoch, window_start=window_start))
 
-        # iterate though the unique values of the dataframe
-        for test_tag in df_1['test-tag'].unique():
-            for graph_group in df_1['Graph-Group'].unique():
-                for description in df_1['short-description'].unique():
-                    df_tmp = df_1.loc[
-                        (df_1['Graph-Group'] == str(graph_group))
-                        & (df_1['test-tag'] == str(test_tag))
-                        & (df_1['short-description'] == str(description))]
-
-                    # For comparing two databases there only needs to be a single entry
-                    if not df_tmp.empty:
-                        # find the same information in db2
-
-                        # find the last Date in the dataframe see if it is a test no longer run
-                        oldest_test_run = df_tmp["Date"].iloc[-1]
-                        recent_test_run = df_tmp["Date"].iloc[0]
-
-                        # if the recent test is over a week old do not include in run
-                        # 1 day = 86400000 milli seconds
-                        # 1 week = 604800000 milli seconds
-                        time_difference = int(time_now) -int(recent_test_run)
-                        logger.info("time_now: {time_now} recent_test_run: {recent_test_run} difference: {time_difference} test_window_epoch: {test_window_epoch} oldest_test_run: {oldest_test_run}".format(
-                            time_now=time_now,recent_test_run=recent_test_run,test_window_epoch=test_window_epoch, time_difference=time_difference, oldest_test_run=oldest_test_run))
-                        if (time_difference) < test_window_epoch:
-
-                            # find the same information in db2
-                            df_tmp_comp = df_2.loc[
-                                (df_2['Graph-Group'] == str(graph_group))
-                                & (df_2['test-tag'] == str(test_tag))
-                                & (df_2['short-description'] == str(description))]
-                            if not df_tmp_comp.empty:
-                                logger.info("db2 contains: {group} {tag} {desc}".format(group=graph_group, tag=test_tag, desc=description))
-
-                                df_tmp.drop_duplicates(inplace=True)
-                                df_tmp.sort_values(by='Date', inplace=True, ascending=False)
-
-                                db_index_1 = int(self.db_index_list[0])
-                                logger.debug("First row {first}".format(first=df_tmp.iloc[db_index_1]))
-                                df_data_1 = df_tmp.iloc[db_index_1]
-                                logger.debug("type: {data} {data1}".format(data=type(df_data_1), data1=df_data_1))
-
-                                df_tmp_comp.drop_duplicates(inplace=True)
-                                df_tmp_comp.sort_values(by='Date', inplace=True, ascending=False)
-
-                                db_index_2 = int(self.db_index_list[1])
-                                logger.debug("First row {first}".format(first=df_tmp_comp.iloc[db_index_2]))
-                                df_data_2 = df_tmp_comp.iloc[db_index_2]
-                                logger.debug("type: {data} {data2}".format(data=type(df_data_2), data2=df_data_2))
-
-                                percent_delta = 0
-                                if((float(df_data_1['numeric-score']) != 0 and df_data_1['numeric-score'] is not None) and df_data_2 is not None):
-                                    percent_delta = round(((float(df_data_2['numeric-score'])/float(df_data_1['numeric-score'])) * 100), 2)
-
-                                self.performance_total += 1
-
-                                # AP auto basic connectivity the failure is if the connection took longer then 500 ms
-                                if 'Basic Client Connectivity' in df_data_2['short-description']:
-                                    # currently AP auto is a failure if greater then 500 ms
-                                    if float(df_data_2['numeric-score']) > 500:
-                                        self.test_result = "Critical"
-                                        background = self.background_red
-                                        self.performance_critical += 1
-                                        logger.info("Basic Client Connectivity {connect_time} > 500 ms so failed".format(connect_time=float(df_data_2['numeric-score'])))
-                                    else:
-                                        self.test_result = "Good"
-                                        background = self.background_green
-                                        self.performance_good += 1
-                                        logger.info("Basic Client Connectivity {connect_time} < 500 ms so passed".format(connect_time=float(df_data_2['numeric-score'])))
-                                # changing the performce to > 80 7/9/2024 - 
-                                elif percent_delta >= 80:
-                                    logger.info("Performance Good {percent} {description}".format(percent=percent_delta,description=df_data_2['short-description']))
-                                    self.test_result = "Good"
-                                    background = self.background_green
-                                    self.performance_good += 1
-                                elif percent_delta >= 70:
-                                    logger.info("Performance Fair {percent} {description}".format(percent=percent_delta,description=df_data_2['short-description']))
-                                    self.test_result = "Fair"
-                                    background = self.background_purple
-                                    self.performance_fair += 1
-                                elif percent_delta >= 50:
-                                    logger.info("Performance Poor {percent} {description}".format(percent=percent_delta,description=df_data_2['short-description']))
-                                    self.test_result = "Poor"
-                                    background = self.background_orange
-                                    self.performance_poor += 1
-                                elif percent_delta == 0:
-                                    # for UL in test-tag and DL 0 or DL in test-tag and UL 0 this case should not be a failure
-                                    if 'UL+DL' in df_data_1['short-description'] and 'DL_UL' in df_data_1['test-tag']:
-                                        logger.info("For test {test} the {discription} DL not being monitored Not Applicable".format(
-                                                test=df_data_1['test-tag'],description=df_data_1['short-description']))
-                                        background = self.background_red
-                                        self.performance_critical += 1
-                                        self.test_result = "Critical"
-                                    elif 'DL' in df_data_1['short-description'] and 'UL' in df_data_1['test-tag']:
-                                        logger.info("For test {test} the {discription} DL not being monitored Not Applicable".format(
-                                                test=df_data_1['test-tag'],description=df_data_1['short-description']))
-                                        background = self.background_green
-                                        self.performance_good += 1
-                                        self.test_result = "Good"
-                                    elif 'DL' in df_data_1['short-description'] and 'UL' in df_data_1['test-tag']:
-                                        logger.info("For test {test} the {discription} DL not being monitored Not Applicable".format(
-                                                test=df_data_1['test-tag'],description=df_data_1['short-description']))
-                                        background = self.background_green
-                                        self.performance_good += 1
-                                        self.test_result = "Good"
-
-                                    # negative logic like Stations Failed IP if zero is a good thing
-                                    elif 'Failed' in df_data_1['short-description']:
-                                        # Only check the lastest run to see if zero
-                                        # if((float(df_data_1['numeric-score']) != 0.0) or (float(df_data_2['numeric-score']) !=0.0)):
-                                        if((float(df_data_2['numeric-score']) !=0.0)):
-                                            logger.info("Performance Critical {percent} {description}".format(percent=percent_delta,description=df_data_2['short-description']))
-                                            background = self.background_red
-                                            self.performance_critical += 1
-                                            self.test_result = "Critical"
-                                        else:
-                                            logger.info("Performance Good {percent} {description}".format(percent=percent_delta,description=df_data_2['short-description']))
-                                            self.test_result = "Good"
-                                            background = self.background_green
-                                            self.performance_good += 1
-                                    elif 'Max Stations IP' in df_data_1['short-description']:
-                                        if((float(df_data_2['numeric-score']) == 0.0)):
-                                            logger.info("Performance Critical {percent} {description}".format(percent=percent_delta,description=df_data_2['short-description']))
-                                            background = self.background_red
-                                            self.performance_critical += 1
-                                            self.test_result = "Critical"
-                                        else:
-                                            logger.info("Performance Good {percent} {description}".format(percent=percent_delta,description=df_data_2['short-description']))
-                                            self.test_result = "Good"
-                                            background = self.background_green
-                                            self.performance_good += 1
-
-                                    else:
-                                        logger.info("Performance Critical {percent} {description}".format(percent=percent_delta,description=df_data_2['short-description']))
-                                        self.test_result = "Critical"
-                                        background = self.background_red
-                                        self.performance_critical += 1
-                                else:
-                                    logger.info("Performance Critical {percent} {description}".format(percent=percent_delta,description=df_data_2['short-description']))
-                                    self.test_result = "Critical"
-                                    background = self.background_red
-                                    self.performance_critical += 1
-
-
-                                # we can get most anything from the dataframe
-                                # TODO use the dataframe export line to CSV?
-                                row = [
-                                    df_data_1['test-rig'],
-                                    df_data_1['test-tag'],
-                                    df_data_1['Graph-Group'],
-                                    df_data_1['test-id'],
-                                    df_data_1['short-description'],
-                                    df_data_1['Units'],
-                                    df_data_1['dut-hw-version'],
-                                    df_data_1['dut-sw-version'],
-                                    df_data_1['dut-model-num'],
-                                    df_data_1['kernel'],
-                                    df_data_1['gui_build_date'],
-                                    df_data_1['numeric-score'],
-                                    df_data_2['dut-hw-version'],
-                                    df_data_2['dut-sw-version'],
-                                    df_data_2['dut-model-num'],
-                                    df_data_2['kernel'],
-                                    df_data_2['gui_build_date'],
-                                    df_data_2['numeric-score'],
-                                    percent_delta,
-                                    self.test_result
-                                ]
-
-                                self.csv_results_writer.writerow(row)
-                                self.csv_results_file.flush()
-
-                                # Set the relative path for results
-                                report_path_1 = df_data_1['kpi_path'] + "readme.html"
-                                relative_report_1 = os.path.relpath(report_path_1, self.lf_inspect_report_path)
-
-                                report_dir_path_1 = df_data_1['kpi_path']
-                                relative_report_dir_path_1 = os.path.relpath(report_dir_path_1, self.lf_inspect_report_path)
+        self.conn = sqlite3.connect(self.database)
+        df_1 = read_compare_table(self.conn, self.table,
+                                  element_column=col_list[0] if col_list else None,
+                                  element_value=sub_attrib_list[0] if col_list else None,
+                                  window_start=window_start)
+        self.conn.close()
+        df_1 = select_db_index(df_1, int(self.db_index_list[0]))
+
+        for db_num in range(1, len(self.database_list)):
+            self.database_comp = self.database_list[db_num]
+            db_index = int(self.db_index_list[db_num]) if db_num < len(self.db_index_list) else 0
+
+            self.conn_comp = sqlite3.connect(self.database_comp)
+            df_2 = read_compare_table(self.conn_comp, self.table,
+                                      element_column=col_list[0] if col_list else None,
+                                      element_value=sub_attrib_list[db_num] if col_list else None)
+            self.conn_comp.close()
+            df_2 = select_db_index(df_2, db_index)
+            logger.info("db {db_1}: {rows_1} groups in test window, db {db_2}: {rows_2} groups".format(
+                db_1=self.database, rows_1=len(df_1), db_2=self.database_comp, rows_2=len(df_2)))
+
+            # position of each group in df_2
+            comp_rows = {key: position for position, key in enumerate(zip(*(df_2[column] for column in COMPARE_KEYS)))}
+            for position, key in enumerate(zip(*(df_1[column] for column in COMPARE_KEYS))):
+                if key in comp_rows:
+                    logger.info("{db} contains: {group} {tag} {desc}".format(db=self.database_comp, group=key[1], tag=key[0], desc=key[2]))
+                    self.compare_rows(df_1.iloc[position], df_2.iloc[comp_rows[key]])
 
-                                report_path_2 = df_data_2['kpi_path'] + "readme.html"
-                                relative_report_2 = os.path.relpath(report_path_2, self.lf_inspect_report_path)
+        # finish the results table
+        self.finish_html_results()
 
-                                report_dir_path_2 = df_data_2['kpi_path']
-                                relative_report_dir_path_2 = os.path.relpath(report_dir_path_2, self.lf_inspect_report_path)
+        self.finish_junit_testsuite()
+        self.finish_junit_testsuites()
 
-                                self.html_results += """
-                                <tr><td>""" + str(df_data_1['test-rig']) + """</td>
-                                <td>""" + str(df_data_1['test-tag']) + """</td>
-                                <td>""" + str(df_data_1['Graph-Group']) + """</td>
-                                <td>""" + str(df_data_1['test-id']) + """</td>
-                                <td>""" + str(df_data_1['short-description']) + """</td>
-                                <td>""" + str(df_data_1['Units']) + """</td>
-                                <td>""" + str(df_data_1['dut-model-num']) + """</td>
-                                <td>""" + str(df_data_1['kernel']) + """</td>
-                                <td>""" + str(df_data_1['gui_build_date']) + """</td>
-                                <td>""" + str(df_data_1['numeric-score']) + """</td>
-                                <td>""" + str(df_data_2['dut-model-num']) + """</td>
-                                <td>""" + str(df_data_2['kernel']) + """</td>
-                                <td>""" + str(df_data_2['gui_build_date']) + """</td>
-                                <td>""" + str(df_data_2['numeric-score']) + """</td>
+    # classify one comparison and add it to the csv, html and junit results
+    def compare_rows(self, df_data_1, df_data_2):
+        percent_delta = 0
+        if((float(df_data_1['numeric-score']) != 0 and df_data_1['numeric-score'] is not None) and df_data_2 is not None):
+            percent_delta = round(((float(df_data_2['numeric-score'])/float(df_data_1['numeric-score'])) * 100), 2)
+
+        self.performance_total += 1
+
+        # AP auto basic connectivity the failure is if the connection took longer then 500 ms
+        if 'Basic Client Connectivity' in df_data_2['short-description']:
+            # currently AP auto is a failure if greater then 500 ms
+            if float(df_data_2['numeric-score']) > 500:
+                self.test_result = "Critical"
+                background = self.background_red
+                self.performance_critical += 1
+                logger.info("Basic Client Connectivity {connect_time} > 500 ms so failed".format(connect_time=float(df_data_2['numeric-score'])))
+            else:
+                self.test_result = "Good"
+                background = self.background_green
+                self.performance_good += 1
+                logger.info("Basic Client Connectivity {connect_time} < 500 ms so passed".format(connect_time=float(df_data_2['numeric-score'])))
+        # changing the performce to > 80 7/9/2024 - 
+        elif percent_delta >= 80:
+            logger.info("Performance Good {percent} {description}".format(percent=percent_delta,description=df_data_2['short-description']))
+            self.test_result = "Good"
+            background = self.background_green
+            self.performance_good += 1
+        elif percent_delta >= 70:
+            logger.info("Performance Fair {percent} {description}".format(percent=percent_delta,description=df_data_2['short-description']))
+            self.test_result = "Fair"
+            background = self.background_purple
+            self.performance_fair += 1
+        elif percent_delta >= 50:
+            logger.info("Performance Poor {percent} {description}".format(percent=percent_delta,description=df_data_2['short-description']))
+            self.test_result = "Poor"
+            background = self.background_orange
+            self.performance_poor += 1
+        elif percent_delta == 0:
+            # for UL in test-tag and DL 0 or DL in test-tag and UL 0 this case should not be a failure
+            if 'UL+DL' in df_data_1['short-description'] and 'DL_UL' in df_data_1['test-tag']:
+                logger.info("For test {test} the {discription} DL not being monitored Not Applicable".format(
+                        test=df_data_1['test-tag'],description=df_data_1['short-description']))
+                background = self.background_red
+                self.performance_critical += 1
+                self.test_result = "Critical"
+            elif 'DL' in df_data_1['short-description'] and 'UL' in df_data_1['test-tag']:
+                logger.info("For test {test} the {discription} DL not being monitored Not Applicable".format(
+                        test=df_data_1['test-tag'],description=df_data_1['short-description']))
+                background = self.background_green
+                self.performance_good += 1
+                self.test_result = "Good"
+            elif 'DL' in df_data_1['short-description'] and 'UL' in df_data_1['test-tag']:
+                logger.info("For test {test} the {discription} DL not being monitored Not Applicable".format(
+                        test=df_data_1['test-tag'],description=df_data_1['short-description']))
+                background = self.background_green
+                self.performance_good += 1
+                self.test_result = "Good"
+
+            # negative logic like Stations Failed IP if zero is a good thing
+            elif 'Failed' in df_data_1['short-description']:
+                # Only check the lastest run to see if zero
+                # if((float(df_data_1['numeric-score']) != 0.0) or (float(df_data_2['numeric-score']) !=0.0)):
+                if((float(df_data_2['numeric-score']) !=0.0)):
+                    logger.info("Performance Critical {percent} {description}".format(percent=percent_delta,description=df_data_2['short-description']))
+                    background = self.background_red
+                    self.performance_critical += 1
+                    self.test_result = "Critical"
+                else:
+                    logger.info("Performance Good {percent} {description}".format(percent=percent_delta,description=df_data_2['short-description']))
+                    self.test_result = "Good"
+                    background = self.background_green
+                    self.performance_good += 1
+            elif 'Max Stations IP' in df_data_1['short-description']:
+                if((float(df_data_2['numeric-score']) == 0.0)):
+                    logger.info("Performance Critical {percent} {description}".format(percent=percent_delta,description=df_data_2['short-description']))
+                    background = self.background_red
+                    self.performance_critical += 1
+                    self.test_result = "Critical"
+                else:
+                    logger.info("Performance Good {percent} {description}".format(percent=percent_delta,description=df_data_2['short-description']))
+                    self.test_result = "Good"
+                    background = self.background_green
+                    self.performance_good += 1
 
-                                <td style=""" + str(background) + """>""" + str(percent_delta) + """</td>
-                                <td style=""" + str(background) + """>""" + str(self.test_result) + """</td>
-                                <td><a href=""" + str(relative_report_1) + """ target=\"_blank\">report_1</a></td>
-                                <td><a href=""" + str(relative_report_dir_path_1) + """ target=\"_blank\">report_dir_1</a></td>
-                                <td><a href=""" + str(relative_report_2) + """ target=\"_blank\">report_2</a></td>
-                                <td><a href=""" + str(relative_report_dir_path_2) + """ target=\"_blank\">report_dir_2</a></td>
+            else:
+                logger.info("Performance Critical {percent} {description}".format(percent=percent_delta,description=df_data_2['short-description']))
+                self.test_result = "Critical"
+                background = self.background_red
+                self.performance_critical += 1
+        else:
+            logger.info("Performance Critical {percent} {description}".format(percent=percent_delta,description=df_data_2['short-description']))
+            self.test_result = "Critical"
+            background = self.background_red
+            self.performance_critical += 1
+
+
+        # we can get most anything from the dataframe
+        # TODO use the dataframe export line to CSV?
+        row = [
+            df_data_1['test-rig'],
+            df_data_1['test-tag'],
+            df_data_1['Graph-Group'],
+            df_data_1['test-id'],
+            df_data_1['short-description'],
+            df_data_1['Units'],
+            df_data_1['dut-hw-version'],
+            df_data_1['dut-sw-version'],
+            df_data_1['dut-model-num'],
+            df_data_1['kernel'],
+            df_data_1['gui_build_date'],
+            df_data_1['numeric-score'],
+            df_data_2['dut-hw-version'],
+            df_data_2['dut-sw-version'],
+            df_data_2['dut-model-num'],
+            df_data_2['kernel'],
+            df_data_2['gui_build_date'],
+            df_data_2['numeric-score'],
+            percent_delta,
+            self.test_result
+        ]
+
+        self.csv_results_writer.writerow(row)
+        self.csv_results_file.flush()
 
+        # Set the relative path for results
+        report_path_1 = df_data_1['kpi_path'] + "readme.html"
+        relative_report_1 = os.path.relpath(report_path_1, self.lf_inspect_report_path)
 
-                                </tr>"""
+        report_dir_path_1 = df_data_1['kpi_path']
+        relative_report_dir_path_1 = os.path.relpath(report_dir_path_1, self.lf_inspect_report_path)
 
-                                self.junit_test = "{test_tag} {group} {test_id} {description}".format(
-                                    test_tag=test_tag, group=graph_group, test_id=df_data_1['test-id'], description=df_data_1['short-description'])
-                                # record the junit results
-                                self.junit_results += """
-                                    <testcase name="{name}" classname="{suite}" id="{description}" time="{time}">
-                                    """.format(name=self.junit_test, suite=self.test_suite, description=description,time="1")
+        report_path_2 = df_data_2['kpi_path'] + "readme.html"
+        relative_report_2 = os.path.relpath(report_path_2, self.lf_inspect_report_path)
 
-                                # remove junit xml characters
-                                str_df_data_1 = str(df_data_1).replace('<', '').replace('>', '')
-                                str_df_data_2 = str(df_data_2).replace('<', '').replace('>', '')
+        report_dir_path_2 = df_data_2['kpi_path']
+        relative_report_dir_path_2 = os.path.relpath(report_dir_path_2, self.lf_inspect_report_path)
 
-                                # Start properties
-                                self.junit_results += """
-                                <properties>
-                                """
+        self.html_results += """
+        <tr><td>""" + str(df_data_1['test-rig']) + """</td>
+        <td>""" + str(df_data_1['test-tag']) + """</td>
+        <td>""" + str(df_data_1['Graph-Group']) + """</td>
+        <td>""" + str(df_data_1['test-id']) + """</td>
+        <td>""" + str(df_data_1['short-description']) + """</td>
+        <td>""" + str(df_data_1['Units']) + """</td>
+        <td>""" + str(df_data_1['dut-model-num']) + """</td>
+        <td>""" + str(df_data_1['kernel']) + """</td>
+        <td>""" + str(df_data_1['gui_build_date']) + """</td>
+        <td>""" + str(df_data_1['numeric-score']) + """</td>
+        <td>""" + str(df_data_2['dut-model-num']) + """</td>
+        <td>""" + str(df_data_2['kernel']) + """</td>
+        <td>""" + str(df_data_2['gui_build_date']) + """</td>
+        <td>""" + str(df_data_2['numeric-score']) + """</td>
+
+        <td style=""" + str(background) + """>""" + str(percent_delta) + """</td>
+        <td style=""" + str(background) + """>""" + str(self.test_result) + """</td>
+        <td><a href=""" + str(relative_report_1) + """ target=\"_blank\">report_1</a></td>
+        <td><a href=""" + str(relative_report_dir_path_1) + """ target=\"_blank\">report_dir_1</a></td>
+        <td><a href=""" + str(relative_report_2) + """ target=\"_blank\">report_2</a></td>
+        <td><a href=""" + str(relative_report_dir_path_2) + """ target=\"_blank\">report_dir_2</a></td>
+
+
+        </tr>"""
+
+        self.junit_test = "{test_tag} {group} {test_id} {description}".format(
+            test_tag=df_data_1['test-tag'], group=df_data_1['Graph-Group'], test_id=df_data_1['test-id'], description=df_data_1['short-description'])
+        # record the junit results
+        self.junit_results += """
+            <testcase name="{name}" classname="{suite}" id="{description}" time="{time}">
+            """.format(name=self.junit_test, suite=self.test_suite, description=df_data_1['short-description'],time="1")
 
-                                self.junit_results += """
-                                    <property name="url:lf_inspect" value="http://{server_ip}/{lf_inspect}" />
-                                    <property name="Performance" value="{test_result}" />
-                                    <property name="Last Run" value="{numeric_score_1}" />
-                                    <property name="Prev Run" value="{numeric_score_2}" />
-                                    <property name="percent" value="{percent}" />
-                                    <property name="Last Data" value="{df_data_1}" />
-                                    <property name="Perv Data" value="{df_data_2}" />
-                                    """.format(server_ip=self.server_ip, lf_inspect=self.lf_inspect_report_url,
-                                            test_result=self.test_result, numeric_score_1=df_data_1['numeric-score'], numeric_score_2=df_data_2['numeric-score'],
-                                            percent=percent_delta, df_data_1=str_df_data_1, df_data_2=str_df_data_2)
-                                
-                                # End properties
-                                self.junit_results += """
-                                </properties>
-                                """                
-                                # Anything other then Good is a failure for allure
-                                if self.test_result != "Good":
-                                    self.junit_results += """
-                                        <failure message="Performance: {result}  Percent: {percent}">
-                                        </failure>""".format(result=self.test_result, percent=percent_delta)
+        # remove junit xml characters
+        str_df_data_1 = str(df_data_1).replace('<', '').replace('>', '')
+        str_df_data_2 = str(df_data_2).replace('<', '').replace('>', '')
 
-                                self.junit_results += """
-                                    </testcase>
-                                    """
+        # Start properties
+        self.junit_results += """
+        <properties>
+        """
 
-        # finish the results table
-        self.finish_html_results()
+        self.junit_results += """
+            <property name="url:lf_inspect" value="http://{server_ip}/{lf_inspect}" />
+            <property name="Performance" value="{test_result}" />
+            <property name="Last Run" value="{numeric_score_1}" />
+            <property name="Prev Run" value="{numeric_score_2}" />
+            <property name="percent" value="{percent}" />
+            <property name="Last Data" value="{df_data_1}" />
+            <property name="Perv Data" value="{df_data_2}" />
+            """.format(server_ip=self.server_ip, lf_inspect=self.lf_inspect_report_url,
+                    test_result=self.test_result, numeric_score_1=df_data_1['numeric-score'], numeric_score_2=df_data_2['numeric-score'],
+                    percent=percent_delta, df_data_1=str_df_data_1, df_data_2=str_df_data_2)
+
+        # End properties
+        self.junit_results += """
+        </properties>
+        """                
+        # Anything other then Good is a failure for allure
+        if self.test_result != "Good":
+            self.junit_results += """
+                <failure message="Performance: {result}  Percent: {percent}">
+                </failure>""".format(result=self.test_result, percent=percent_delta)
 
-        self.finish_junit_testsuite()
-        self.finish_junit_testsuites()
+        self.junit_results += """
+            </testcase>
+            """
 
     def compare_single_db_info(self):
         logger.info("compare the data in single db: {db_list}".format(db_list=self.database_list))
@@ -1286,12 +1287,16 @@ Compare second to last run to last run the index would be 1 for second to last a
 To compare a kpi element such as dut-model-num
     --path REPORT_PATH --databasek DATABASE_SQLITE_1,DATABASE_SQLITE_2 --db_index 0,0 --element dut-model-num==AXE11000&&NETGEAR_R7000
 
+To compare the last run of one database with the last run of two others
+    --path REPORT_PATH --database DATABASE_SQLITE_1,DATABASE_SQLITE_2,DATABASE_SQLITE_3 --db_index 0,0,0
+
         ''')
     parser.add_argument('--path', help=''' --path to where to place the results ''', default='')
 
     parser.add_argument('--database', help='''
-                        --database db_one,db_two may be a list of up to 2 db', default='qa_test_db
-                        for single db then will compare is done within same db.''')
+                        --database db_one,db_two may be a list of db', default='qa_test_db
+                        for single db then will compare is done within same db.
+                        for more than one db the first db is compared to each of the others''')
     parser.add_argument('--db_index', help='''--db_index  db_index_one,db_index_two
 if db_index is not specified:
     for single db compare, will compare last run with previous
@@ -1349,8 +1354,8 @@ Note: in the Allure report the dataframe indexs will be reduced by 1
         __db_index_list =db_index.split(',')
     else:
         if len(__database_list) > 1:
-            # compare the lastest in both dbs
-            __db_index_list = [0, 0]
+            # compare the lastest in all dbs
+            __db_index_list = [0] * len(__database_list)
         else:
             __db_index_list = [0, 0]
 
@@ -1549,9 +1554,8 @@ Note: in the Allure report the dataframe indexs will be reduced by 1
     #  os.path.splitext(str(os.path.basename(self.database_list[0])))[0]
     if(len(__database_list)) == 1:
         lf_inspect_database_name = os.path.splitext(str(os.path.basename(__database_list[0])))[0]
-    # for now assume 2, TODO loop though list
     else:
-        lf_inspect_database_name = os.path.splitext(str(os.path.basename(__database_list[0])))[0]+"_"+os.path.splitext(str(os.path.basename(__database_list[1])))[0]
+        lf_inspect_database_name = "_".join(os.path.splitext(str(os.path.basename(database)))[0] for database in __database_list)
     junit_xml, junit_path_only = report.write_junit_results(test_suite=lf_inspect_database_name)
 
 
@@ -15,12 +15,14 @@ import importlib
 import plotly.express as px
 import pandas as pd
 import sqlite3
+import hashlib
 import argparse
 from pathlib import Path
 import time
 import logging
 import re
 import traceback
+from concurrent.futures import ProcessPoolExecutor
 
 
 
@@ -35,6 +37,154 @@ lf_logger_config = importlib.import_module("py-scripts.lf_logger_config")
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 
 
+def build_kpi_figure(df_tmp, group, test_id, test_tag, test_rig, units):
+    """ plotly figure of one Graph-Group of one test-tag on one test-rig """
+    title = "{test_id} : {group} : {test_tag} : {test_rig}".format(
+        test_id=test_id, group=group, test_tag=test_tag, test_rig=test_rig)
+    # group of Score will have subtest
+    if group == 'Score':
+        # Print out the Standard Score report
+        kpi_fig = (
+            px.scatter(
+                df_tmp,
+                x="Date",
+                y="numeric-score",
+                custom_data=[
+                    'numeric-score',
+                    'Subtest-Pass',
+                    'Subtest-Fail',
+                    'kernel'
+                    ],
+                color="short-description",
+                hover_name="short-description",
+                size_max=60)).update_traces(
+            mode='lines+markers')
+
+        kpi_fig.update_traces(
+            hovertemplate="<br>".join([
+                "kernel-version: %{customdata[4]}",
+                "numeric-score: %{customdata[0]}",
+                "Subtest-Pass: %{customdata[1]}",
+                "Subtest-Fail: %{customdata[2]}"
+            ])
+        )
+
+        kpi_fig.update_layout(
+            title=title,
+            xaxis_title="Time",
+            yaxis_title="{}".format(units),
+            xaxis={'type': 'date'}
+        )
+        kpi_fig.update_layout(autotypenumbers='convert types')
+    else:
+        kpi_fig = (
+            px.scatter(
+                df_tmp,
+                x="Date",
+                y="numeric-score",
+                custom_data=[
+                    'Date',
+                    'test_dir',
+                    'numeric-score',
+                    'kernel',
+                    'radio_fw',
+                    'gui_ver',
+                    'gui_build_date',
+                    'server_ver',
+                    'server_build_date',
+                    'dut-hw-version',
+                    'dut-sw-version',
+                    'dut-model-num',
+                    'dut-serial-num'
+                    ],
+                color="short-description",
+                hover_name="short-description",
+                size_max=60)).update_traces(
+            mode='lines+markers')
+
+        kpi_fig.update_layout(
+            title=title,
+            xaxis_title="Time",
+            yaxis_title="{units}".format(units=units),
+            xaxis={'type': 'date'}
+        )
+
+        kpi_fig.update_traces(
+            hovertemplate="<br>".join([
+                "Date: %{customdata[0]}",
+                "test_dir: %{customdata[1]}",
+                "numeric-score: %{customdata[2]}",
+                "kernel-version: %{customdata[3]}",
+                "radio-fw: %{customdata[4]}",
+                "gui-version: %{customdata[5]}",
+                "gui-build-date: %{customdata[6]}",
+                "server-version: %{customdata[7]}",
+                "server-build-date: %{customdata[8]}",
+                "dut-hw-version: %{customdata[9]}",
+                "dut-sw-version: %{customdata[10]}",
+                "dut-model-num: %{customdata[11]}",
+                "dut-serial-num: %{customdata[12]}",
+            ])
+        )
+
+        kpi_fig.update_layout(autotypenumbers='convert types')
+    return kpi_fig
+
+
+def write_kpi_figure(kpi_fig, png_path, html_path):
+    """ write the png and the interactive html, returns False if the png could not be written """
+    png_present = True
+    try:
+        kpi_fig.write_image(png_path, scale=1, width=1200, height=300)
+    except ValueError as err:
+        logger.info("ValueError kpi_fig.write_image {msg}".format(msg=err))
+        png_present = False
+    except Exception as x:
+        traceback.print_exception(
+            Exception, x, x.__traceback__, chain=True)
+        logger.info("BaseException kpi_fig.write_image {msg}".format(msg=x))
+        png_present = False
+    # generate html image (interactive)
+    if png_present:
+        kpi_fig.write_html(html_path)
+    return png_present
+
+
+def kpi_chart_hash(chart):
+    """ hash of the rows and labels a chart is drawn from """
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(chart['df'], index=False).values.tobytes())
+    digest.update(",".join(chart['df'].columns).encode())
+    digest.update(repr((chart['group'], chart['test_id'], chart['test_tag'], chart['test_rig'],
+                        chart['units'])).encode())
+    return digest.hexdigest()
+
+
+def render_kpi_chart(chart):
+    """
+    Write the png and html of a chart unless the files from a previous build
+    were drawn from the same rows, runs in the process pool of generate_graph_png()
+    returns (png present, cached)
+    """
+    hash_path = chart['png_path'] + '.sha256'
+    chart_hash = kpi_chart_hash(chart)
+    if chart['use_cache'] and os.path.exists(chart['png_path']) and os.path.exists(chart['html_path']):
+        try:
+            with open(hash_path, 'r') as hash_fd:
+                if hash_fd.read().strip() == chart_hash:
+                    return True, True
+        except OSError:
+            pass
+    kpi_fig = build_kpi_figure(chart['df'], chart['group'], chart['test_id'], chart['test_tag'],
+                               chart['test_rig'], chart['units'])
+    png_present = write_kpi_figure(kpi_fig, chart['png_path'], chart['html_path'])
+    if png_present:
+        with open(hash_path, 'w') as hash_fd:
+            hash_fd.write(chart_hash)
+    return png_present, False
+
+
+
 class csv_sql:
     def __init__(self,
                  _path='.',
@@ -44,7 +194,9 @@ class csv_sql:
                  _database='qa_db',
                  _table='qa_table',
                  _png=False,
-                 _test_window_days='7'):
+                 _test_window_days='7',
+                 _workers=4,
+                 _png_cache=True):
         self.path = _path
         self.path_comp = _path_comp
         self.lf_qa_report_path = _lf_qa_report_path
@@ -56,10 +208,14 @@ class csv_sql:
         self.database = _database
         self.table = _table
         self.png = _png
+        self.workers = int(_workers)
+        self.png_cache = _png_cache
+        self.df_history = None
         self.kpi_list = []
         self.html_list = []
         self.conn = None
         self.df = pd.DataFrame()
+        self.meta_cache = {}
         self.plot_figure = []
         self.html_results = ""
         self.test_rig_list = []
@@ -108,151 +264,99 @@ class csv_sql:
         parent_path = os.path.dirname(_path)
         return parent_path
 
-    # TODO put a wrapper around all the LANforge pertinate information
-    # TODO put in traceback on the exceptions.
-    def get_kernel_version_from_meta(sefl, _kpi_path):
-        kernel_version = "NA"
-        logger.info("read meta path for kernel version:  {_kpi_path}".format(_kpi_path=_kpi_path))
-        try:
-            meta_data_path = _kpi_path + '/' + '/meta.txt'
-            meta_data_fd = open(meta_data_path, 'r')
-            for line in meta_data_fd:
-                if "lanforge_kernel_version:" in line:
-                    kernel_version = line.replace("$ lanforge_kernel_version:", "")
-                    kernel_version = test_run.strip()
-                    logger.info("meta_data_path: {meta_data_path} Kernel Version: {kernel}".format(
-                        meta_data_path=meta_data_path, kernel=kernel_version))
-                    break
-            meta_data_fd.close()
-        except Exception as x:
-            traceback.print_exception(
-                Exception, x, x.__traceback__, chain=True)
-            logger.info("exception reading meta get_kernel_version_from_meta {_kpi_path}".format(
-                _kpi_path=_kpi_path))
-        return kernel_version
-
-    def get_radio_firmware_from_meta(sefl, _kpi_path):
-        radio_firmware = "NA"
-        logger.info("read meta path for radio firmware version:  {_kpi_path}".format(_kpi_path=_kpi_path))
-        try:
-            meta_data_path = _kpi_path + '/' + '/meta.txt'
-            meta_data_fd = open(meta_data_path, 'r')
-            for line in meta_data_fd:
-                if "radio_firmware" in line:
-                    radio_firmware = line.replace("$ radio_firmware:", "")
-                    radio_firmware = test_run.strip()
-                    logger.info("meta_data_path: {meta_data_path} Radio Firmware : {radio_fw}".format(
-                        meta_data_path=meta_data_path, kernel=kernel_version))
-                    break
-            meta_data_fd.close()
-        except Exception as x:
-            traceback.print_exception(
-                Exception, x, x.__traceback__, chain=True)
-            logger.info("exception reading meta get_kernel_version_from_meta {_kpi_path}".format(
-                _kpi_path=_kpi_path))
-        return radio_firmware
-
-
-    def get_gui_info_from_meta(sefl, _kpi_path):
-        gui_version = "NA"
-        gui_build_date = "NA"
-        gui_build_date
-        logger.debug("read meta path for gui version:  {_kpi_path}".format(_kpi_path=_kpi_path))
+    # meta.txt is read once per test directory, the get_*_from_meta methods
+    # return fields of the cached parse
+    def read_meta(self, _kpi_path):
+        meta_data_path = os.path.normpath(_kpi_path + '/' + 'meta.txt')
+        if meta_data_path in self.meta_cache:
+            return self.meta_cache[meta_data_path]
+        meta = {
+            'test_run': "NA",
+            'use_meta_test_tag': False,
+            'test_tag': "NA",
+            'test_dir': "NA",
+            'kernel': "NA",
+            'radio_fw': "NA",
+            'gui_ver': "NA",
+            'gui_build_date': "NA",
+            'server_ver': "NA",
+            'server_build_date': "NA",
+        }
+        # the first line of each kind is used, except for test_tag where the last one is
+        found = set()
+        meta_test_tag = "NA"
+        logger.info("read meta path {meta_data_path}".format(meta_data_path=meta_data_path))
         try:
-            meta_data_path = _kpi_path + '/' + '/meta.txt'
-            meta_data_fd = open(meta_data_path, 'r')
-            for line in meta_data_fd:
-                if "lanforge_gui_version_full:" in line:
-                    # gui_version = line.replace("lanforge_gui_version_full:", "")
-                    # gui_version = test_run.strip()
-
-                    pattern = "\"BuildVersion\" : \"(\\S+)\""
-                    match = re.search(pattern, line)
-                    if (match is not None):
-                        gui_version = match.group(1)
-
-                    pattern = "\"BuildDate\" : \"(\\S+\\s+\\S+\\s+\\S+\\s+\\S+\\s+\\S+\\s+\\S+\\s+\\S+)\""
-                    match = re.search(pattern, line)
-                    if (match is not None):
-                        gui_build_date = match.group(1)
-
-
-                    logger.info("meta_data_path: {meta_data_path} GUI Version: {gui_version} GUI Build Date {gui_build_date}".format(
-                        meta_data_path=meta_data_path, gui_version=gui_version,gui_build_date=gui_build_date))
-
-                    break
-            meta_data_fd.close()
-
+            with open(meta_data_path, 'r') as meta_data_fd:
+                for line in meta_data_fd:
+                    if "test_run" in line and 'test_run' not in found:
+                        found.add('test_run')
+                        meta['test_run'] = line.replace("$ test_run: ", "").strip()
+                    if "gui_version:" in line:
+                        gui_version = line.replace("$ lanforge_gui_version:", "").strip()
+                        if gui_version == '5.4.3':
+                            meta['use_meta_test_tag'] = True
+                    if "test_tag" in line:
+                        meta_test_tag = line.replace("test_tag", "").strip()
+                    if "file_meta:" in line and 'test_dir' not in found:
+                        found.add('test_dir')
+                        meta['test_dir'] = line.split('/')[-2]
+                    if "lanforge_kernel_version:" in line and 'kernel' not in found:
+                        found.add('kernel')
+                        meta['kernel'] = line.replace("$ lanforge_kernel_version:", "").strip()
+                    if "radio_firmware" in line and 'radio_fw' not in found:
+                        found.add('radio_fw')
+                        meta['radio_fw'] = line.replace("$ radio_firmware:", "").strip()
+                    if "lanforge_gui_version_full:" in line and 'gui' not in found:
+                        found.add('gui')
+                        match = re.search("\"BuildVersion\" : \"(\\S+)\"", line)
+                        if (match is not None):
+                            meta['gui_ver'] = match.group(1)
+                        match = re.search(
+                            "\"BuildDate\" : \"(\\S+\\s+\\S+\\s+\\S+\\s+\\S+\\s+\\S+\\s+\\S+\\s+\\S+)\"", line)
+                        if (match is not None):
+                            meta['gui_build_date'] = match.group(1)
+                    if "lanforge_server_version_full:" in line and 'server' not in found:
+                        found.add('server')
+                        match = re.search("Version: (\\S+)", line)
+                        if (match is not None):
+                            meta['server_ver'] = match.group(1)
+                        match = re.search("Compiled on:  (\\S+\\s+\\S+\\s+\\S+\\s+\\S+\\s+\\S+\\s+\\S+\\s+\\S+)", line)
+                        if (match is not None):
+                            meta['server_build_date'] = match.group(1)
         except Exception as x:
             traceback.print_exception(
                 Exception, x, x.__traceback__, chain=True)
-            logger.info("exception reading meta get_gui_version_from_meta {_kpi_path}".format(
-                _kpi_path=_kpi_path))
-        return gui_version, gui_build_date
-
-    def get_server_info_from_meta(sefl, _kpi_path):
-        server_version = "NA"
-        server_build_date = "NA"
-        logger.debug("read meta path for server version:  {_kpi_path}".format(_kpi_path=_kpi_path))
-        try:
-            meta_data_path = _kpi_path + '/' + '/meta.txt'
-            meta_data_fd = open(meta_data_path, 'r')
-            for line in meta_data_fd:
-                if "lanforge_server_version_full:" in line:
-
-                    pattern = "Version: (\\S+)"
-                    match = re.search(pattern, line)
-                    if (match is not None):
-                        server_version = match.group(1)
-
-                    pattern = "Compiled on:  (\\S+\\s+\\S+\\s+\\S+\\s+\\S+\\s+\\S+\\s+\\S+\\s+\\S+)"
+            logger.info("exception reading meta {meta_data_path}".format(
+                meta_data_path=meta_data_path))
+        # before 5.4.3 the test_tag is in kpi.csv
+        if meta['use_meta_test_tag']:
+            meta['test_tag'] = meta_test_tag
 
-                    match = re.search(pattern, line)
-                    if (match  is not None):
-                        server_build_date = match.group(1)
+        if meta['test_run'] == "NA":
+            meta['test_run'] = _kpi_path.rsplit('/', 2)[0]
+            logger.info("Try harder test_run: {test_run} _kpi_path: {_kpi_path}".format(
+                test_run=meta['test_run'], _kpi_path=_kpi_path))
+        logger.info("meta_data_path: {meta_data_path} {meta}".format(meta_data_path=meta_data_path, meta=meta))
+        self.meta_cache[meta_data_path] = meta
+        return meta
 
+    def get_kernel_version_from_meta(self, _kpi_path):
+        return self.read_meta(_kpi_path)['kernel']
 
-                    logger.info("meta_data_path: {meta_data_path} server Version: {server_version}".format(
-                        meta_data_path=meta_data_path, server_version=server_version))
-                    logger.info("meta_data_path: {meta_data_path} server_build_date: {server_build}".format(
-                        meta_data_path=meta_data_path, server_build=server_build_date))
-
-                    break
-
-            meta_data_fd.close()
-        except Exception as x:
-            traceback.print_exception(
-                Exception, x, x.__traceback__, chain=True)
-            logger.info("exception reading meta get_gui_server_from_meta {_kpi_path}".format(
-                _kpi_path=_kpi_path))
-        return server_version, server_build_date
-
-    def get_test_dir_info_from_meta(sefl, _kpi_path):
-        test_dir = "NA"
-        logger.debug("read meta path for test dir:  {_kpi_path}".format(_kpi_path=_kpi_path))
-        try:
-            meta_data_path = _kpi_path + '/' + '/meta.txt'
-            meta_data_fd = open(meta_data_path, 'r')
-            for line in meta_data_fd:
-                if "file_meta:" in line:
-                    split_line = line.split('/')
-                    test_dir = split_line[-2]
-                    logger.info("meta_data_path: {meta_data_path} test_dir: {test_dir}".format(
-                        meta_data_path=meta_data_path, test_dir=test_dir))
-                    break
-
-            meta_data_fd.close()
-        except Exception as x:
-            traceback.print_exception(
-                Exception, x, x.__traceback__, chain=True)
-            logger.info("exception reading meta get_gui_server_from_meta {_kpi_path}".format(
-                _kpi_path=_kpi_path))
-        return test_dir
+    def get_radio_firmware_from_meta(self, _kpi_path):
+        return self.read_meta(_kpi_path)['radio_fw']
 
+    def get_gui_info_from_meta(self, _kpi_path):
+        meta = self.read_meta(_kpi_path)
+        return meta['gui_ver'], meta['gui_build_date']
 
-    #def get_server_from_meta(sefl, _kpi_path):
-    #def get_gui_from_meta(sefl, _kpi_path):
+    def get_server_info_from_meta(self, _kpi_path):
+        meta = self.read_meta(_kpi_path)
+        return meta['server_ver'], meta['server_build_date']
 
+    def get_test_dir_info_from_meta(self, _kpi_path):
+        return self.read_meta(_kpi_path)['test_dir']
 
     def get_test_id_test_tag(self, _kpi_path):
         test_id = "NA"
@@ -297,75 +401,11 @@ class csv_sql:
         return test_id, test_tag
 
     def get_test_run_from_meta(self, _kpi_path):
-        test_run = "NA"
-        logger.info("read meta path {_kpi_path}".format(_kpi_path=_kpi_path))
-        try:
-            meta_data_path = _kpi_path + '/' + '/meta.txt'
-            meta_data_fd = open(meta_data_path, 'r')
-            for line in meta_data_fd:
-                if "test_run" in line:
-                    test_run = line.replace("$ test_run: ", "")
-                    test_run = test_run.strip()
-                    logger.info("meta_data_path: {meta_data_path} test_run: {test_run}".format(
-                        meta_data_path=meta_data_path, test_run=test_run))
-                    break
-            meta_data_fd.close()
-        except Exception as x:
-            traceback.print_exception(
-                Exception, x, x.__traceback__, chain=True)
-            logger.info("exception reading test_run from {_kpi_path}".format(
-                _kpi_path=_kpi_path))
-
-        if test_run == "NA":
-            try:
-                test_run = _kpi_path.rsplit('/', 2)[0]
-                logger.info("try harder test_run: {test_run}".format(test_run=test_run))
-            except Exception as x:
-                traceback.print_exception(
-                    Exception, x, x.__traceback__, chain=True)
-                logger.info("exception getting test_run from kpi_path")
-            logger.info("Try harder test_run: {test_run} _kpi_path: {_kpi_path}".format(test_run=test_run, _kpi_path=_kpi_path))
-        return test_run
-
-    # TODO retrieve the kernel, GUI, and Server information
+        return self.read_meta(_kpi_path)['test_run']
 
     def get_test_tag_from_meta(self, _kpi_path):
-        test_tag = "NA"
-        use_meta_test_tag = False
-        gui_version_5_4_3 = False
-        logger.info("read meta path {_kpi_path}".format(_kpi_path=_kpi_path))
-        try:
-            meta_data_path = _kpi_path + '/' + 'meta.txt'
-            meta_data_fd = open(meta_data_path, 'r')
-            for line in meta_data_fd:
-                if "gui_version:" in line:
-                    gui_version = line.replace("$ lanforge_gui_version:", "")
-                    gui_version = gui_version.strip()
-                    if gui_version == '5.4.3':
-                        gui_version_5_4_3 = True
-                        use_meta_test_tag = True
-                    logger.info("meta_data_path: {meta_data_path} lanforge_gui_version: {gui_version} 5.4.3: {gui_version_5_4_3}".format(
-                        meta_data_path=meta_data_path, gui_version=gui_version, gui_version_5_4_3=gui_version_5_4_3))
-            meta_data_fd.close()
-            if gui_version_5_4_3:
-                meta_data_fd = open(meta_data_path, 'r')
-                test_tag = 'NA'
-                for line in meta_data_fd:
-                    if "test_tag" in line:
-                        test_tag = line.replace("test_tag", "")
-                        test_tag = test_tag.strip()
-                        logger.info(
-                            "meta_data_path {meta_data_path} test_tag {test_tag}".format(
-                                meta_data_path=meta_data_path,
-                                test_tag=test_tag))
-                meta_data_fd.close()
-        except Exception as x:
-            traceback.print_exception(
-                Exception, x, x.__traceback__, chain=True)
-            logger.info("exception reading test_tag from {_kpi_path}".format(
-                _kpi_path=_kpi_path))
-
-        return use_meta_test_tag, test_tag
+        meta = self.read_meta(_kpi_path)
+        return meta['use_meta_test_tag'], meta['test_tag']
 
     def get_suite_html(self):
         suite_html_results = """
@@ -579,106 +619,117 @@ class csv_sql:
     # Fedora  sudo dnf install sqlitebrowser
     # Ubuntu sudo apt-get install sqlite3
     #
-    def store(self):
+    # The <table>_kpi_files table records every kpi.csv stored: its path, mtime,
+    # size and sha256. A kpi.csv already stored and unchanged is skipped, a changed
+    # one has its rows replaced.
+    def get_kpi_files_table(self):
+        return "{table}_kpi_files".format(table=self.table)
+
+    def get_stored_kpi_files(self):
+        kpi_files = {}
+        cursor = self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS \"{kpi_files}\" (kpi_file TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, "
+            "sha256 TEXT, rows INTEGER, stored TEXT)".format(kpi_files=self.get_kpi_files_table()))
+        cursor = self.conn.execute(
+            "SELECT kpi_file, mtime_ns, size, sha256 FROM \"{kpi_files}\"".format(kpi_files=self.get_kpi_files_table()))
+        for kpi_file, mtime_ns, size, sha256 in cursor.fetchall():
+            kpi_files[kpi_file] = (mtime_ns, size, sha256)
+        return kpi_files
+
+    def get_table_columns(self):
+        cursor = self.conn.execute("PRAGMA table_info(\"{table}\")".format(table=self.table))
+        return [row[1] for row in cursor.fetchall()]
+
+    def create_indexes(self):
+        # indexes for the dashboard queries, on the columns the table has
+        columns = self.get_table_columns()
+        for column in ['test-id', 'test-tag', 'Date', 'kpi_path']:
+            if column in columns:
+                self.conn.execute("CREATE INDEX IF NOT EXISTS \"ix_{table}_{name}\" ON \"{table}\" (\"{column}\")".format(
+                    table=self.table, name=column.replace('-', '_'), column=column))
+        self.conn.commit()
+
+    def read_kpi(self, kpi):
+        df_kpi_tmp = pd.read_csv(kpi, sep='\t')
+        # only store the path to the kpi.csv file
+        _kpi_path = str(kpi).replace('kpi.csv', '')
+        meta = self.read_meta(_kpi_path)
+        df_kpi_tmp['kpi_path'] = _kpi_path
+        df_kpi_tmp['test_run'] = meta['test_run']
+
+        if meta['use_meta_test_tag']:
+            df_kpi_tmp['test-tag'] = meta['test_tag']
+
+        df_kpi_tmp['test_dir'] = meta['test_dir']
+        logger.info("test_dir: {test_dir}".format(test_dir=meta['test_dir']))
+
+        df_kpi_tmp['kernel'] = meta['kernel']
+        df_kpi_tmp['radio_fw'] = meta['radio_fw']
+        df_kpi_tmp['gui_ver'] = meta['gui_ver']
+        df_kpi_tmp['gui_build_date'] = meta['gui_build_date']
+        df_kpi_tmp['server_ver'] = meta['server_ver']
+        df_kpi_tmp['server_build_date'] = meta['server_build_date']
+        return df_kpi_tmp
+
+    def store_path(self, _path):
         logger.info("reading kpi and storing in db {}".format(self.database))
-        path = Path(self.path)
+        path = Path(_path)
         logger.info("store path {path}".format(path=path))
-        logger.info("self.path  {path}".format(path=self.path))
         self.kpi_list = list(path.glob('**/kpi.csv'))  # Hard code for now
 
         if not self.kpi_list:
             logger.info("WARNING: used --store , no new kpi.csv found, check input path or remove --store from command line")
 
-        rows = []
-        for kpi in self.kpi_list:  # TODO note empty kpi.csv failed test
-            df_kpi_tmp = pd.read_csv(kpi, sep='\t')
-            # only store the path to the kpi.csv file
-            _kpi_path = str(kpi).replace('kpi.csv', '')
-            df_kpi_tmp['kpi_path'] = _kpi_path
-            test_run = self.get_test_run_from_meta(_kpi_path)
-            df_kpi_tmp['test_run'] = test_run
-
-            use_meta_test_tag, test_tag = self.get_test_tag_from_meta(_kpi_path)
-            if use_meta_test_tag:
-                df_kpi_tmp['test-tag'] = test_tag
-
-            test_dir = self.get_test_dir_info_from_meta(_kpi_path)
-            # test_dir = test_dir.replace('-',' ')
-            df_kpi_tmp['test_dir'] = test_dir
-
-            logger.info("test_dir: {test_dir}".format(test_dir=test_dir))
-
-            df_kpi_tmp['kernel'] = self.get_kernel_version_from_meta(_kpi_path)
-            df_kpi_tmp['radio_fw'] = self.get_radio_firmware_from_meta(_kpi_path)
-            df_kpi_tmp['gui_ver'], df_kpi_tmp['gui_build_date'] = self.get_gui_info_from_meta(_kpi_path)
-            df_kpi_tmp['server_ver'], df_kpi_tmp['server_build_date'] = self.get_server_info_from_meta(_kpi_path)
-
-            # this next line creats duplicate entries
-            self.df = pd.concat([self.df,df_kpi_tmp], ignore_index=True)
-
-
         self.conn = sqlite3.connect(self.database)
-        try:
-            self.df.to_sql(self.table, self.conn, if_exists='append')
-        except Exception as x:
-            traceback.print_exception(
-                Exception, x, x.__traceback__, chain=True)
-            logger.info("attempt to append to database with different column layout,\
-                 caused an exception, input new name --database <new name>")
-            print(
-                "Error attempt to append to database with different column layout,\
-                     caused an exception, input new name --database <new name>",
-                file=sys.stderr)
-            exit(1)
-        self.conn.close()
-
-    # information on sqlite database
-    # https://pandas.pydata.org/docs/reference/api/pandas.DataFrame.to_sql.html
-    # sqlite browser:
-    # Fedora  sudo dnf install sqlitebrowser
-    # Ubuntu sudo apt-get install sqlite3
-    #
-    def store_comp(self):
-        logger.info("reading kpi and storing in db {}".format(self.database))
-        path = Path(self.path_comp)
-        logger.info("store path {path}".format(path=path))
-        logger.info("self.path_comp  {path}".format(path=self.path_comp))
-        self.kpi_list = list(path.glob('**/kpi.csv'))  # Hard code for now
-
-        if not self.kpi_list:
-            logger.info("WARNING: used --store , no new kpi.csv found, check input path or remove --store from command line")
-
+        stored_kpi_files = self.get_stored_kpi_files()
+        kpi_frames = []
+        kpi_files = []
+        skipped = 0
         for kpi in self.kpi_list:  # TODO note empty kpi.csv failed test
-            df_kpi_tmp = pd.read_csv(kpi, sep='\t')
-            # only store the path to the kpi.csv file
-            _kpi_path = str(kpi).replace('kpi.csv', '')
-            df_kpi_tmp['kpi_path'] = _kpi_path
-            test_run = self.get_test_run_from_meta(_kpi_path)
-            df_kpi_tmp['test_run'] = test_run
-
-            use_meta_test_tag, test_tag = self.get_test_tag_from_meta(_kpi_path)
-            if use_meta_test_tag:
-                df_kpi_tmp['test-tag'] = test_tag
-
-            test_dir = self.get_test_dir_info_from_meta(_kpi_path)
-            # test_dir = test_dir.replace('-',' ')
-            df_kpi_tmp['test_dir'] = test_dir
-
-            logger.info("test_dir: {test_dir}".format(test_dir=test_dir))
-
-            df_kpi_tmp['kernel'] = self.get_kernel_version_from_meta(_kpi_path)
-            df_kpi_tmp['radio_fw'] = self.get_radio_firmware_from_meta(_kpi_path)
-            df_kpi_tmp['gui_ver'], df_kpi_tmp['gui_build_date'] = self.get_gui_info_from_meta(_kpi_path)
-            df_kpi_tmp['server_ver'], df_kpi_tmp['server_build_date'] = self.get_server_info_from_meta(_kpi_path)
-
-            # this next line creates duplicate entries
-            # df_kpi_tmp = df_kpi_tmp.append(df_kpi_tmp, ignore_index=True)
-            self.df = self.df.append(df_kpi_tmp, ignore_index=True)
-
-        self.conn = sqlite3.connect(self.database)
+            kpi_file = os.path.abspath(str(kpi))
+            stat = os.stat(kpi_file)
+            stored = stored_kpi_files.get(kpi_file)
+            if stored is not None and stored[0] == stat.st_mtime_ns and stored[1] == stat.st_size:
+                skipped += 1
+                continue
+            with open(kpi_file, 'rb') as kpi_fd:
+                sha256 = hashlib.sha256(kpi_fd.read()).hexdigest()
+            if stored is not None and stored[2] == sha256:
+                # touched but not changed
+                kpi_files.append((kpi_file, stat.st_mtime_ns, stat.st_size, sha256, None, str(kpi)))
+                skipped += 1
+                continue
+            df_kpi_tmp = self.read_kpi(kpi)
+            kpi_frames.append(df_kpi_tmp)
+            kpi_files.append((kpi_file, stat.st_mtime_ns, stat.st_size, sha256, len(df_kpi_tmp), str(kpi)))
+
+        logger.info("kpi.csv found: {found} already stored: {skipped} to store: {new}".format(
+            found=len(self.kpi_list), skipped=skipped, new=len(kpi_frames)))
+
+        # one concat, and the stored rows of changed kpi.csv files replaced in the same transaction
+        self.df = pd.concat(kpi_frames, ignore_index=True) if kpi_frames else pd.DataFrame()
         try:
-            self.df.to_sql(self.table, self.conn, if_exists='append')
+            if 'kpi_path' in self.get_table_columns():
+                self.conn.executemany(
+                    "DELETE FROM \"{table}\" WHERE kpi_path = ?".format(table=self.table),
+                    [(str(kpi).replace('kpi.csv', ''),) for _, _, _, _, rows, kpi in kpi_files if rows is not None])
+            stored_time = time.strftime("%Y-%m-%d %H:%M:%S")
+            for kpi_file, mtime_ns, size, sha256, rows, kpi in kpi_files:
+                if rows is None:
+                    self.conn.execute(
+                        "UPDATE \"{kpi_files}\" SET mtime_ns = ?, size = ? WHERE kpi_file = ?".format(
+                            kpi_files=self.get_kpi_files_table()), (mtime_ns, size, kpi_file))
+                else:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO \"{kpi_files}\" VALUES (?, ?, ?, ?, ?, ?)".format(
+                            kpi_files=self.get_kpi_files_table()), (kpi_file, mtime_ns, size, sha256, rows, stored_time))
+            if not self.df.empty:
+                # to_sql commits the transaction
+                self.df.to_sql(self.table, self.conn, if_exists='append')
+            else:
+                self.conn.commit()
         except Exception as x:
+            self.conn.rollback()
             traceback.print_exception(
                 Exception, x, x.__traceback__, chain=True)
             logger.info("attempt to append to database with different column layout,\
@@ -688,19 +739,19 @@ class csv_sql:
                      caused an exception, input new name --database <new name>",
                 file=sys.stderr)
             exit(1)
+        self.create_indexes()
         self.conn.close()
 
+    def store(self):
+        logger.info("self.path  {path}".format(path=self.path))
+        self.store_path(self.path)
 
+    def store_comp(self):
+        logger.info("self.path_comp  {path}".format(path=self.path_comp))
+        self.store_path(self.path_comp)
 
-    def generate_png(self, group, test_id_list, test_tag,
-                     test_rig, kpi_path_list, kpi_fig, df_tmp):
-        # save the figure - figures will be over written png
-        # for testing
-        png_server_img = ''
-        # generate the png files
-        logger.info("generate png and kpi images from kpi kpi_path:{}".format(
-            df_tmp['kpi_path']))
-            # LAN-1535 scripting: test_l3.py output masks other output when browsing (index.html) create relative paths in reports
+    def get_kpi_chart_paths(self, group, test_tag, test_rig, kpi_path_list):
+        # LAN-1535 scripting: test_l3.py output masks other output when browsing (index.html) create relative paths in reports
         # generate png img path
         png_path = os.path.join(
             kpi_path_list[-1], "{}_{}_{}_kpi.png".format(group, test_tag, test_rig))
@@ -709,48 +760,54 @@ class csv_sql:
         html_path = os.path.join(
             kpi_path_list[-1], "{}_{}_{}_kpi.html".format(group, test_tag, test_rig))
         html_path = html_path.replace(' ', '')
+        return png_path, html_path
 
-        # generate png image
-        png_present = True
-        try:
-            kpi_fig.write_image(png_path, scale=1, width=1200, height=300)
-        except ValueError as err:
-            logger.info("ValueError kpi_fig.write_image {msg}".format(msg=err))
-            png_present = False
-            # exit(1)
-        except Exception as x:
-            traceback.print_exception(
-                Exception, x, x.__traceback__, chain=True)
-            logger.info("BaseException kpi_fig.write_image{msg}".format(msg=err))
-            png_present = False
-            # exit(1)
-        # generate html image (interactive)
-        # TODO Do not crash if a PNG is not present
-        if png_present:
-            kpi_fig.write_html(html_path)
-            # Relative path
-            img_kpi_html_path_relative = os.path.relpath(html_path, self.lf_qa_report_path)
-            png_img_path_relative = os.path.relpath(png_path, self.lf_qa_report_path)
+    def add_kpi_chart_html(self, group, test_id_list, test_tag, test_rig, kpi_path_list, png_path, html_path):
+        # Relative path
+        img_kpi_html_path_relative = os.path.relpath(html_path, self.lf_qa_report_path)
+        png_img_path_relative = os.path.relpath(png_path, self.lf_qa_report_path)
 
-            # link to interactive results
-            report_index_html_path = kpi_path_list[-1] + "readme.html"
-            relative_report_index_html = os.path.relpath(report_index_html_path, self.lf_qa_report_path)
+        # link to interactive results
+        report_index_html_path = kpi_path_list[-1] + "readme.html"
+        relative_report_index_html = os.path.relpath(report_index_html_path, self.lf_qa_report_path)
 
-            self.html_results += """<a href={report_index_html_path} target="_blank">{test_id}_{group}_{test_tag}_{test_rig}_Report </a>
-            """.format(report_index_html_path=relative_report_index_html, test_id=test_id_list[-1], group=group, test_tag=test_tag, test_rig=test_rig)
+        self.html_results += """<a href={report_index_html_path} target="_blank">{test_id}_{group}_{test_tag}_{test_rig}_Report </a>
+        """.format(report_index_html_path=relative_report_index_html, test_id=test_id_list[-1], group=group, test_tag=test_tag, test_rig=test_rig)
 
-            self.html_results += """
-            <a href={img_kpi_html_path} target="_blank">
-                <img src={png_server_img}>
-            </a>
-            """.format(img_kpi_html_path=img_kpi_html_path_relative, png_server_img=png_img_path_relative)
+        self.html_results += """
+        <a href={img_kpi_html_path} target="_blank">
+            <img src={png_server_img}>
+        </a>
+        """.format(img_kpi_html_path=img_kpi_html_path_relative, png_server_img=png_img_path_relative)
 
-            self.html_results += """<br>"""
-            self.html_results += """<br>"""
-            self.html_results += """<br>"""
-            self.html_results += """<br>"""
-            self.html_results += """<br>"""
+        self.html_results += """<br>"""
+        self.html_results += """<br>"""
+        self.html_results += """<br>"""
+        self.html_results += """<br>"""
+        self.html_results += """<br>"""
 
+    def generate_png(self, group, test_id_list, test_tag,
+                     test_rig, kpi_path_list, kpi_fig, df_tmp):
+        # save the figure - figures will be over written png
+        logger.info("generate png and kpi images from kpi kpi_path:{}".format(
+            df_tmp['kpi_path']))
+        png_path, html_path = self.get_kpi_chart_paths(group, test_tag, test_rig, kpi_path_list)
+        # TODO Do not crash if a PNG is not present
+        if write_kpi_figure(kpi_fig, png_path, html_path):
+            self.add_kpi_chart_html(group, test_id_list, test_tag, test_rig, kpi_path_list, png_path, html_path)
+
+    # the table is read once per run, the subtest information and the graphs
+    # are both taken from it
+    def load_history(self):
+        if self.df_history is None:
+            self.conn = sqlite3.connect(self.database)
+            # current connection is sqlite3 /TODO move to SQLAlchemy
+            self.df_history = pd.read_sql_query(
+                "SELECT * from {}".format(self.table), self.conn)
+            self.conn.close()
+            # sort by date from oldest to newest, raises KeyError if the table is empty
+            self.df_history = self.df_history.sort_values(by='Date')
+        return self.df_history
 
     # TODO determin the subtest pass and fail graph
     # df is sorted by date oldest to newest
@@ -761,13 +818,8 @@ class csv_sql:
         logger.info("generate table and graph from subtest data per run: {}".format(
             time.time()))
         # https://datacarpentry.org/python-ecology-lesson/09-working-with-sql/index.html-
-        self.conn = sqlite3.connect(self.database)
-        # current connection is sqlite3 /TODO move to SQLAlchemy
-        df3 = pd.read_sql_query(
-            "SELECT * from {}".format(self.table), self.conn)
-        # sort by date from oldest to newest.
         try:
-            df3 = df3.sort_values(by='Date')
+            df3 = self.load_history()
         except Exception as x:
             traceback.print_exception(
                 Exception, x, x.__traceback__, chain=True)
@@ -775,7 +827,6 @@ class csv_sql:
                    "KeyError(key) when sorting by Date for db: {db},"
                    " check Database name, path to kpi, typo in path, exiting".format(db=self.database)))
             exit(1)
-        self.conn.close()
 
         # test_run are used for detemining the subtest-pass, subtest-fail
         # the tests are sorted by date above.
@@ -846,19 +897,13 @@ class csv_sql:
                 time.time()))
 
         # https://datacarpentry.org/python-ecology-lesson/09-working-with-sql/index.html-
-        self.conn = sqlite3.connect(self.database)
-        # current connection is sqlite3 /TODO move to SQLAlchemy
-        df3 = pd.read_sql_query(
-            "SELECT * from {}".format(self.table), self.conn)
-        # sort by date from oldest to newest.
         try:
-            df3 = df3.sort_values(by='Date')
+            df3 = self.load_history()
         except Exception as x:
             traceback.print_exception(
                 Exception, x, x.__traceback__, chain=True)
             logger.info("Database empty: KeyError(key) when sorting by Date, check Database name, path to kpi, typo in path, exiting")
             exit(1)
-        self.conn.close()
 
         # graph group and test-tag are used for detemining the graphs, can use any columns
         # the following list manipulation removes the duplicates
@@ -868,13 +913,6 @@ class csv_sql:
         logger.info("graph_group_list: {}".format(graph_group_list))
 
         # prior to 5.4.3 there was not test-tag, the test tag is in the meta data
-        # logger.info("dataframe df3 {df3}".format(df3=df3))
-
-        test_tag_list = list(df3['test-tag'])
-        test_tag_list = [x for x in test_tag_list if x is not None]
-        test_tag_list = list(sorted(set(test_tag_list)))
-        # logger.info("test_tag_list: {}".format(test_tag_list) )
-
         test_rig_list = list(df3['test-rig'])
         test_rig_list = [x for x in test_rig_list if x is not None]
         test_rig_list = list(sorted(set(test_rig_list)))
@@ -885,147 +923,60 @@ class csv_sql:
         time_now = round(time.time() * 1000)
         test_window_epoch = int(self.test_window_days) * 86400000
 
-        # create the rest of the graphs
-        for test_rig in test_rig_list:
-            for test_tag in test_tag_list:
-                for group in graph_group_list:
-                    df_tmp = df3.loc[(df3['test-rig'] == test_rig) & (
-                        df3['Graph-Group'] == str(group)) & (df3['test-tag'] == str(test_tag))]
-                    if not df_tmp.empty:
-                        # Note if graph group is score there is sub tests for pass and fail
-                        # would like a percentage
-
-                        df_tmp = df_tmp.sort_values(by='Date')
-                        test_id_list = list(df_tmp['test-id'])
-                        kpi_path_list = list(df_tmp['kpi_path'])
-
-                        # get Device Under Test Information ,
-                        # the set command uses a hash , sorted puts it back in order
-                        # the set reduces the redundency the filster removes None
-                        # list puts it back into a list
-                        # This code is since the dut is not passed in to lf_qa.py when
-                        # regernation of graphs from db
-
-                        # find the last Date in the dataframe see if it is a test no longer run
-                        recent_test_run = df_tmp["Date"].iloc[-1]
-                        oldest_test_run = df_tmp["Date"].iloc[0]
-                        # if the recent test is over a week old do not include in run
-                        # 1 day = 86400000 milli seconds
-                        # 1 week = 604800000 milli seconds
-                        time_difference = int(time_now) -int(recent_test_run)
-                        logger.info("time_now: {time_now} recent_test_run: {recent_test_run} difference: {time_difference} test_window_epoch: {test_window_epoch} oldest_test_run: {oldest_test_run}".format(
-                            time_now=time_now,recent_test_run=recent_test_run,test_window_epoch=test_window_epoch, time_difference=time_difference, oldest_test_run=oldest_test_run))
-                        ##if (time_difference) < 604800000:  # TODO have window be configurable
-                        if (time_difference) < test_window_epoch:  # TODO have window be configurable
-                            units_list = list(df_tmp['Units'])
-                            logger.info(
-                                "GRAPHING::: test-rig {} test-tag {}  Graph-Group {}".format(test_rig, test_tag, group))
-                            # group of Score will have subtest
-                            if group == 'Score':
-                                # Print out the Standard Score report
-                                kpi_fig = (
-                                    px.scatter(
-                                        df_tmp,
-                                        x="Date",
-                                        y="numeric-score",
-                                        custom_data=[
-                                            'numeric-score',
-                                            'Subtest-Pass',
-                                            'Subtest-Fail',
-                                            'kernel'
-                                            ],
-                                        color="short-description",
-                                        hover_name="short-description",
-                                        size_max=60)).update_traces(
-                                    mode='lines+markers')
-
-                                kpi_fig.update_traces(
-                                    hovertemplate="<br>".join([
-                                        "kernel-version: %{customdata[4]}",
-                                        "numeric-score: %{customdata[0]}",
-                                        "Subtest-Pass: %{customdata[1]}",
-                                        "Subtest-Fail: %{customdata[2]}"
-                                    ])
-                                )
-
-                                kpi_fig.update_layout(
-                                    title="{test_id} : {group} : {test_tag} : {test_rig}".format(
-                                        test_id=test_id_list[-1], group=group, test_tag=test_tag, test_rig=test_rig),
-                                    xaxis_title="Time",
-                                    yaxis_title="{}".format(units_list[-1]),
-                                    xaxis={'type': 'date'}
-                                )
-                                kpi_fig.update_layout(autotypenumbers='convert types')
-
-                                self.generate_png(df_tmp=df_tmp,
-                                                group=group,
-                                                test_id_list=test_id_list,
-                                                test_tag=test_tag,
-                                                test_rig=test_rig,
-                                                kpi_path_list=kpi_path_list,
-                                                kpi_fig=kpi_fig)
-
-                            else:
-                                kpi_fig = (
-                                    px.scatter(
-                                        df_tmp,
-                                        x="Date",
-                                        y="numeric-score",
-                                        custom_data=[
-                                            'Date',
-                                            'test_dir',
-                                            'numeric-score',
-                                            'kernel',
-                                            'radio_fw',
-                                            'gui_ver',
-                                            'gui_build_date',
-                                            'server_ver',
-                                            'server_build_date',
-                                            'dut-hw-version',
-                                            'dut-sw-version',
-                                            'dut-model-num',
-                                            'dut-serial-num'
-                                            ],
-                                        color="short-description",
-                                        hover_name="short-description",
-                                        size_max=60)).update_traces(
-                                    mode='lines+markers')
-
-                                kpi_fig.update_layout(
-                                    title="{test_id} : {group} : {test_tag} : {test_rig}".format(
-                                        test_id=test_id_list[-1], group=group, test_tag=test_tag, test_rig=test_rig),
-                                    xaxis_title="Time",
-                                    yaxis_title="{units}".format(units=units_list[-1]),
-                                    xaxis={'type': 'date'}
-                                )
-
-                                kpi_fig.update_traces(
-                                    hovertemplate="<br>".join([
-                                        "Date: %{customdata[0]}",
-                                        "test_dir: %{customdata[1]}",
-                                        "numeric-score: %{customdata[2]}",
-                                        "kernel-version: %{customdata[3]}",
-                                        "radio-fw: %{customdata[4]}",
-                                        "gui-version: %{customdata[5]}",
-                                        "gui-build-date: %{customdata[6]}",
-                                        "server-version: %{customdata[7]}",
-                                        "server-build-date: %{customdata[8]}",
-                                        "dut-hw-version: %{customdata[9]}",
-                                        "dut-sw-version: %{customdata[10]}",
-                                        "dut-model-num: %{customdata[11]}",
-                                        "dut-serial-num: %{customdata[12]}",
-                                    ])
-                                )
-
-                                kpi_fig.update_layout(autotypenumbers='convert types')
-
-                                self.generate_png(df_tmp=df_tmp,
-                                                group=group,
-                                                test_id_list=test_id_list,
-                                                test_tag=test_tag,
-                                                test_rig=test_rig,
-                                                kpi_path_list=kpi_path_list,
-                                                kpi_fig=kpi_fig)
+        # one pass over the history splits it into the rows of each graph
+        charts = []
+        for (test_rig, test_tag, group), df_tmp in df3.groupby(['test-rig', 'test-tag', 'Graph-Group'], sort=True):
+            # Note if graph group is score there is sub tests for pass and fail
+            # would like a percentage
+            df_tmp = df_tmp.sort_values(by='Date')
+            test_id_list = list(df_tmp['test-id'])
+            kpi_path_list = list(df_tmp['kpi_path'])
+
+            # find the last Date in the dataframe see if it is a test no longer run
+            recent_test_run = df_tmp["Date"].iloc[-1]
+            oldest_test_run = df_tmp["Date"].iloc[0]
+            # if the recent test is older than the test window do not include in run
+            # 1 day = 86400000 milli seconds
+            time_difference = int(time_now) - int(recent_test_run)
+            logger.info("time_now: {time_now} recent_test_run: {recent_test_run} difference: {time_difference} test_window_epoch: {test_window_epoch} oldest_test_run: {oldest_test_run}".format(
+                time_now=time_now, recent_test_run=recent_test_run, test_window_epoch=test_window_epoch, time_difference=time_difference, oldest_test_run=oldest_test_run))
+            if (time_difference) < test_window_epoch:
+                logger.info(
+                    "GRAPHING::: test-rig {} test-tag {}  Graph-Group {}".format(test_rig, test_tag, group))
+                png_path, html_path = self.get_kpi_chart_paths(group, test_tag, test_rig, kpi_path_list)
+                charts.append({
+                    'df': df_tmp,
+                    'group': group,
+                    'test_id': test_id_list[-1],
+                    'test_id_list': test_id_list,
+                    'test_tag': test_tag,
+                    'test_rig': test_rig,
+                    'units': list(df_tmp['Units'])[-1],
+                    'kpi_path_list': kpi_path_list,
+                    'png_path': png_path,
+                    'html_path': html_path,
+                    'use_cache': self.png_cache,
+                })
+
+        # render the charts in parallel, the html is added in graph order
+        start_time = time.time()
+        if self.workers > 1 and len(charts) > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                results = list(executor.map(render_kpi_chart, charts))
+        else:
+            results = [render_kpi_chart(chart) for chart in charts]
+        cached = 0
+        failed = 0
+        for chart, (png_present, chart_cached) in zip(charts, results):
+            cached += chart_cached
+            if not png_present:
+                failed += 1
+                continue
+            self.add_kpi_chart_html(chart['group'], chart['test_id_list'], chart['test_tag'], chart['test_rig'],
+                                    chart['kpi_path_list'], chart['png_path'], chart['html_path'])
+        logger.info("graphs: {total} rendered: {rendered} unchanged: {cached} failed: {failed} in {seconds:.1f} sec".format(
+            total=len(charts), rendered=len(charts) - cached - failed, cached=cached, failed=failed,
+            seconds=time.time() - start_time))
 
 
 # Feature, Sum up the subtests passed/failed from the kpi files for each
@@ -1092,6 +1043,10 @@ Usage: lf_qa.py --store --png --path <path to directories to traverse> --databas
 
     parser.add_argument('--test_window_days', help="--test_window,  days to look back for test results , used to elimnate older tests being reported default 7 days", default="7")
 
+    parser.add_argument('--workers', help="--workers <number>, processes rendering graphs in parallel default 4", default=4, type=int)
+
+    parser.add_argument('--no_png_cache', help="--no_png_cache , render every graph even if its rows have not changed since the last run", action='store_true')
+
     parser.add_argument('--test_suite', help="--test_suite , the test suite is to help identify which suite was run ", default="lf_qa")
 
     parser.add_argument('--server', help="--server , server switch is deprecated ", default="")
@@ -1171,7 +1126,9 @@ Usage: lf_qa.py --store --png --path <path to directories to traverse> --databas
         _database=__database,
         _table=__table,
         _png=__png,
-        _test_window_days=__test_window_days)
+        _test_window_days=__test_window_days,
+        _workers=args.workers,
+        _png_cache=not args.no_png_cache)
     # csv_dash.sub_test_information()
 
     if args.store:
@@ -228,6 +228,13 @@ This script calculates the theoretical value of three different stations( 11abg/
         else:
             rtscts_name = 'No'
 
+        # MCS, spatial streams and channel width the 802.11ac calculator can compute
+
+        if "11ac" in Calculator_name:
+            ac11_error = wlan_theoretical_sta.ac11_parameter_error(data_name, spatial_name, channel_name)
+            if ac11_error:
+                parse.error(ac11_error)
+
     except Exception as e:
         logging.exception(e)
         exit(2)
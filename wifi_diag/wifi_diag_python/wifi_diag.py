@@ -21,7 +21,6 @@ INCLUDE_IN_README: False
 """
 
 import sys
-import pyshark
 import numpy as np
 import pandas as pd
 import logging
@@ -29,6 +28,8 @@ import argparse
 import shutil
 import os
 import importlib
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
 
 sys.path.append(os.path.join(os.path.abspath(__file__ + "../../../../")))
 
@@ -38,37 +39,182 @@ lf_graph = importlib.import_module("py-scripts.lf_graph")
 lf_bar_graph = lf_graph.lf_bar_graph
 
 
+# Fields read from each packet by tshark, in column order
+TSHARK_FIELDS = ("wlan.fc.type", "wlan.fc.subtype",
+                 "wlan_radio.signal_dbm", "wlan_radio.phy", "wlan_radio.data_rate",
+                 "wlan_radio.11ac.bandwidth", "wlan_radio.11ac.mcs", "wlan_radio.11ac.nss",
+                 "radiotap.he.data_3.data_mcs", "radiotap.he.data_5.data_bw_ru_allocation", "radiotap.he.data_6.nsts",
+                 "wlan_radio.a_mpdu_aggregate_id")
+(F_TYPE, F_SUBTYPE, F_SIGNAL, F_PHY, F_RATE, F_AC_BW, F_AC_MCS, F_AC_NSS,
+ F_HE_MCS, F_HE_BW, F_HE_NSTS, F_AMPDU) = range(len(TSHARK_FIELDS))
+
+# tshark prints the numbers behind these fields, the report shows their names
+PHY_NAMES = {0: "Unknown", 1: "802.11 FHSS", 2: "802.11 IR", 3: "802.11 DSSS", 4: "802.11b", 5: "802.11a",
+             6: "802.11g", 7: "802.11n", 8: "802.11ac", 9: "802.11ad", 10: "802.11ah", 11: "802.11ax", 12: "802.11be"}
+VHT_BANDWIDTH_NAMES = {0: "20 MHz", 1: "40 MHz", 2: "20 MHz", 3: "20 MHz", 4: "80 MHz", 5: "40 MHz", 6: "40 MHz",
+                       7: "20 MHz", 8: "20 MHz", 9: "20 MHz", 10: "20 MHz", 11: "160 MHz"}
+HE_BANDWIDTH_NAMES = {0: "20", 1: "40", 2: "80", 3: "160/80+80", 4: "26-tone RU", 5: "52-tone RU", 6: "106-tone RU",
+                      7: "242-tone RU", 8: "484-tone RU", 9: "996-tone RU", 10: "2x996-tone RU"}
+
+HISTOGRAMS = ("management", "control", "data", "mcs", "bandwidth", "nss", "rate", "phy", "signal", "ampdu")
+
+
+def _int_column(column):
+    """ tshark numbers to int, -1 where the field is missing """
+    return np.array([int(value, 0) if value else -1 for value in column], dtype=np.int64)
+
+
+def _named(codes, names):
+    """ show each code as 'name (code)' """
+    unique, inverse = np.unique(codes, return_inverse=True)
+    labels = np.array(["%s (%d)" % (names[code], code) if code in names else str(code) for code in unique.tolist()])
+    return labels[inverse]
+
+
+def _value_counts(values):
+    if len(values) == 0:
+        return {}
+    unique, counts = np.unique(values, return_counts=True)
+    return dict(zip(unique.tolist(), counts.tolist()))
+
+
+def summarize_chunk(lines, subtype_list):
+    """
+    Count the histogram values of a chunk of tshark field rows
+    :param lines: tab separated rows, one per packet, columns as TSHARK_FIELDS
+    :param subtype_list: dict of raw frame control byte, like '88', to subtype name
+    :return: dict of histogram name to {value: packets}, and 'count' the packets in the chunk
+    """
+    rows = [line.rstrip("\n").split("\t") for line in lines]
+    rows = [row + [""] * (len(TSHARK_FIELDS) - len(row)) for row in rows]
+    columns = np.array(rows, dtype=str).reshape(len(rows), len(TSHARK_FIELDS)).T
+    frame_type = _int_column(columns[F_TYPE])
+    subtype = _int_column(columns[F_SUBTYPE])
+
+    # raw frame control byte: subtype, type, version 0
+    raw = np.array(["%02x" % byte for byte in ((subtype << 4) | (frame_type << 2)).tolist()])
+    known = np.isin(raw, list(subtype_list.keys()))
+    names = np.array([subtype_list.get(key, "") for key in raw.tolist()])
+
+    summary = {"count": len(rows)}
+    summary["management"] = _value_counts(names[(frame_type == 0) & known])
+    summary["control"] = _value_counts(names[(frame_type == 1) & known])
+    data = (frame_type == 2) & known
+    summary["data"] = _value_counts(names[data])
+
+    # rate fields of data frames that have radio information
+    data = data & (columns[F_PHY] != "")
+    ac = data & (columns[F_AC_NSS] != "")
+    he = data & (columns[F_HE_NSTS] != "")
+    mcs = np.concatenate([columns[F_AC_MCS][ac & (columns[F_AC_MCS] != "")],
+                          _int_column(columns[F_HE_MCS][he & (columns[F_HE_MCS] != "")]).astype(str)])
+    ac_bw = ac & (columns[F_AC_BW] != "")
+    he_bw = he & (columns[F_HE_BW] != "")
+    bandwidth = np.concatenate([_named(_int_column(columns[F_AC_BW][ac_bw]), VHT_BANDWIDTH_NAMES),
+                                _named(_int_column(columns[F_HE_BW][he_bw]), HE_BANDWIDTH_NAMES)])
+    nss = np.concatenate([columns[F_AC_NSS][ac], columns[F_HE_NSTS][he]])
+    summary["mcs"] = _value_counts(mcs)
+    summary["bandwidth"] = _value_counts(bandwidth)
+    summary["nss"] = _value_counts(nss)
+    summary["ampdu"] = _value_counts(columns[F_AMPDU][data & (columns[F_AMPDU] != "")])
+
+    # radio information of every packet
+    summary["rate"] = _value_counts(columns[F_RATE][columns[F_RATE] != ""])
+    phy = columns[F_PHY] != ""
+    summary["phy"] = _value_counts(_named(_int_column(columns[F_PHY][phy]), PHY_NAMES))
+    summary["signal"] = _value_counts(columns[F_SIGNAL][columns[F_SIGNAL] != ""])
+    return summary
+
+
+def merge_summaries(total, summary):
+    """ add the counts of summary into total """
+    total["count"] = total.get("count", 0) + summary["count"]
+    for name in HISTOGRAMS:
+        counts = total.setdefault(name, {})
+        for value, packets in summary[name].items():
+            counts[value] = counts.get(value, 0) + packets
+    return total
+
+
+def read_pcap_chunks(pcap_file, chunk_rows=50000):
+    """
+    Stream the fields of TSHARK_FIELDS out of a capture
+    :return: generator of lists of at most chunk_rows tshark rows
+    """
+    command = ["tshark", "-r", pcap_file, "-T", "fields", "-E", "separator=/t", "-E", "occurrence=f"]
+    for field in TSHARK_FIELDS:
+        command += ["-e", field]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, universal_newlines=True)
+    chunk = []
+    try:
+        for line in process.stdout:
+            chunk.append(line)
+            if len(chunk) >= chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+    finally:
+        process.stdout.close()
+        if process.wait() != 0:
+            logging.warning("tshark exited with %s reading %s" % (process.returncode, pcap_file))
+
+
+def summarize_pcap(pcap_file, subtype_list, chunk_rows=50000, workers=1):
+    """
+    Histogram counts of a whole capture, read a chunk at a time
+    :param workers: processes counting chunks; tshark decodes in its own process either way
+    :return: merged summary, see summarize_chunk()
+    """
+    total = {}
+    chunks = read_pcap_chunks(pcap_file, chunk_rows=chunk_rows)
+    if workers <= 1:
+        for chunk in chunks:
+            merge_summaries(total, summarize_chunk(chunk, subtype_list))
+            print("packets read:", total["count"])
+        return total
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # keep at most two chunks per worker in flight
+        pending = []
+        for chunk in chunks:
+            pending.append(executor.submit(summarize_chunk, chunk, subtype_list))
+            if len(pending) >= 2 * workers:
+                merge_summaries(total, pending.pop(0).result())
+                print("packets read:", total["count"])
+        for future in pending:
+            merge_summaries(total, future.result())
+    print("packets read:", total.get("count", 0))
+    return total
+
+
+def histogram(values):
+    """
+    :param values: list of values, or dict of value to packets already counted
+    :return: (sorted unique values, packets per value)
+    """
+    if isinstance(values, dict):
+        unique = sorted(values.keys())
+        return unique, [values[value] for value in unique]
+    if len(values) == 0:
+        return [], []
+    unique, counts = np.unique(values, return_counts=True)
+    return unique.tolist(), counts.tolist()
+
+
 class wifi_diag:
-    def __init__(self):
+    def __init__(self, chunk_rows=50000, workers=1):
         self.FilePath = output
-        self.cap = pyshark.FileCapture(self.FilePath)
+        self.chunk_rows = chunk_rows
+        self.workers = workers
 
     # This is for AMPDU Histogram
     def RateAMPDU(self, AMPDU, count):
 
-        countUniqueAMPDU = []
-
         perUniqueAMPDU = []
-        chainCountAMPDU = []
-
-        uniqueAMPDU = np.unique(AMPDU)
-        uniqueAMPDU = [i for i in uniqueAMPDU]
 
-        for countAMPDU in uniqueAMPDU:
-            countUniqueAMPDU.append(AMPDU.count(countAMPDU))
-
-        chainUniqueAMPDU = np.unique(countUniqueAMPDU)
-        chainUniqueAMPDU = [i for i in chainUniqueAMPDU]
-
-        for Acount in chainUniqueAMPDU:
-            chainCountAMPDU.append(countUniqueAMPDU.count(Acount))
-
-        UniqueChainCountAMPDU = np.unique(chainCountAMPDU)
-        UniqueChainCountAMPDU = [i for i in UniqueChainCountAMPDU]
-
-        listAMPDU = []
-        for un in UniqueChainCountAMPDU:
-            listAMPDU.append(chainCountAMPDU.count(un))
+        # packets per aggregate, then aggregates per chain length
+        countUniqueAMPDU = histogram(AMPDU)[1]
+        chainUniqueAMPDU, chainCountAMPDU = histogram(countUniqueAMPDU)
 
         print(chainUniqueAMPDU, chainCountAMPDU)
         dictAMPDU = dict(zip(chainUniqueAMPDU, chainCountAMPDU))
@@ -131,14 +277,9 @@ class wifi_diag:
 
     # This is for MCS Histogram
     def MCSHistogram(self, MCSIndex, vMCS, count):
-        countUniqueMCSIndex = []
-
         perUniqueMCS = []
 
-        uniqueMCSIndex = np.unique(MCSIndex)
-
-        for countMCS in uniqueMCSIndex:
-            countUniqueMCSIndex.append(MCSIndex.count(countMCS))
+        uniqueMCSIndex, countUniqueMCSIndex = histogram(MCSIndex)
 
         for cnt in countUniqueMCSIndex:
             perUniqueMCS.append(round((cnt * 100) / count, 2))
@@ -199,13 +340,9 @@ class wifi_diag:
 
     # This is for Bandwidth Histogram
     def BandwidthHistogram(self, Bandwidth, vBW, count):
-        countUniqueBandwidth = []
         perUniqueBW = []
 
-        uniqueBandwidth = ((np.unique(Bandwidth)))
-
-        for countBandwidth in uniqueBandwidth:
-            countUniqueBandwidth.append(Bandwidth.count(countBandwidth))
+        uniqueBandwidth, countUniqueBandwidth = histogram(Bandwidth)
 
         for cnt in countUniqueBandwidth:
             perUniqueBW.append(round((cnt * 100) / count, 2))
@@ -267,13 +404,9 @@ class wifi_diag:
 
     # This is for NSS Histogram
     def NSSHistogram(self, Spatial_Stream, vNCS, count):
-        countUniqueSpatial_stream = []
         perUniqueNCS = []
 
-        uniqueSpatial_stream = ((np.unique(Spatial_Stream)))
-
-        for countNCS in uniqueSpatial_stream:
-            countUniqueSpatial_stream.append(Spatial_Stream.count(countNCS))
+        uniqueSpatial_stream, countUniqueSpatial_stream = histogram(Spatial_Stream)
 
         for cnt in countUniqueSpatial_stream:
             perUniqueNCS.append(round((cnt * 100) / count, 2))
@@ -334,15 +467,9 @@ class wifi_diag:
 
     # This is for Rate Histogram
     def RateHistogram(self, DataRate, count):
-        countUniqueData = []
         perUniqueData = []
 
-        uniqueData = np.unique(DataRate)
-
-        for i in uniqueData:
-            countUniqueData.append(DataRate.count(i))
-
-        uniqueData = [i for i in uniqueData]
+        uniqueData, countUniqueData = histogram(DataRate)
 
         dictRate = (dict(zip(uniqueData, countUniqueData, )))
 
@@ -401,14 +528,8 @@ class wifi_diag:
 
     #This is for Phy Histogram
     def PhyHistogram(self, PhyType, count):
-        countUniquePhy = []
         perUniquePhy = []
-        uniquePhy = np.unique(PhyType)
-
-        for j in uniquePhy:
-            countUniquePhy.append(PhyType.count(j))
-
-        uniquePhy = [i for i in uniquePhy]
+        uniquePhy, countUniquePhy = histogram(PhyType)
 
         dictPhy = (dict(zip(uniquePhy, countUniquePhy)))
 
@@ -470,14 +591,8 @@ class wifi_diag:
 
     # This is for Signal Histogram
     def SignalHistogram(self, SignalStrength, count):
-        countUniqueSignal = []
         perUniqueSignal = []
-        uniqueSignal = np.unique(SignalStrength)
-
-        for k in uniqueSignal:
-            countUniqueSignal.append(SignalStrength.count(k))
-
-        uniqueSignal = [i for i in uniqueSignal]
+        uniqueSignal, countUniqueSignal = histogram(SignalStrength)
         dictSig = (dict(zip(uniqueSignal, countUniqueSignal)))
 
         for e in countUniqueSignal:
@@ -547,12 +662,13 @@ class wifi_diag:
 
         for Type, Subtype in Type_Subtype.items():
 
+            subtype_counts = dict(zip(*histogram(Subtype[0])))
             liskeys = []
             for key in subtype_list.values():
                 if (key in liskeys):
                     continue
 
-                val = Subtype[0].count(key)
+                val = subtype_counts.get(key, 0)
                 liskeys.append(key)
                 if (val != 0):
                     Type_list.append(str(Type))
@@ -628,252 +744,23 @@ class wifi_diag:
                         }
 
 
-        Managementls = []
-        Controlls = []
-        Data_framels = []
-        PhyType = []
-        DataRate = []
-        SignalStrength = []
-
-
-        MCSIndex = []
-        Bandwidth = []
-        PHY = []
-        Spatial_Stream = []
-        AMPDU = []
-
-        vDataType = 0
-        count = 0
-        vWLAN_RADIO = 0
-        vsignalstrength = 0
-        vPhy = 0
-        vdatarate = 0
-        vWLAN = 0
-
-        vNotPHY = 0
-        vNotBW = 0
-        vNotMCS = 0
-        vNOTNCS = 0
-        vMCS = 0
-        vPHY = 0
-        vBW = 0
-        vNCS = 0
-        vAMPDU = 0
-        vNotAMPD = 0
-
-        for packet in self.cap:
-            count += 1
-            print(count)
-
-
-            try:
-                WLAN_RADIO = packet.wlan_radio
-                wlan_radio_Fields_keys = []
-                wlan_radio_Fields_values = []
-
-                for keys, values in packet.wlan_radio._all_fields.items():
-                    # print(keys, ":", values)
-                    wlan_radio_Fields_keys.append(keys)
-                    wlan_radio_Fields_values.append(values)
-
-                vWLAN_RADIO = 1
-                try:
-                    signalstrength = WLAN_RADIO.signal_dbm
-                    vsignalstrength = 1
-                except:
-                    pass
-
-                try:
-                    phy = WLAN_RADIO.phy.showname_value
-                    vPhy = 1
-                except:
-                    pass
-
-                try:
-                    datarate = WLAN_RADIO.data_rate
-                    vdatarate = 1
-                except:
-                    pass
-
-            except:
-                pass
-                # print("WLAN RADIO NOT FOUND")
-
-            try:
-                RADIOTAP = packet.radiotap
-                # radiotap_field_keys = []
-                # radiotap_field_values = []
-                #
-                # for keys, values in packet.radiotap._all_fields.items():
-                #     print(keys, ":", values)
-                #     radiotap_field_keys.append(keys)
-                #     radiotap_field_values.append(values)
-
-                # print("*****************RADIOTAP**************************")
-            except:
-                # print("RADIOTAP NOT FOUND")
-                pass
-
-            try:
-                WLAN = packet.wlan
-                # for keys, values in packet.wlan._all_fields.items():
-                #     print(keys, ":", values)
-                # print("***********************************************")
-                vWLAN = 1
-            except:
-                pass
-                # print("WLAN NOT FOUND")
-
-
-            PacketCount = (packet.number)
-
-
-            if vWLAN == 1:
-                # print("WLAN found")
-                # Type/Subtype raw value
-                type_raw = (str(packet.wlan.fc_type.raw_value))
-                subtype_raw = ((packet.wlan.fc_type_subtype.raw_value))
-
-                # Name of values Types/Subtype
-                type = (str(packet.wlan.fc_type.showname_value))
-                subtype = (str(packet.wlan.fc_type_subtype.showname_value))
-
-                # Sorting Subtypes by Types as a refrence
-                if (type_raw == "0"):
-                    try:
-                        Managementls.append(subtype_list[subtype_raw])
-                    except:
-                        pass
-
-                elif (type_raw == "1"):
-                    try:
-                        Controlls.append(subtype_list[subtype_raw])
-                    except:
-                        print("Control Frame", subtype, subtype_raw)
-
-                elif (type_raw == "2"):
-
-                    try:
-                        vDataType += 1
-
-                        Data_framels.append(subtype_list[subtype_raw])
-                        checkType =  packet.wlan_radio._all_fields["wlan_radio.phy"]
-
-
-                        try:
-
-                            if "wlan_radio.11ac.bandwidth" and "wlan_radio.11ac.mcs" and "wlan_radio.11ac.nss" in wlan_radio_Fields_keys:
-                                print("in 11ac")
-                                try:
-
-                                    if "wlan_radio.11ac.bandwidth" in wlan_radio_Fields_keys:
-                                        Bandwidth.append(packet.wlan_radio._all_fields["wlan_radio.11ac.bandwidth"].showname_value)
-                                        vBW += 1
-                                        # print("11 ac bandwidth")
-
-                                    if "wlan_radio.11ac.mcs" in wlan_radio_Fields_keys:
-                                        MCSIndex.append(packet.wlan_radio._all_fields["wlan_radio.11ac.mcs"].showname_value)
-                                        vMCS += 1
-                                        # print("11 ac MCS")
-
-                                    if "wlan_radio.11ac.nss" in wlan_radio_Fields_keys:
-                                        Spatial_Stream.append(packet.wlan_radio._all_fields["wlan_radio.11ac.nss"].showname_value)
-                                        vNCS += 1
-                                        # print("11 ac NSS")
-
-
-                                except:
-                                    print("wlan_radio.11ac.bandwidth  or wlan_radio.11ac.mcs or wlan_radio.11ac.nss not found")
-
-                            try:
-                                # print("in 11ax")
-                                radiotap_field_keys = []
-                                radiotap_field_values = []
-
-                                for keys, values in packet.radiotap._all_fields.items():
-                                    # print(keys, ":", values)
-                                    radiotap_field_keys.append(keys)
-                                    radiotap_field_values.append(values)
-
-                                if "radiotap.he.data_3.data_mcs" and "radiotap.he.data_5.data_bw_ru_allocation" and "radiotap.he.data_6.nsts" in radiotap_field_keys:
-
-                                    print("in 11ax inside")
-                                    try:
-                                        if "radiotap.he.data_3.data_mcs" in radiotap_field_keys:
-                                            # print("in 11ax radiotap")
-                                            MCSIndex.append(packet.radiotap._all_fields["radiotap.he.data_3.data_mcs"].showname_value)
-                                            vMCS += 1
-                                    except:
-                                        print("MCS not found in ax")
-
-                                    try:
-                                        if "radiotap.he.data_5.data_bw_ru_allocation" in radiotap_field_keys:
-                                            # print("in BW radiotap 11ax")
-                                            Bandwidth.append(packet.radiotap._all_fields["radiotap.he.data_5.data_bw_ru_allocation"].showname_value)
-                                            vBW += 1
-
-                                    except:
-                                        print("BW not found in ax")
-
-                                    try:
-                                        if "radiotap.he.data_6.nsts" in radiotap_field_keys:
-                                            # print("in 11ax radiotap nsts")
-                                            Spatial_Stream.append(packet.radiotap._all_fields["radiotap.he.data_6.nsts"].showname_value)
-                                            vNCS += 1
-
-
-                                    except:
-                                        print("NSTS not found in ax")
-                            except:
-                                print("radiotap.he.data_3.data_mcs  or radiotap.he.data_5.data_bw_ru_allocation or radiotap.he.data_6.nsts not found")
-
-                            if "wlan_radio.a_mpdu_aggregate_id" in wlan_radio_Fields_keys:
-                                AMPDU.append((packet.wlan_radio._all_fields["wlan_radio.a_mpdu_aggregate_id"].showname_value))
-                                vAMPDU += 1
-
-                            if "wlan_radio.phy" in wlan_radio_Fields_keys:
-                                PHY.append(packet.wlan_radio._all_fields["wlan_radio.phy"].showname_value)
-                                vPHY += 1
-
-
-                        except:
-                            pass
-                            # print("comming out through try in except")
-
-
-                    except:
-                        print("Data frame", subtype, subtype_raw)
-
-                else:
-                    print("\nMissing Type in table : ", type_raw, subtype, subtype_raw, "\n")
-            else:
-                print("Packet Number :",count,":"," WLAN NOT FOUND")
-
-            vWLAN = 0
-            if vdatarate == 1:
-                DataRate.append(datarate)
-
-            if vPhy == 1:
-                PhyType.append(phy)
-
-            if vsignalstrength == 1:
-                SignalStrength.append(signalstrength)
-
-            try:
+        # one streaming pass over the capture, counted a chunk at a time
+        summary = summarize_pcap(self.FilePath, subtype_list, chunk_rows=self.chunk_rows, workers=self.workers)
+        count = summary.get("count", 0)
+        if count == 0:
+            print("No packets found in", self.FilePath)
+            return
 
-                print("\r" + count, ":", packet.wlan_radio._all_fields.items())
-            except:
-                pass
-        if vAMPDU != 0:
-            wd_obj.RateAMPDU(AMPDU, count)
+        if summary["ampdu"]:
+            wd_obj.RateAMPDU(summary["ampdu"], count)
 
-        wd_obj.MCSHistogram(MCSIndex, vMCS, count)
-        wd_obj.BandwidthHistogram(Bandwidth, vBW, count)
-        wd_obj.NSSHistogram(Spatial_Stream, vNCS, count)
-        wd_obj.RateHistogram(DataRate, count)
-        wd_obj.PhyHistogram(PhyType, count)
-        wd_obj.SignalHistogram(SignalStrength, count)
-        wd_obj.PacketHistogram(subtype_list, Managementls, Controlls, Data_framels, count)
+        wd_obj.MCSHistogram(summary["mcs"], sum(summary["mcs"].values()), count)
+        wd_obj.BandwidthHistogram(summary["bandwidth"], sum(summary["bandwidth"].values()), count)
+        wd_obj.NSSHistogram(summary["nss"], sum(summary["nss"].values()), count)
+        wd_obj.RateHistogram(summary["rate"], count)
+        wd_obj.PhyHistogram(summary["phy"], count)
+        wd_obj.SignalHistogram(summary["signal"], count)
+        wd_obj.PacketHistogram(subtype_list, summary["management"], summary["control"], summary["data"], count)
 
         report.build_footer()
 
@@ -883,6 +770,10 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="To create a report from a pcap files")
     parser.add_argument("-i", "--input", type=str,
                         help="Enter the Name of the pcap files which needs to generatate pdf report.")
+    parser.add_argument("--chunk_rows", type=int, default=50000,
+                        help="packets counted per chunk, bounds the memory used")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes counting chunks in parallel")
 
     args = None
 
@@ -926,7 +817,7 @@ if __name__ == "__main__":
                         "RSSI, percentage of control frames and management frames, etc. ")
     report.build_objective()
 
-    wd_obj = wifi_diag()
+    wd_obj = wifi_diag(chunk_rows=args.chunk_rows, workers=args.workers)
     wd_obj.main()
 
     html_file = report.write_html()